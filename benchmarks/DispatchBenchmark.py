@@ -0,0 +1,108 @@
+# <h1>DispatchBenchmark</h1>
+# <p>Per-call cost of the CodeGenerator, SymTableStack and
+# SemanticErrorHandler entry points that used to be overloaded with
+# multipledispatch, against the same overloads routed through @dispatch.
+# The @dispatch versions call the current bodies, so their figures include
+# one extra Python call. Run from the repository root:</p>
+# <pre>python -m benchmarks.DispatchBenchmark</pre>
+import contextlib
+import io
+import sys
+import timeit
+
+from multipledispatch import dispatch
+
+from edu.yu.compilers.backend.converter.CodeGenerator import CodeGenerator
+from edu.yu.compilers.frontend.SemanticErrorHandler import SemanticErrorHandler
+from edu.yu.compilers.intermediate.ast.Ast import Node
+from edu.yu.compilers.intermediate.symtable.SymTable import SymTable
+from edu.yu.compilers.intermediate.symtable.SymTableStack import SymTableStack
+
+Code = SemanticErrorHandler.Code
+
+
+# The overloads as they were, on top of the current bodies.
+class DispatchCodeGenerator(CodeGenerator):
+
+    @dispatch()
+    def emit_start(self):
+        CodeGenerator.emit_start(self)
+
+    @dispatch(str)
+    def emit_start(self, code):
+        CodeGenerator.emit_start(self, code)
+
+    @dispatch()
+    def emit_line(self):
+        CodeGenerator.emit_line(self)
+
+    @dispatch(str)
+    def emit_line(self, code):
+        CodeGenerator.emit_line(self, code)
+
+
+class DispatchSymTableStack(SymTableStack):
+
+    @dispatch()
+    def push(self):
+        return SymTableStack.push(self)
+
+    @dispatch(SymTable)
+    def push(self, symTable):
+        return SymTableStack.push(self, symTable)
+
+
+class DispatchSemanticErrorHandler(SemanticErrorHandler):
+
+    @dispatch(Code, int, str)
+    def flag(self, code, lineNumber, text):
+        SemanticErrorHandler.flag(self, code, lineNumber, text)
+
+    @dispatch(Code, Node)
+    def flag(self, code, ctx):
+        SemanticErrorHandler.flag(self, code, ctx.start.line, ctx.getText())
+
+
+# Time one call.
+# @param call   the call.
+# @param number the number of calls.
+# @return the cost of a call in nanoseconds.
+def perCall(call, number):
+    return min(timeit.repeat(call, number=number, repeat=5)) / number * 1e9
+
+
+def main():
+    calls = []
+
+    for generatorClass in (DispatchCodeGenerator, CodeGenerator):
+        code = generatorClass(io.StringIO())
+        calls.append((generatorClass.__name__, "emit_start()", code.emit_start))
+        calls.append((generatorClass.__name__, "emit_start(code)", lambda code=code: code.emit_start("x = 1;")))
+        calls.append((generatorClass.__name__, "emit_line()", code.emit_line))
+        calls.append((generatorClass.__name__, "emit_line(code)", lambda code=code: code.emit_line("x = 1;")))
+
+    for stackClass in (DispatchSymTableStack, SymTableStack):
+        def pushPop(stack=stackClass()):
+            stack.push()
+            stack._pop()
+
+        calls.append((stackClass.__name__, "push() + _pop()", pushPop))
+
+    for handlerClass in (DispatchSemanticErrorHandler, SemanticErrorHandler):
+        handler = handlerClass()
+        calls.append((handlerClass.__name__, "flag(code, line, text)",
+                      lambda handler=handler: handler.flag(Code.TYPE_MISMATCH, 12, "x + 'a'")))
+
+    with contextlib.redirect_stdout(io.StringIO()) as sink:
+        results = []
+        for className, method, call in calls:
+            results.append((className, method, perCall(call, 50000)))
+            sink.seek(0)
+            sink.truncate()
+
+    for className, method, cost in results:
+        print(f"{className + '.' + method:<60} {cost:8.0f} ns")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+# <h1>ExpressionBenchmark</h1>
+# <p>Converter time for synthetic programs with a single very long
+# expression: a flat chain of terms, deeply nested parentheses, and a
+# println with thousands of arguments. The Converter builds expression text
+# in fragment lists joined once. ConcatenatingConverter builds it the way
+# it used to, by concatenating the text of each subexpression into the text
+# of its parent. Run from the repository root:</p>
+# <pre>python -m benchmarks.ExpressionBenchmark [termCount ...]</pre>
+import sys
+import timeit
+
+from edu.yu.compilers.backend.converter.Converter import Converter
+from edu.yu.compilers.driver.GraspCompiler import GraspCompiler
+from edu.yu.compilers.frontend.Semantics import Semantics
+from edu.yu.compilers.intermediate.util.BackendMode import BackendMode
+
+# Semantics and the Converter recurse once per nesting level, and each
+# level of parentheses is several nodes deep.
+MAX_NESTING = 60
+
+
+# The expression methods as they were.
+class ConcatenatingConverter(Converter):
+
+    def visitArgumentList(self, ctx):
+        text = ""
+        separator = ""
+
+        for argCtx in ctx.argument:
+            text += separator
+            text += str(self.visit(argCtx.expression))
+            separator = ", "
+
+        return text
+
+    def visitExpression(self, ctx):
+        simpleCtx1 = ctx.simpleExpression[0]
+        relOpCtx = ctx.relOp
+        simpleText1 = str(self.visit(simpleCtx1))
+        text = simpleText1
+
+        if relOpCtx is not None:
+            op = relOpCtx.getText()
+
+            if op == "=":
+                op = "=="
+            elif op == "<>":
+                op = "!="
+
+            simpleText2 = str(self.visit(ctx.simpleExpression[1]))
+            text = simpleText1 + " " + op + " " + simpleText2
+
+        return text
+
+    def visitSimpleExpression(self, ctx):
+        count = len(ctx.term)
+        text = ""
+
+        if ctx.sign is not None and ctx.sign.getText() == "-":
+            text += "-"
+
+        for i in range(count):
+            text += str(self.visit(ctx.term[i]))
+
+            if i < count - 1:
+                addOp = ctx.addOp[i].getText().lower()
+                if addOp == "or":
+                    addOp = "||"
+
+                text += " " + addOp + " "
+
+        return text
+
+    def visitTerm(self, ctx):
+        count = len(ctx.factor)
+        text = ""
+
+        for i in range(count):
+            text += str(self.visit(ctx.factor[i]))
+
+            if i < count - 1:
+                mulOpStr = ctx.mulOp[i].getText().lower()
+                if mulOpStr == "and":
+                    mulOp = " && "
+                elif mulOpStr == "div":
+                    mulOp = "/"
+                elif mulOpStr == "mod":
+                    mulOp = "%"
+                else:
+                    mulOp = mulOpStr
+
+                text += mulOp
+
+        return text
+
+    def visitVariableFactor(self, ctx):
+        return self.visit(ctx.variable)
+
+    def visitNotFactor(self, ctx):
+        return "!" + self.visit(ctx.factor)
+
+    def visitParenthesizedFactor(self, ctx):
+        return "(" + self.visit(ctx.expression) + ")"
+
+    def createWriteArguments(self, ctx):
+        arguments = ""
+        separator = ""
+
+        for argCtx in ctx.writeArgument:
+            if argCtx.getText()[0] != '\'':
+                arguments += separator + self.visit(argCtx.expression)
+                separator = ", "
+
+        return arguments
+
+
+# Create the source of a program whose body is one statement.
+# @param statement the statement.
+# @return the source text.
+def programSource(statement):
+    return ("program Expressions;\n"
+            "VAR{\n"
+            "    integer i, j, k;\n"
+            "}\n"
+            "Do {\n"
+            f"    {statement};\n"
+            "}\n")
+
+
+# Create the synthetic programs for one term count.
+# @param count the number of terms.
+# @return a list of (shape, source) pairs.
+def programs(count):
+    names = ("i", "j", "k")
+
+    flat = " + ".join(f"{names[t % 3]} * {t % 7 + 1}" for t in range(count))
+
+    # Nest in groups, so that the nesting depth stays within the
+    # recursion limit however many terms there are.
+    depth = min(count, MAX_NESTING)
+    group = "i"
+    for t in range(1, depth):
+        group = f"({group} + {names[t % 3]})"
+    nested = " - ".join([group] * max(count // depth, 1))
+
+    arguments = ", ".join(f"{names[t % 3]} + {t}" for t in range(count))
+
+    return [
+        ("flat", programSource(f"i = {flat}")),
+        ("nested", programSource(f"i = {nested}")),
+        ("arguments", programSource(f"println({arguments})")),
+    ]
+
+
+# Parse and analyze a source.
+# @param compiler the GraspCompiler to parse with.
+# @param source   the source text.
+# @return the analyzed AST.
+def analyze(compiler, source):
+    tree = compiler.parseDescent(source)
+    program = compiler.astBuilder.build(tree, compiler.parser.getTokenStream().tokens)
+    Semantics(BackendMode.CONVERTER).visit(program)
+    return program
+
+
+def main(args):
+    counts = [int(arg) for arg in args] or [1000, 4000, 16000]
+    compiler = GraspCompiler(fastLex=True)
+
+    print(f"{'shape':<10} {'terms':>8} {'concatenating':>14} {'fragments':>10}")
+    for count in counts:
+        for shape, source in programs(count):
+            program = analyze(compiler, source)
+            times = []
+
+            for converterClass in (ConcatenatingConverter, Converter):
+                times.append(min(timeit.repeat(lambda: converterClass().visit(program),
+                                               number=1, repeat=5)) * 1000)
+
+            print(f"{shape:<10} {count:>8} {times[0]:>12.2f}ms {times[1]:>8.2f}ms")
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,78 @@
+# <h1>SymTableBenchmark</h1>
+# <p>Cost of filling a symbol table with thousands of entries, looking them
+# up, and asking for the sorted entries repeatedly as the Converter does,
+# for SymTable against the same table on a SortedDict that copies the
+# entries on every call. Run from the repository root:</p>
+# <pre>python -m benchmarks.SymTableBenchmark [entryCount ...]</pre>
+import sys
+import timeit
+
+from sortedcontainers import SortedDict
+
+from edu.yu.compilers.intermediate.symtable.Kind import Kind
+from edu.yu.compilers.intermediate.symtable.SymTable import SymTable
+from edu.yu.compilers.intermediate.symtable.SymTableEntry import SymTableEntry
+
+
+# The symbol table as it was.
+class SortedDictSymTable(SortedDict):
+
+    def __init__(self, nestingLevel):
+        super().__init__()
+        self.nestingLevel = nestingLevel
+
+    def enter(self, name, kind):
+        entry = SymTableEntry(name, kind, self)
+        super().__setitem__(name, entry)
+        return entry
+
+    def lookup(self, name):
+        return super().get(name)
+
+    def sortedEntries(self):
+        return list(super().values())
+
+
+# Time the table operations at one size.
+# @param tableClass the symbol table class.
+# @param names      the names to enter, in declaration order.
+# @return the enter, lookup and sortedEntries times in milliseconds.
+def timeTable(tableClass, names):
+    def enterAll():
+        table = tableClass(1)
+        for name in names:
+            table.enter(name, Kind.VARIABLE)
+        return table
+
+    table = enterAll()
+
+    def lookupAll():
+        for name in names:
+            table.lookup(name)
+
+    # The Converter asks for the sorted entries once per declaration list,
+    # record definition and allocation pass.
+    def sortedAll():
+        for i in range(100):
+            for entry in table.sortedEntries():
+                pass
+
+    return [min(timeit.repeat(call, number=1, repeat=5)) * 1000
+            for call in (enterAll, lookupAll, sortedAll)]
+
+
+def main(args):
+    sizes = [int(arg) for arg in args] or [1000, 5000, 20000]
+
+    print(f"{'table':<20} {'entries':>8} {'enter':>10} {'lookup':>10} {'100 sorted':>12}")
+    for size in sizes:
+        # Declaration order isn't name order.
+        names = [f"v{(i * 7919) % size}" for i in range(size)]
+
+        for tableClass in (SortedDictSymTable, SymTable):
+            enter, lookup, sortedViews = timeTable(tableClass, names)
+            print(f"{tableClass.__name__:<20} {size:>8} {enter:>8.2f}ms {lookup:>8.2f}ms {sortedViews:>10.2f}ms")
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,128 @@
+# <h1>VirtualMachineBenchmark</h1>
+# <p>Run time of synthetic programs on the EXECUTOR backend's closures, on
+# the COMPILER backend's VM and as the PYTHON backend's generated Python:
+# a loop of arithmetic, a loop of function calls, a loop over an array,
+# and a small program run once for each of many inputs. Run from the
+# repository root:</p>
+# <pre>python -m benchmarks.VirtualMachineBenchmark [iterations [inputs]]</pre>
+import io
+import sys
+import timeit
+
+from edu.yu.compilers.driver.GraspCompiler import GraspCompiler
+from edu.yu.compilers.intermediate.util.BackendMode import BackendMode
+
+DECLARATIONS = ("VAR{\n"
+                "    integer i, j, n, total;\n"
+                "    integer[5] a;\n"
+                "}\n"
+                "Function add(integer u, integer v) returns integer{\n"
+                "    Do {\n"
+                "        return u + v;\n"
+                "    }\n"
+                "}\n")
+
+
+# Create the source of a program.
+# @param body the statements of its body.
+# @return the source text.
+def programSource(body):
+    return f"program Benchmark;\n{DECLARATIONS}DO {{\n{body}\n}}\n"
+
+
+# Create the synthetic programs.
+# @param iterations the number of loop iterations.
+# @return a list of (shape, source) pairs.
+def programs(iterations):
+    return [
+        ("arithmetic", programSource(
+            "    total = 0;\n"
+            f"    FOR INDEX i START AT 0 AND WHILE i < {iterations} KEEP DOING\n"
+            "        total = total + i mod 7 * 3 - i div 5;\n"
+            "    UPDATE i = i + 1;\n"
+            "    println(total);")),
+        ("calls", programSource(
+            "    total = 0;\n"
+            f"    FOR INDEX i START AT 0 AND WHILE i < {iterations} KEEP DOING\n"
+            "        total = add(total, i);\n"
+            "    UPDATE i = i + 1;\n"
+            "    println(total);")),
+        ("arrays", programSource(
+            f"    FOR INDEX i START AT 0 AND WHILE i < {iterations // 5} KEEP DOING\n"
+            "        FOR INDEX j START AT 0 AND WHILE j < 5 KEEP DOING\n"
+            "            a[j] = a[j] + i mod 3;\n"
+            "        UPDATE j = j + 1;\n"
+            "    UPDATE i = i + 1;\n"
+            "    println(a[0] + a[4]);")),
+    ]
+
+
+# The program run once for each input: the sum of the digits of a number.
+INPUT_PROGRAM = programSource(
+    "    read(n);\n"
+    "    total = 0;\n"
+    "    WHILE n > 0 IS TRUE KEEP DOING {\n"
+    "        total = total + n mod 10;\n"
+    "        n = n div 10;\n"
+    "    }\n"
+    "    println(total);")
+
+
+# Compile a program for a backend.
+# @param mode   the BackendMode.
+# @param source the source text.
+# @return the Executable, VirtualMachine or PythonProgram.
+def compileProgram(mode, source):
+    result = GraspCompiler(mode, fastLex=True).compileSource("Benchmark.grasp", source, capture=True)
+    if result.executable is None:
+        raise RuntimeError(f"{mode.name}: {result.getStatus()}\n{result.diagnostics}")
+    return result.executable
+
+
+# Run a program once for each input.
+# @param executable the Executable, VirtualMachine or PythonProgram.
+# @param inputs     the input texts.
+# @return the output texts.
+def runAll(executable, inputs):
+    outputs = []
+    for text in inputs:
+        output = io.StringIO()
+        executable.run(io.StringIO(text), output)
+        outputs.append(output.getvalue())
+    return outputs
+
+
+def main(args):
+    iterations = int(args[0]) if len(args) > 0 else 300000
+    inputCount = int(args[1]) if len(args) > 1 else 5000
+    modes = (BackendMode.EXECUTOR, BackendMode.COMPILER, BackendMode.PYTHON)
+
+    print(f"{'program':<12} {'executor':>10} {'vm':>10} {'python':>10}")
+    for shape, source in programs(iterations):
+        times = []
+        outputs = []
+
+        for mode in modes:
+            executable = compileProgram(mode, source)
+            output = io.StringIO()
+            times.append(min(timeit.repeat(lambda: executable.run(io.StringIO(), output),
+                                           number=1, repeat=3)) * 1000)
+            outputs.append(output.getvalue())
+
+        assert outputs[1:] == outputs[:-1], f"{shape}: the outputs differ"
+        print(f"{shape:<12} " + " ".join(f"{time:>8.0f}ms" for time in times))
+
+    inputs = [f"{number * 7919 % 1000000007}\n" for number in range(inputCount)]
+    times = []
+    outputs = []
+    for mode in modes:
+        executable = compileProgram(mode, INPUT_PROGRAM)
+        times.append(min(timeit.repeat(lambda: runAll(executable, inputs), number=1, repeat=3)) * 1000)
+        outputs.append(runAll(executable, inputs))
+
+    assert outputs[1:] == outputs[:-1], "inputs: the outputs differ"
+    print(f"{f'{inputCount} inputs':<12} " + " ".join(f"{time:>8.0f}ms" for time in times))
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
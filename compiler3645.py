@@ -1,77 +1,133 @@
+import argparse
+import contextlib
 import os
 import sys
 
-import antlr4
-
-from gen.GraspLexer import GraspLexer
-from gen.GraspParser import GraspParser
-from edu.yu.compilers.frontend.Semantics import Semantics
-from edu.yu.compilers.frontend.SyntaxErrorHandler import SyntaxErrorHandler
+from edu.yu.compilers.driver.BatchCompiler import BatchCompiler
+from edu.yu.compilers.driver.CompileCache import CompileCache
+from edu.yu.compilers.driver.GraspCompiler import GraspCompiler, Tee
+from edu.yu.compilers.driver.ParseStatistics import ParseStatistics
 from edu.yu.compilers.intermediate.util.BackendMode import BackendMode
-from edu.yu.compilers.backend.converter.Converter import Converter
-from antlr4 import CommonTokenStream
+
+# Buffer size of the Java file the converter streams into.
+OBJECT_FILE_BUFFER_SIZE = 1 << 20
+
+
+# Open a new Java file for the converter to stream into.
+# @param java_file_name the Java file name. The file must not exist.
+# @param echo           an optional stream to also echo the Java to.
+# @return the stream, in a context manager. The file is removed again if
+#         the conversion fails.
+@contextlib.contextmanager
+def openJavaFile(java_file_name, echo):
+    javaFile = open(java_file_name, "x", buffering=OBJECT_FILE_BUFFER_SIZE)
+    try:
+        yield Tee(javaFile, echo) if echo is not None else javaFile
+    except BaseException:
+        javaFile.close()
+        os.remove(java_file_name)
+        raise
+
+    javaFile.close()
+    if echo is not None:
+        print(file=echo)
 
 
 def main(args):
-    if len(args) != 2:
+    argParser = argparse.ArgumentParser(prog="python3 compiler3645.py")
+    argParser.add_argument("sources", nargs="+", metavar="sourceFileName",
+                           help="source file or a .gast AST image, or with --batch, files and directories")
+    argParser.add_argument("--batch", action="store_true",
+                           help="compile every file with one warm parser and report throughput")
+    argParser.add_argument("-j", dest="jobs", type=int, default=None, metavar="N",
+                           help="compile a batch on N worker processes (implies --batch)")
+    argParser.add_argument("-d", dest="output_dir", default=".",
+                           help="directory for the Java files of a batch (default: current directory)")
+    argParser.add_argument("--cache", dest="cache_dir", default=None, metavar="DIR",
+                           help="reuse results for unchanged sources from a compile cache in DIR")
+    argParser.add_argument("--cache-size", dest="cache_size", type=int, default=256, metavar="MB",
+                           help="size limit of the compile cache (default: 256 MB)")
+    argParser.add_argument("--ast-dir", dest="ast_dir", default=None, metavar="DIR",
+                           help="also write an AST image (.gast) of each analyzed program into DIR")
+    argParser.add_argument("--fast-parse", dest="fast_parse", action="store_true",
+                           help="parse with the generated parser's SLL prediction instead of the descent parser, "
+                                "falling back to full LL on a syntax error")
+    argParser.add_argument("--fast-lex", dest="fast_lex", action="store_true",
+                           help="lex with the hand-written scanner instead of the generated lexer")
+    argParser.add_argument("--antlr-parser", dest="antlr_parser", action="store_true",
+                           help="parse with the generated ANTLR parser only (the reference parser)")
+    argParser.add_argument("--quiet", action="store_true",
+                           help="don't echo the generated Java to stdout")
+    argParser.add_argument("--execute", action="store_true",
+                           help="run the program in-process instead of converting it to Java")
+    argParser.add_argument("--vm", action="store_true",
+                           help="like --execute, but compile the program to bytecode and run it on the VM")
+    argParser.add_argument("--python", action="store_true",
+                           help="like --execute, but translate the program to Python and run that")
+    argParser.add_argument("--py-dir", dest="py_dir", default=None, metavar="DIR",
+                           help="with --python, also write the Python module and its .pyc cache into DIR")
+    options = argParser.parse_args(args[1:])
+    cacheMaxBytes = options.cache_size * 1024 * 1024
+
+    run = options.execute or options.vm or options.python
+    mode = BackendMode.PYTHON if options.python else BackendMode.COMPILER if options.vm else \
+        BackendMode.EXECUTOR if options.execute else BackendMode.CONVERTER
+    if options.execute + options.vm + options.python > 1:
+        argParser.error("--execute, --vm and --python are alternatives")
+    if run and (options.batch or options.jobs is not None or options.cache_dir is not None):
+        argParser.error("--execute, --vm and --python run a single program, without a compile cache")
+    if (options.py_dir is not None) and not options.python:
+        argParser.error("--py-dir needs --python")
+
+    if options.batch or options.jobs is not None:
+        jobs = options.jobs if options.jobs is not None else 1
+        if jobs < 1:
+            argParser.error("-j needs at least one worker")
+        batch = BatchCompiler(options.output_dir, mode, jobs, options.cache_dir, cacheMaxBytes, options.ast_dir,
+                             options.fast_parse, options.fast_lex, options.antlr_parser)
+        return 1 if batch.run(options.sources) > 0 else 0
+
+    if len(options.sources) != 1:
         print(args)
         print("python3 compiler3645.py <sourceFileName>")
         return
 
-    source_file_name = args[1]
-
-    mode = BackendMode.CONVERTER
-    # Create the input stream.
-    source = open(source_file_name, 'r').read()
-
-    # Create the character stream from the input stream.
-    cs = antlr4.InputStream(source)  # FIXME
-
-    # Custom syntax error handler.
-    syntax_error_handler = SyntaxErrorHandler()
-
-    # Create a lexer which scans the character stream
-    # to create a token stream.
-    lexer = GraspLexer(cs)
-    lexer.removeErrorListeners()
-    lexer.addErrorListener(syntax_error_handler)
-    tokens = CommonTokenStream(lexer)
-
-    # Create a parser which parses the token stream.
-    parser = GraspParser(tokens)
-
-    # Pass 1: Check syntax and create the parse tree.
-    parser.removeErrorListeners()
-    parser.addErrorListener(syntax_error_handler)
-    tree = parser.program()
+    source_file_name = options.sources[0]
+    cache = CompileCache(options.cache_dir, cacheMaxBytes) if options.cache_dir is not None else None
+    compiler = GraspCompiler(mode, cache, options.ast_dir, options.fast_parse, options.fast_lex,
+                             options.antlr_parser)
+    java_file_name = GraspCompiler.javaFileName(source_file_name)
+    # The compiler redirects stdout to keep the error listings: echo to the real one.
+    echo = None if options.quiet else sys.stdout
+    openObjectFile = None if run else lambda: openJavaFile(java_file_name, echo)
+    if source_file_name.endswith(".gast"):
+        # Convert a saved analyzed tree without parsing again.
+        result = compiler.convertImage(source_file_name, openObjectFile)
+    else:
+        result = compiler.compileFile(source_file_name, capture=False, openObjectFile=openObjectFile)
+    if options.fast_parse:
+        parseStatistics = ParseStatistics()
+        parseStatistics.add(result)
+        print(parseStatistics.getStatistics(), file=sys.stderr)
+
+    if run:
+        if result.executable is None:
+            return 1
+        if options.py_dir is not None:
+            result.executable.write(os.path.join(options.py_dir, GraspCompiler.pythonFileName(source_file_name)))
+        try:
+            result.executable.run()
+        except (ArithmeticError, LookupError, ValueError, TypeError, EOFError, RecursionError) as ex:
+            sys.stdout.flush()
+            print(f"Runtime error: {type(ex).__name__}: {ex}", file=sys.stderr)
+            return 1
     #
-    # error_count = syntax_error_handler.get_count()
+    # error_count = result.syntaxErrorCount
     # if error_count > 0:
     #     print(f"\nThere were {error_count} syntax errors.")
     #     print("Object file not created or modified.")
     #     return
 
-    # Pass 2: Semantic operations.
-    pass2 = Semantics(mode)
-    pass2.visit(tree)
-
-    error_count = pass2.getErrorCount()
-    if error_count > 0:
-        print(f"\nThere were {error_count} semantic errors.")
-        print("Object file not created or modified.")
-        return
-
-    if mode == BackendMode.CONVERTER:
-        # Pass 3: Convert from Grasp to Java.
-        pass3 = Converter()
-        objectCode = str(pass3.visit(tree))
-        print(objectCode)
-        java_file_name = (source_file_name[source_file_name.rfind(os.sep) + 1:source_file_name.index('.')] + '.java').capitalize()
-        open(java_file_name, "x")
-        javaFile = open(java_file_name, "a")
-        javaFile.write(objectCode)
-        javaFile.close()
-
 
 if __name__ == "__main__":
-    main(sys.argv)
+    sys.exit(main(sys.argv))
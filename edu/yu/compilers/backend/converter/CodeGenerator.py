@@ -1,12 +1,13 @@
-from multipledispatch import dispatch
-
 class CodeGenerator:
     
     blanks = ' ' * 80  # 80 blanks
 
-    # ? how to do PrintWriter here ?
+    # The generator writes fragment by fragment and never flushes: give it
+    # a buffered stream (a StringIO, or a file opened with a large buffer)
+    # and let the owner flush or close it once the program is written.
     def __init__(self, object_file):
         self.object_file = object_file
+        self.write = object_file.write
         self.length = 0  # length of the code line
         self.position = 0  # position in the code line
         self.indentation = ''  # indentation of the code line
@@ -17,52 +18,36 @@ class CodeGenerator:
 
     def lf_if_needed(self):
         if self.need_lf:
-            self.object_file.write('\n')
-            self.object_file.flush()
+            self.write('\n')
             self.length = 0
             self.need_lf = False
 
     def emit(self, code):
-        self.object_file.write(code)
-        self.object_file.flush()
+        self.write(code)
         self.length += len(code)
         self.need_lf = True
 
-    @dispatch()
-    def emit_start(self):
-        self.lf_if_needed()
-        self.emit(self.indentation)
-        self.position = 0
-
-    # ? can you method overload here ?
-    @dispatch(str)
-    def emit_start(self, code):
+    # Start a new line at the current indentation.
+    # @param code the code to start the line with.
+    def emit_start(self, code=''):
         self.lf_if_needed()
         self.emit(self.indentation + code)
         self.position = 0
 
-    @dispatch()
-    def emit_line(self):
-        self.lf_if_needed()
-        self.object_file.write('\n')
-        self.object_file.flush()
-        self.length = 0
-        self.position = 0
-        self.need_lf = False
-
-    # ? can you method overload here ?
-    @dispatch(str)
-    def emit_line(self, code):
+    # Emit a whole line, or an empty line without code.
+    # @param code the code of the line.
+    def emit_line(self, code=None):
         self.lf_if_needed()
-        self.object_file.write(self.indentation + code + '\n')
-        self.object_file.flush()
+        if code is None:
+            self.write('\n')
+        else:
+            self.write(self.indentation + code + '\n')
         self.length = 0
         self.position = 0
         self.need_lf = False
 
     def emit_end(self, code):
-        self.object_file.write(code + '\n')
-        self.object_file.flush()
+        self.write(code + '\n')
         self.length = 0
         self.position = 0
         self.need_lf = False
@@ -83,9 +68,7 @@ class CodeGenerator:
 
     def split(self, limit):
         if self.length > limit:
-            self.object_file.write('\n')
-            self.object_file.write(self.blanks[:self.position])
-            self.object_file.flush()
+            self.write('\n' + self.blanks[:self.position])
             self.length = self.position
             self.position = 0
             self.need_lf = False
@@ -1,16 +1,16 @@
 # Convert Pascal programs to Java.
 import io
 
-from gen.GraspParser import GraspParser
 from edu.yu.compilers.backend.converter.CodeGenerator import CodeGenerator
+from edu.yu.compilers.intermediate.ast import Ast
+from edu.yu.compilers.intermediate.ast.AstVisitor import AstVisitor
 from edu.yu.compilers.intermediate.symtable.Kind import Kind
 from edu.yu.compilers.intermediate.symtable.Predefined import Predefined
 from edu.yu.compilers.intermediate.symtable.SymTable import SymTable
 from edu.yu.compilers.intermediate.type.Form import Form
-from gen.GraspVisitor import GraspVisitor
 
 
-class Converter(GraspVisitor):
+class Converter(AstVisitor):
     # Map a Pascal datatype name to the Java datatype name.
     type_name_table = {
         "integer": "int",
@@ -20,7 +20,12 @@ class Converter(GraspVisitor):
         "string": "String",
     }
 
-    def __init__(self):
+    # Constructor.
+    # @param object_file an optional text stream to write the Java to as it
+    #                    is generated. Without one, visiting the program
+    #                    returns the Java as a string.
+    def __init__(self, object_file=None):
+        self.object_file = object_file
         self.code = None
         self.program_name = None
         self.program_variables = True
@@ -31,31 +36,31 @@ class Converter(GraspVisitor):
         return self.program_name
 
     def visitRoutineDefinition(self, ctx):
-        self.visit(ctx.functionHead())
+        self.visit(ctx.functionHead)
         self.visitFunctionBlock(ctx)
 
 
     def visitFunctionBlock(self, ctx):
-        varDecs = ctx.block().declarations().variablesPart()
+        varDecs = ctx.block.declarations.variablesPart
         if varDecs is not None:
-            for varDec in varDecs.variableDeclarationsList().variableDeclarations():
-                for id_ in varDec.variableIdentifierList().variableIdentifier():
+            for varDec in varDecs.variableDeclarationsList.variableDeclarations:
+                for id_ in varDec.variableIdentifierList.variableIdentifier:
                     self.code.emit_start()
-                    self.visit(varDec.typeSpecification())
+                    self.visit(varDec.typeSpecification)
                     self.code.emit(" " + id_.getText() + ";")
-        routineDefs = ctx.block().declarations().routinesPart()
+        routineDefs = ctx.block.declarations.routinesPart
         if routineDefs is not None:
             self.code.emit_start()
             self.code.emit('class Local{')
-            for definition in routineDefs.routineDefinition():
+            for definition in routineDefs.routineDefinition:
                 self.code.emit_start()
                 #  visit funcHead
-                self.visitSubFunctionHead(definition.functionHead())
+                self.visitSubFunctionHead(definition.functionHead)
                 # everything else is the same
                 self.visitFunctionBlock(definition)  # visits the routien definitions like any other
             self.code.emit("\n}")
         self.code.emit_start()
-        stmts = ctx.block().compoundStatement().statementList().statement()
+        stmts = ctx.block.compoundStatement.statementList.statement
         for i in range(len(stmts)):
             self.visit(stmts[i])
 
@@ -63,10 +68,10 @@ class Converter(GraspVisitor):
         return None
 
     def visitProgram(self, ctx):
-        sw = io.StringIO()
+        sw = io.StringIO() if self.object_file is None else self.object_file
         self.code = CodeGenerator(sw)
 
-        self.visit(ctx.programHeader())
+        self.visit(ctx.programHeader)
 
         # Execution timer and runtime standard input.
         self.code.indent()
@@ -75,8 +80,8 @@ class Converter(GraspVisitor):
         self.code.emit_line()
 
         # Level 1 declarations.
-        idCtx = ctx.programHeader().programIdentifier()
-        self.visit(ctx.block().declarations())
+        idCtx = ctx.programHeader.programIdentifier
+        self.visit(ctx.block.declarations)
         self.emitUnnamedRecordDefinitions(idCtx.entry.getRoutineSymTable())
 
         # Main.
@@ -90,19 +95,22 @@ class Converter(GraspVisitor):
         self.code.emit_line()
 
         # Main compound statement.
-        self.visit(ctx.block().compoundStatement().statementList())
+        self.visit(ctx.block.compoundStatement.statementList)
 
         self.code.dedent()
         self.code.emit_line("}")
 
         self.code.dedent()
         self.code.emit_line("}")
+        if self.object_file is not None:
+            return None  # the stream belongs to the caller
+
         result = sw.getvalue()
         self.code.close()
         return result
 
     def visitProgramHeader(self, ctx):
-        programName = ctx.programIdentifier().entry.getName()
+        programName = ctx.programIdentifier.entry.getName()
 
         # Emit the Python program class.
         self.code.emit_line(f"public class {programName}")
@@ -111,8 +119,8 @@ class Converter(GraspVisitor):
         return None
 
     def visitConstantDefinition(self, ctx):
-        idCtx = ctx.constantIdentifier()
-        constCtx = ctx.constant()
+        idCtx = ctx.constantIdentifier
+        constCtx = ctx.constant
         constantName = idCtx.entry.getName()
         type_ = constCtx.type_
         graspTypeName = type_.getName()
@@ -132,9 +140,9 @@ class Converter(GraspVisitor):
         return None
 
     def visitTypeDefinition(self, ctx):
-        idCtx = ctx.typeIdentifier()
+        idCtx = ctx.typeIdentifier
         typeName = idCtx.entry.getName()
-        typeCtx = ctx.typeSpecification()
+        typeCtx = ctx.typeSpecification
         form = typeCtx.type_.getForm()
 
         if form == Form.ENUMERATION:
@@ -163,8 +171,8 @@ class Converter(GraspVisitor):
     # def visitEnumerationTypespec(self, ctx):
     #     separator = " {"
     #
-    #     for constCtx in ctx.enumerationType().enumerationConstant():
-    #         self.code.emit(separator + constCtx.constantIdentifier().entry.getName())
+    #     for constCtx in ctx.enumerationType.enumerationConstant:
+    #         self.code.emit(separator + constCtx.constantIdentifier.entry.getName())
     #         separator = ", "
     #
     #     self.code.emit_end("};")
@@ -195,17 +203,17 @@ class Converter(GraspVisitor):
                 self.code.emit_end(";")
 
     def visitRecordTypespec(self, ctx):
-        fieldsCtx = ctx.recordType().recordFields()
+        fieldsCtx = ctx.recordType.recordFields
         self.record_fields = True
-        self.visit(fieldsCtx.variableDeclarationsList())
+        self.visit(fieldsCtx.variableDeclarationsList)
         self.record_fields = False
         return None
 
     def visitVariableDeclarations(self, ctx):
-        typeCtx = ctx.typeSpecification()
-        listCtx = ctx.variableIdentifierList()
+        typeCtx = ctx.typeSpecification
+        listCtx = ctx.variableIdentifierList
 
-        for varCtx in listCtx.variableIdentifier():
+        for varCtx in listCtx.variableIdentifier:
             self.code.emit_start()
             if self.program_variables and not self.record_fields:
                 self.code.emit("private static ")
@@ -254,33 +262,33 @@ class Converter(GraspVisitor):
         return None
 
     # def visit_case_statement(self, ctx):
-    #     var_name = self.visit(ctx.expression())
+    #     var_name = self.visit(ctx.expression)
     #     self.code.emit_line(f"switch ({var_name}) {{")
     #     self.code.indent()
     #
-    #     for branch in ctx.caseBranchList().caseBranch():
-    #         if branch.caseConstantList() is None:
+    #     for branch in ctx.caseBranchList.caseBranch:
+    #         if branch.caseConstantList is None:
     #             continue
     #
     #         self.code.emit_start("case ")
-    #         obj1 = branch.caseConstantList().caseConstant(0)
+    #         obj1 = branch.caseConstantList.caseConstant[0]
     #         str1 = obj1.getText()
     #         if obj1.type_ == Predefined.stringType:
     #             str1 = "\"" + self.convert_string(str1) + "\""
     #         self.code.emit(str1)
     #
-    #         for i in range(1, len(branch.caseConstantList().caseConstant())):
-    #             if branch.caseConstantList() is None:
+    #         for i in range(1, len(branch.caseConstantList.caseConstant)):
+    #             if branch.caseConstantList is None:
     #                 continue
     #
-    #             obj2 = branch.caseConstantList().caseConstant(i)
+    #             obj2 = branch.caseConstantList.caseConstant[i]
     #             str2 = obj2.getText()
     #             if obj2.type_ == Predefined.stringType:
     #                 str2 = "\"" + self.convert_string(str2) + "\""
     #             self.code.emit(", " + str2)
     #
     #         self.code.emit_line(":")
-    #         self.visit(branch.statement())
+    #         self.visit(branch.statement)
     #         self.code.emit_line("break;")
     #
     #     self.code.dedent()
@@ -291,7 +299,7 @@ class Converter(GraspVisitor):
     def visitVariableIdentifierList(self, ctx):
         separator = " "
 
-        for varCtx in ctx.variableIdentifier():
+        for varCtx in ctx.variableIdentifier:
             self.code.emit(separator)
             self.code.emit(varCtx.getText())
             separator = ", "
@@ -386,8 +394,8 @@ class Converter(GraspVisitor):
                     self.emitAllocateStructuredData(lhsPrefix, fieldId)
 
     def visitStatementList(self, ctx):
-        for stmtCtx in ctx.statement():
-            if stmtCtx.emptyStatement() is None:
+        for stmtCtx in ctx.statement:
+            if stmtCtx.emptyStatement is None:
                 self.code.emit_start()
                 self.visit(stmtCtx)
         return None
@@ -401,49 +409,49 @@ class Converter(GraspVisitor):
         return None
 
     def visitAssignmentStatement(self, ctx):
-        lhs = self.visit(ctx.lhs().variable())
-        expr = self.visit(ctx.rhs().expression())
+        lhs = self.visit(ctx.lhs.variable)
+        expr = self.visit(ctx.rhs.expression)
         self.code.emit(lhs + " = " + expr)
         self.code.emit_end(";")
         return None
 
     # def visitRepeatStatement(self, ctx):
-    #     needBraces = len(ctx.statementList().statement()) > 1
+    #     needBraces = len(ctx.statementList.statement) > 1
     #
     #     self.code.emit("do")
     #     if needBraces:
     #         self.code.emit_line("{")
     #     self.code.indent()
     #
-    #     self.visit(ctx.statementList())
+    #     self.visit(ctx.statementList)
     #
     #     self.code.dedent()
     #     if needBraces:
     #         self.code.emit_line("}")
     #
     #     self.code.emit_start("while (not (")
-    #     self.code.emit(visit(ctx.expression()))
+    #     self.code.emit(visit(ctx.expression))
     #     self.code.emit_end("));")
     #
     #     return None
 
     def visitFunctionHead(self, ctx):
-        funcName = str(ctx.routineIdentifier().IDENTIFIER())
+        funcName = ctx.routineIdentifier.name
         self.code.emit("private static ")
-        self.visit(ctx.typeIdentifier())
+        self.visit(ctx.typeIdentifier)
         self.code.emit(" " + funcName + "(")
 
-        if ctx.parameters() is not None:
+        if ctx.parameters is not None:
             #
-            parameterDeclarations = ctx.parameters().parameterDeclarationsList().parameterDeclaration()  # TODO YOULL NEED TO CHANGE THIS
+            parameterDeclarations = ctx.parameters.parameterDeclarationsList.parameterDeclaration  # TODO YOULL NEED TO CHANGE THIS
             i = 0
             while i < len(parameterDeclarations):  # TODO CHANGED TO REG WHILE MIGHT NEED TO FIX
                 paramDec = parameterDeclarations[i]
-                parameterIdentifier = paramDec.parameterIdentifier()
-                self.visit(paramDec.typeIdentifier())  # type
-                if paramDec.typeIdentifier().type_.form == Form.ARRAY:
+                parameterIdentifier = paramDec.parameterIdentifier
+                self.visit(paramDec.typeIdentifier)  # type
+                if paramDec.typeIdentifier.type_.form == Form.ARRAY:
                     self.code.emit('[]')
-                self.code.emit(" " + str(parameterIdentifier.IDENTIFIER()))
+                self.code.emit(" " + parameterIdentifier.name)
                 if i < len(parameterDeclarations) - 1:
                     self.code.emit(", ")
                 i += 1
@@ -452,22 +460,22 @@ class Converter(GraspVisitor):
         return None
 
     def visitSubFunctionHead(self, ctx):
-        funcName = str(ctx.routineIdentifier().IDENTIFIER())
+        funcName = ctx.routineIdentifier.name
         self.code.emit("static ")
-        self.visit(ctx.typeIdentifier())
+        self.visit(ctx.typeIdentifier)
         self.code.emit(" " + funcName + "(")
 
-        if ctx.parameters() is not None:
+        if ctx.parameters is not None:
             #
-            parameterDeclarations = ctx.parameters().parameterDeclarationsList().parameterDeclaration()  # TODO YOULL NEED TO CHANGE THIS
+            parameterDeclarations = ctx.parameters.parameterDeclarationsList.parameterDeclaration  # TODO YOULL NEED TO CHANGE THIS
             i = 0
             while i < len(parameterDeclarations):  # TODO CHANGED TO REG WHILE MIGHT NEED TO FIX
                 paramDec = parameterDeclarations[i]
-                parameterIdentifier = paramDec.parameterIdentifier()
-                self.visit(paramDec.typeIdentifier())  # type
-                if paramDec.typeIdentifier().type_.form == Form.ARRAY:
+                parameterIdentifier = paramDec.parameterIdentifier
+                self.visit(paramDec.typeIdentifier)  # type
+                if paramDec.typeIdentifier.type_.form == Form.ARRAY:
                     self.code.emit('[]')
-                self.code.emit(" " + str(parameterIdentifier.IDENTIFIER()))
+                self.code.emit(" " + parameterIdentifier.name)
                 if i < len(parameterDeclarations) - 1:
                     self.code.emit(", ")
                 i += 1
@@ -482,40 +490,40 @@ class Converter(GraspVisitor):
     #     self.code.emit(procedureName)
     #     self.code.emit("(")
     #
-    #     if ctx.argumentList() is not None:
-    #         self.code.emit(visit(ctx.argumentList()))
+    #     if ctx.argumentList is not None:
+    #         self.code.emit(visit(ctx.argumentList))
     #
     #     self.code.emit_end(");")
     #     return None
 
     def visitForStatement(self, ctx):
-        needBraces = ctx.statement().compoundStatement() is not None
-        initialStmt = self.visit(ctx.variable()) + " = " + self.visit(ctx.expression(0))
-        limit = self.visit(ctx.expression(1))
-        updateString = self.visit(ctx.variable()) + "++"  # TODO NEED TO FIX
+        needBraces = ctx.statement.compoundStatement is not None
+        initialStmt = self.visit(ctx.variable) + " = " + self.visit(ctx.expression[0])
+        limit = self.visit(ctx.expression[1])
+        updateString = self.visit(ctx.variable) + "++"  # TODO NEED TO FIX
         self.code.emit("for ( " + initialStmt + "; " + limit + "; " + updateString + ")")
         if not needBraces:
             self.code.indent()
         self.code.emit_start()
-        self.visit(ctx.statement())
+        self.visit(ctx.statement)
         if not needBraces:
             self.code.dedent()
         return None
 
     # TODO every visit result needs to be casted to string
     def visitIfStatement(self, ctx):
-        needBraces = ctx.trueStatement().statement().compoundStatement() is not None
-        condition = str(self.visit(ctx.expression()))
+        needBraces = ctx.trueStatement.statement.compoundStatement is not None
+        condition = str(self.visit(ctx.expression))
         self.code.emit("if (" + condition + ")")
         if not needBraces:
             self.code.indent()
 
         self.code.emit_start()
-        self.visit(ctx.trueStatement())
+        self.visit(ctx.trueStatement)
         if not needBraces:
             self.code.dedent()
-        if ctx.falseStatement() is not None:
-            needBraces = ctx.falseStatement().statement().compoundStatement() is not None
+        if ctx.falseStatement is not None:
+            needBraces = ctx.falseStatement.statement.compoundStatement is not None
             self.code.emit_start("else ")
             if needBraces:
                 self.code.emit("{")
@@ -523,7 +531,7 @@ class Converter(GraspVisitor):
             if not needBraces:
                 self.code.indent()
             self.code.emit_start()
-            self.visit(ctx.falseStatement())
+            self.visit(ctx.falseStatement)
             if not needBraces:
                 self.code.dedent()
             if needBraces:
@@ -532,34 +540,59 @@ class Converter(GraspVisitor):
         return None
 
     def visitWhileStatement(self, ctx):
-        self.code.emit_line(f"while ({ctx.expression().getText()})")
+        self.code.emit_line(f"while ({self.visit(ctx.expression)})")
         self.code.emit_line("{")
         self.code.indent()
-        self.visit(ctx.statement())
+        self.visit(ctx.statement)
         self.code.dedent()
         self.code.emit_line("}")
 
         return None
 
-    def visitReturnStatement(self, ctx: GraspParser.ReturnStatementContext):
-        self.code.emit_line(f"return {ctx.expression().getText()};")
+    def visitReturnStatement(self, ctx: Ast.ReturnStatement):
+        self.code.emit_line(f"return {self.visit(ctx.expression)};")
+
+    # Expressions are built as lists of text fragments that are joined
+    # once, so that long operator chains, deep nesting and long argument
+    # lists cost time linear in the length of the text. Each appendX()
+    # method appends the fragments of an X node; the visit method of each
+    # expression node returns its joined text.
+
+    # Append the fragments of any expression node.
+    # @param ctx       the node.
+    # @param fragments the fragment list.
+    def appendFragments(self, ctx, fragments):
+        appender = Converter.appenders.get(type(ctx))
+        if appender is None:
+            fragments.append(str(self.visit(ctx)))
+        else:
+            appender(self, ctx, fragments)
+
+    # Get the text of an expression node.
+    # @param ctx the node.
+    # @return the Java text.
+    def joinFragments(self, ctx):
+        fragments = []
+        self.appendFragments(ctx, fragments)
+        return "".join(fragments)
 
     def visitArgumentList(self, ctx):
-        text = ""
+        return self.joinFragments(ctx)
+
+    def appendArgumentList(self, ctx, fragments):
         separator = ""
 
-        for argCtx in ctx.argument():
-            text += separator
-            text += str(self.visit(argCtx.expression()))
+        for argCtx in ctx.argument:
+            fragments.append(separator)
+            self.appendFragments(argCtx.expression, fragments)
             separator = ", "
 
-        return text
-
     def visitExpression(self, ctx):
-        simpleCtx1 = ctx.simpleExpression()[0]
-        relOpCtx = ctx.relOp()
-        simpleText1 = str(self.visit(simpleCtx1))
-        text = simpleText1
+        return self.joinFragments(ctx)
+
+    def appendExpression(self, ctx, fragments):
+        simpleCtx1 = ctx.simpleExpression[0]
+        relOpCtx = ctx.relOp
 
         # Second simple expression?
         if relOpCtx is not None:
@@ -570,49 +603,54 @@ class Converter(GraspVisitor):
             elif op == "<>":
                 op = "!="
 
-            simpleCtx2 = ctx.simpleExpression()[1]
-            simpleText2 = str(self.visit(simpleCtx2))
+            simpleCtx2 = ctx.simpleExpression[1]
 
             # Python uses the == operator for strings.
             if simpleCtx1.type_ == Predefined.stringType:
-                text = "(" + simpleText1 + ")." + "compareTo(" + simpleText2 + ") " + op + " 0"
+                fragments.append("(")
+                self.appendFragments(simpleCtx1, fragments)
+                fragments.append(").compareTo(")
+                self.appendFragments(simpleCtx2, fragments)
+                fragments.append(") " + op + " 0")
             else:
-                text = simpleText1 + " " + op + " " + simpleText2
-
-        return text
+                self.appendFragments(simpleCtx1, fragments)
+                fragments.append(" " + op + " ")
+                self.appendFragments(simpleCtx2, fragments)
+        else:
+            self.appendFragments(simpleCtx1, fragments)
 
     def visitSimpleExpression(self, ctx):
-        count = len(ctx.term())
-        text = ""
+        return self.joinFragments(ctx)
+
+    def appendSimpleExpression(self, ctx, fragments):
+        count = len(ctx.term)
 
-        if ctx.sign() is not None and ctx.sign().getText() == "-":
-            text += "-"
+        if ctx.sign is not None and ctx.sign.getText() == "-":
+            fragments.append("-")
 
         # Loop over the simple expressions.
         for i in range(count):
-            termCtx = ctx.term()[i]
-            text += str(self.visit(termCtx))
+            self.appendFragments(ctx.term[i], fragments)
 
             if i < count - 1:
-                addOp = ctx.addOp()[i].getText().lower()
+                addOp = ctx.addOp[i].getText().lower()
                 if addOp == "or":
                     addOp = "||"
 
-                text += " " + addOp + " "
-
-        return text
+                fragments.append(" " + addOp + " ")
 
     def visitTerm(self, ctx):
-        count = len(ctx.factor())
-        text = ""
+        return self.joinFragments(ctx)
+
+    def appendTerm(self, ctx, fragments):
+        count = len(ctx.factor)
 
         # Loop over the terms.
         for i in range(count):
-            factorCtx = ctx.factor()[i]
-            text += str(self.visit(factorCtx))
+            self.appendFragments(ctx.factor[i], fragments)
 
             if i < count - 1:
-                mulOpStr = ctx.mulOp()[i].getText().lower()
+                mulOpStr = ctx.mulOp[i].getText().lower()
                 mulOp = ""
                 if mulOpStr == "and":
                     mulOp = " && "
@@ -623,60 +661,63 @@ class Converter(GraspVisitor):
                 else:
                     mulOp = mulOpStr
 
-                text += mulOp
-
-        return text
+                fragments.append(mulOp)
 
     def visitVariableFactor(self, ctx):
-        return self.visit(ctx.variable())
+        return self.joinFragments(ctx)
+
+    def appendVariableFactor(self, ctx, fragments):
+        self.appendVariable(ctx.variable, fragments)
 
     def visitVariable(self, ctx):
-        idCtx = ctx.variableIdentifier()
+        return self.joinFragments(ctx)
+
+    def appendVariable(self, ctx, fragments):
+        idCtx = ctx.variableIdentifier
         variableId = idCtx.entry
         variableName = variableId.getName()
-        type_ = ctx.variableIdentifier().type_
-        variableNameBuilder = [variableName]
+        type_ = ctx.variableIdentifier.type_
 
         if (
                 type_ != Predefined.booleanType
                 and variableId.getKind() == Kind.ENUMERATION_CONSTANT
         ):
-            variableNameBuilder.insert(0, type_.getName() + ".")
+            fragments.append(type_.getName() + ".")
+        fragments.append(variableName)
 
         # Loop over any subscript and field modifiers.
-        for modCtx in ctx.modifier():
+        for modCtx in ctx.modifier:
             # Subscripts.
-            if modCtx.indexList() is not None:
-                for indexCtx in modCtx.indexList().index():
+            if modCtx.indexList is not None:
+                for indexCtx in modCtx.indexList.index:
                     indexType = Predefined.integerType
                     minIndex = 0
 
                     if indexType.getForm() == Form.SUBRANGE:
                         minIndex = indexType.getSubrangeMinValue()
 
-                    exprCtx = indexCtx.expression()
-                    expr = self.visit(exprCtx)
-                    subscript = (
-                        expr
-                        if minIndex == 0
-                        else "(" + expr + ")+" + (-minIndex)
-                        if minIndex < 0
-                        else "(" + expr + ")-" + minIndex
-                    )
-
-                    variableNameBuilder.append("[" + subscript + "]")
+                    exprCtx = indexCtx.expression
+                    fragments.append("[")
+                    if minIndex == 0:
+                        self.appendFragments(exprCtx, fragments)
+                    else:
+                        expr = self.visit(exprCtx)
+                        fragments.append(
+                            "(" + expr + ")+" + (-minIndex)
+                            if minIndex < 0
+                            else "(" + expr + ")-" + minIndex
+                        )
+                    fragments.append("]")
 
                     type_ = Predefined.charType  # type_.getArrayElementType()
 
             # Record field.
             else:
-                fieldCtx = modCtx.field()
+                fieldCtx = modCtx.field
                 fieldName = fieldCtx.entry.getName()
-                variableNameBuilder.append("." + fieldName)
+                fragments.append("." + fieldName)
                 type_ = fieldCtx.type_
 
-        return "".join(variableNameBuilder)
-
     def visitNumberFactor(self, ctx):
         return ctx.getText()
 
@@ -684,7 +725,7 @@ class Converter(GraspVisitor):
         return ctx.getText()
 
     def visitStringFactor(self, ctx):
-        graspString = ctx.stringConstant().STRING().getText()
+        graspString = ctx.stringConstant.getText()
         return '"' + self.convertString(graspString) + '"'
 
     def convertString(self, graspString):
@@ -692,7 +733,7 @@ class Converter(GraspVisitor):
         return unquoted.replace("''", "'").replace("\"", "\\\"")
 
     # def visitFunctionCallStatement(self, ctx:GraspParser.FunctionCallStatementContext):
-    #     funcNameCtx = ctx.functionName()
+    #     funcNameCtx = ctx.functionName
     #     funcSTE = funcNameCtx.entry # need to visit functioncall stmt in semantics
     #     functionName = funcSTE.getName()
     #
@@ -701,42 +742,52 @@ class Converter(GraspVisitor):
     #     else:
     #         text = functionName + "("
     #
-    #         if ctx.argumentList() is not None:
-    #             text += self.visit(ctx.argumentList())
+    #         if ctx.argumentList is not None:
+    #             text += self.visit(ctx.argumentList)
     #
     #         text += ");
     #         self.code.emit(text)
 
     def visitFunctionCallFactor(self, ctx):
-        callCtx = ctx.functionCallStatement()
-        funcNameCtx = callCtx.functionName()
+        return self.joinFragments(ctx)
+
+    def appendFunctionCallFactor(self, ctx, fragments):
+        callCtx = ctx.functionCallStatement
+        funcNameCtx = callCtx.functionName
         funcCallSTE = funcNameCtx.entry
         functionName = funcCallSTE.getName()
 
-        text = ''
         if funcCallSTE.isNested():
-            text = 'Local.'
+            fragments.append('Local.')
 
-        text += functionName + "("
+        fragments.append(functionName + "(")
 
-        if callCtx.argumentList() is not None:
-            text += self.visit(callCtx.argumentList())
+        if callCtx.argumentList is not None:
+            self.appendArgumentList(callCtx.argumentList, fragments)
 
-        text += ")"
-        return text
+        fragments.append(")")
 
     def visitNotFactor(self, ctx):
-        return "!" + self.visit(ctx.factor())
+        return self.joinFragments(ctx)
+
+    def appendNotFactor(self, ctx, fragments):
+        fragments.append("!")
+        self.appendFragments(ctx.factor, fragments)
 
     def visitParenthesizedFactor(self, ctx):
-        return "(" + self.visit(ctx.expression()) + ")"
+        return self.joinFragments(ctx)
+
+    def appendParenthesizedFactor(self, ctx, fragments):
+        fragments.append("(")
+        self.appendFragments(ctx.expression, fragments)
+        fragments.append(")")
 
     def visitPrintStatement(self, ctx):
         self.code.emit("System.out.printf(")
         self.code.mark()
 
-        format = self.createWriteFormat(ctx.writeArguments())
-        arguments = self.createWriteArguments(ctx.writeArguments())
+        format = self.createWriteFormat(ctx.writeArguments)
+        arguments = self.createWriteArguments(ctx.writeArguments)
 
         self.code.emit('"' + format + '"')
 
@@ -749,12 +800,12 @@ class Converter(GraspVisitor):
         return None
 
     def visitPrintlnStatement(self, ctx):
-        if ctx.writeArguments() is not None:
+        if ctx.writeArguments is not None:
             self.code.emit("System.out.printf(")
             self.code.mark()
 
-            format = self.createWriteFormat(ctx.writeArguments())
-            arguments = self.createWriteArguments(ctx.writeArguments())
+            format = self.createWriteFormat(ctx.writeArguments)
+            arguments = self.createWriteArguments(ctx.writeArguments)
 
             self.code.emit('"' + format + "\\n\"")  # append line feed
 
@@ -770,59 +821,60 @@ class Converter(GraspVisitor):
         return None
 
     def createWriteFormat(self, ctx):
-        format = ""
+        format = []
 
         # Loop over the "write" arguments.
-        for argCtx in ctx.writeArgument():
-            type_ = argCtx.expression().type_
+        for argCtx in ctx.writeArgument:
+            type_ = argCtx.expression.type_
             argText = argCtx.getText()
 
             # Append any literal strings.
             if argText[0] == '\'':
-                format += self.convertString(argText)
+                format.append(self.convertString(argText))
 
             # For any other expressions, append a field specifier.
             else:
-                format += "%"
+                format.append("%")
 
-                fwCtx = argCtx.fieldWidth()
+                fwCtx = argCtx.fieldWidth
                 if fwCtx is not None:
-                    sign = "-" if fwCtx.sign() is not None and fwCtx.sign().getText() == "-" else ""
-                    format += sign + fwCtx.integerConstant().getText()
+                    sign = "-" if fwCtx.sign is not None and fwCtx.sign.getText() == "-" else ""
+                    format.append(sign + fwCtx.integerConstant.getText())
 
-                    dpCtx = fwCtx.decimalPlaces()
+                    dpCtx = fwCtx.decimalPlaces
                     if dpCtx is not None:
-                        format += "." + dpCtx.integerConstant().getText()
+                        format.append("." + dpCtx.integerConstant.getText())
 
                 typeFlag = "d" if type_ == Predefined.integerType else "f" if type_ == Predefined.realType else "b" if type_ == Predefined.booleanType else "c" if type_ == Predefined.charType else "s"
-                format += typeFlag
+                format.append(typeFlag)
 
-        return format
+        return "".join(format)
 
     def createWriteArguments(self, ctx):
-        arguments = ""
+        arguments = []
         separator = ""
 
         # Loop over "write" arguments.
-        for argCtx in ctx.writeArgument():
+        for argCtx in ctx.writeArgument:
             argText = argCtx.getText()
 
             # Not a literal string.
             if argText[0] != '\'':
-                arguments += separator + self.visit(argCtx.expression())
+                arguments.append(separator)
+                self.appendFragments(argCtx.expression, arguments)
                 separator = ", "
 
-        return arguments
+        return "".join(arguments)
 
     def visitReadStatement(self, ctx):
-        if len(ctx.readArguments().variable()) == 1:
-            self.visit(ctx.readArguments())
+        if len(ctx.readArguments.variable) == 1:
+            self.visit(ctx.readArguments)
         else:
             self.code.emit("{")
             self.code.indent()
             self.code.emit_start()
 
-            self.visit(ctx.readArguments())
+            self.visit(ctx.readArguments)
 
             self.code.dedent()
             self.code.emit_line("}")
@@ -834,7 +886,7 @@ class Converter(GraspVisitor):
         self.code.indent()
         self.code.emit_start()
 
-        self.visit(ctx.readArguments())
+        self.visit(ctx.readArguments)
         self.code.emit_line("_sysin.nextLine();")
 
         self.code.dedent()
@@ -843,11 +895,11 @@ class Converter(GraspVisitor):
         return None
 
     def visitReadArguments(self, ctx):
-        size = len(ctx.variable())
+        size = len(ctx.variable)
 
         # Loop over the read arguments.
         for i in range(size):
-            varCtx = ctx.variable()[i]
+            varCtx = ctx.variable[i]
             varName = varCtx.getText()
             type_ = varCtx.type_
 
@@ -875,3 +927,17 @@ class Converter(GraspVisitor):
                 self.code.emit_start()
 
         return None
+
+
+# The fragment appenders of the expression nodes.
+Converter.appenders = {
+    Ast.ArgumentList: Converter.appendArgumentList,
+    Ast.Expression: Converter.appendExpression,
+    Ast.SimpleExpression: Converter.appendSimpleExpression,
+    Ast.Term: Converter.appendTerm,
+    Ast.VariableFactor: Converter.appendVariableFactor,
+    Ast.Variable: Converter.appendVariable,
+    Ast.FunctionCallFactor: Converter.appendFunctionCallFactor,
+    Ast.NotFactor: Converter.appendNotFactor,
+    Ast.ParenthesizedFactor: Converter.appendParenthesizedFactor,
+}
@@ -0,0 +1,960 @@
+# <h1>Executor</h1>
+# <p>The EXECUTOR backend. It compiles an analyzed AST into nested Python
+# closures, one per statement and expression, and returns an Executable
+# that runs them in-process. What a tree-walking interpreter decides at
+# every step, such as which operator an expression applies, where a
+# variable lives or which print arguments are literal text, is decided
+# once here, so that running a statement is a handful of direct calls.</p>
+# <p>A statement closure takes the frame of the routine it runs in and
+# returns RETURNED if it executed a return statement, None otherwise. An
+# expression closure takes the frame and returns the value. Integers,
+# decimals and booleans are Python ints, floats and bools, a char is a
+# one-character str and a string is a str (None until assigned).
+# Enumeration values are their ordinals. An array is a list, and a record
+# is a list of its field values in field name order.</p>
+# <p>The program's variables are in the global frame. Every routine call
+# gets a new frame, and the display (the frame of the active routine at
+# each nesting level) gives a nested routine the variables of the
+# routines it is nested in. A VAR parameter is copied in and copied back
+# out when the call returns.</p>
+import math
+import re
+import sys
+
+from edu.yu.compilers.intermediate.ast import Ast
+from edu.yu.compilers.intermediate.ast.AstVisitor import AstVisitor
+from edu.yu.compilers.intermediate.symtable.Kind import Kind
+from edu.yu.compilers.intermediate.symtable.Predefined import Predefined
+from edu.yu.compilers.intermediate.type.Form import Form
+
+# What a statement closure returns after executing a return statement.
+RETURNED = True
+
+# The escapes javac interprets in the string literals of the converted program.
+JAVA_ESCAPE = re.compile(r"\\([btnfr\"'\\])")
+JAVA_ESCAPES = {"b": "\b", "t": "\t", "n": "\n", "f": "\f", "r": "\r", '"': '"', "'": "'", "\\": "\\"}
+
+
+# Integer division, truncated toward zero as in Java.
+def divide(dividend, divisor):
+    quotient = abs(dividend) // abs(divisor)
+    return quotient if (dividend < 0) == (divisor < 0) else -quotient
+
+
+# Integer remainder, with the sign of the dividend as in Java.
+def remainder(dividend, divisor):
+    result = abs(dividend) % abs(divisor)
+    return -result if dividend < 0 else result
+
+
+# Decimal division, which gives an infinity or NaN for a zero divisor as in Java.
+def realDivide(dividend, divisor):
+    try:
+        return dividend / divisor
+    except ZeroDivisionError:
+        if (dividend == 0) or math.isnan(dividend):
+            return math.nan
+        return math.copysign(math.inf, dividend) * math.copysign(1.0, divisor)
+
+
+# Raise the error of a negative array index. Python would count it from
+# the end of the list; larger indexes raise IndexError by themselves.
+def indexError(index, array):
+    raise IndexError(f"Index {index} out of bounds for length {len(array)}")
+
+
+# The text of a boolean for a print statement.
+def booleanText(value):
+    return "true" if value else "false"
+
+
+# The text of a string for a print statement.
+def stringText(value):
+    return "null" if value is None else value
+
+
+# Standard input, read like java.util.Scanner reads it in the converted
+# program: whitespace-separated tokens, single characters, and the rest
+# of a line.
+class StandardInput:
+
+    def __init__(self, file):
+        self.file = file
+        self.line = ""
+        self.position = 0
+
+    # Make sure there is unread text.
+    def fill(self):
+        while self.position >= len(self.line):
+            self.line = self.file.readline()
+            self.position = 0
+            if not self.line:
+                raise EOFError("no more input")
+
+    # Read the next token.
+    # @return the token text.
+    def next(self):
+        self.fill()
+        while self.line[self.position].isspace():
+            self.position += 1
+            self.fill()
+
+        start = self.position
+        end = start
+        while (end < len(self.line)) and not self.line[end].isspace():
+            end += 1
+        self.position = end
+
+        return self.line[start:end]
+
+    def nextInt(self):
+        return int(self.next())
+
+    def nextDouble(self):
+        return float(self.next())
+
+    def nextBoolean(self):
+        token = self.next().lower()
+        if token not in ("true", "false"):
+            raise ValueError(f"invalid boolean: {token!r}")
+        return token == "true"
+
+    # Read the next character, whitespace included.
+    def nextChar(self):
+        self.fill()
+        char = self.line[self.position]
+        self.position += 1
+        return char
+
+    # Skip the rest of the current line.
+    def nextLine(self):
+        if self.position >= len(self.line):
+            self.fill()
+        self.line = ""
+        self.position = 0
+
+
+# The streams of a run, which the print and read closures reach through.
+class Runtime:
+    __slots__ = ("input", "output")
+
+    def __init__(self):
+        self.input = None
+        self.output = None
+
+
+# The frame layout and compiled body of the program or a routine.
+class CompiledRoutine:
+    __slots__ = ("level", "template", "allocators", "resultIndex", "body")
+
+    def __init__(self, level):
+        self.level = level  # nesting level of the routine's symbol table
+        self.template = []  # initial values of the frame slots
+        self.allocators = []  # (slot, function) for each array and record slot
+        self.resultIndex = None  # slot of a function's return value
+        self.body = None  # the statement closure
+
+    # Create a frame with freshly allocated arrays and records.
+    # @return the frame.
+    def newFrame(self):
+        frame = self.template.copy()
+        for index, allocate in self.allocators:
+            frame[index] = allocate()
+        return frame
+
+
+# A compiled program.
+class Executable:
+
+    def __init__(self, name, program, display, runtime):
+        self.name = name
+        self.program = program
+        self.display = display
+        self.runtime = runtime
+
+    # Run the program.
+    # @param inputFile  the text stream to read from (default sys.stdin).
+    # @param outputFile the text stream to print to (default sys.stdout).
+    def run(self, inputFile=None, outputFile=None):
+        self.runtime.input = StandardInput(inputFile if inputFile is not None else sys.stdin)
+        self.runtime.output = outputFile if outputFile is not None else sys.stdout
+
+        # The closures hold on to the global frame, so it's reset in place.
+        globalFrame = self.display[1]
+        globalFrame[:] = self.program.newFrame()
+        for level in range(2, len(self.display)):
+            self.display[level] = None
+
+        self.program.body(globalFrame)
+
+
+class Executor(AstVisitor):
+
+    def __init__(self):
+        self.runtime = Runtime()
+        self.display = [None, []]  # frame by nesting level, the global frame at 1
+        self.frameIndexes = {}  # variable or parameter entry -> frame slot
+        self.fieldIndexes = {}  # record field entry -> record slot
+        self.routines = {}  # routine entry -> CompiledRoutine
+        self.routineId = None  # the entry of the routine being compiled
+        self.routine = None  # its CompiledRoutine
+        self.level = 1  # its nesting level
+
+    # Compile a program.
+    # @param ctx the analyzed AST.
+    # @return the Executable.
+    def visitProgram(self, ctx):
+        programId = ctx.programHeader.programIdentifier.entry
+        program = self.declareRoutine(programId, [])
+
+        self.routineId = programId
+        self.routine = program
+        program.body = self.visit(ctx.block.compoundStatement)
+
+        for routineId, routine in self.routines.items():
+            if routine is not program:
+                self.routineId = routineId
+                self.routine = routine
+                self.level = routine.level
+                routine.body = self.visit(routineId.getExecutable())
+
+        return Executable(programId.getName(), program, self.display, self.runtime)
+
+    # Lay out the frames of the program or a routine and its subroutines.
+    # @param routineId  the routine's symbol table entry.
+    # @param parameters the routine's parameter entries.
+    # @return the CompiledRoutine, with no body yet.
+    def declareRoutine(self, routineId, parameters):
+        symTable = routineId.getRoutineSymTable()
+        routine = CompiledRoutine(symTable.getNestingLevel())
+        self.routines[routineId] = routine
+
+        while len(self.display) <= routine.level:
+            self.display.append(None)
+
+        variables = list(parameters)
+        for entry in symTable.sortedEntries():
+            if (entry.getKind() == Kind.VARIABLE) and (entry not in variables):
+                variables.append(entry)
+
+        for index, entry in enumerate(variables):
+            self.frameIndexes[entry] = index
+            type_ = entry.getType()
+            routine.template.append(self.initialValue(type_))
+            if type_.isStructured():
+                routine.allocators.append((index, self.allocator(type_)))
+
+        resultId = symTable.lookup(routineId.getName())
+        if (resultId is not None) and (resultId.getKind() == Kind.VARIABLE):
+            routine.resultIndex = self.frameIndexes[resultId]
+
+        for subroutineId in routineId.getSubroutines():
+            self.declareRoutine(subroutineId, subroutineId.getRoutineParameters())
+
+        return routine
+
+    # Get the value a variable of a type starts out with.
+    # @param type_ the type.
+    # @return the value, None for strings, arrays and records.
+    def initialValue(self, type_):
+        type_ = type_.baseType()
+
+        if type_ is Predefined.integerType:
+            return 0
+        elif type_ is Predefined.realType:
+            return 0.0
+        elif type_ is Predefined.booleanType:
+            return False
+        elif type_ is Predefined.charType:
+            return "\0"
+        elif type_.getForm() == Form.ENUMERATION:
+            return 0
+        return None
+
+    # Create the function that allocates a new array or record.
+    # @param type_ the array or record type.
+    # @return the function.
+    def allocator(self, type_):
+        if type_.getForm() == Form.ARRAY:
+            count = type_.getArrayElementCount()
+            elemType = type_.getArrayElementType()
+
+            if elemType.isStructured():
+                allocateElement = self.allocator(elemType)
+                return lambda: [allocateElement() for _ in range(count)]
+
+            value = self.initialValue(elemType)
+            return lambda: [value] * count
+
+        template = []
+        allocators = []
+        for index, fieldId in enumerate(self.recordFields(type_.getRecordSymTable())):
+            fieldType = fieldId.getType()
+            template.append(self.initialValue(fieldType))
+            if fieldType.isStructured():
+                allocators.append((index, self.allocator(fieldType)))
+
+        def allocateRecord():
+            record = template.copy()
+            for index, allocate in allocators:
+                record[index] = allocate()
+            return record
+
+        return allocateRecord
+
+    # Get the fields of a record type in record slot order, and remember
+    # their slots.
+    # @param symTable the record type's symbol table.
+    # @return the list of field entries.
+    def recordFields(self, symTable):
+        fields = [entry for entry in symTable.sortedEntries() if entry.getKind() == Kind.RECORD_FIELD]
+        for index, fieldId in enumerate(fields):
+            self.fieldIndexes[fieldId] = index
+        return fields
+
+    # Get the record slot of a field.
+    # @param fieldId the field entry.
+    # @return the slot.
+    def fieldIndex(self, fieldId):
+        if fieldId not in self.fieldIndexes:
+            self.recordFields(fieldId.getSymTable())
+        return self.fieldIndexes[fieldId]
+
+    # Statements.
+
+    def visitCompoundStatement(self, ctx):
+        return self.visit(ctx.statementList)
+
+    def visitStatementList(self, ctx):
+        statements = []
+        for stmtCtx in ctx.statement:
+            statement = self.visit(stmtCtx)
+            if statement is not None:
+                statements.append(statement)
+
+        return self.sequence(statements)
+
+    # Combine statement closures into one.
+    # @param statements the statement closures.
+    # @return the closure that executes them in order.
+    def sequence(self, statements):
+        statements = tuple(statements)
+
+        if len(statements) == 1:
+            return statements[0]
+
+        def block(frame):
+            for statement in statements:
+                if statement(frame):
+                    return RETURNED
+
+        return block
+
+    def visitStatement(self, ctx):
+        for child in ctx.getChildren():
+            return self.visit(child)
+        return None
+
+    def visitEmptyStatement(self, ctx):
+        return None
+
+    # Compile a statement that may be empty.
+    # @param ctx the StatementContext.
+    # @return the statement closure.
+    def statement(self, ctx):
+        statement = self.visit(ctx)
+        return statement if statement is not None else self.sequence(())
+
+    def visitAssignmentStatement(self, ctx):
+        return self.assignment(ctx.lhs.variable, ctx.rhs.expression)
+
+    # Compile the assignment of an expression to a variable.
+    # @param varCtx  the VariableContext.
+    # @param exprCtx the ExpressionContext.
+    # @return the statement closure.
+    def assignment(self, varCtx, exprCtx):
+        value = self.coerced(self.visit(exprCtx), exprCtx.type_, varCtx.type_)
+
+        if varCtx.modifier:
+            store = self.store(varCtx)
+
+            def assign(frame):
+                store(frame, value(frame))
+
+            return assign
+
+        level, index = self.location(varCtx.entry)
+
+        if level == 1:
+            globalFrame = self.display[1]
+
+            def assignGlobal(frame):
+                globalFrame[index] = value(frame)
+
+            return assignGlobal
+        elif level == self.level:
+            def assignLocal(frame):
+                frame[index] = value(frame)
+
+            return assignLocal
+        else:
+            display = self.display
+
+            def assignOuter(frame):
+                display[level][index] = value(frame)
+
+            return assignOuter
+
+    def visitIfStatement(self, ctx):
+        condition = self.visit(ctx.expression)
+        then = self.statement(ctx.trueStatement.statement)
+
+        if ctx.falseStatement is None:
+            def ifThen(frame):
+                if condition(frame):
+                    return then(frame)
+
+            return ifThen
+
+        otherwise = self.statement(ctx.falseStatement.statement)
+
+        def ifThenElse(frame):
+            if condition(frame):
+                return then(frame)
+            return otherwise(frame)
+
+        return ifThenElse
+
+    def visitWhileStatement(self, ctx):
+        condition = self.visit(ctx.expression)
+        body = self.statement(ctx.statement)
+
+        def whileLoop(frame):
+            while condition(frame):
+                if body(frame):
+                    return RETURNED
+
+        return whileLoop
+
+    def visitForStatement(self, ctx):
+        initialize = self.assignment(ctx.variable, ctx.expression[0])
+        condition = self.visit(ctx.expression[1])
+        body = self.statement(ctx.statement)
+        update = self.visit(ctx.assignmentStatement)
+
+        def forLoop(frame):
+            initialize(frame)
+            while condition(frame):
+                if body(frame):
+                    return RETURNED
+                update(frame)
+
+        return forLoop
+
+    def visitReturnStatement(self, ctx):
+        exprCtx = ctx.expression
+        value = self.visit(exprCtx)
+        resultIndex = self.routine.resultIndex
+
+        # Return from the program.
+        if resultIndex is None:
+            def stop(frame):
+                value(frame)
+                return RETURNED
+
+            return stop
+
+        value = self.coerced(value, exprCtx.type_, self.routineId.getType())
+
+        def returnValue(frame):
+            frame[resultIndex] = value(frame)
+            return RETURNED
+
+        return returnValue
+
+    def visitFunctionCallStatement(self, ctx):
+        call = self.call(ctx)
+
+        def callStatement(frame):
+            call(frame)
+
+        return callStatement
+
+    def visitCaseStatement(self, ctx):
+        raise NotImplementedError(f"line {ctx.start.line}: case statements can't be executed")
+
+    def visitDeclareAndAssignStatement(self, ctx):
+        raise NotImplementedError(f"line {ctx.start.line}: declare-and-assign statements can't be executed")
+
+    def visitPrintStatement(self, ctx):
+        return self.write(ctx.writeArguments, "")
+
+    def visitPrintlnStatement(self, ctx):
+        if ctx.writeArguments is None:
+            runtime = self.runtime
+
+            def println(frame):
+                runtime.output.write("\n")
+
+            return println
+
+        return self.write(ctx.writeArguments, "\n")
+
+    # Compile a print statement into a Python format, as the Converter
+    # builds a Java format for printf.
+    # @param ctx the WriteArgumentsContext.
+    # @param end the text to print after the arguments.
+    # @return the statement closure.
+    def write(self, ctx, end):
+        runtime = self.runtime
+        format = []
+        arguments = []
+
+        for argCtx in ctx.writeArgument:
+            exprCtx = argCtx.expression
+            literal = self.literalString(exprCtx)
+
+            # Literal strings are part of the format.
+            if literal is not None:
+                format.append(literal)
+                continue
+
+            format.append("%")
+
+            fwCtx = argCtx.fieldWidth
+            if fwCtx is not None:
+                sign = "-" if fwCtx.sign is not None and fwCtx.sign.getText() == "-" else ""
+                format.append(sign + fwCtx.integerConstant.getText())
+
+                dpCtx = fwCtx.decimalPlaces
+                if dpCtx is not None:
+                    format.append("." + dpCtx.integerConstant.getText())
+
+            type_ = exprCtx.type_
+            value = self.visit(exprCtx)
+            text = None
+
+            if type_ is Predefined.integerType:
+                format.append("d")
+            elif type_ is Predefined.realType:
+                format.append("f")
+            elif type_ is Predefined.charType:
+                format.append("c")
+            else:
+                format.append("s")
+
+                if type_ is Predefined.booleanType:
+                    text = booleanText
+                elif type_ is Predefined.stringType:
+                    text = stringText
+                elif (type_ is not None) and (type_.getForm() == Form.ENUMERATION):
+                    names = tuple(constantId.getName() for constantId in type_.getEnumerationConstants())
+                    text = names.__getitem__
+
+            arguments.append(value if text is None else self.converted(value, text))
+
+        format = "".join(format) + end
+
+        if not arguments:
+            def printText(frame):
+                runtime.output.write(format % ())
+
+            return printText
+        elif len(arguments) == 1:
+            argument = arguments[0]
+
+            def printValue(frame):
+                runtime.output.write(format % (argument(frame),))
+
+            return printValue
+
+        arguments = tuple(arguments)
+
+        def printValues(frame):
+            runtime.output.write(format % tuple([argument(frame) for argument in arguments]))
+
+        return printValues
+
+    # Get the text of a print argument that is a literal string.
+    # @param exprCtx the ExpressionContext.
+    # @return the text, or None if the argument is not a literal string.
+    def literalString(self, exprCtx):
+        factorCtx = self.loneFactor(exprCtx)
+        if isinstance(factorCtx, Ast.StringFactor):
+            return self.stringValue(factorCtx.stringConstant.getText())
+        return None
+
+    # Get the factor an expression consists of.
+    # @param exprCtx the ExpressionContext.
+    # @return the factor, or None if there is more to the expression.
+    def loneFactor(self, exprCtx):
+        if len(exprCtx.simpleExpression) == 1:
+            simpleCtx = exprCtx.simpleExpression[0]
+            if (simpleCtx.sign is None) and (len(simpleCtx.term) == 1):
+                termCtx = simpleCtx.term[0]
+                if len(termCtx.factor) == 1:
+                    return termCtx.factor[0]
+        return None
+
+    def visitReadStatement(self, ctx):
+        return self.read(ctx.readArguments, False)
+
+    def visitReadlnStatement(self, ctx):
+        return self.read(ctx.readArguments, True)
+
+    # Compile a read statement.
+    # @param ctx      the ReadArgumentsContext.
+    # @param skipLine true to skip the rest of the line afterwards.
+    # @return the statement closure.
+    def read(self, ctx, skipLine):
+        runtime = self.runtime
+        reads = []
+
+        for varCtx in ctx.variable:
+            type_ = varCtx.type_.baseType()
+            reader = StandardInput.nextChar if type_ is Predefined.charType else \
+                StandardInput.nextInt if type_ is Predefined.integerType else \
+                StandardInput.nextDouble if type_ is Predefined.realType else \
+                StandardInput.nextBoolean if type_ is Predefined.booleanType else \
+                StandardInput.next
+            reads.append((self.store(varCtx), reader))
+
+        reads = tuple(reads)
+
+        def readValues(frame):
+            input = runtime.input
+            for store, reader in reads:
+                store(frame, reader(input))
+            if skipLine:
+                input.nextLine()
+
+        return readValues
+
+    # Expressions.
+
+    def visitExpression(self, ctx):
+        left = self.visit(ctx.simpleExpression[0])
+
+        if ctx.relOp is None:
+            return left
+
+        return self.operation(ctx.relOp.getText(), left, self.visit(ctx.simpleExpression[1]))
+
+    def visitSimpleExpression(self, ctx):
+        value = self.visit(ctx.term[0])
+
+        if ctx.sign is not None and ctx.sign.getText() == "-":
+            value = self.negated(value)
+
+        for i in range(1, len(ctx.term)):
+            value = self.operation(ctx.addOp[i - 1].getText().lower(), value, self.visit(ctx.term[i]))
+
+        return value
+
+    def visitTerm(self, ctx):
+        value = self.visit(ctx.factor[0])
+
+        for i in range(1, len(ctx.factor)):
+            value = self.operation(ctx.mulOp[i - 1].getText().lower(), value, self.visit(ctx.factor[i]))
+
+        return value
+
+    # Compile a binary operation.
+    # @param op    the operator.
+    # @param left  the closure of the left operand.
+    # @param right the closure of the right operand.
+    # @return the expression closure.
+    def operation(self, op, left, right):
+        if op == "+":
+            return lambda frame: left(frame) + right(frame)
+        elif op == "-":
+            return lambda frame: left(frame) - right(frame)
+        elif op == "*":
+            return lambda frame: left(frame) * right(frame)
+        elif op == "/":
+            return lambda frame: realDivide(left(frame), right(frame))
+        elif op == "div":
+            return lambda frame: divide(left(frame), right(frame))
+        elif op == "mod":
+            return lambda frame: remainder(left(frame), right(frame))
+        elif op == "and":
+            return lambda frame: left(frame) and right(frame)
+        elif op == "or":
+            return lambda frame: left(frame) or right(frame)
+        elif op in ("==", "="):
+            return lambda frame: left(frame) == right(frame)
+        elif op in ("!=", "<>"):
+            return lambda frame: left(frame) != right(frame)
+        elif op == "<":
+            return lambda frame: left(frame) < right(frame)
+        elif op == "<=":
+            return lambda frame: left(frame) <= right(frame)
+        elif op == ">":
+            return lambda frame: left(frame) > right(frame)
+        elif op == ">=":
+            return lambda frame: left(frame) >= right(frame)
+
+        raise NotImplementedError(f"operator {op} can't be executed")
+
+    def negated(self, value):
+        return lambda frame: -value(frame)
+
+    def converted(self, value, function):
+        return lambda frame: function(value(frame))
+
+    # Convert an integer value assigned to a decimal, as Java widens it.
+    # @param value      the expression closure.
+    # @param valueType  the type of the value.
+    # @param targetType the type it is assigned to.
+    # @return the expression closure.
+    def coerced(self, value, valueType, targetType):
+        if (targetType is not None) and (targetType.baseType() is Predefined.realType) and (
+                valueType is not None) and (valueType.baseType() is Predefined.integerType):
+            return self.converted(value, float)
+        return value
+
+    def visitVariableFactor(self, ctx):
+        return self.visit(ctx.variable)
+
+    def visitNumberFactor(self, ctx):
+        numberCtx = ctx.number
+        text = numberCtx.unsignedNumber.getText()
+        value = int(text) if numberCtx.unsignedNumber.integerConstant is not None else float(text)
+
+        if numberCtx.sign is not None and numberCtx.sign.getText() == "-":
+            value = -value
+
+        return lambda frame: value
+
+    def visitCharacterFactor(self, ctx):
+        value = ctx.getText()[1:-1]
+        return lambda frame: value
+
+    def visitStringFactor(self, ctx):
+        value = self.stringValue(ctx.stringConstant.getText())
+        return lambda frame: value
+
+    # Get the value of a string constant, as javac reads the string
+    # literal the Converter makes of it.
+    # @param graspString the quoted Grasp string.
+    # @return the string.
+    def stringValue(self, graspString):
+        unquoted = graspString[1:-1].replace("''", "'")
+        return JAVA_ESCAPE.sub(lambda match: JAVA_ESCAPES[match.group(1)], unquoted)
+
+    def visitFunctionCallFactor(self, ctx):
+        return self.call(ctx.functionCallStatement)
+
+    def visitNotFactor(self, ctx):
+        value = self.visit(ctx.factor)
+        return lambda frame: not value(frame)
+
+    def visitParenthesizedFactor(self, ctx):
+        return self.visit(ctx.expression)
+
+    # Compile a function call.
+    # @param ctx the FunctionCallStatementContext.
+    # @return the expression closure.
+    def call(self, ctx):
+        routineId = ctx.functionName.entry
+        routine = self.routines.get(routineId)
+        if routine is None:
+            raise NotImplementedError(f"line {ctx.start.line}: {ctx.functionName.name} can't be called")
+
+        argCtxs = ctx.argumentList.argument if ctx.argumentList is not None else []
+        arguments = []
+        references = []
+
+        for paramId, argCtx in zip(routineId.getRoutineParameters(), argCtxs):
+            exprCtx = argCtx.expression
+            index = self.frameIndexes[paramId]
+            arguments.append((index, self.coerced(self.visit(exprCtx), exprCtx.type_, paramId.getType())))
+
+            # Copy a VAR parameter back out.
+            if paramId.getKind() == Kind.REFERENCE_PARAMETER:
+                references.append((index, self.store(self.loneFactor(exprCtx).variable)))
+
+        arguments = tuple(arguments)
+        references = tuple(references)
+        display = self.display
+        level = routine.level
+        template = routine.template
+        allocators = tuple(routine.allocators)
+        resultIndex = routine.resultIndex
+
+        # Most functions have no arrays, records or VAR parameters.
+        if not (allocators or references) and (resultIndex is not None):
+            def callSimpleFunction(frame):
+                newFrame = template.copy()
+                for index, argument in arguments:
+                    newFrame[index] = argument(frame)
+
+                saved = display[level]
+                display[level] = newFrame
+                routine.body(newFrame)
+                display[level] = saved
+
+                return newFrame[resultIndex]
+
+            return callSimpleFunction
+
+        def callFunction(frame):
+            newFrame = template.copy()
+            for index, allocate in allocators:
+                newFrame[index] = allocate()
+            for index, argument in arguments:
+                newFrame[index] = argument(frame)
+
+            saved = display[level]
+            display[level] = newFrame
+            routine.body(newFrame)
+            display[level] = saved
+
+            for index, store in references:
+                store(frame, newFrame[index])
+
+            return newFrame[resultIndex] if resultIndex is not None else None
+
+        return callFunction
+
+    # Variables.
+
+    # Get where a variable or parameter is stored.
+    # @param entry the symbol table entry.
+    # @return the nesting level of its frame and its frame slot.
+    def location(self, entry):
+        return entry.getSymTable().getNestingLevel(), self.frameIndexes[entry]
+
+    # Compile the load of a variable, constant or enumeration constant
+    # without modifiers.
+    # @param entry the symbol table entry.
+    # @return the expression closure.
+    def load(self, entry):
+        kind = entry.getKind()
+
+        if kind == Kind.CONSTANT:
+            value = entry.getValue()
+            return lambda frame: value
+        elif kind == Kind.ENUMERATION_CONSTANT:
+            type_ = entry.getType()
+            if type_ is Predefined.booleanType:
+                value = bool(entry.getValue())
+            else:
+                value = type_.getEnumerationConstants().index(entry)
+            return lambda frame: value
+        elif entry not in self.frameIndexes:
+            raise NotImplementedError(f"{entry.getName()} can't be used as a variable")
+
+        level, index = self.location(entry)
+
+        if level == 1:
+            globalFrame = self.display[1]
+            return lambda frame: globalFrame[index]
+        elif level == self.level:
+            return lambda frame: frame[index]
+        else:
+            display = self.display
+            return lambda frame: display[level][index]
+
+    # Get the subscripts and fields of a variable.
+    # @param ctx the VariableContext.
+    # @return a list of (expression closure, None, in bounds) for a
+    #         subscript and (None, record slot, None) for a field.
+    def selectors(self, ctx):
+        selectors = []
+        for modCtx in ctx.modifier:
+            if modCtx.indexList is not None:
+                for indexCtx in modCtx.indexList.index:
+                    selectors.append((self.visit(indexCtx.expression), None, indexCtx.inBounds))
+            else:
+                selectors.append((None, self.fieldIndex(modCtx.field.entry), None))
+        return selectors
+
+    def visitVariable(self, ctx):
+        value = self.load(ctx.entry)
+
+        for index, fieldIndex, inBounds in self.selectors(ctx):
+            value = self.element(value, index, inBounds) if index is not None else self.field(value, fieldIndex)
+
+        return value
+
+    # Compile the load of an array element.
+    # @param array    the closure of the array.
+    # @param index    the closure of the subscript.
+    # @param inBounds true if the subscript is known to be in bounds.
+    # @return the expression closure.
+    def element(self, array, index, inBounds):
+        if inBounds:
+            return lambda frame: array(frame)[index(frame)]
+
+        def loadElement(frame):
+            elements = array(frame)
+            i = index(frame)
+            if i < 0:
+                indexError(i, elements)
+            return elements[i]
+
+        return loadElement
+
+    # Compile the load of a record field.
+    # @param record     the closure of the record.
+    # @param fieldIndex the record slot of the field.
+    # @return the expression closure.
+    def field(self, record, fieldIndex):
+        return lambda frame: record(frame)[fieldIndex]
+
+    # Compile the store into a variable, array element or record field.
+    # @param ctx the VariableContext.
+    # @return a closure that takes the frame and the value to store.
+    def store(self, ctx):
+        selectors = self.selectors(ctx)
+
+        if not selectors:
+            level, index = self.location(ctx.entry)
+
+            if level == 1:
+                globalFrame = self.display[1]
+
+                def storeGlobal(frame, value):
+                    globalFrame[index] = value
+
+                return storeGlobal
+            elif level == self.level:
+                def storeLocal(frame, value):
+                    frame[index] = value
+
+                return storeLocal
+            else:
+                display = self.display
+
+                def storeOuter(frame, value):
+                    display[level][index] = value
+
+                return storeOuter
+
+        container = self.load(ctx.entry)
+        for index, fieldIndex, inBounds in selectors[:-1]:
+            container = (self.element(container, index, inBounds) if index is not None
+                         else self.field(container, fieldIndex))
+
+        index, fieldIndex, inBounds = selectors[-1]
+
+        if inBounds:
+            def storeKnownElement(frame, value):
+                container(frame)[index(frame)] = value
+
+            return storeKnownElement
+        elif index is not None:
+            def storeElement(frame, value):
+                elements = container(frame)
+                i = index(frame)
+                if i < 0:
+                    indexError(i, elements)
+                elements[i] = value
+
+            return storeElement
+
+        def storeField(frame, value):
+            container(frame)[fieldIndex] = value
+
+        return storeField
@@ -0,0 +1,680 @@
+# <h1>PythonGenerator</h1>
+# <p>The PYTHON backend. It translates an analyzed AST into the source of a
+# Python module and returns a PythonProgram that compiles and runs it.
+# The program becomes the function main(_input, _output), its variables
+# the locals of main, and each routine a function nested in the function
+# of the routine it is declared in, so that a variable of an enclosing
+# routine is a closure variable (declared nonlocal where it's assigned).
+# Records become classes with __slots__, and arrays preallocated
+# lists. Values are represented as by the EXECUTOR backend.</p>
+# <p>A VAR parameter is copied in and copied back out: a function with
+# VAR parameters returns a tuple of its value and their final values,
+# which the caller assigns back to the argument variables.</p>
+# <p>Grasp identifiers have no underscores, so every name the generated
+# code adds for itself starts with an underscore and can't clash with
+# one.</p>
+import io
+import keyword
+import re
+
+from edu.yu.compilers.backend.converter.CodeGenerator import CodeGenerator
+from edu.yu.compilers.backend.executor.Executor import JAVA_ESCAPE, JAVA_ESCAPES
+from edu.yu.compilers.backend.python.PythonProgram import PythonProgram
+from edu.yu.compilers.intermediate.ast import Ast
+from edu.yu.compilers.intermediate.ast.AstVisitor import AstVisitor
+from edu.yu.compilers.intermediate.symtable.Kind import Kind
+from edu.yu.compilers.intermediate.symtable.Predefined import Predefined
+from edu.yu.compilers.intermediate.type.Form import Form
+
+# Operands that can be evaluated twice: variables and integer literals.
+NAME = re.compile(r"[A-Za-z]\w*")
+INTEGER = re.compile(r"\d+")
+
+# The start of every generated module. The helpers are the EXECUTOR
+# backend's, and the builtins the code uses are imported under private
+# names, since a Grasp variable may shadow a builtin.
+PROLOGUE = """\
+import sys as _sys
+from operator import setitem as _setitem
+
+from edu.yu.compilers.backend.executor.Executor import (
+    StandardInput as _StandardInput, booleanText as _booleanText, divide as _divide, indexError as _indexError,
+    realDivide as _realDivide, remainder as _remainder, stringText as _stringText)
+
+_float = float
+_range = range
+_setattr = setattr
+"""
+
+
+class PythonGenerator(AstVisitor):
+    RELATIONAL = {"=": "==", "==": "==", "<>": "!=", "!=": "!=", "<": "<", "<=": "<=", ">": ">", ">=": ">="}
+
+    def __init__(self):
+        self.declarations = CodeGenerator(io.StringIO())  # module-level classes and constants
+        self.recordClasses = {}  # record type -> class name
+        self.enumerationNames = {}  # enumeration type -> name of the tuple of its constant names
+
+        # The routine being generated.
+        self.code = None
+        self.routineId = None
+        self.level = 1
+        self.nonlocals = None  # names of enclosing routines' variables it assigns
+        self.lineCount = 0  # lines emitted so far
+
+    # Translate a program.
+    # @param ctx the analyzed AST.
+    # @return the PythonProgram.
+    def visitProgram(self, ctx):
+        programId = ctx.programHeader.programIdentifier.entry
+        main = self.routine(programId, ctx.block.compoundStatement, "main", ["_input", "_output"])
+
+        source = [f"# {programId.getName()}: generated by the Grasp compiler from the program "
+                  f"{programId.getName()}.\n", PROLOGUE]
+        source.append(self.declarations.object_file.getvalue())
+        source.append("\n\n" + main)
+        source.append("\n\nif __name__ == \"__main__\":\n"
+                      "    main(_StandardInput(_sys.stdin), _sys.stdout)\n")
+
+        return PythonProgram(programId.getName(), "".join(source))
+
+    # Generate the function of the program or a routine, with the
+    # functions of its subroutines nested in it.
+    # @param routineId  the routine's symbol table entry.
+    # @param body       the CompoundStatementContext of its body.
+    # @param name       the function name.
+    # @param parameters the parameter names.
+    # @return the function's source, not indented.
+    def routine(self, routineId, body, name, parameters):
+        saved = self.code, self.routineId, self.level, self.nonlocals
+        symTable = routineId.getRoutineSymTable()
+        self.code = CodeGenerator(io.StringIO())
+        self.routineId = routineId
+        self.level = symTable.getNestingLevel()
+        self.nonlocals = []
+        self.code.indent()
+
+        if self.level == 1:
+            self.line("_write = _output.write")
+
+        # The variables, in declaration order.
+        variables = [entry for entry in symTable.values() if (entry.getKind() == Kind.VARIABLE)]
+        for entry in sorted(variables, key=lambda entry: entry.getSlotNumber()):
+            self.line(f"{self.name(entry)} = {self.initialValue(entry.getType())}")
+
+        for subroutineId in routineId.getSubroutines():
+            self.line()
+            function = self.routine(subroutineId, subroutineId.getExecutable(), self.name(subroutineId),
+                                    [self.name(paramId) for paramId in subroutineId.getRoutineParameters()])
+            for text in function.splitlines():
+                self.line(text if text else None)
+        if routineId.getSubroutines():
+            self.line()
+
+        self.visit(body)
+
+        statements = body.statementList.statement
+        if (self.level > 1) and not (statements and statements[-1].returnStatement is not None):
+            self.line("return " + self.result(self.resultName()))
+
+        lines = [f"def {name}({', '.join(parameters)}):\n"]
+        if self.nonlocals:
+            lines.append(f"    nonlocal {', '.join(self.nonlocals)}\n")
+        self.code.lf_if_needed()
+        lines.append(self.code.object_file.getvalue())
+
+        self.code, self.routineId, self.level, self.nonlocals = saved
+        return "".join(lines)
+
+    # Emit a line of the routine.
+    # @param text the line, or None for an empty line.
+    def line(self, text=None):
+        self.code.emit_line(text)
+        self.lineCount += 1
+
+    # Emit a statement as the indented body of a compound Python
+    # statement.
+    # @param ctx the StatementContext.
+    def block(self, ctx):
+        self.code.indent()
+        count = self.lineCount
+        self.visit(ctx)
+        if self.lineCount == count:
+            self.line("pass")
+        self.code.dedent()
+
+    # Get the Python name of a variable, parameter or routine.
+    # @param entry the symbol table entry.
+    # @return the name.
+    def name(self, entry):
+        name = entry.getName()
+        return name + "_" if keyword.iskeyword(name) else name
+
+    # Get the name of the current function's result variable.
+    # @return the name, "None" if it has none.
+    def resultName(self):
+        resultId = self.routineId.getRoutineSymTable().lookup(self.routineId.getName())
+        if (resultId is not None) and (resultId.getKind() == Kind.VARIABLE):
+            return self.name(resultId)
+        return "None"
+
+    # Get what the current function returns for a value: the value, or
+    # with VAR parameters a tuple of it and their values.
+    # @param value the source of the value.
+    # @return the source of the returned expression.
+    def result(self, value):
+        references = [self.name(paramId) for paramId in self.routineId.getRoutineParameters()
+                      if paramId.getKind() == Kind.REFERENCE_PARAMETER]
+        return ", ".join([value] + references)
+
+    # Get the source of the value a variable of a type starts out with.
+    # @param type_ the type.
+    # @return the source.
+    def initialValue(self, type_):
+        type_ = type_.baseType()
+
+        if type_ is Predefined.integerType:
+            return "0"
+        elif type_ is Predefined.realType:
+            return "0.0"
+        elif type_ is Predefined.booleanType:
+            return "False"
+        elif type_ is Predefined.charType:
+            return repr("\0")
+        elif type_.getForm() == Form.ENUMERATION:
+            return "0"
+        elif type_.getForm() == Form.ARRAY:
+            count = type_.getArrayElementCount()
+            elemType = type_.getArrayElementType()
+            element = self.initialValue(elemType)
+            if elemType.isStructured():
+                return f"[{element} for _ in _range({count})]"
+            return f"[{element}] * {count}"
+        elif type_.getForm() == Form.RECORD:
+            return self.recordClass(type_) + "()"
+        return "None"
+
+    # Get the class of a record type, declaring it the first time.
+    # @param type_ the record type.
+    # @return the class name.
+    def recordClass(self, type_):
+        name = self.recordClasses.get(type_)
+        if name is not None:
+            return name
+
+        name = f"_Record_{type_.getName() or 'unnamed'}"
+        if name in self.recordClasses.values():
+            name += f"_{len(self.recordClasses)}"
+        self.recordClasses[type_] = name
+
+        fields = [entry for entry in type_.getRecordSymTable().values() if entry.getKind() == Kind.RECORD_FIELD]
+        fields.sort(key=lambda entry: entry.getSlotNumber())
+        names = [self.name(fieldId) for fieldId in fields]
+        initialValues = [self.initialValue(fieldId.getType()) for fieldId in fields]
+
+        code = self.declarations
+        code.emit_line()
+        code.emit_line()
+        code.emit_line(f"class {name}:")
+        code.indent()
+        code.emit_line(f"__slots__ = {tuple(names)!r}")
+        code.emit_line()
+        code.emit_line("def __init__(self):")
+        code.indent()
+        for fieldName, value in zip(names, initialValues):
+            code.emit_line(f"self.{fieldName} = {value}")
+        if not names:
+            code.emit_line("pass")
+        code.dedent()
+        code.dedent()
+
+        return name
+
+    # Get the tuple of the constant names of an enumeration type,
+    # declaring it the first time.
+    # @param type_ the enumeration type.
+    # @return the tuple's name.
+    def enumerationNamesOf(self, type_):
+        name = self.enumerationNames.get(type_)
+        if name is None:
+            name = self.enumerationNames[type_] = f"_NAMES_{len(self.enumerationNames)}"
+            names = tuple(constantId.getName() for constantId in type_.getEnumerationConstants())
+            self.declarations.emit_line(f"{name} = {names!r}")
+        return name
+
+    # Statements.
+
+    def visitAssignmentStatement(self, ctx):
+        self.assign(ctx.lhs.variable, self.value(ctx.rhs.expression, ctx.lhs.variable.type_))
+
+    # Emit the assignment of a value to a variable.
+    # @param varCtx the VariableContext.
+    # @param value  the source of the value.
+    def assign(self, varCtx, value):
+        self.line(f"{self.target(varCtx)} = {value}")
+
+    def visitIfStatement(self, ctx, keyword="if"):
+        self.line(f"{keyword} {self.visit(ctx.expression)}:")
+        self.block(ctx.trueStatement.statement)
+
+        if ctx.falseStatement is not None:
+            falseCtx = ctx.falseStatement.statement
+            if falseCtx.ifStatement is not None:
+                self.visitIfStatement(falseCtx.ifStatement, "elif")
+            else:
+                self.line("else:")
+                self.block(falseCtx)
+
+    def visitWhileStatement(self, ctx):
+        self.line(f"while {self.visit(ctx.expression)}:")
+        self.block(ctx.statement)
+
+    def visitForStatement(self, ctx):
+        self.assign(ctx.variable, self.value(ctx.expression[0], ctx.variable.type_))
+        self.line(f"while {self.visit(ctx.expression[1])}:")
+        self.code.indent()
+        self.visit(ctx.statement)
+        self.visit(ctx.assignmentStatement)
+        self.code.dedent()
+
+    def visitReturnStatement(self, ctx):
+        # Return from the program.
+        if self.level == 1:
+            self.line(self.visit(ctx.expression))
+            self.line("return")
+        else:
+            self.line("return " + self.result(self.value(ctx.expression, self.routineId.getType())))
+
+    def visitFunctionCallStatement(self, ctx):
+        routineId, arguments, references = self.arguments(ctx)
+        call = f"{self.name(routineId)}({', '.join(arguments)})"
+
+        if not references:
+            self.line(call)
+            return
+
+        self.line(f"_t = {call}")
+        for i, varCtx in enumerate(references, 1):
+            self.assign(varCtx, f"_t[{i}]")
+
+    def visitCaseStatement(self, ctx):
+        raise NotImplementedError(f"line {ctx.start.line}: case statements can't be translated")
+
+    def visitDeclareAndAssignStatement(self, ctx):
+        raise NotImplementedError(f"line {ctx.start.line}: declare-and-assign statements can't be translated")
+
+    def visitPrintStatement(self, ctx):
+        self.write(ctx.writeArguments, "")
+
+    def visitPrintlnStatement(self, ctx):
+        if ctx.writeArguments is None:
+            self.line(r"_write('\n')")
+        else:
+            self.write(ctx.writeArguments, "\n")
+
+    # Emit a print statement that writes a Python format, as the
+    # Converter builds a Java format for printf.
+    # @param ctx the WriteArgumentsContext.
+    # @param end the text to print after the arguments.
+    def write(self, ctx, end):
+        format = []
+        arguments = []
+
+        for argCtx in ctx.writeArgument:
+            exprCtx = argCtx.expression
+            literal = self.literalString(exprCtx)
+
+            # Literal strings are part of the format.
+            if literal is not None:
+                format.append(literal)
+                continue
+
+            format.append("%")
+
+            fwCtx = argCtx.fieldWidth
+            if fwCtx is not None:
+                sign = "-" if fwCtx.sign is not None and fwCtx.sign.getText() == "-" else ""
+                format.append(sign + fwCtx.integerConstant.getText())
+
+                dpCtx = fwCtx.decimalPlaces
+                if dpCtx is not None:
+                    format.append("." + dpCtx.integerConstant.getText())
+
+            type_ = exprCtx.type_
+            value = self.visit(exprCtx)
+
+            if type_ is Predefined.integerType:
+                format.append("d")
+            elif type_ is Predefined.realType:
+                format.append("f")
+            elif type_ is Predefined.charType:
+                format.append("c")
+            else:
+                format.append("s")
+
+                if type_ is Predefined.booleanType:
+                    value = f"_booleanText({value})"
+                elif type_ is Predefined.stringType:
+                    value = f"_stringText({value})"
+                elif (type_ is not None) and (type_.getForm() == Form.ENUMERATION):
+                    value = f"{self.enumerationNamesOf(type_)}[{value}]"
+
+            arguments.append(value)
+
+        format = "".join(format) + end
+
+        # Without arguments the text is known, unless it's a bad format.
+        if not arguments:
+            try:
+                self.line(f"_write({format % ()!r})")
+                return
+            except (TypeError, ValueError):
+                pass
+
+        self.line(f"_write({format!r} % ({', '.join(arguments)}{',' if len(arguments) == 1 else ''}))")
+
+    # Get the text of a print argument that is a literal string.
+    # @param exprCtx the ExpressionContext.
+    # @return the text, or None if the argument is not a literal string.
+    def literalString(self, exprCtx):
+        factorCtx = self.loneFactor(exprCtx)
+        if isinstance(factorCtx, Ast.StringFactor):
+            return self.stringValue(factorCtx.stringConstant.getText())
+        return None
+
+    # Get the factor an expression consists of.
+    # @param exprCtx the ExpressionContext.
+    # @return the factor, or None if there is more to the expression.
+    def loneFactor(self, exprCtx):
+        if len(exprCtx.simpleExpression) == 1:
+            simpleCtx = exprCtx.simpleExpression[0]
+            if (simpleCtx.sign is None) and (len(simpleCtx.term) == 1):
+                termCtx = simpleCtx.term[0]
+                if len(termCtx.factor) == 1:
+                    return termCtx.factor[0]
+        return None
+
+    def visitReadStatement(self, ctx):
+        self.read(ctx.readArguments, False)
+
+    def visitReadlnStatement(self, ctx):
+        self.read(ctx.readArguments, True)
+
+    # Emit a read statement.
+    # @param ctx      the ReadArgumentsContext.
+    # @param skipLine true to skip the rest of the line afterwards.
+    def read(self, ctx, skipLine):
+        for varCtx in ctx.variable:
+            type_ = varCtx.type_.baseType()
+            reader = "nextChar" if type_ is Predefined.charType else \
+                "nextInt" if type_ is Predefined.integerType else \
+                "nextDouble" if type_ is Predefined.realType else \
+                "nextBoolean" if type_ is Predefined.booleanType else \
+                "next"
+            self.assign(varCtx, f"_input.{reader}()")
+
+        if skipLine:
+            self.line("_input.nextLine()")
+
+    # Expressions. Visiting an expression returns its source, which is
+    # parenthesized where Python's operator precedence differs from
+    # Grasp's.
+
+    # Get the source of an expression whose value is assigned to a
+    # variable or parameter of a type.
+    # @param ctx        the ExpressionContext.
+    # @param targetType the type.
+    # @return the source.
+    def value(self, ctx, targetType):
+        value = self.visit(ctx)
+        valueType = ctx.type_
+
+        # Convert an integer assigned to a decimal, as Java widens it.
+        if (targetType is not None) and (targetType.baseType() is Predefined.realType) and (
+                valueType is not None) and (valueType.baseType() is Predefined.integerType):
+            value = value + ".0" if re.fullmatch(r"-?\d+", value) else f"_float({value})"
+
+        return value
+
+    def visitExpression(self, ctx):
+        left = self.visit(ctx.simpleExpression[0])
+
+        if ctx.relOp is None:
+            return left
+
+        right = self.visit(ctx.simpleExpression[1])
+        return f"{left} {PythonGenerator.RELATIONAL[ctx.relOp.getText()]} {right}"
+
+    def visitSimpleExpression(self, ctx):
+        value = self.visit(ctx.term[0])
+
+        if ctx.sign is not None and ctx.sign.getText() == "-":
+            value = "-" + value
+
+        for i in range(1, len(ctx.term)):
+            value = self.operation(ctx.addOp[i - 1].getText().lower(), value, self.visit(ctx.term[i]))
+
+        return value
+
+    def visitTerm(self, ctx):
+        value = self.visit(ctx.factor[0])
+
+        for i in range(1, len(ctx.factor)):
+            value = self.operation(ctx.mulOp[i - 1].getText().lower(), value, self.visit(ctx.factor[i]))
+
+        return value
+
+    # Get the source of a binary operation.
+    # @param op    the operator.
+    # @param left  the source of the left operand.
+    # @param right the source of the right operand.
+    # @return the source.
+    def operation(self, op, left, right):
+        if op in ("+", "-", "*"):
+            return f"{left} {op} {right}"
+        elif op in ("and", "or"):
+            return f"({left} {op} {right})"
+        elif op == "/":
+            return self.division(left, right, "/", "_realDivide", "!= 0")
+        elif op == "div":
+            return self.division(left, right, "//", "_divide", "> 0", "{} >= 0")
+        elif op == "mod":
+            return self.division(left, right, "%", "_remainder", "> 0", "{} >= 0")
+        raise NotImplementedError(f"operator {op} can't be translated")
+
+    # Get the source of a division. Where the operands can be evaluated
+    # twice, Python's operator is applied directly to operands for which
+    # it gives the result Java's does.
+    # @param left         the source of the dividend.
+    # @param right        the source of the divisor.
+    # @param operator     the Python operator.
+    # @param function     the helper function that handles every operand.
+    # @param divisorTest  the test of the divisor for the operator.
+    # @param dividendTest the test of the dividend for the operator, if any.
+    # @return the source.
+    def division(self, left, right, operator, function, divisorTest, dividendTest=None):
+        call = f"{function}({left}, {right})"
+        if not (self.simple(left) and self.simple(right)):
+            return call
+
+        tests = []
+        if (dividendTest is not None) and not INTEGER.fullmatch(left):
+            tests.append(dividendTest.format(left))
+        if not INTEGER.fullmatch(right):
+            tests.append(f"{right} {divisorTest}")
+        elif int(right) == 0:
+            return call
+
+        if not tests:
+            return f"({left} {operator} {right})"
+        return f"({left} {operator} {right} if {' and '.join(tests)} else {call})"
+
+    # Find out if an operand can be evaluated twice.
+    # @param source the source of the operand.
+    # @return true if it's a variable or an unsigned integer.
+    def simple(self, source):
+        return bool(NAME.fullmatch(source) or INTEGER.fullmatch(source))
+
+    def visitVariableFactor(self, ctx):
+        return self.visit(ctx.variable)
+
+    def visitNumberFactor(self, ctx):
+        numberCtx = ctx.number
+        text = numberCtx.unsignedNumber.getText()
+        value = int(text) if numberCtx.unsignedNumber.integerConstant is not None else float(text)
+
+        if numberCtx.sign is not None and numberCtx.sign.getText() == "-":
+            value = -value
+
+        return repr(value)
+
+    def visitCharacterFactor(self, ctx):
+        return repr(ctx.getText()[1:-1])
+
+    def visitStringFactor(self, ctx):
+        return repr(self.stringValue(ctx.stringConstant.getText()))
+
+    # Get the value of a string constant, as javac reads the string
+    # literal the Converter makes of it.
+    # @param graspString the quoted Grasp string.
+    # @return the string.
+    def stringValue(self, graspString):
+        unquoted = graspString[1:-1].replace("''", "'")
+        return JAVA_ESCAPE.sub(lambda match: JAVA_ESCAPES[match.group(1)], unquoted)
+
+    def visitFunctionCallFactor(self, ctx):
+        routineId, arguments, references = self.arguments(ctx.functionCallStatement)
+        call = f"{self.name(routineId)}({', '.join(arguments)})"
+
+        if not references:
+            return call
+
+        # Assign the VAR parameters back within the expression, in
+        # assignment expressions or setter calls.
+        parts = [f"(_t := {call})"]
+        for i, varCtx in enumerate(references, 1):
+            parts.append(self.setter(varCtx, f"_t[{i}]"))
+        parts.append("_t[0]")
+        return f"({', '.join(parts)})[-1]"
+
+    def visitNotFactor(self, ctx):
+        return f"(not {self.visit(ctx.factor)})"
+
+    def visitParenthesizedFactor(self, ctx):
+        return f"({self.visit(ctx.expression)})"
+
+    # Get the arguments of a function call.
+    # @param ctx the FunctionCallStatementContext.
+    # @return the routine's entry, the sources of the arguments and the
+    #         VariableContexts of the VAR arguments.
+    def arguments(self, ctx):
+        routineId = ctx.functionName.entry
+        if routineId.getExecutable() is None:
+            raise NotImplementedError(f"line {ctx.start.line}: {ctx.functionName.name} can't be called")
+
+        exprCtxs = [argCtx.expression for argCtx in ctx.argumentList.argument] \
+            if ctx.argumentList is not None else []
+        arguments = []
+        references = []
+
+        for paramId, exprCtx in zip(routineId.getRoutineParameters(), exprCtxs):
+            arguments.append(self.value(exprCtx, paramId.getType()))
+            if paramId.getKind() == Kind.REFERENCE_PARAMETER:
+                references.append(self.loneFactor(exprCtx).variable)
+
+        return routineId, arguments, references
+
+    # Variables.
+
+    # Get the source of a variable, constant or enumeration constant
+    # without modifiers.
+    # @param entry the symbol table entry.
+    # @return the source.
+    def load(self, entry):
+        kind = entry.getKind()
+
+        if kind == Kind.CONSTANT:
+            return repr(entry.getValue())
+        elif kind == Kind.ENUMERATION_CONSTANT:
+            type_ = entry.getType()
+            if type_ is Predefined.booleanType:
+                return repr(bool(entry.getValue()))
+            return repr(type_.getEnumerationConstants().index(entry))
+        elif entry.getSlotNumber() is None:
+            raise NotImplementedError(f"{entry.getName()} can't be used as a variable")
+
+        return self.name(entry)
+
+    def visitVariable(self, ctx):
+        value = self.load(ctx.entry)
+        for modCtx in ctx.modifier:
+            value = self.select(value, modCtx)
+        return value
+
+    # Get the source of the array element or record field a modifier
+    # selects.
+    # @param container the source of the array or record.
+    # @param modCtx    the ModifierContext.
+    # @return the source.
+    def select(self, container, modCtx):
+        if modCtx.indexList is None:
+            return f"{container}.{self.name(modCtx.field.entry)}"
+
+        for indexCtx in modCtx.indexList.index:
+            container = f"{container}[{self.index(container, indexCtx)}]"
+        return container
+
+    # Get the source of an array index, checked for being negative, which
+    # Python would count from the end of the list, unless it's known to be
+    # in bounds.
+    # @param array    the source of the array.
+    # @param indexCtx the IndexContext.
+    # @return the source.
+    def index(self, array, indexCtx):
+        index = self.visit(indexCtx.expression)
+        if indexCtx.inBounds or INTEGER.fullmatch(index):
+            return index
+        elif NAME.fullmatch(index):
+            return f"{index} if {index} >= 0 else _indexError({index}, {array})"
+        return f"_i if (_i := {index}) >= 0 else _indexError(_i, {array})"
+
+    # Get the source of the target of an assignment to a variable, array
+    # element or record field.
+    # @param ctx the VariableContext.
+    # @return the source.
+    def target(self, ctx):
+        if not ctx.modifier:
+            return self.local(ctx.entry)
+        return self.visit(ctx)
+
+    # Get the name of a variable that is assigned, declaring it nonlocal
+    # if it's a variable of an enclosing routine.
+    # @param entry the symbol table entry.
+    # @return the name.
+    def local(self, entry):
+        name = self.name(entry)
+        if (entry.getSymTable().getNestingLevel() < self.level) and (name not in self.nonlocals):
+            self.nonlocals.append(name)
+        return name
+
+    # Get the source of an expression that assigns a value to a variable,
+    # array element or record field.
+    # @param ctx   the VariableContext.
+    # @param value the source of the value.
+    # @return the source.
+    def setter(self, ctx, value):
+        if not ctx.modifier:
+            return f"({self.local(ctx.entry)} := {value})"
+
+        container = self.load(ctx.entry)
+        for modCtx in ctx.modifier[:-1]:
+            container = self.select(container, modCtx)
+
+        modCtx = ctx.modifier[-1]
+        if modCtx.indexList is None:
+            return f"_setattr({container}, {self.name(modCtx.field.entry)!r}, {value})"
+
+        indexCtxs = modCtx.indexList.index
+        for indexCtx in indexCtxs[:-1]:
+            container = f"{container}[{self.index(container, indexCtx)}]"
+        return f"_setitem({container}, {self.index(container, indexCtxs[-1])}, {value})"
@@ -0,0 +1,52 @@
+# <h1>PythonProgram</h1>
+# <p>A program translated to Python by the PYTHON backend. The module
+# source is compiled with compile() and executed once to define its
+# main(), which each run calls. Written to a file, the module can be run
+# and profiled with the standard Python tools, and its bytecode is cached
+# as a .pyc file the way the import system caches it.</p>
+import py_compile
+import sys
+
+from edu.yu.compilers.backend.executor.Executor import StandardInput
+
+
+class PythonProgram:
+
+    # Constructor.
+    # @param name     the name of the program.
+    # @param source   the module source.
+    # @param fileName the file the source is in, if it's written to one.
+    def __init__(self, name, source, fileName=None):
+        self.name = name
+        self.source = source
+        self.fileName = None
+        self.main = None
+        self.load(fileName)
+
+    # Compile the module and define its main().
+    # @param fileName the file the source is in, or None.
+    def load(self, fileName):
+        self.fileName = fileName
+        code = compile(self.source, fileName if fileName is not None else f"<{self.name}>", "exec")
+        namespace = {"__name__": self.name}
+        exec(code, namespace)
+        self.main = namespace["main"]
+
+    # Write the module and cache its bytecode in the __pycache__ directory
+    # next to it. Tracebacks and profiles then refer to the file.
+    # @param fileName the .py file name.
+    # @return the .pyc file name.
+    def write(self, fileName):
+        with open(fileName, "w") as pyFile:
+            pyFile.write(self.source)
+
+        pycFileName = py_compile.compile(fileName, doraise=True)
+        self.load(fileName)
+        return pycFileName
+
+    # Run the program.
+    # @param inputFile  the text stream to read from (default sys.stdin).
+    # @param outputFile the text stream to print to (default sys.stdout).
+    def run(self, inputFile=None, outputFile=None):
+        self.main(StandardInput(inputFile if inputFile is not None else sys.stdin),
+                  outputFile if outputFile is not None else sys.stdout)
@@ -0,0 +1,719 @@
+# <h1>BytecodeCompiler</h1>
+# <p>The COMPILER backend. It compiles an analyzed AST into a CodeObject
+# for the program and one for each routine, and returns a VirtualMachine
+# loaded with them. Variables and parameters are in the frame slots
+# Semantics numbered them with, record fields in the record slots. An
+# expression operand that is a variable of the current routine or a
+# constant is read from its slot where it is, and every other value is
+# computed into a temporary slot. The temporaries of a statement are free
+# again after it.</p>
+# <p>A constant's slot is not known until the routine is compiled and the
+# number of temporaries it needs is known, so until then a constant slot
+# operand is the negative number -(index + 1) of the constant.</p>
+from edu.yu.compilers.backend.executor.Executor import JAVA_ESCAPE, JAVA_ESCAPES, StandardInput, booleanText, \
+    stringText
+from edu.yu.compilers.backend.vm import Opcode
+from edu.yu.compilers.backend.vm.CodeObject import CodeObject
+from edu.yu.compilers.backend.vm.VirtualMachine import VirtualMachine
+from edu.yu.compilers.intermediate.ast import Ast
+from edu.yu.compilers.intermediate.ast.AstVisitor import AstVisitor
+from edu.yu.compilers.intermediate.symtable.Kind import Kind
+from edu.yu.compilers.intermediate.symtable.Predefined import Predefined
+from edu.yu.compilers.intermediate.type.Form import Form
+
+
+class BytecodeCompiler(AstVisitor):
+    ARITHMETIC = {"+": Opcode.ADD, "-": Opcode.SUB, "*": Opcode.MUL, "/": Opcode.DIVIDE,
+                  "div": Opcode.DIV, "mod": Opcode.MOD}
+    RELATIONAL = {"=": Opcode.EQ, "==": Opcode.EQ, "<>": Opcode.NE, "!=": Opcode.NE,
+                  "<": Opcode.LT, "<=": Opcode.LE, ">": Opcode.GT, ">=": Opcode.GE}
+    # The jumps taken when a relation is true and when it is false.
+    JUMP_IF = {"=": Opcode.JUMP_IF_EQ, "==": Opcode.JUMP_IF_EQ, "<>": Opcode.JUMP_IF_NE, "!=": Opcode.JUMP_IF_NE,
+               "<": Opcode.JUMP_IF_LT, "<=": Opcode.JUMP_IF_LE, ">": Opcode.JUMP_IF_GT, ">=": Opcode.JUMP_IF_GE}
+    JUMP_UNLESS = {"=": Opcode.JUMP_UNLESS_EQ, "==": Opcode.JUMP_UNLESS_EQ,
+                   "<>": Opcode.JUMP_UNLESS_NE, "!=": Opcode.JUMP_UNLESS_NE,
+                   "<": Opcode.JUMP_UNLESS_LT, "<=": Opcode.JUMP_UNLESS_LE,
+                   ">": Opcode.JUMP_UNLESS_GT, ">=": Opcode.JUMP_UNLESS_GE}
+
+    def __init__(self):
+        self.routines = {}  # routine entry -> CodeObject
+        self.levelCount = 1  # the deepest nesting level
+        self.hasCalls = {}  # expression node -> whether it contains a function call
+
+        # The routine being compiled.
+        self.routineId = None
+        self.routine = None
+        self.level = 1
+        self.code = None
+        self.constantIndexes = {}  # object -> index in routine.constants
+        self.values = []  # the values of the constant slots
+        self.valueIndexes = {}  # (type, repr) of a value -> index in values
+        self.constantOperands = []  # code positions of constant slot operands
+        self.firstTemp = 0  # the first temporary slot
+        self.temp = 0  # the next free temporary slot
+        self.maxTemp = 0  # the end of the temporary slots used
+        self.lastDest = None  # code position of the destination operand of the last instruction
+
+    # Compile a program.
+    # @param ctx the analyzed AST.
+    # @return the VirtualMachine.
+    def visitProgram(self, ctx):
+        programId = ctx.programHeader.programIdentifier.entry
+        program = self.declareRoutine(programId)
+
+        for routineId, routine in self.routines.items():
+            body = ctx.block.compoundStatement if routine is program else routineId.getExecutable()
+            self.compileRoutine(routineId, routine, body)
+
+        return VirtualMachine(programId.getName(), program, self.levelCount)
+
+    # Lay out the frames of the program or a routine and its subroutines.
+    # @param routineId the routine's symbol table entry.
+    # @return the CodeObject, with no code yet.
+    def declareRoutine(self, routineId):
+        symTable = routineId.getRoutineSymTable()
+        routine = CodeObject(routineId.getName(), symTable.getNestingLevel())
+        self.routines[routineId] = routine
+        self.levelCount = max(self.levelCount, routine.level)
+
+        maxSlot = symTable.getMaxSlotNumber()
+        routine.template = [None] * (maxSlot + 1 if maxSlot is not None else 0)
+        allocators = []
+
+        for entry in symTable.values():
+            slot = entry.getSlotNumber()
+            if slot is not None:
+                type_ = entry.getType()
+                routine.template[slot] = self.initialValue(type_)
+                if type_.isStructured():
+                    allocators.append((slot, self.allocator(type_)))
+
+        routine.allocators = tuple(allocators)
+
+        resultId = symTable.lookup(routineId.getName())
+        if (resultId is not None) and (resultId.getKind() == Kind.VARIABLE):
+            routine.resultSlot = resultId.getSlotNumber()
+
+        for subroutineId in routineId.getSubroutines():
+            self.declareRoutine(subroutineId)
+
+        return routine
+
+    # Get the value a variable of a type starts out with.
+    # @param type_ the type.
+    # @return the value, None for strings, arrays and records.
+    def initialValue(self, type_):
+        type_ = type_.baseType()
+
+        if type_ is Predefined.integerType:
+            return 0
+        elif type_ is Predefined.realType:
+            return 0.0
+        elif type_ is Predefined.booleanType:
+            return False
+        elif type_ is Predefined.charType:
+            return "\0"
+        elif type_.getForm() == Form.ENUMERATION:
+            return 0
+        return None
+
+    # Create the function that allocates a new array or record.
+    # @param type_ the array or record type.
+    # @return the function.
+    def allocator(self, type_):
+        if type_.getForm() == Form.ARRAY:
+            count = type_.getArrayElementCount()
+            elemType = type_.getArrayElementType()
+
+            if elemType.isStructured():
+                allocateElement = self.allocator(elemType)
+                return lambda: [allocateElement() for _ in range(count)]
+
+            value = self.initialValue(elemType)
+            return lambda: [value] * count
+
+        symTable = type_.getRecordSymTable()
+        template = [None] * (symTable.getMaxSlotNumber() + 1)
+        allocators = []
+        for fieldId in symTable.values():
+            if fieldId.getKind() == Kind.RECORD_FIELD:
+                slot = fieldId.getSlotNumber()
+                fieldType = fieldId.getType()
+                template[slot] = self.initialValue(fieldType)
+                if fieldType.isStructured():
+                    allocators.append((slot, self.allocator(fieldType)))
+
+        def allocateRecord():
+            record = template.copy()
+            for slot, allocate in allocators:
+                record[slot] = allocate()
+            return record
+
+        return allocateRecord
+
+    # Compile the body of the program or a routine.
+    # @param routineId the routine's symbol table entry.
+    # @param routine   its CodeObject.
+    # @param ctx       the CompoundStatementContext of its body.
+    def compileRoutine(self, routineId, routine, ctx):
+        self.routineId = routineId
+        self.routine = routine
+        self.level = routine.level
+        self.code = routine.code
+        self.constantIndexes = {}
+        self.values = []
+        self.valueIndexes = {}
+        self.constantOperands = []
+        self.firstTemp = self.temp = self.maxTemp = len(routine.template)
+        self.lastDest = None
+
+        self.visit(ctx)
+        self.emit(Opcode.RETURN)
+
+        # The constant slots follow the temporaries.
+        base = self.maxTemp
+        routine.template.extend([None] * (base - self.firstTemp))
+        routine.template.extend(self.values)
+        for position in self.constantOperands:
+            self.code[position] = base - self.code[position] - 1
+
+    # Code emission.
+
+    # Append an instruction.
+    # @param op       the opcode.
+    # @param operands the operands.
+    # @return the code position of the instruction.
+    def emit(self, op, *operands):
+        code = self.code
+        position = len(code)
+        code.append(op)
+
+        for operand in operands:
+            if operand < 0:
+                self.constantOperands.append(len(code))
+            code.append(operand)
+
+        self.lastDest = None
+        return position
+
+    # Append an instruction whose first operand is the slot it writes.
+    # @param op       the opcode.
+    # @param operands the operands.
+    # @return the destination slot.
+    def produce(self, op, *operands):
+        self.lastDest = self.emit(op, *operands) + 1
+        return operands[0]
+
+    # Append a jump.
+    # @param op       the opcode.
+    # @param operands the operands before the target.
+    # @param target   the target, if it is known yet.
+    # @return the code position of the target operand.
+    def jump(self, op, *operands, target=0):
+        self.emit(op, *operands, target)
+        return len(self.code) - 1
+
+    # Make jumps go to the next instruction.
+    # @param positions the code positions of their target operands.
+    def patch(self, positions):
+        for position in positions:
+            self.code[position] = self.label()
+
+    # Get the code position of the next instruction, which jumps may go to.
+    # @return the position.
+    def label(self):
+        self.lastDest = None
+        return len(self.code)
+
+    # Allocate a temporary slot.
+    # @return the slot.
+    def newTemp(self):
+        slot = self.temp
+        self.temp += 1
+        self.maxTemp = max(self.maxTemp, self.temp)
+        return slot
+
+    # Get the slot of a constant value.
+    # @param value the value.
+    # @return the slot operand.
+    def constant(self, value):
+        key = (type(value), repr(value))
+        index = self.valueIndexes.get(key)
+        if index is None:
+            index = self.valueIndexes[key] = len(self.values)
+            self.values.append(value)
+        return -(index + 1)
+
+    # Get the index of an object in the constants of the routine.
+    # @param value the object.
+    # @return the index.
+    def constantIndex(self, value):
+        index = self.constantIndexes.get(value)
+        if index is None:
+            index = self.constantIndexes[value] = len(self.routine.constants)
+            self.routine.constants.append(value)
+        return index
+
+    # Copy a value into a slot. If the value was just computed into a
+    # temporary, the instruction that computed it is made to write the
+    # slot instead.
+    # @param dest the slot.
+    # @param slot the slot of the value.
+    def moveTo(self, dest, slot):
+        if slot == dest:
+            return
+
+        if (self.lastDest is not None) and (slot >= self.firstTemp) and (self.code[self.lastDest] == slot):
+            self.code[self.lastDest] = dest
+        else:
+            self.produce(Opcode.MOVE, dest, slot)
+
+    # Make sure that the value of an operand that is read after more
+    # expressions are evaluated is not changed by a function they call.
+    # @param slot  the slot of the operand.
+    # @param later the ExpressionContexts evaluated before it is read.
+    # @return the slot to read.
+    def stable(self, slot, later):
+        if (0 <= slot < self.firstTemp) and any(self.hasCall(ctx) for ctx in later):
+            return self.produce(Opcode.MOVE, self.newTemp(), slot)
+        return slot
+
+    # Find out if an expression calls a function.
+    # @param ctx the node.
+    # @return true if it does.
+    def hasCall(self, ctx):
+        found = self.hasCalls.get(ctx)
+        if found is None:
+            found = isinstance(ctx, Ast.FunctionCallFactor) or any(self.hasCall(child)
+                                                                    for child in ctx.getChildren())
+            self.hasCalls[ctx] = found
+        return found
+
+    # Statements.
+
+    def visitStatement(self, ctx):
+        temp = self.temp
+        for child in ctx.getChildren():
+            self.visit(child)
+        self.temp = temp
+
+    def visitAssignmentStatement(self, ctx):
+        self.assignment(ctx.lhs.variable, ctx.rhs.expression)
+
+    # Compile the assignment of an expression to a variable.
+    # @param varCtx  the VariableContext.
+    # @param exprCtx the ExpressionContext.
+    def assignment(self, varCtx, exprCtx):
+        self.store(varCtx, self.value(exprCtx, varCtx.type_))
+
+    def visitIfStatement(self, ctx):
+        falseJump = self.branch(ctx.expression, False)
+        self.visit(ctx.trueStatement.statement)
+
+        if ctx.falseStatement is None:
+            self.patch([falseJump])
+        else:
+            endJump = self.jump(Opcode.JUMP)
+            self.patch([falseJump])
+            self.visit(ctx.falseStatement.statement)
+            self.patch([endJump])
+
+    # Loops test their condition after the body, so that an iteration
+    # takes one jump.
+    def visitWhileStatement(self, ctx):
+        testJump = self.jump(Opcode.JUMP)
+        top = self.label()
+        self.visit(ctx.statement)
+        self.patch([testJump])
+        self.branch(ctx.expression, True, top)
+
+    def visitForStatement(self, ctx):
+        self.assignment(ctx.variable, ctx.expression[0])
+        testJump = self.jump(Opcode.JUMP)
+        top = self.label()
+        self.visit(ctx.statement)
+        self.visit(ctx.assignmentStatement)
+        self.patch([testJump])
+        self.branch(ctx.expression[1], True, top)
+
+    # Compile the test of a condition.
+    # @param ctx    the ExpressionContext.
+    # @param sense  true to jump if the condition is true, false to jump
+    #               if it is false.
+    # @param target the target, if it is known yet.
+    # @return the code position of the target operand of the jump.
+    def branch(self, ctx, sense, target=0):
+        if ctx.relOp is None:
+            return self.jump(Opcode.JUMP_IF_TRUE if sense else Opcode.JUMP_IF_FALSE, self.visit(ctx), target=target)
+
+        left = self.stable(self.visit(ctx.simpleExpression[0]), ctx.simpleExpression[1:])
+        right = self.visit(ctx.simpleExpression[1])
+        jumps = BytecodeCompiler.JUMP_IF if sense else BytecodeCompiler.JUMP_UNLESS
+        return self.jump(jumps[ctx.relOp.getText()], left, right, target=target)
+
+    def visitReturnStatement(self, ctx):
+        resultSlot = self.routine.resultSlot
+
+        # Return from the program.
+        if resultSlot is None:
+            self.visit(ctx.expression)
+        else:
+            self.moveTo(resultSlot, self.value(ctx.expression, self.routineId.getType()))
+
+        self.emit(Opcode.RETURN)
+
+    def visitFunctionCallStatement(self, ctx):
+        self.call(ctx)
+
+    def visitCaseStatement(self, ctx):
+        raise NotImplementedError(f"line {ctx.start.line}: case statements can't be compiled")
+
+    def visitDeclareAndAssignStatement(self, ctx):
+        raise NotImplementedError(f"line {ctx.start.line}: declare-and-assign statements can't be compiled")
+
+    def visitPrintStatement(self, ctx):
+        self.write(ctx.writeArguments, "")
+
+    def visitPrintlnStatement(self, ctx):
+        if ctx.writeArguments is None:
+            self.emit(Opcode.PRINT, self.constantIndex("\n"), 0)
+        else:
+            self.write(ctx.writeArguments, "\n")
+
+    # Compile a print statement into a Python format, as the Converter
+    # builds a Java format for printf.
+    # @param ctx the WriteArgumentsContext.
+    # @param end the text to print after the arguments.
+    def write(self, ctx, end):
+        format = []
+        arguments = []
+        argCtxs = ctx.writeArgument
+
+        for i, argCtx in enumerate(argCtxs):
+            exprCtx = argCtx.expression
+            literal = self.literalString(exprCtx)
+
+            # Literal strings are part of the format.
+            if literal is not None:
+                format.append(literal)
+                continue
+
+            format.append("%")
+
+            fwCtx = argCtx.fieldWidth
+            if fwCtx is not None:
+                sign = "-" if fwCtx.sign is not None and fwCtx.sign.getText() == "-" else ""
+                format.append(sign + fwCtx.integerConstant.getText())
+
+                dpCtx = fwCtx.decimalPlaces
+                if dpCtx is not None:
+                    format.append("." + dpCtx.integerConstant.getText())
+
+            type_ = exprCtx.type_
+            value = self.visit(exprCtx)
+            text = None
+
+            if type_ is Predefined.integerType:
+                format.append("d")
+            elif type_ is Predefined.realType:
+                format.append("f")
+            elif type_ is Predefined.charType:
+                format.append("c")
+            else:
+                format.append("s")
+
+                if type_ is Predefined.booleanType:
+                    text = booleanText
+                elif type_ is Predefined.stringType:
+                    text = stringText
+                elif (type_ is not None) and (type_.getForm() == Form.ENUMERATION):
+                    names = tuple(constantId.getName() for constantId in type_.getEnumerationConstants())
+                    text = names.__getitem__
+
+            if text is not None:
+                value = self.produce(Opcode.APPLY, self.newTemp(), self.constantIndex(text), value)
+            arguments.append(self.stable(value, [argCtx.expression for argCtx in argCtxs[i + 1:]]))
+
+        format = "".join(format) + end
+        self.emit(Opcode.PRINT, self.constantIndex(format), len(arguments), *arguments)
+
+    # Get the text of a print argument that is a literal string.
+    # @param exprCtx the ExpressionContext.
+    # @return the text, or None if the argument is not a literal string.
+    def literalString(self, exprCtx):
+        factorCtx = self.loneFactor(exprCtx)
+        if isinstance(factorCtx, Ast.StringFactor):
+            return self.stringValue(factorCtx.stringConstant.getText())
+        return None
+
+    # Get the factor an expression consists of.
+    # @param exprCtx the ExpressionContext.
+    # @return the factor, or None if there is more to the expression.
+    def loneFactor(self, exprCtx):
+        if len(exprCtx.simpleExpression) == 1:
+            simpleCtx = exprCtx.simpleExpression[0]
+            if (simpleCtx.sign is None) and (len(simpleCtx.term) == 1):
+                termCtx = simpleCtx.term[0]
+                if len(termCtx.factor) == 1:
+                    return termCtx.factor[0]
+        return None
+
+    def visitReadStatement(self, ctx):
+        self.read(ctx.readArguments, False)
+
+    def visitReadlnStatement(self, ctx):
+        self.read(ctx.readArguments, True)
+
+    # Compile a read statement.
+    # @param ctx      the ReadArgumentsContext.
+    # @param skipLine true to skip the rest of the line afterwards.
+    def read(self, ctx, skipLine):
+        for varCtx in ctx.variable:
+            type_ = varCtx.type_.baseType()
+            reader = StandardInput.nextChar if type_ is Predefined.charType else \
+                StandardInput.nextInt if type_ is Predefined.integerType else \
+                StandardInput.nextDouble if type_ is Predefined.realType else \
+                StandardInput.nextBoolean if type_ is Predefined.booleanType else \
+                StandardInput.next
+            temp = self.temp
+            self.store(varCtx, self.produce(Opcode.READ, self.newTemp(), self.constantIndex(reader)))
+            self.temp = temp
+
+        if skipLine:
+            self.emit(Opcode.READ_LINE)
+
+    # Expressions.
+
+    # Compile an expression whose value is assigned to a variable or
+    # parameter of a type.
+    # @param ctx        the ExpressionContext.
+    # @param targetType the type.
+    # @return the slot of the value.
+    def value(self, ctx, targetType):
+        slot = self.visit(ctx)
+        valueType = ctx.type_
+
+        # Convert an integer assigned to a decimal, as Java widens it.
+        if (targetType is not None) and (targetType.baseType() is Predefined.realType) and (
+                valueType is not None) and (valueType.baseType() is Predefined.integerType):
+            slot = self.produce(Opcode.APPLY, self.newTemp(), self.constantIndex(float), slot)
+
+        return slot
+
+    def visitExpression(self, ctx):
+        left = self.visit(ctx.simpleExpression[0])
+
+        if ctx.relOp is None:
+            return left
+
+        left = self.stable(left, ctx.simpleExpression[1:])
+        right = self.visit(ctx.simpleExpression[1])
+        return self.produce(BytecodeCompiler.RELATIONAL[ctx.relOp.getText()], self.newTemp(), left, right)
+
+    def visitSimpleExpression(self, ctx):
+        value = self.visit(ctx.term[0])
+
+        if ctx.sign is not None and ctx.sign.getText() == "-":
+            value = self.produce(Opcode.NEG, self.newTemp(), value)
+
+        for i in range(1, len(ctx.term)):
+            value = self.operation(ctx.addOp[i - 1].getText().lower(), value, ctx.term[i])
+
+        return value
+
+    def visitTerm(self, ctx):
+        value = self.visit(ctx.factor[0])
+
+        for i in range(1, len(ctx.factor)):
+            value = self.operation(ctx.mulOp[i - 1].getText().lower(), value, ctx.factor[i])
+
+        return value
+
+    # Compile a binary operation.
+    # @param op       the operator.
+    # @param left     the slot of the left operand.
+    # @param rightCtx the node of the right operand.
+    # @return the slot of the value.
+    def operation(self, op, left, rightCtx):
+        if op in ("and", "or"):
+            # Evaluate the right operand only if the left one doesn't decide.
+            value = self.newTemp()
+            self.moveTo(value, left)
+            skip = self.jump(Opcode.JUMP_IF_FALSE if op == "and" else Opcode.JUMP_IF_TRUE, value)
+            self.moveTo(value, self.visit(rightCtx))
+            self.patch([skip])
+            return value
+
+        opcode = BytecodeCompiler.ARITHMETIC.get(op)
+        if opcode is None:
+            raise NotImplementedError(f"operator {op} can't be compiled")
+
+        left = self.stable(left, [rightCtx])
+        right = self.visit(rightCtx)
+        return self.produce(opcode, self.newTemp(), left, right)
+
+    def visitVariableFactor(self, ctx):
+        return self.visit(ctx.variable)
+
+    def visitNumberFactor(self, ctx):
+        numberCtx = ctx.number
+        text = numberCtx.unsignedNumber.getText()
+        value = int(text) if numberCtx.unsignedNumber.integerConstant is not None else float(text)
+
+        if numberCtx.sign is not None and numberCtx.sign.getText() == "-":
+            value = -value
+
+        return self.constant(value)
+
+    def visitCharacterFactor(self, ctx):
+        return self.constant(ctx.getText()[1:-1])
+
+    def visitStringFactor(self, ctx):
+        return self.constant(self.stringValue(ctx.stringConstant.getText()))
+
+    # Get the value of a string constant, as javac reads the string
+    # literal the Converter makes of it.
+    # @param graspString the quoted Grasp string.
+    # @return the string.
+    def stringValue(self, graspString):
+        unquoted = graspString[1:-1].replace("''", "'")
+        return JAVA_ESCAPE.sub(lambda match: JAVA_ESCAPES[match.group(1)], unquoted)
+
+    def visitFunctionCallFactor(self, ctx):
+        return self.call(ctx.functionCallStatement)
+
+    def visitNotFactor(self, ctx):
+        return self.produce(Opcode.NOT, self.newTemp(), self.visit(ctx.factor))
+
+    def visitParenthesizedFactor(self, ctx):
+        return self.visit(ctx.expression)
+
+    # Compile a function call.
+    # @param ctx the FunctionCallStatementContext.
+    # @return the slot of the value.
+    def call(self, ctx):
+        routineId = ctx.functionName.entry
+        callee = self.routines.get(routineId)
+        if callee is None:
+            raise NotImplementedError(f"line {ctx.start.line}: {ctx.functionName.name} can't be called")
+
+        exprCtxs = [argCtx.expression for argCtx in ctx.argumentList.argument] \
+            if ctx.argumentList is not None else []
+        arguments = []
+        references = []  # (parameter slot, temporary slot, VariableContext)
+
+        # The arguments go into the parameter slots 0..n-1, as Semantics
+        # numbers the parameters before the other variables.
+        for i, (paramId, exprCtx) in enumerate(zip(routineId.getRoutineParameters(), exprCtxs)):
+            argument = self.value(exprCtx, paramId.getType())
+            arguments.append(self.stable(argument, exprCtxs[i + 1:]))
+
+            # Copy a VAR parameter back out.
+            if paramId.getKind() == Kind.REFERENCE_PARAMETER:
+                references.append((paramId.getSlotNumber(), self.newTemp(), self.loneFactor(exprCtx).variable))
+
+        result = self.newTemp()
+        copies = [slot for paramSlot, temp, varCtx in references for slot in (paramSlot, temp)]
+        position = self.emit(Opcode.CALL, result, self.constantIndex(callee), len(arguments), *arguments,
+                             len(references), *copies)
+
+        # The result can go straight into a variable unless a VAR
+        # parameter is copied back after it.
+        if not references:
+            self.lastDest = position + 1
+
+        for paramSlot, temp, varCtx in references:
+            self.store(varCtx, temp)
+
+        return result
+
+    # Variables.
+
+    # Compile the load of a variable, constant or enumeration constant
+    # without modifiers.
+    # @param entry the symbol table entry.
+    # @return the slot of the value.
+    def load(self, entry):
+        kind = entry.getKind()
+
+        if kind == Kind.CONSTANT:
+            return self.constant(entry.getValue())
+        elif kind == Kind.ENUMERATION_CONSTANT:
+            type_ = entry.getType()
+            if type_ is Predefined.booleanType:
+                return self.constant(bool(entry.getValue()))
+            return self.constant(type_.getEnumerationConstants().index(entry))
+
+        slot = entry.getSlotNumber()
+        if slot is None:
+            raise NotImplementedError(f"{entry.getName()} can't be used as a variable")
+
+        level = entry.getSymTable().getNestingLevel()
+        if level == self.level:
+            return slot
+        elif level == 1:
+            return self.produce(Opcode.LOAD_GLOBAL, self.newTemp(), slot)
+        return self.produce(Opcode.LOAD_OUTER, self.newTemp(), level, slot)
+
+    def visitVariable(self, ctx):
+        value = self.load(ctx.entry)
+        for modCtx in ctx.modifier:
+            value = self.select(value, modCtx)
+        return value
+
+    # Compile the loads of the array elements or the record field a
+    # modifier selects.
+    # @param container the slot of the array or record.
+    # @param modCtx    the ModifierContext.
+    # @return the slot of the value.
+    def select(self, container, modCtx):
+        if modCtx.indexList is None:
+            return self.produce(Opcode.FIELD, self.newTemp(), container, modCtx.field.entry.getSlotNumber())
+
+        for indexCtx in modCtx.indexList.index:
+            container = self.stable(container, [indexCtx.expression])
+            container = self.produce(self.indexOpcode(indexCtx), self.newTemp(), container,
+                                     self.visit(indexCtx.expression))
+        return container
+
+    # Get the opcode of the load of an array element.
+    # @param indexCtx the IndexContext of the subscript.
+    # @return ELEMENT if the subscript is known to be in bounds, else INDEX.
+    def indexOpcode(self, indexCtx):
+        return Opcode.ELEMENT if indexCtx.inBounds else Opcode.INDEX
+
+    # Compile the store into a variable, array element or record field.
+    # @param ctx  the VariableContext.
+    # @param slot the slot of the value.
+    def store(self, ctx, slot):
+        entry = ctx.entry
+
+        if not ctx.modifier:
+            level = entry.getSymTable().getNestingLevel()
+            if level == self.level:
+                self.moveTo(entry.getSlotNumber(), slot)
+            elif level == 1:
+                self.emit(Opcode.STORE_GLOBAL, entry.getSlotNumber(), slot)
+            else:
+                self.emit(Opcode.STORE_OUTER, level, entry.getSlotNumber(), slot)
+            return
+
+        slot = self.stable(slot, [ctx])
+        container = self.load(entry)
+        for modCtx in ctx.modifier[:-1]:
+            container = self.select(container, modCtx)
+
+        modCtx = ctx.modifier[-1]
+        if modCtx.indexList is None:
+            self.emit(Opcode.STORE_FIELD, container, modCtx.field.entry.getSlotNumber(), slot)
+            return
+
+        indexCtxs = modCtx.indexList.index
+        for indexCtx in indexCtxs[:-1]:
+            container = self.stable(container, [indexCtx.expression])
+            container = self.produce(self.indexOpcode(indexCtx), self.newTemp(), container,
+                                     self.visit(indexCtx.expression))
+
+        container = self.stable(container, [indexCtxs[-1].expression])
+        opcode = Opcode.STORE_ELEMENT if indexCtxs[-1].inBounds else Opcode.STORE_INDEX
+        self.emit(opcode, container, self.visit(indexCtxs[-1].expression), slot)
@@ -0,0 +1,125 @@
+# <h1>CodeObject</h1>
+# <p>The bytecode of the program or a routine, for the COMPILER backend's
+# VM. The instructions are packed into an array of ints. A frame is a
+# list with a fixed number of slots: first the variables and parameters,
+# numbered by their symbol table slot numbers, then the temporaries of
+# expressions, then the constants of the routine. The template holds the
+# initial value of every slot, so creating a frame is copying it and
+# allocating the arrays and records.</p>
+# <p>The VM loads a CodeObject by decoding the code into a list of
+# instructions, each a tuple of the opcode and its operands, with jump
+# targets that are list indexes and constants in place of the operands
+# k. Unpacking a tuple is much faster in CPython than indexing the array
+# for each operand. A call is decoded into
+# (CALL, d, routine, gather, parameters, copies): gather(frame) gets the
+# arguments to assign to the parameters slice of the routine's frame, and
+# copies is a tuple of the (p, d) pairs of VAR parameters.</p>
+from array import array
+from operator import itemgetter
+
+from edu.yu.compilers.backend.vm import Opcode
+
+
+class CodeObject:
+    __slots__ = ("name", "level", "code", "constants", "template", "allocators", "resultSlot", "instructions")
+
+    # Constructor.
+    # @param name  the name of the program or routine.
+    # @param level the nesting level of its symbol table.
+    def __init__(self, name, level):
+        self.name = name
+        self.level = level
+        self.code = array("i")
+        self.constants = []  # the operands k refer to
+        self.template = []  # initial values of the frame slots
+        self.allocators = ()  # (slot, function) for each array and record slot
+        self.resultSlot = None  # slot of a function's return value
+        self.instructions = None  # the decoded instructions, None until loaded
+
+    # Decode the instructions of this CodeObject and the ones it calls.
+    def load(self):
+        if self.instructions is not None:
+            return
+
+        code = self.code
+        starts = []
+        pc = 0
+        while pc < len(code):
+            starts.append(pc)
+            pc = self.instructionEnd(pc)
+        indexes = {start: index for index, start in enumerate(starts)}
+        starts.append(len(code))
+
+        self.instructions = []
+        for index in range(len(starts) - 1):
+            instruction = code[starts[index]:starts[index + 1]].tolist()
+            for i, kind in enumerate(Opcode.OPERANDS[instruction[0]][1], 1):
+                if kind == "t":
+                    instruction[i] = indexes[instruction[i]]
+                elif kind == "k":
+                    instruction[i] = self.constants[instruction[i]]
+            if instruction[0] == Opcode.CALL:
+                instruction = self.decodeCall(instruction)
+            self.instructions.append(tuple(instruction))
+
+        for constant in self.constants:
+            if isinstance(constant, CodeObject):
+                constant.load()
+
+    # Decode a call.
+    # @param instruction the opcode and operands.
+    # @return the decoded instruction.
+    def decodeCall(self, instruction):
+        op, dest, routine, count = instruction[:4]
+        arguments = instruction[4:4 + count]
+        copies = instruction[5 + count:]
+
+        # A getter of several items returns a tuple of them, and a getter
+        # of a slice a list.
+        if count > 1:
+            gather = itemgetter(*arguments)
+        elif count == 1:
+            gather = itemgetter(slice(arguments[0], arguments[0] + 1))
+        else:
+            gather = itemgetter(slice(0, 0))
+
+        return op, dest, routine, gather, slice(0, count), tuple(zip(copies[0::2], copies[1::2]))
+
+    # Find the end of an instruction.
+    # @param pc the code position of the instruction.
+    # @return the code position of the next one.
+    def instructionEnd(self, pc):
+        code = self.code
+        end = pc + 1 + len(Opcode.OPERANDS[code[pc]][1])
+
+        # The variable-length operands of calls and prints.
+        if code[pc] == Opcode.CALL:
+            end += code[end - 1]
+            end += 1 + 2 * code[end]
+        elif code[pc] == Opcode.PRINT:
+            end += code[end - 1]
+
+        return end
+
+    # Create a frame with freshly allocated arrays and records.
+    # @return the frame.
+    def newFrame(self):
+        frame = self.template.copy()
+        for slot, allocate in self.allocators:
+            frame[slot] = allocate()
+        return frame
+
+    # List the instructions, one per line.
+    # @return the listing.
+    def disassemble(self):
+        code = self.code
+        lines = [f"{self.name}: level {self.level}, {len(self.template)} slots"]
+        pc = 0
+
+        while pc < len(code):
+            name = Opcode.OPERANDS[code[pc]][0]
+            end = self.instructionEnd(pc)
+            lines.append(f"{pc:6}  {name:<16}" + " ".join(str(operand) for operand in code[pc + 1:end]))
+            pc = end
+
+        return "\n".join(lines)
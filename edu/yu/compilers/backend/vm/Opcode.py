@@ -0,0 +1,82 @@
+# <h1>Opcode</h1>
+# <p>The instructions of the COMPILER backend's VM. An instruction is its
+# opcode followed by its operands, all ints in the code array of a
+# CodeObject. The VM is a register machine: the values an instruction
+# reads and the value it computes are in slots of the current frame, so
+# i = i + 1 is the one instruction ADD i i c, where the slot c holds the
+# constant 1. The operands are:</p>
+# <ul>
+# <li>d, a, b, c: frame slots, written (d) or read (a, b, c).</li>
+# <li>t: a jump target, the code position of an instruction.</li>
+# <li>k: an index into the CodeObject's constants (the routines called,
+#     print formats, readers and conversion functions).</li>
+# <li>s: the slot of a variable in another frame, l: the nesting level of
+#     that frame, f: the slot of a field in a record.</li>
+# <li>n, r: a count of the operands that follow.</li>
+# </ul>
+# <p>The opcodes are numbered in the order the VM tests for them, the
+# most frequently executed first.</p>
+
+ADD = 0  # d a b      f[d] = f[a] + f[b]
+MOVE = 1  # d a       f[d] = f[a]
+JUMP_IF_LT = 2  # a b t     if f[a] < f[b]: jump to t
+INDEX = 3  # d a b     f[d] = f[a][f[b]]
+STORE_INDEX = 4  # a b c     f[a][f[b]] = f[c]
+ELEMENT = 5  # d a b    f[d] = f[a][f[b]], with f[b] known to be in bounds
+STORE_ELEMENT = 6  # a b c    f[a][f[b]] = f[c], with f[b] known to be in bounds
+CALL = 7  # d k n a1..an r p1 d1..pr dr    see CodeObject
+RETURN = 8
+SUB = 9  # d a b
+MUL = 10  # d a b
+DIV = 11  # d a b      integer division, truncated
+MOD = 12  # d a b     integer remainder, with the sign of f[a]
+JUMP_UNLESS_LT = 13  # a b t    unless f[a] < f[b]: jump to t
+JUMP = 14  # t
+LOAD_GLOBAL = 15  # d s     f[d] = global frame[s]
+STORE_GLOBAL = 16  # s a    global frame[s] = f[a]
+JUMP_IF_FALSE = 17  # a t
+JUMP_IF_TRUE = 18  # a t
+JUMP_IF_LE = 19  # a b t
+JUMP_IF_GT = 20  # a b t
+JUMP_IF_GE = 21  # a b t
+JUMP_IF_EQ = 22  # a b t
+JUMP_IF_NE = 23  # a b t
+JUMP_UNLESS_LE = 24  # a b t
+JUMP_UNLESS_GT = 25  # a b t
+JUMP_UNLESS_GE = 26  # a b t
+JUMP_UNLESS_EQ = 27  # a b t
+JUMP_UNLESS_NE = 28  # a b t
+LT = 29  # d a b      f[d] = f[a] < f[b]
+LE = 30  # d a b
+GT = 31  # d a b
+GE = 32  # d a b
+EQ = 33  # d a b
+NE = 34  # d a b
+NEG = 35  # d a       f[d] = -f[a]
+NOT = 36  # d a       f[d] = not f[a]
+DIVIDE = 37  # d a b   decimal division
+FIELD = 38  # d a f    f[d] = f[a][f]
+STORE_FIELD = 39  # a f b   f[a][f] = f[b]
+LOAD_OUTER = 40  # d l s    f[d] = display[l][s]
+STORE_OUTER = 41  # l s a   display[l][s] = f[a]
+APPLY = 42  # d k a     f[d] = constants[k](f[a])
+PRINT = 43  # k n a1..an    print constants[k] % (f[a1], ..., f[an])
+READ = 44  # d k        f[d] = constants[k](standard input)
+READ_LINE = 45  # skip the rest of the input line
+
+# The name and the fixed operands of each opcode, for CodeObject.
+OPERANDS = (
+    ("ADD", "dab"), ("MOVE", "da"), ("JUMP_IF_LT", "abt"), ("INDEX", "dab"), ("STORE_INDEX", "abc"),
+    ("ELEMENT", "dab"), ("STORE_ELEMENT", "abc"),
+    ("CALL", "dkn"), ("RETURN", ""), ("SUB", "dab"), ("MUL", "dab"), ("DIV", "dab"), ("MOD", "dab"),
+    ("JUMP_UNLESS_LT", "abt"), ("JUMP", "t"), ("LOAD_GLOBAL", "ds"), ("STORE_GLOBAL", "sa"),
+    ("JUMP_IF_FALSE", "at"), ("JUMP_IF_TRUE", "at"),
+    ("JUMP_IF_LE", "abt"), ("JUMP_IF_GT", "abt"), ("JUMP_IF_GE", "abt"), ("JUMP_IF_EQ", "abt"),
+    ("JUMP_IF_NE", "abt"),
+    ("JUMP_UNLESS_LE", "abt"), ("JUMP_UNLESS_GT", "abt"), ("JUMP_UNLESS_GE", "abt"),
+    ("JUMP_UNLESS_EQ", "abt"), ("JUMP_UNLESS_NE", "abt"),
+    ("LT", "dab"), ("LE", "dab"), ("GT", "dab"), ("GE", "dab"), ("EQ", "dab"), ("NE", "dab"),
+    ("NEG", "da"), ("NOT", "da"), ("DIVIDE", "dab"), ("FIELD", "daf"), ("STORE_FIELD", "afb"),
+    ("LOAD_OUTER", "dls"), ("STORE_OUTER", "lsa"), ("APPLY", "dka"), ("PRINT", "kn"),
+    ("READ", "dk"), ("READ_LINE", ""),
+)
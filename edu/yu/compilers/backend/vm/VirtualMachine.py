@@ -0,0 +1,255 @@
+# <h1>VirtualMachine</h1>
+# <p>Runs the CodeObjects of the COMPILER backend. One dispatch loop
+# executes the program and every routine it calls: a call pushes the
+# caller's state on a list and switches to the callee's code and a new
+# fixed-size frame, a return pops it, so running a routine costs no Python
+# call. Values are represented as by the EXECUTOR backend.</p>
+# <p>The display holds the frame of the active routine at each nesting
+# level, the global frame at level 1. A VAR parameter is copied in and
+# copied back out when the call returns.</p>
+import sys
+
+from edu.yu.compilers.backend.executor.Executor import StandardInput, divide, indexError, realDivide, remainder
+from edu.yu.compilers.backend.vm.Opcode import (
+    ADD, MOVE, JUMP_IF_LT, INDEX, STORE_INDEX, ELEMENT, STORE_ELEMENT, CALL, RETURN, SUB, MUL, DIV, MOD,
+    JUMP_UNLESS_LT, JUMP, LOAD_GLOBAL, STORE_GLOBAL, JUMP_IF_FALSE, JUMP_IF_TRUE, JUMP_IF_LE, JUMP_IF_GT,
+    JUMP_IF_GE, JUMP_IF_EQ, JUMP_IF_NE, JUMP_UNLESS_LE, JUMP_UNLESS_GT, JUMP_UNLESS_GE, JUMP_UNLESS_EQ,
+    JUMP_UNLESS_NE, LT, LE, GT, GE, EQ, NE, NEG, NOT, DIVIDE, FIELD, STORE_FIELD, LOAD_OUTER, STORE_OUTER,
+    APPLY, PRINT, READ, READ_LINE)
+
+
+class VirtualMachine:
+    MAX_CALL_DEPTH = 10000
+
+    # Constructor.
+    # @param name       the name of the program.
+    # @param program    the program's CodeObject.
+    # @param levelCount the deepest nesting level of its routines.
+    def __init__(self, name, program, levelCount):
+        self.name = name
+        self.program = program
+        self.program.load()
+        self.display = [None] * (levelCount + 1)
+        self.input = None
+        self.output = None
+
+    # Run the program.
+    # @param inputFile  the text stream to read from (default sys.stdin).
+    # @param outputFile the text stream to print to (default sys.stdout).
+    def run(self, inputFile=None, outputFile=None):
+        self.input = StandardInput(inputFile if inputFile is not None else sys.stdin)
+        self.output = outputFile if outputFile is not None else sys.stdout
+
+        display = self.display
+        for level in range(len(display)):
+            display[level] = None
+        display[1] = self.program.newFrame()
+
+        self.execute(self.program, display[1])
+
+    # Execute a routine until it returns from its outermost call.
+    # @param routine the loaded CodeObject.
+    # @param f       its frame.
+    def execute(self, routine, f):
+        display = self.display
+        g = display[1]
+        input = self.input
+        write = self.output.write
+        calls = []  # (routine, frame, CALL instruction, return index, saved display entry) of each caller
+        maxDepth = VirtualMachine.MAX_CALL_DEPTH
+        code = routine.instructions
+        pc = 0
+
+        while True:
+            instruction = code[pc]
+            op = instruction[0]
+            pc += 1
+
+            if op == ADD:
+                _, d, a, b = instruction
+                f[d] = f[a] + f[b]
+            elif op == MOVE:
+                _, d, a = instruction
+                f[d] = f[a]
+            elif op == JUMP_IF_LT:
+                _, a, b, t = instruction
+                if f[a] < f[b]:
+                    pc = t
+            elif op == INDEX:
+                _, d, a, b = instruction
+                index = f[b]
+                if index < 0:
+                    indexError(index, f[a])
+                f[d] = f[a][index]
+            elif op == STORE_INDEX:
+                _, a, b, c = instruction
+                index = f[b]
+                if index < 0:
+                    indexError(index, f[a])
+                f[a][index] = f[c]
+            elif op == ELEMENT:
+                _, d, a, b = instruction
+                f[d] = f[a][f[b]]
+            elif op == STORE_ELEMENT:
+                _, a, b, c = instruction
+                f[a][f[b]] = f[c]
+            elif op == CALL:
+                # Call the routine with the arguments in its parameter
+                # slots, which Semantics numbers 0..n-1.
+                _, d, callee, gather, parameters, copies = instruction
+                frame = callee.template.copy()
+                if callee.allocators:
+                    for slot, allocate in callee.allocators:
+                        frame[slot] = allocate()
+                frame[parameters] = gather(f)
+
+                if len(calls) >= maxDepth:
+                    raise RecursionError("maximum call depth exceeded")
+                level = callee.level
+                calls.append((routine, f, instruction, pc, display[level]))
+                display[level] = frame
+
+                routine = callee
+                code = callee.instructions
+                f = frame
+                pc = 0
+            elif op == RETURN:
+                if not calls:
+                    return
+
+                # Put the result into d and copy each VAR parameter p into d.
+                frame = f
+                level = routine.level
+                resultSlot = routine.resultSlot
+                routine, f, instruction, pc, display[level] = calls.pop()
+                code = routine.instructions
+
+                f[instruction[1]] = frame[resultSlot]
+                if instruction[5]:
+                    for p, d in instruction[5]:
+                        f[d] = frame[p]
+            elif op == SUB:
+                _, d, a, b = instruction
+                f[d] = f[a] - f[b]
+            elif op == MUL:
+                _, d, a, b = instruction
+                f[d] = f[a] * f[b]
+            elif op == DIV:
+                _, d, a, b = instruction
+                dividend = f[a]
+                divisor = f[b]
+                f[d] = dividend // divisor if (dividend >= 0) and (divisor > 0) else divide(dividend, divisor)
+            elif op == MOD:
+                _, d, a, b = instruction
+                dividend = f[a]
+                divisor = f[b]
+                f[d] = dividend % divisor if (dividend >= 0) and (divisor > 0) else remainder(dividend, divisor)
+            elif op == JUMP_UNLESS_LT:
+                _, a, b, t = instruction
+                if not f[a] < f[b]:
+                    pc = t
+            elif op == JUMP:
+                pc = instruction[1]
+            elif op == LOAD_GLOBAL:
+                _, d, s = instruction
+                f[d] = g[s]
+            elif op == STORE_GLOBAL:
+                _, s, a = instruction
+                g[s] = f[a]
+            elif op == JUMP_IF_FALSE:
+                if not f[instruction[1]]:
+                    pc = instruction[2]
+            elif op == JUMP_IF_TRUE:
+                if f[instruction[1]]:
+                    pc = instruction[2]
+            elif op == JUMP_IF_LE:
+                _, a, b, t = instruction
+                if f[a] <= f[b]:
+                    pc = t
+            elif op == JUMP_IF_GT:
+                _, a, b, t = instruction
+                if f[a] > f[b]:
+                    pc = t
+            elif op == JUMP_IF_GE:
+                _, a, b, t = instruction
+                if f[a] >= f[b]:
+                    pc = t
+            elif op == JUMP_IF_EQ:
+                _, a, b, t = instruction
+                if f[a] == f[b]:
+                    pc = t
+            elif op == JUMP_IF_NE:
+                _, a, b, t = instruction
+                if f[a] != f[b]:
+                    pc = t
+            elif op == JUMP_UNLESS_LE:
+                _, a, b, t = instruction
+                if not f[a] <= f[b]:
+                    pc = t
+            elif op == JUMP_UNLESS_GT:
+                _, a, b, t = instruction
+                if not f[a] > f[b]:
+                    pc = t
+            elif op == JUMP_UNLESS_GE:
+                _, a, b, t = instruction
+                if not f[a] >= f[b]:
+                    pc = t
+            elif op == JUMP_UNLESS_EQ:
+                _, a, b, t = instruction
+                if not f[a] == f[b]:
+                    pc = t
+            elif op == JUMP_UNLESS_NE:
+                _, a, b, t = instruction
+                if not f[a] != f[b]:
+                    pc = t
+            elif op == LT:
+                _, d, a, b = instruction
+                f[d] = f[a] < f[b]
+            elif op == LE:
+                _, d, a, b = instruction
+                f[d] = f[a] <= f[b]
+            elif op == GT:
+                _, d, a, b = instruction
+                f[d] = f[a] > f[b]
+            elif op == GE:
+                _, d, a, b = instruction
+                f[d] = f[a] >= f[b]
+            elif op == EQ:
+                _, d, a, b = instruction
+                f[d] = f[a] == f[b]
+            elif op == NE:
+                _, d, a, b = instruction
+                f[d] = f[a] != f[b]
+            elif op == NEG:
+                _, d, a = instruction
+                f[d] = -f[a]
+            elif op == NOT:
+                _, d, a = instruction
+                f[d] = not f[a]
+            elif op == DIVIDE:
+                _, d, a, b = instruction
+                f[d] = realDivide(f[a], f[b])
+            elif op == FIELD:
+                _, d, a, field = instruction
+                f[d] = f[a][field]
+            elif op == STORE_FIELD:
+                _, a, field, b = instruction
+                f[a][field] = f[b]
+            elif op == LOAD_OUTER:
+                _, d, level, s = instruction
+                f[d] = display[level][s]
+            elif op == STORE_OUTER:
+                _, level, s, a = instruction
+                display[level][s] = f[a]
+            elif op == APPLY:
+                _, d, function, a = instruction
+                f[d] = function(f[a])
+            elif op == PRINT:
+                write(instruction[1] % tuple([f[slot] for slot in instruction[3:]]))
+            elif op == READ:
+                _, d, reader = instruction
+                f[d] = reader(input)
+            elif op == READ_LINE:
+                input.nextLine()
+            else:
+                raise NotImplementedError(f"{routine.name}: invalid opcode {op} at {pc - 1}")
@@ -0,0 +1,204 @@
+# <h1>BatchCompiler</h1>
+# <p>Compile many source files with warm GraspCompilers, either serially
+# in this process or fanned out over a pool of worker processes, then
+# report per-file results and overall throughput.</p>
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from edu.yu.compilers.driver.CompileCache import CompileCache
+from edu.yu.compilers.driver.GraspCompiler import GraspCompiler
+from edu.yu.compilers.driver.ParseStatistics import ParseStatistics
+from edu.yu.compilers.intermediate.util.BackendMode import BackendMode
+
+# The warm compiler of a worker process.
+workerCompiler = None
+
+
+# Worker process initializer: load the lexer and parser once per worker.
+# @param mode          the backend mode.
+# @param cacheDir      the compile cache directory, or None.
+# @param cacheMaxBytes the compile cache size limit.
+# @param astImageDir   the AstImage directory, or None.
+# @param fastParse     true for the two-stage SLL/LL parse.
+# @param fastLex       true to lex with GraspScanner.
+# @param antlrParser   true to parse with GraspParser only.
+def initWorker(mode, cacheDir, cacheMaxBytes, astImageDir, fastParse, fastLex, antlrParser):
+    global workerCompiler
+    cache = CompileCache(cacheDir, cacheMaxBytes) if cacheDir is not None else None
+    workerCompiler = GraspCompiler(mode, cache, astImageDir, fastParse, fastLex, antlrParser)
+
+
+# Compile one source file in a worker process.
+# @param sourceName the source file name.
+# @return the CompileResult.
+def compileInWorker(sourceName):
+    try:
+        return workerCompiler.compileFile(sourceName)
+    except OSError as ex:
+        return GraspCompiler.failedResult(sourceName, ex)
+
+
+class BatchCompiler:
+    SOURCE_SUFFIXES = (".grasp", ".pgm")
+
+    # Constructor.
+    # @param outputDir the directory to write Java files into.
+    # @param mode      the backend mode.
+    # @param jobs      the number of worker processes, 1 to compile
+    #                  in this process.
+    # @param cacheDir  the compile cache directory, or None for no cache.
+    # @param cacheMaxBytes the compile cache size limit.
+    # @param astImageDir the directory to write AstImages into, or None.
+    # @param fastParse true for the two-stage SLL/LL parse.
+    # @param fastLex   true to lex with GraspScanner.
+    # @param antlrParser true to parse with GraspParser only.
+    def __init__(self, outputDir=".", mode=BackendMode.CONVERTER, jobs=1,
+                 cacheDir=None, cacheMaxBytes=CompileCache.DEFAULT_MAX_BYTES, astImageDir=None,
+                 fastParse=False, fastLex=False, antlrParser=False):
+        self.outputDir = outputDir
+        self.mode = mode
+        self.jobs = jobs
+        self.cacheDir = cacheDir
+        self.cacheMaxBytes = cacheMaxBytes
+        self.astImageDir = astImageDir
+        self.fastParse = fastParse
+        self.fastLex = fastLex
+        self.antlrParser = antlrParser
+        self.compiler = None
+
+    # Expand a list of files and directories into source file names.
+    # Directories are searched recursively for .grasp and .pgm files;
+    # files named explicitly are always kept.
+    # @param paths the files and directories.
+    # @return the source file names, in a stable order.
+    @staticmethod
+    def collectSources(paths):
+        sourceNames = []
+
+        for path in paths:
+            if os.path.isdir(path):
+                found = []
+                for dirPath, dirNames, fileNames in os.walk(path):
+                    dirNames.sort()
+                    for fileName in fileNames:
+                        if fileName.endswith(BatchCompiler.SOURCE_SUFFIXES):
+                            found.append(os.path.join(dirPath, fileName))
+                sourceNames.extend(sorted(found))
+            else:
+                sourceNames.append(path)
+
+        return sourceNames
+
+    # Compile each source file, serially or with the worker pool.
+    # @param sourceNames the source file names.
+    # @return a generator of CompileResults, in the order of sourceNames.
+    def compileAll(self, sourceNames):
+        if self.jobs > 1 and len(sourceNames) > 1:
+            return self.compileParallel(sourceNames)
+        else:
+            return self.compileSerial(sourceNames)
+
+    # Compile each source file with the same warm compiler.
+    # @param sourceNames the source file names.
+    # @return a generator of CompileResults, in the order of sourceNames.
+    def compileSerial(self, sourceNames):
+        if self.compiler is None:
+            cache = CompileCache(self.cacheDir, self.cacheMaxBytes) if self.cacheDir is not None else None
+            self.compiler = GraspCompiler(self.mode, cache, self.astImageDir, self.fastParse, self.fastLex,
+                                          self.antlrParser)
+
+        for sourceName in sourceNames:
+            try:
+                result = self.compiler.compileFile(sourceName)
+            except OSError as ex:
+                result = GraspCompiler.failedResult(sourceName, ex)
+            yield result
+
+    # Compile the source files on a pool of worker processes, each of which
+    # keeps its own warm compiler. Results (including the captured error
+    # listings) come back in the order of sourceNames whatever order the
+    # workers finish in, so the report is the same as a serial run.
+    # @param sourceNames the source file names.
+    # @return a generator of CompileResults, in the order of sourceNames.
+    def compileParallel(self, sourceNames):
+        jobs = min(self.jobs, len(sourceNames))
+        chunkSize = max(1, len(sourceNames) // (jobs * 4))
+
+        with ProcessPoolExecutor(max_workers=jobs, initializer=initWorker,
+                                 initargs=(self.mode, self.cacheDir, self.cacheMaxBytes, self.astImageDir,
+                                           self.fastParse, self.fastLex, self.antlrParser)) as pool:
+            yield from pool.map(compileInWorker, sourceNames, chunksize=chunkSize)
+
+    # Write the generated Java of a successful compilation.
+    # @param result the CompileResult.
+    # @return the Java file path, or None if nothing was written.
+    def writeObjectFile(self, result):
+        if not result.succeeded():
+            return None
+
+        javaPath = os.path.join(self.outputDir, GraspCompiler.javaFileName(result.sourceName))
+        with open(javaPath, "w") as javaFile:
+            javaFile.write(result.objectCode)
+
+        return javaPath
+
+    # Compile, write and report on a list of files and directories.
+    # @param paths the files and directories.
+    # @return the number of files that did not compile.
+    def run(self, paths):
+        sourceNames = self.collectSources(paths)
+        results = self.compileAll(sourceNames)
+
+        os.makedirs(self.outputDir, exist_ok=True)
+        if self.astImageDir is not None:
+            os.makedirs(self.astImageDir, exist_ok=True)
+        start = time.perf_counter()
+        fileCount = 0
+        lineCount = 0
+        badCount = 0
+        cachedCount = 0
+        parseStatistics = ParseStatistics()
+
+        for result in results:
+            if result.diagnostics:
+                print(result.diagnostics, end="")
+            if self.writeObjectFile(result) is None:
+                badCount += 1
+
+            fileCount += 1
+            lineCount += result.lineCount
+            if result.cached:
+                cachedCount += 1
+            parseStatistics.add(result)
+            print("{:<50} {:>9.1f} ms  {}".format(result.sourceName, result.elapsed * 1000, result.getStatus()))
+
+        self.printSummary(fileCount, badCount, lineCount, time.perf_counter() - start)
+        if self.cacheDir is not None:
+            self.printCacheSummary(cachedCount, fileCount - cachedCount)
+        if self.fastParse:
+            print(parseStatistics.getStatistics())
+
+        return badCount
+
+    @staticmethod
+    def printSummary(fileCount, badCount, lineCount, elapsed):
+        filesPerSecond = fileCount / elapsed if elapsed > 0 else 0.0
+        linesPerSecond = lineCount / elapsed if elapsed > 0 else 0.0
+
+        print()
+        print(f"{fileCount} files compiled, {fileCount - badCount} ok, {badCount} not created.")
+        print(f"{lineCount} source lines in {elapsed:.2f} seconds "
+              f"({filesPerSecond:.1f} files/s, {linesPerSecond:.0f} lines/s).")
+
+    # Print the cache statistics of the batch. The hits and misses are
+    # counted from the results because workers keep their own statistics;
+    # the cache is trimmed to its limit here, after all workers are done.
+    def printCacheSummary(self, hits, misses):
+        cache = CompileCache(self.cacheDir, self.cacheMaxBytes)
+        if cache.totalBytes > cache.maxBytes:
+            cache.evict()
+
+        cache.hits = hits
+        cache.misses = misses
+        print(cache.getStatistics())
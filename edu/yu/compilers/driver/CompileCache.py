@@ -0,0 +1,168 @@
+# <h1>CompileCache</h1>
+# <p>An on-disk cache of compilation results. An entry is keyed by the
+# SHA-256 of the source text together with a fingerprint of the compiler
+# itself (grammar, generated parser and compiler sources) and the backend
+# mode, so editing the compiler invalidates every entry at once.</p>
+# <p>Each entry is one JSON file written atomically, so several worker
+# processes can share a cache directory. The cache is bounded in bytes
+# and evicts the least recently used entries; a hit refreshes the entry's
+# modification time.</p>
+import glob
+import hashlib
+import json
+import os
+import tempfile
+
+from edu.yu.compilers.driver.GraspCompiler import CompileResult
+
+
+class CompileCache:
+    ENTRY_SUFFIX = ".json"
+    DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+    fingerprint = None  # computed once per process
+
+    # Constructor.
+    # @param directory the cache directory, created if necessary.
+    # @param maxBytes  the size limit of all the entries together.
+    def __init__(self, directory, maxBytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.maxBytes = maxBytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        os.makedirs(directory, exist_ok=True)
+
+        # Sizes and last use times of the entries, read once.
+        self.entries = {}
+        for entry in os.scandir(directory):
+            if entry.name.endswith(CompileCache.ENTRY_SUFFIX):
+                info = entry.stat()
+                self.entries[entry.path] = (info.st_size, info.st_mtime)
+        self.totalBytes = sum(size for size, mtime in self.entries.values())
+
+    # Compute the fingerprint of the compiler: a digest of every file whose
+    # change could change the output.
+    # @return the hex digest.
+    @staticmethod
+    def compilerFingerprint():
+        if CompileCache.fingerprint is None:
+            root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(
+                os.path.dirname(os.path.abspath(__file__))))))
+            paths = [os.path.join(root, "antlr", "Grasp.g4")]
+            paths += glob.glob(os.path.join(root, "gen", "*.py"))
+            paths += glob.glob(os.path.join(root, "edu", "**", "*.py"), recursive=True)
+
+            digest = hashlib.sha256()
+            for path in sorted(paths):
+                digest.update(os.path.relpath(path, root).encode("utf-8"))
+                with open(path, 'rb') as file:
+                    digest.update(file.read())
+            CompileCache.fingerprint = digest.hexdigest()
+
+        return CompileCache.fingerprint
+
+    # Compute the cache key of a source.
+    # @param source the source text.
+    # @param mode   the backend mode.
+    # @return the key.
+    @staticmethod
+    def key(source, mode):
+        digest = hashlib.sha256()
+        digest.update(CompileCache.compilerFingerprint().encode("ascii"))
+        digest.update(mode.name.encode("ascii"))
+        digest.update(source.encode("utf-8"))
+        return digest.hexdigest()
+
+    def entryPath(self, key):
+        return os.path.join(self.directory, key + CompileCache.ENTRY_SUFFIX)
+
+    # Look up the result of an earlier compilation.
+    # @param key        the cache key.
+    # @param sourceName the name to report the source under.
+    # @return a CompileResult marked as cached, or None on a miss.
+    def lookup(self, key, sourceName):
+        path = self.entryPath(key)
+        try:
+            with open(path, 'r', encoding="utf-8") as file:
+                data = json.load(file)
+            os.utime(path)
+        except (OSError, ValueError):
+            # Missing, evicted by another process, or half written.
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        if path in self.entries:
+            self.entries[path] = (self.entries[path][0], os.path.getmtime(path))
+
+        result = CompileResult(sourceName)
+        result.objectCode = data["objectCode"]
+        result.diagnostics = data["diagnostics"]
+        result.syntaxErrorCount = data["syntaxErrors"]
+        result.semanticErrorCount = data["semanticErrors"]
+        result.lineCount = data["lines"]
+        result.cached = True
+
+        return result
+
+    # Store the result of a compilation. Failed compilations (a crashing
+    # pass) are not stored.
+    # @param key    the cache key.
+    # @param result the CompileResult.
+    def store(self, key, result):
+        if result.failure is not None:
+            return
+
+        data = json.dumps({
+            "objectCode": result.objectCode,
+            "diagnostics": result.diagnostics,
+            "syntaxErrors": result.syntaxErrorCount,
+            "semanticErrors": result.semanticErrorCount,
+            "lines": result.lineCount,
+        }).encode("utf-8")
+
+        path = self.entryPath(key)
+        fd, tempPath = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                file.write(data)
+            os.replace(tempPath, path)
+        except OSError:
+            if os.path.exists(tempPath):
+                os.unlink(tempPath)
+            return
+
+        previous = self.entries.get(path)
+        if previous is not None:
+            self.totalBytes -= previous[0]
+        self.entries[path] = (len(data), os.path.getmtime(path))
+        self.totalBytes += len(data)
+
+        if self.totalBytes > self.maxBytes:
+            self.evict()
+
+    # Remove least recently used entries until the cache is within its limit.
+    def evict(self):
+        for path in sorted(self.entries, key=lambda p: self.entries[p][1]):
+            if self.totalBytes <= self.maxBytes:
+                break
+
+            size = self.entries.pop(path)[0]
+            self.totalBytes -= size
+            self.evictions += 1
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+    # Get the hit and miss statistics.
+    # @return the statistics text.
+    def getStatistics(self):
+        lookups = self.hits + self.misses
+        hitRate = 100.0 * self.hits / lookups if lookups > 0 else 0.0
+
+        return (f"cache: {self.hits} hits, {self.misses} misses ({hitRate:.1f}% hit rate), "
+                f"{self.evictions} evicted, {len(self.entries)} entries, "
+                f"{self.totalBytes / 1024:.0f} KiB of {self.maxBytes / 1024:.0f} KiB")
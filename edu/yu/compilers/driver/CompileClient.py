@@ -0,0 +1,78 @@
+# <h1>CompileClient</h1>
+# <p>Submit Grasp source to a running grasp-compiled daemon and get back
+# the generated Java and the error listings.</p>
+# <p>This module deliberately imports nothing from the compiler itself, so
+# a client starts without loading ANTLR or the generated parser.</p>
+# <p>Protocol: one JSON object per line in each direction. A request is
+# {"name": ..., "source": ...}; the response is
+# {"name", "objectCode", "diagnostics", "syntaxErrors", "semanticErrors",
+# "failure", "elapsed"}, with objectCode None when no Java was created.</p>
+import json
+import os
+import socket
+import sys
+import tempfile
+
+DEFAULT_SOCKET_PATH = os.path.join(tempfile.gettempdir(), "grasp-compiled.sock")
+
+
+class CompileClient:
+
+    # Constructor. Connects to the daemon.
+    # @param socketPath the daemon's Unix socket.
+    def __init__(self, socketPath=DEFAULT_SOCKET_PATH):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(socketPath)
+        self.reader = self.sock.makefile("r", encoding="utf-8")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.close()
+
+    def close(self):
+        self.reader.close()
+        self.sock.close()
+
+    # Compile source text. The connection stays open for further requests.
+    # @param sourceName the name to report the source under.
+    # @param source     the source text.
+    # @return the response dictionary.
+    def compile(self, sourceName, source):
+        request = json.dumps({"name": sourceName, "source": source}) + "\n"
+        self.sock.sendall(request.encode("utf-8"))
+
+        response = self.reader.readline()
+        if not response:
+            raise ConnectionError("grasp-compiled closed the connection")
+
+        return json.loads(response)
+
+
+def main(args):
+    if len(args) < 2:
+        print("python3 -m edu.yu.compilers.driver.CompileClient <sourceFileName>...")
+        return 2
+
+    socketPath = os.environ.get("GRASP_COMPILED_SOCKET", DEFAULT_SOCKET_PATH)
+    status = 0
+
+    with CompileClient(socketPath) as client:
+        for sourceFileName in args[1:]:
+            with open(sourceFileName, 'r') as sourceFile:
+                response = client.compile(sourceFileName, sourceFile.read())
+
+            print(response["diagnostics"], end="")
+            if response["failure"] is not None:
+                print(f"{sourceFileName}: FAILED ({response['failure']})")
+            if response["objectCode"] is not None:
+                print(response["objectCode"])
+            else:
+                status = 1
+
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
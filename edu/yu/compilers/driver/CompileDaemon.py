@@ -0,0 +1,89 @@
+# <h1>CompileDaemon</h1>
+# <p>A long-running compile server on a local Unix socket. The ANTLR
+# runtime, the generated parser with its warm DFA caches and the
+# predefined prelude stay loaded between requests, so a request pays only
+# for the compilation itself. See CompileClient for the protocol.</p>
+import json
+import os
+import socketserver
+import stat
+import threading
+
+from edu.yu.compilers.driver.CompileClient import DEFAULT_SOCKET_PATH
+from edu.yu.compilers.driver.GraspCompiler import GraspCompiler
+from edu.yu.compilers.driver.ParseStatistics import ParseStatistics
+from edu.yu.compilers.intermediate.util.BackendMode import BackendMode
+
+
+class CompileDaemon(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    # Serve the requests of one client connection until it disconnects.
+    class RequestHandler(socketserver.StreamRequestHandler):
+
+        def handle(self):
+            for line in self.rfile:
+                try:
+                    request = json.loads(line)
+                    response = self.server.compile(request["name"], request["source"])
+                except (ValueError, KeyError, TypeError) as ex:
+                    response = CompileDaemon.toResponse(GraspCompiler.failedResult(None, ex))
+
+                self.wfile.write((json.dumps(response) + "\n").encode("utf-8"))
+                self.wfile.flush()
+
+    # Constructor. Loads the compiler and binds the socket.
+    # @param socketPath the Unix socket path. A stale socket file left
+    #                   by an earlier daemon is replaced.
+    # @param mode       the backend mode.
+    # @param cache      an optional CompileCache.
+    # @param fastParse  true for the two-stage SLL/LL parse.
+    # @param fastLex    true to lex with GraspScanner.
+    # @param antlrParser true to parse with GraspParser only.
+    def __init__(self, socketPath=DEFAULT_SOCKET_PATH, mode=BackendMode.CONVERTER, cache=None,
+                 fastParse=False, fastLex=False, antlrParser=False):
+        self.socketPath = socketPath
+        self.compiler = GraspCompiler(mode, cache, fastParse=fastParse, fastLex=fastLex,
+                                      antlrParser=antlrParser)
+        self.requestCount = 0
+        self.parseStatistics = ParseStatistics()
+
+        # Connections are served on their own threads, but the compiler
+        # (and the stdout capture around it) can only run one at a time.
+        self.compileLock = threading.Lock()
+
+        if os.path.exists(socketPath) and stat.S_ISSOCK(os.stat(socketPath).st_mode):
+            os.unlink(socketPath)
+        super().__init__(socketPath, CompileDaemon.RequestHandler)
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.socketPath):
+            os.unlink(self.socketPath)
+
+    # Compile one source.
+    # @param sourceName the name to report the source under.
+    # @param source     the source text.
+    # @return the response dictionary.
+    def compile(self, sourceName, source):
+        with self.compileLock:
+            result = self.compiler.compileSource(sourceName, source)
+            self.requestCount += 1
+            self.parseStatistics.add(result)
+
+        return CompileDaemon.toResponse(result)
+
+    # Convert a CompileResult to a response dictionary.
+    # @param result the CompileResult.
+    # @return the response dictionary.
+    @staticmethod
+    def toResponse(result):
+        return {
+            "name": result.sourceName,
+            "objectCode": result.objectCode,
+            "diagnostics": result.diagnostics,
+            "syntaxErrors": result.syntaxErrorCount,
+            "semanticErrors": result.semanticErrorCount,
+            "failure": result.failure,
+            "elapsed": result.elapsed,
+        }
@@ -0,0 +1,413 @@
+# <h1>GraspCompiler</h1>
+# <p>The lexer -> parser -> AST builder -> semantics -> inliner ->
+# constant folder -> dead code eliminator -> loop-invariant mover ->
+# bounds-check eliminator -> converter (or executor, bytecode compiler
+# or Python generator) pipeline behind a reusable object. One lexer and
+# one parser are created up front and are re-pointed at each new
+# source, so the generated ATN, the shared ANTLR DFA caches and the
+# imported parser module are paid for only once no matter how many
+# programs are compiled.</p>
+import contextlib
+import io
+import os
+import sys
+import time
+
+import antlr4
+from antlr4 import CommonTokenStream
+from antlr4.atn.PredictionMode import PredictionMode
+from antlr4.error.ErrorListener import ErrorListener
+from antlr4.error.ErrorStrategy import BailErrorStrategy, DefaultErrorStrategy
+from antlr4.error.Errors import ParseCancellationException
+
+from gen.GraspLexer import GraspLexer
+from gen.GraspParser import GraspParser
+from edu.yu.compilers.frontend.GraspScanner import GraspScanner
+from edu.yu.compilers.frontend.IdentifierTokenFactory import IdentifierTokenFactory
+from edu.yu.compilers.frontend.RecursiveDescentParser import RecursiveDescentParser
+from edu.yu.compilers.frontend.Semantics import Semantics
+from edu.yu.compilers.frontend.SyntaxErrorHandler import SyntaxErrorHandler
+from edu.yu.compilers.intermediate.ast.AstBuilder import AstBuilder
+from edu.yu.compilers.intermediate.optimizer.BoundsCheckEliminator import BoundsCheckEliminator
+from edu.yu.compilers.intermediate.optimizer.ConstantFolder import ConstantFolder
+from edu.yu.compilers.intermediate.optimizer.DeadCodeEliminator import DeadCodeEliminator
+from edu.yu.compilers.intermediate.optimizer.Inliner import Inliner
+from edu.yu.compilers.intermediate.optimizer.LoopInvariantMover import LoopInvariantMover
+from edu.yu.compilers.intermediate.symtable.SymTable import SymTable
+from edu.yu.compilers.intermediate.util.AstImage import AstImage
+from edu.yu.compilers.intermediate.util.BackendMode import BackendMode
+from edu.yu.compilers.backend.converter.Converter import Converter
+from edu.yu.compilers.backend.executor.Executor import Executor
+from edu.yu.compilers.backend.python.PythonGenerator import PythonGenerator
+from edu.yu.compilers.backend.vm.BytecodeCompiler import BytecodeCompiler
+
+
+# The outcome of compiling one source file.
+class CompileResult:
+
+    def __init__(self, sourceName):
+        self.sourceName = sourceName
+        self.objectCode = None  # generated Java, None if not created or written to an object file
+        self.executable = None  # the Executable, VirtualMachine or PythonProgram to run the program, None if not created
+        self.syntaxErrorCount = 0
+        self.semanticErrorCount = 0
+        self.diagnostics = ""  # captured error listings
+        self.failure = None  # "ExceptionType: message" if a pass crashed
+        self.lineCount = 0
+        self.elapsed = 0.0  # seconds
+        self.cached = False  # true if taken from a CompileCache
+        self.sllTime = None  # seconds in the SLL parse stage, None if not run
+        self.llTime = None  # seconds in the full LL parse, None if not run
+
+    def succeeded(self):
+        return (self.failure is None) and ((self.objectCode is not None) or (self.executable is not None))
+
+    # Get a short description of how the compilation went.
+    # @return the status text.
+    def getStatus(self):
+        if self.failure is not None:
+            return "FAILED (" + self.failure + ")"
+        elif self.semanticErrorCount > 0:
+            return f"{self.semanticErrorCount} semantic errors"
+        elif self.syntaxErrorCount > 0:
+            return f"ok, {self.syntaxErrorCount} syntax errors"
+        else:
+            return "ok"
+
+
+# A text stream that writes to two others, so that error listings can be
+# shown as they happen and still be kept in the CompileResult.
+class Tee(io.TextIOBase):
+
+    def __init__(self, first, second):
+        self.first = first
+        self.second = second
+
+    def write(self, text):
+        self.first.write(text)
+        self.second.write(text)
+        return len(text)
+
+    def flush(self):
+        self.first.flush()
+
+
+# An error listener that only notes that an error happened. The SLL stage
+# of a fast parse reports nothing itself: the LL stage that follows a
+# failure reports every error.
+class ErrorFlag(ErrorListener):
+
+    def __init__(self):
+        self.raised = False
+
+    def syntaxError(self, recognizer, offendingSymbol, line, charPositionInLine, msg, ex):
+        self.raised = True
+
+
+class GraspCompiler:
+
+    # Constructor.
+    # @param mode  the backend mode.
+    # @param cache an optional CompileCache to consult before compiling.
+    # @param astImageDir an optional directory to write an AstImage of
+    #                    each analyzed tree into.
+    # @param fastParse true to parse with GraspParser's SLL prediction
+    #                  first, instead of with the RecursiveDescentParser,
+    #                  and fall back to full LL only when that fails.
+    # @param fastLex true to lex with the hand-written GraspScanner
+    #                instead of the generated GraspLexer.
+    # @param antlrParser true to parse with GraspParser only, instead of
+    #                    with the RecursiveDescentParser first.
+    def __init__(self, mode=BackendMode.CONVERTER, cache=None, astImageDir=None, fastParse=False,
+                 fastLex=False, antlrParser=False):
+        self.mode = mode
+        self.cache = cache
+        self.astImageDir = astImageDir
+        self.fastParse = fastParse
+        self.descentParser = None if antlrParser or fastParse else RecursiveDescentParser()
+        self.astBuilder = AstBuilder()
+
+        # The lexer and parser are created once and reused for every source.
+        self.lexer = GraspScanner() if fastLex else GraspLexer(None)
+        self.lexer._factory = IdentifierTokenFactory.DEFAULT
+        self.lexer.removeErrorListeners()
+        self.parser = GraspParser(None)
+        self.parser.removeErrorListeners()
+
+    # Get the name of the Java file generated for a source file.
+    # @param sourceFileName the source file path.
+    # @return the Java file name, e.g. "hangman.pgm" -> "Hangman.java".
+    @staticmethod
+    def javaFileName(sourceFileName):
+        baseName = os.path.basename(sourceFileName)
+        return (baseName.split('.')[0] + '.java').capitalize()
+
+    # Get the name of the AstImage file written for a source file.
+    # @param sourceFileName the source file path.
+    # @return the image file name, e.g. "hangman.pgm" -> "Hangman.gast".
+    @staticmethod
+    def astImageFileName(sourceFileName):
+        return GraspCompiler.javaFileName(sourceFileName)[:-len('.java')] + '.gast'
+
+    # Get the name of the Python module written for a source file.
+    # @param sourceFileName the source file path.
+    # @return the module file name, e.g. "hangman.pgm" -> "Hangman.py".
+    @staticmethod
+    def pythonFileName(sourceFileName):
+        return GraspCompiler.javaFileName(sourceFileName)[:-len('.java')] + '.py'
+
+    # Create the result for a source file that could not be compiled at all.
+    # @param sourceName the source file name.
+    # @param ex         the exception that stopped it.
+    # @return the CompileResult.
+    @staticmethod
+    def failedResult(sourceName, ex):
+        result = CompileResult(sourceName)
+        result.failure = f"{type(ex).__name__}: {ex}"
+        return result
+
+    # Compile a source file.
+    # @param sourceFileName the source file path.
+    # @param capture true to capture the error listings in the result
+    #                and record a crashing pass as a failure instead of
+    #                raising, false to print them as they happen
+    #                (they are kept in the result either way).
+    # @param openObjectFile an optional function that returns a context
+    #                       manager for the text stream to write the Java
+    #                       to. It is called only if Java is generated,
+    #                       and the Java then streams into it instead of
+    #                       being kept in the result.
+    # @return the CompileResult.
+    def compileFile(self, sourceFileName, capture=True, openObjectFile=None):
+        with open(sourceFileName, 'r') as sourceFile:
+            source = sourceFile.read()
+
+        return self.compileSource(sourceFileName, source, capture, openObjectFile)
+
+    # Compile source text.
+    # @param sourceName the name to report the source under.
+    # @param source     the source text.
+    # @param capture    see compileFile().
+    # @param openObjectFile see compileFile().
+    # @return the CompileResult.
+    def compileSource(self, sourceName, source, capture=True, openObjectFile=None):
+        start = time.perf_counter()
+
+        # A cache hit would skip writing the AST image.
+        cacheKey = None
+        if self.cache is not None and self.astImageDir is None:
+            cacheKey = self.cache.key(source, self.mode)
+            result = self.cache.lookup(cacheKey, sourceName)
+
+            if result is not None:
+                if not capture:
+                    print(result.diagnostics, end="")
+                if (openObjectFile is not None) and (result.objectCode is not None):
+                    with openObjectFile() as objectFile:
+                        objectFile.write(result.objectCode)
+                result.elapsed = time.perf_counter() - start
+                return result
+
+        result = CompileResult(sourceName)
+        result.lineCount = source.count('\n') + 1
+
+        if capture:
+            listing = io.StringIO()
+            with contextlib.redirect_stdout(listing):
+                try:
+                    self.runPasses(source, result, openObjectFile)
+                except Exception as ex:
+                    result.failure = f"{type(ex).__name__}: {ex}"
+                    result.objectCode = None
+            result.diagnostics = listing.getvalue()
+        else:
+            listing = io.StringIO()
+            with contextlib.redirect_stdout(Tee(sys.stdout, listing)):
+                self.runPasses(source, result, openObjectFile)
+            result.diagnostics = listing.getvalue()
+
+        if self.cache is not None:
+            self.cache.store(cacheKey or self.cache.key(source, self.mode), result)
+
+        result.elapsed = time.perf_counter() - start
+        return result
+
+    def runPasses(self, source, result, openObjectFile=None):
+        # Unnamed record types are numbered globally. Restart the numbering
+        # so the output for a source doesn't depend on what was compiled before.
+        SymTable.unnamedIndex = 0
+
+        # Pass 1: Check syntax and create the parse tree.
+        tree = None
+        if self.fastParse:
+            tree = self.parseSLL(source, result)
+        elif self.descentParser is not None:
+            tree = self.parseDescent(source)
+
+        if tree is None:
+            start = time.perf_counter()
+            tree = self.parseLL(source, result)
+            result.llTime = time.perf_counter() - start
+
+        # Lower the parse tree to the abstract syntax tree the other passes
+        # walk, and let the parse tree go.
+        program = self.astBuilder.build(tree, self.parser.getTokenStream().tokens)
+        del tree
+
+        # Pass 2: Semantic operations.
+        pass2 = Semantics(self.mode)
+        pass2.visit(program)
+
+        result.semanticErrorCount = pass2.getErrorCount()
+        if result.semanticErrorCount > 0:
+            print(f"\nThere were {result.semanticErrorCount} semantic errors.")
+            print("Object file not created or modified.")
+            return
+
+        if self.astImageDir is not None:
+            imagePath = os.path.join(self.astImageDir, self.astImageFileName(result.sourceName))
+            AstImage.write(imagePath, program, pass2.getProgramId())
+
+        self.optimize(program)
+
+        if self.mode == BackendMode.CONVERTER:
+            self.convert(program, result, openObjectFile)
+        elif self.mode == BackendMode.EXECUTOR:
+            result.executable = Executor().visit(program)
+        elif self.mode == BackendMode.COMPILER:
+            result.executable = BytecodeCompiler().visit(program)
+        elif self.mode == BackendMode.PYTHON:
+            result.executable = PythonGenerator().visit(program)
+
+    # Passes 3 to 7: Optimize an analyzed tree, from a source or from an
+    # AstImage, for every backend.
+    # @param program the analyzed AST.
+    @staticmethod
+    def optimize(program):
+        # Pass 3: Inline small functions.
+        Inliner().visit(program)
+
+        # Pass 4: Fold constant expressions.
+        ConstantFolder().visit(program)
+
+        # Pass 5: Remove unreachable statements and routines.
+        DeadCodeEliminator().visit(program)
+
+        # Pass 6: Move loop-invariant expressions out of loops.
+        LoopInvariantMover().visit(program)
+
+        # Pass 7: Prove the subscripts of FOR loops in bounds.
+        BoundsCheckEliminator().visit(program)
+
+    # Pass 8: Convert from Grasp to Java.
+    # @param program        the analyzed AST.
+    # @param result         the CompileResult.
+    # @param openObjectFile see compileFile().
+    def convert(self, program, result, openObjectFile):
+        if openObjectFile is None:
+            pass8 = Converter()
+            result.objectCode = str(pass8.visit(program))
+        elif self.cache is not None:
+            # The cache keeps the Java as a string.
+            pass8 = Converter()
+            result.objectCode = str(pass8.visit(program))
+            with openObjectFile() as objectFile:
+                objectFile.write(result.objectCode)
+        else:
+            with openObjectFile() as objectFile:
+                pass8 = Converter(objectFile)
+                pass8.visit(program)
+
+    # Point the lexer and the parser at a new source.
+    # @param source   the source text.
+    # @param listener the error listener of both.
+    def reset(self, source, listener):
+        self.lexer.inputStream = antlr4.InputStream(source)
+        self.lexer.removeErrorListeners()
+        self.lexer.addErrorListener(listener)
+
+        self.parser.setTokenStream(CommonTokenStream(self.lexer))
+        self.parser.removeErrorListeners()
+        self.parser.addErrorListener(listener)
+
+    # Parse with the RecursiveDescentParser, which handles only
+    # well-formed programs.
+    # @param source the source text.
+    # @return the parse tree, or None if GraspParser must report errors.
+    def parseDescent(self, source):
+        errorFlag = ErrorFlag()
+        self.reset(source, errorFlag)
+
+        try:
+            tree = self.descentParser.parse(self.parser.getTokenStream())
+        except ParseCancellationException:
+            tree = None
+
+        return None if errorFlag.raised else tree
+
+    # Parse with SLL prediction, giving up at the first syntax error.
+    # SLL prediction needs no full-context lookahead and so is much
+    # faster, but it can reject (never wrongly accept) a valid program.
+    # @param source the source text.
+    # @param result the CompileResult to record the stage time in.
+    # @return the parse tree, or None if the full LL parse must decide.
+    def parseSLL(self, source, result):
+        start = time.perf_counter()
+        errorFlag = ErrorFlag()
+        self.reset(source, errorFlag)
+        self.parser._interp.predictionMode = PredictionMode.SLL
+        self.parser._errHandler = BailErrorStrategy()
+
+        try:
+            tree = self.parser.program()
+        except ParseCancellationException:
+            tree = None
+        finally:
+            self.parser._interp.predictionMode = PredictionMode.LL
+            self.parser._errHandler = DefaultErrorStrategy()
+
+        result.sllTime = time.perf_counter() - start
+
+        # A lexer error doesn't stop the parse, but it must be reported.
+        return None if errorFlag.raised else tree
+
+    # Parse with full LL prediction, reporting and recovering from
+    # syntax errors.
+    # @param source the source text.
+    # @param result the CompileResult to record the error count in.
+    # @return the parse tree.
+    def parseLL(self, source, result):
+        # Custom syntax error handler.
+        syntaxErrorHandler = SyntaxErrorHandler()
+        self.reset(source, syntaxErrorHandler)
+
+        tree = self.parser.program()
+        result.syntaxErrorCount = syntaxErrorHandler.get_count()
+        return tree
+
+    # Convert an analyzed tree saved as an AstImage, or compile it for
+    # execution in EXECUTOR, COMPILER or PYTHON mode, without lexing, parsing or semantic
+    # analysis.
+    # @param imagePath the AstImage file path.
+    # @param openObjectFile see compileFile().
+    # @return the CompileResult.
+    def convertImage(self, imagePath, openObjectFile=None):
+        result = CompileResult(imagePath)
+        start = time.perf_counter()
+
+        with AstImage(imagePath) as image:
+            program, programId = image.rebuild()
+
+        self.optimize(program)
+
+        if self.mode == BackendMode.CONVERTER:
+            self.convert(program, result, openObjectFile)
+        elif self.mode == BackendMode.EXECUTOR:
+            result.executable = Executor().visit(program)
+        elif self.mode == BackendMode.COMPILER:
+            result.executable = BytecodeCompiler().visit(program)
+        elif self.mode == BackendMode.PYTHON:
+            result.executable = PythonGenerator().visit(program)
+
+        result.elapsed = time.perf_counter() - start
+        return result
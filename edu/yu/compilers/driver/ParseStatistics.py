@@ -0,0 +1,36 @@
+# <h1>ParseStatistics</h1>
+# <p>How the two-stage parse of GraspCompiler's fast-parse mode went over
+# a number of compilations: how many sources the SLL stage parsed on its
+# own, how many fell back to full LL, and the time spent in each stage.
+# The figures are collected from CompileResults, so results that come
+# back from worker processes can be added up in the parent.</p>
+
+
+class ParseStatistics:
+
+    def __init__(self):
+        self.parses = 0
+        self.fallbacks = 0
+        self.sllTime = 0.0  # seconds
+        self.llTime = 0.0  # seconds
+
+    # Add the parse of one compilation. Cached results did not parse.
+    # @param result the CompileResult.
+    def add(self, result):
+        if result.sllTime is None:
+            return
+
+        self.parses += 1
+        self.sllTime += result.sllTime
+        if result.llTime is not None:
+            self.fallbacks += 1
+            self.llTime += result.llTime
+
+    # Get the fallback rate and stage timings.
+    # @return the statistics text.
+    def getStatistics(self):
+        fallbackRate = 100.0 * self.fallbacks / self.parses if self.parses > 0 else 0.0
+
+        return (f"parse: {self.parses} parses, {self.parses - self.fallbacks} SLL only, "
+                f"{self.fallbacks} LL fallbacks ({fallbackRate:.1f}%), "
+                f"SLL {self.sllTime * 1000:.1f} ms, LL {self.llTime * 1000:.1f} ms")
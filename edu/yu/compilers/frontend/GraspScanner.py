@@ -0,0 +1,177 @@
+# <h1>GraspScanner</h1>
+# <p>A hand-written lexer for Grasp and a drop-in replacement for the
+# generated GraspLexer. Instead of simulating the lexer ATN one character
+# at a time, it matches each token with one combined regular expression.
+# It emits the same CommonTokens (types, text, positions, channel), and it
+# reports the same token recognition errors to its error listeners, so
+# CommonTokenStream and GraspParser work with it unchanged.</p>
+# <p>The alternatives of the expression are ordered so that the first
+# match is the longest one, as in ANTLR. Keywords are matched as
+# identifiers and then looked up, which gives them priority over
+# IDENTIFIER just as their earlier position in the grammar does.
+# Identifiers get their interned text and key from
+# IdentifierTokenFactory.</p>
+# <p>programs/ScannerConformance.py checks it token for token against
+# GraspLexer.</p>
+import re
+
+from antlr4.Recognizer import Recognizer
+from antlr4.Token import CommonToken, Token
+from antlr4.error.Errors import LexerNoViableAltException
+
+from edu.yu.compilers.frontend.IdentifierTokenFactory import IdentifierTokenFactory
+from gen.GraspLexer import GraspLexer
+
+
+class GraspScanner(Recognizer):
+    literalNames = GraspLexer.literalNames
+    symbolicNames = GraspLexer.symbolicNames
+    ruleNames = GraspLexer.ruleNames
+    grammarFileName = GraspLexer.grammarFileName
+
+    PATTERN = re.compile(r"""
+          (?P<WS>[ \t]+)
+        | (?P<NEWLINE>\r?\n)
+        | (?P<COMMENT>/\*[^@]*\*/)
+        | (?P<SINGLE_COMMENT>//[^\r\n]*)
+        | (?P<WORD>[a-zA-Z][a-zA-Z0-9]*(?:\[\])*)
+        | (?P<NUMBER>[0-9]+(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?)
+        | (?P<STRING>'(?:''|[^'])*')
+        | (?P<QUOTE>')
+        | (?P<LITERAL>==|!=|<=|>=|[;(),{}=\-+\[\]:.<>*/])
+        """, re.VERBOSE)
+
+    # Tokens the parser never sees.
+    SKIPPED = frozenset(("WS", "NEWLINE", "COMMENT", "SINGLE_COMMENT"))
+
+    # Characters that start a token but are not one by themselves. Like the
+    # ATN simulator, the scanner takes the following character into the
+    # error along with them.
+    PREFIXES = frozenset(("!", "\r"))
+
+    # Keyword token types by upper-case spelling.
+    KEYWORDS = {name: getattr(GraspLexer, name)
+                for name in GraspLexer.ruleNames[GraspLexer.ruleNames.index("PROGRAM"):
+                                                 GraspLexer.ruleNames.index("IDENTIFIER")]}
+
+    # Literal token types by spelling. 'TRUE' is case sensitive.
+    LITERALS = {literal[1:-1]: tokenType for tokenType, literal in enumerate(GraspLexer.literalNames)
+                if literal.startswith("'") and tokenType != GraspLexer.QUOTE}
+
+    def __init__(self, input=None):
+        super().__init__()
+        self._factory = IdentifierTokenFactory.DEFAULT
+        self._input = None
+        self._tokenFactorySourcePair = (self, None)
+        self.data = ""
+        self.pos = 0
+        self.line = 1
+        self.column = 0
+        if input is not None:
+            self.inputStream = input
+
+    @property
+    def inputStream(self):
+        return self._input
+
+    @inputStream.setter
+    def inputStream(self, input):
+        self._input = input
+        self._tokenFactorySourcePair = (self, input)
+        self.data = input.strdata
+        self.pos = 0
+        self.line = 1
+        self.column = 0
+
+    def getSourceName(self):
+        return self._input.getSourceName()
+
+    # Get the next token the parser sees.
+    # @return the token, EOF at the end of the input.
+    def nextToken(self):
+        data = self.data
+        match = GraspScanner.PATTERN.match
+
+        while True:
+            pos = self.pos
+            if pos >= len(data):
+                return self.emitEOF()
+
+            m = match(data, pos)
+            if m is None:
+                self.recover(pos)
+                continue
+
+            kind = m.lastgroup
+            end = m.end()
+            tokenText = m.group()
+            line = self.line
+            column = self.column
+
+            self.pos = end
+            newlines = tokenText.count('\n')
+            if newlines == 0:
+                self.column += end - pos
+            else:
+                self.line += newlines
+                self.column = len(tokenText) - tokenText.rfind('\n') - 1
+
+            if kind in GraspScanner.SKIPPED:
+                continue
+
+            key = None
+            if kind == "WORD":
+                tokenType = GraspScanner.KEYWORDS.get(tokenText.upper())
+                if tokenType is None:
+                    if tokenText == "TRUE":
+                        tokenType = GraspLexer.T__11
+                    else:
+                        tokenType = GraspLexer.IDENTIFIER
+                        tokenText, key = IdentifierTokenFactory.intern(tokenText)
+            elif kind == "NUMBER":
+                tokenType = GraspLexer.INTEGER if tokenText.isdigit() else GraspLexer.DECIMAL
+            elif kind == "STRING":
+                tokenType = GraspLexer.CHARACTER if (end - pos == 3) and (tokenText[1] != "'") \
+                    else GraspLexer.STRING
+            elif kind == "QUOTE":
+                tokenType = GraspLexer.QUOTE
+            else:
+                tokenType = GraspScanner.LITERALS[tokenText]
+
+            token = CommonToken(self._tokenFactorySourcePair, tokenType, Token.DEFAULT_CHANNEL, pos, end - 1)
+            token.line = line
+            token.column = column
+            token.text = tokenText
+            if key is not None:
+                token.key = key
+            return token
+
+    def emitEOF(self):
+        token = CommonToken(self._tokenFactorySourcePair, Token.EOF, Token.DEFAULT_CHANNEL,
+                            self.pos, self.pos - 1)
+        token.line = self.line
+        token.column = self.column
+        return token
+
+    # Report a character that starts no token and skip over it.
+    # @param pos the position of the character.
+    def recover(self, pos):
+        data = self.data
+        end = pos + 1
+        if data[pos] in GraspScanner.PREFIXES and end < len(data):
+            end += 1
+
+        errorText = data[pos:end]
+        display = errorText.replace("\n", "\\n").replace("\t", "\\t").replace("\r", "\\r")
+        msg = "token recognition error at: '" + display + "'"
+        ex = LexerNoViableAltException(self, self._input, pos, None)
+        self.getErrorListenerDispatch().syntaxError(self, None, self.line, self.column, msg, ex)
+
+        self.pos = end
+        newlines = errorText.count('\n')
+        if newlines == 0:
+            self.column += end - pos
+        else:
+            self.line += newlines
+            self.column = len(errorText) - errorText.rfind('\n') - 1
+
@@ -0,0 +1,48 @@
+# <h1>IdentifierTokenFactory</h1>
+# <p>A token factory that gives each IDENTIFIER token its key: the name
+# folded to lower case, the way Grasp compares names. Keys and spellings
+# are interned in one table per process, so every occurrence of a name,
+# in every compilation, has the same key and spelling string objects.
+# Semantics enters and looks up symbols by key, so it folds no case and
+# creates no strings, and its dictionary lookups find the key by
+# identity.</p>
+import sys
+
+from antlr4.CommonTokenFactory import CommonTokenFactory
+
+from gen.GraspLexer import GraspLexer
+
+
+class IdentifierTokenFactory(CommonTokenFactory):
+    DEFAULT = None
+
+    spellings = {}  # spelling -> (interned spelling, key)
+
+    # Create a token, with its interned text and key if it's an identifier.
+    def create(self, source, type, text, channel, start, stop, line, column):
+        token = super().create(source, type, text, channel, start, stop, line, column)
+        if type == GraspLexer.IDENTIFIER:
+            token.text, token.key = IdentifierTokenFactory.intern(token.text)
+        return token
+
+    # Intern the spelling of a name.
+    # @param text the spelling.
+    # @return the interned spelling and the interned key.
+    @staticmethod
+    def intern(text):
+        interned = IdentifierTokenFactory.spellings.get(text)
+        if interned is None:
+            spelling = sys.intern(text)
+            interned = IdentifierTokenFactory.spellings[spelling] = (spelling, sys.intern(text.lower()))
+        return interned
+
+    # Get the key of an identifier token.
+    # @param token the token.
+    # @return the key.
+    @staticmethod
+    def keyOf(token):
+        key = getattr(token, "key", None)
+        return key if key is not None else IdentifierTokenFactory.intern(token.text)[1]
+
+
+IdentifierTokenFactory.DEFAULT = IdentifierTokenFactory()
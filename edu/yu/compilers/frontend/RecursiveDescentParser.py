@@ -0,0 +1,829 @@
+# <h1>RecursiveDescentParser</h1>
+# <p>A hand-written predictive parser for the Grasp grammar. It builds the
+# same parse tree as GraspParser, made of the generated context classes,
+# so Semantics and the Converter run on it unchanged. But it decides
+# every alternative with a token or two of lookahead, or with a short
+# scan over brackets, instead of running ANTLR's adaptive prediction.</p>
+# <p>It parses well-formed programs only. At the first unexpected token it
+# raises ParseCancellationException, and the caller parses again with
+# GraspParser to report and recover from the syntax errors.</p>
+# <p>Where the grammar is ambiguous it chooses as ANTLR does: a sign in
+# front of a number belongs to the simple expression, and ELSE, DEFAULT
+# and further IS branches go to the innermost IF.</p>
+# <p>programs/ParserConformance.py checks its trees node for node against
+# GraspParser's.</p>
+import gc
+
+from antlr4 import Token
+from antlr4.error.Errors import ParseCancellationException
+
+from gen.GraspParser import GraspParser
+
+P = GraspParser
+
+# The literal tokens.
+SEMICOLON = P.T__0
+LPAREN = P.T__1
+COMMA = P.T__2
+RPAREN = P.T__3
+LBRACE = P.T__4
+RBRACE = P.T__5
+EQUALS = P.T__6
+MINUS = P.T__7
+PLUS = P.T__8
+LBRACKET = P.T__9
+RBRACKET = P.T__10
+TRUE = P.T__11
+COLON = P.T__12
+DOT = P.T__13
+
+SIGNS = frozenset((MINUS, PLUS))
+REL_OPS = frozenset((P.T__14, P.T__15, P.T__16, P.T__17, P.T__18, P.T__19))
+ADD_OPS = frozenset((PLUS, MINUS, P.OR))
+MUL_OPS = frozenset((P.T__20, P.T__21, P.DIV, P.MOD, P.AND))
+
+TYPE_SPECIFICATION_START = frozenset((P.IDENTIFIER, LPAREN, P.BLUEPRINT))
+FACTOR_START = frozenset((P.IDENTIFIER, P.INTEGER, P.DECIMAL, MINUS, PLUS, P.CHARACTER, P.STRING,
+                          P.NOT, LPAREN))
+STATEMENT_START = frozenset((P.DO, LBRACE, P.IDENTIFIER, LPAREN, P.BLUEPRINT, P.IF, P.WHILE, P.FOR,
+                             P.PRINT, P.PRINTLN, P.READ, P.READLN, P.RETURN, SEMICOLON))
+
+# The statements that end with a semicolon, by the token they start with.
+SEMICOLON_STATEMENTS = {
+    P.PRINT: "printStatement",
+    P.PRINTLN: "printlnStatement",
+    P.READ: "readStatement",
+    P.READLN: "readlnStatement",
+    P.RETURN: "returnStatement",
+}
+
+
+# The rule context class that declares the locals of a context class: the
+# class itself, or for a labeled alternative the rule's class.
+def ruleClass(contextClass):
+    base = contextClass.__mro__[1]
+    return base if base.__name__ != "ParserRuleContext" else contextClass
+
+
+class RecursiveDescentParser:
+
+    def __init__(self):
+        self.tokens = []
+        self.pos = 0
+        self.initializers = {}
+
+    # Parse a program.
+    # @param tokenStream the CommonTokenStream of the source. It is filled.
+    # @return the ProgramContext.
+    def parse(self, tokenStream):
+        tokenStream.fill()
+        self.tokens = tokenStream.tokens
+        self.pos = 0
+
+        # Every context is new and lives as long as the tree, and the parent
+        # links make them cyclic, so garbage collections during the parse
+        # would only rescan the growing tree over and over.
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            return self.program(None)
+        finally:
+            if collecting:
+                gc.enable()
+
+    # Get the type of a lookahead token.
+    # @param k 1 for the next token, 2 for the one after it, and so on.
+    # @return the token type, EOF past the end.
+    def la(self, k=1):
+        index = self.pos + k - 1
+        return self.tokens[index].type if index < len(self.tokens) else Token.EOF
+
+    # Create a context and add it to its parent, like Parser.enterRule().
+    # @param contextClass the context class.
+    # @param parent       the parent context, or None.
+    # @return the context.
+    def enter(self, contextClass, parent):
+        initializer = self.initializers.get(contextClass)
+        if initializer is None:
+            initializer = ruleClass(contextClass).__init__
+            self.initializers[contextClass] = initializer
+
+        ctx = contextClass.__new__(contextClass)
+        initializer(ctx, None, parent)
+        ctx.start = self.tokens[self.pos]
+        if parent is not None:
+            parent.addChild(ctx)
+        return ctx
+
+    # Finish a context, like Parser.exitRule().
+    # @param ctx the context.
+    # @return the context.
+    def exit(self, ctx):
+        ctx.stop = self.tokens[self.pos - 1] if self.pos > 0 else None
+        return ctx
+
+    # Match the next token and add it to a context.
+    # @param ctx       the context.
+    # @param tokenType the expected token type.
+    def match(self, ctx, tokenType):
+        token = self.tokens[self.pos]
+        if token.type != tokenType:
+            self.fail()
+        self.pos += 1
+        ctx.addTokenNode(token)
+
+    # Match the next token, whichever it is, and add it to a context.
+    def matchAny(self, ctx):
+        ctx.addTokenNode(self.tokens[self.pos])
+        self.pos += 1
+
+    # Report an unexpected token.
+    def fail(self):
+        token = self.tokens[self.pos]
+        raise ParseCancellationException(f"line {token.line}:{token.column} unexpected {token.text!r}")
+
+    # Skip over a bracketed group.
+    # @param index the index of the opening token.
+    # @param open  the opening token type.
+    # @param close the closing token type.
+    # @return the index after the closing token.
+    def skipGroup(self, index, open, close):
+        depth = 0
+        tokens = self.tokens
+        while index < len(tokens):
+            tokenType = tokens[index].type
+            if tokenType == open:
+                depth += 1
+            elif tokenType == close:
+                depth -= 1
+                if depth == 0:
+                    return index + 1
+            elif tokenType == Token.EOF:
+                break
+            index += 1
+        return index
+
+    # Skip over a simple type or a record type.
+    # @param index the index of its first token.
+    # @return the index after it.
+    def skipElementType(self, index):
+        tokenType = self.tokens[index].type
+        if tokenType == LPAREN:
+            return self.skipGroup(index, LPAREN, RPAREN)
+        elif tokenType == P.BLUEPRINT:
+            return self.skipGroup(index + 1, LBRACE, RBRACE)
+        else:
+            return index + 1
+
+    def tokenTypeAt(self, index):
+        return self.tokens[index].type if index < len(self.tokens) else Token.EOF
+
+    # ----- Programs and declarations -----
+
+    def program(self, parent):
+        ctx = self.enter(P.ProgramContext, parent)
+        self.programHeader(ctx)
+        self.block(ctx)
+        return self.exit(ctx)
+
+    def programHeader(self, parent):
+        ctx = self.enter(P.ProgramHeaderContext, parent)
+        self.match(ctx, P.PROGRAM)
+        self.programIdentifier(ctx)
+        if self.la() == LPAREN:
+            self.programParameters(ctx)
+        self.match(ctx, SEMICOLON)
+        return self.exit(ctx)
+
+    def programParameters(self, parent):
+        ctx = self.enter(P.ProgramParametersContext, parent)
+        self.match(ctx, LPAREN)
+        self.match(ctx, P.IDENTIFIER)
+        while self.la() == COMMA:
+            self.match(ctx, COMMA)
+            self.match(ctx, P.IDENTIFIER)
+        self.match(ctx, RPAREN)
+        return self.exit(ctx)
+
+    def programIdentifier(self, parent):
+        return self.identifierRule(P.ProgramIdentifierContext, parent)
+
+    def identifierRule(self, contextClass, parent):
+        ctx = self.enter(contextClass, parent)
+        self.match(ctx, P.IDENTIFIER)
+        return self.exit(ctx)
+
+    def block(self, parent):
+        ctx = self.enter(P.BlockContext, parent)
+        self.declarations(ctx)
+        self.compoundStatement(ctx)
+        return self.exit(ctx)
+
+    def declarations(self, parent):
+        ctx = self.enter(P.DeclarationsContext, parent)
+        if self.la() == P.FINAL:
+            self.constantsPart(ctx)
+        if self.la() == P.TYPE:
+            self.typesPart(ctx)
+        if self.la() == P.VAR:
+            self.variablesPart(ctx)
+        if self.la() == P.FUNCTION:
+            self.routinesPart(ctx)
+        return self.exit(ctx)
+
+    def constantsPart(self, parent):
+        ctx = self.enter(P.ConstantsPartContext, parent)
+        self.match(ctx, P.FINAL)
+        self.match(ctx, LBRACE)
+        self.constantDefinitionsList(ctx)
+        self.match(ctx, RBRACE)
+        return self.exit(ctx)
+
+    def constantDefinitionsList(self, parent):
+        ctx = self.enter(P.ConstantDefinitionsListContext, parent)
+        self.constantDefinition(ctx)
+        self.match(ctx, SEMICOLON)
+        while self.la() in TYPE_SPECIFICATION_START:
+            self.constantDefinition(ctx)
+            self.match(ctx, SEMICOLON)
+        return self.exit(ctx)
+
+    def constantDefinition(self, parent):
+        ctx = self.enter(P.ConstantDefinitionContext, parent)
+        self.typeSpecification(ctx)
+        self.identifierRule(P.ConstantIdentifierContext, ctx)
+        self.match(ctx, EQUALS)
+        self.constant(ctx)
+        return self.exit(ctx)
+
+    def constant(self, parent):
+        ctx = self.enter(P.ConstantContext, parent)
+        tokenType = self.la()
+        if tokenType in SIGNS:
+            self.sign(ctx)
+            tokenType = self.la()
+
+        if tokenType == P.IDENTIFIER:
+            self.match(ctx, P.IDENTIFIER)
+        elif tokenType in (P.INTEGER, P.DECIMAL):
+            self.unsignedNumber(ctx)
+        elif ctx.children is not None:
+            self.fail()
+        elif tokenType == P.CHARACTER:
+            self.tokenRule(P.CharacterConstantContext, ctx)
+        elif tokenType == P.STRING:
+            self.tokenRule(P.StringConstantContext, ctx)
+        else:
+            self.fail()
+        return self.exit(ctx)
+
+    def sign(self, parent):
+        return self.tokenRule(P.SignContext, parent)
+
+    # Parse a rule that is a single token.
+    def tokenRule(self, contextClass, parent):
+        ctx = self.enter(contextClass, parent)
+        self.matchAny(ctx)
+        return self.exit(ctx)
+
+    def typesPart(self, parent):
+        ctx = self.enter(P.TypesPartContext, parent)
+        self.match(ctx, P.TYPE)
+        self.match(ctx, LBRACE)
+        listCtx = self.enter(P.TypeDefinitionsListContext, ctx)
+        while self.la() == P.IDENTIFIER:
+            self.typeDefinition(listCtx)
+        self.exit(listCtx)
+        self.match(ctx, RBRACE)
+        return self.exit(ctx)
+
+    def typeDefinition(self, parent):
+        ctx = self.enter(P.TypeDefinitionContext, parent)
+        self.identifierRule(P.TypeIdentifierContext, ctx)
+        self.match(ctx, EQUALS)
+        self.typeSpecification(ctx)
+        return self.exit(ctx)
+
+    def typeSpecification(self, parent):
+        tokenType = self.la()
+        if tokenType not in TYPE_SPECIFICATION_START:
+            self.fail()
+
+        if self.tokenTypeAt(self.skipElementType(self.pos)) == LBRACKET:
+            ctx = self.enter(P.ArrayTypespecContext, parent)
+            self.arrayType(ctx)
+        elif tokenType == P.BLUEPRINT:
+            ctx = self.enter(P.RecordTypespecContext, parent)
+            self.recordType(ctx)
+        else:
+            ctx = self.enter(P.SimpleTypespecContext, parent)
+            self.simpleType(ctx)
+        return self.exit(ctx)
+
+    def simpleType(self, parent):
+        if self.la() == P.IDENTIFIER:
+            ctx = self.enter(P.TypeIdentifierTypespecContext, parent)
+            self.identifierRule(P.TypeIdentifierContext, ctx)
+        else:
+            ctx = self.enter(P.EnumerationTypespecContext, parent)
+            self.enumerationType(ctx)
+        return self.exit(ctx)
+
+    def enumerationType(self, parent):
+        ctx = self.enter(P.EnumerationTypeContext, parent)
+        self.match(ctx, LPAREN)
+        self.enumerationConstant(ctx)
+        while self.la() == COMMA:
+            self.match(ctx, COMMA)
+            self.enumerationConstant(ctx)
+        self.match(ctx, RPAREN)
+        return self.exit(ctx)
+
+    def enumerationConstant(self, parent):
+        ctx = self.enter(P.EnumerationConstantContext, parent)
+        self.identifierRule(P.ConstantIdentifierContext, ctx)
+        return self.exit(ctx)
+
+    def arrayType(self, parent):
+        ctx = self.enter(P.ArrayTypeContext, parent)
+        elemCtx = self.enter(P.ArrayElemTypeContext, ctx)
+        if self.la() == P.BLUEPRINT:
+            self.recordType(elemCtx)
+        else:
+            self.simpleType(elemCtx)
+        self.exit(elemCtx)
+
+        dimensionCtx = self.enter(P.ArrayDimensionListContext, ctx)
+        while True:
+            self.match(dimensionCtx, LBRACKET)
+            self.expression(dimensionCtx)
+            self.match(dimensionCtx, RBRACKET)
+            if self.la() != LBRACKET:
+                break
+        self.exit(dimensionCtx)
+        return self.exit(ctx)
+
+    def recordType(self, parent):
+        ctx = self.enter(P.RecordTypeContext, parent)
+        self.match(ctx, P.BLUEPRINT)
+        self.match(ctx, LBRACE)
+        fieldsCtx = self.enter(P.RecordFieldsContext, ctx)
+        self.variableDeclarationsList(fieldsCtx)
+        self.exit(fieldsCtx)
+        if self.la() == SEMICOLON:
+            self.match(ctx, SEMICOLON)
+        self.match(ctx, RBRACE)
+        return self.exit(ctx)
+
+    def variablesPart(self, parent):
+        ctx = self.enter(P.VariablesPartContext, parent)
+        self.match(ctx, P.VAR)
+        self.match(ctx, LBRACE)
+        self.variableDeclarationsList(ctx)
+        self.match(ctx, RBRACE)
+        return self.exit(ctx)
+
+    def variableDeclarationsList(self, parent):
+        ctx = self.enter(P.VariableDeclarationsListContext, parent)
+        self.variableDeclarations(ctx)
+        self.match(ctx, SEMICOLON)
+        while self.la() in TYPE_SPECIFICATION_START:
+            self.variableDeclarations(ctx)
+            self.match(ctx, SEMICOLON)
+        return self.exit(ctx)
+
+    def variableDeclarations(self, parent):
+        ctx = self.enter(P.VariableDeclarationsContext, parent)
+        self.typeSpecification(ctx)
+        listCtx = self.enter(P.VariableIdentifierListContext, ctx)
+        self.identifierRule(P.VariableIdentifierContext, listCtx)
+        while self.la() == COMMA:
+            self.match(listCtx, COMMA)
+            self.identifierRule(P.VariableIdentifierContext, listCtx)
+        self.exit(listCtx)
+        return self.exit(ctx)
+
+    def routinesPart(self, parent):
+        ctx = self.enter(P.RoutinesPartContext, parent)
+        self.routineDefinition(ctx)
+        while self.la() == SEMICOLON:
+            self.match(ctx, SEMICOLON)
+            self.routineDefinition(ctx)
+        return self.exit(ctx)
+
+    def routineDefinition(self, parent):
+        ctx = self.enter(P.RoutineDefinitionContext, parent)
+        self.functionHead(ctx)
+        self.match(ctx, LBRACE)
+        self.block(ctx)
+        self.match(ctx, RBRACE)
+        return self.exit(ctx)
+
+    def functionHead(self, parent):
+        ctx = self.enter(P.FunctionHeadContext, parent)
+        self.match(ctx, P.FUNCTION)
+        if self.la() == P.FINAL:
+            self.match(ctx, P.FINAL)
+        self.identifierRule(P.RoutineIdentifierContext, ctx)
+        if self.la() == LPAREN:
+            self.parameters(ctx)
+        self.match(ctx, P.RETURNS)
+        self.identifierRule(P.TypeIdentifierContext, ctx)
+        return self.exit(ctx)
+
+    def parameters(self, parent):
+        ctx = self.enter(P.ParametersContext, parent)
+        self.match(ctx, LPAREN)
+        listCtx = self.enter(P.ParameterDeclarationsListContext, ctx)
+        self.parameterDeclaration(listCtx)
+        while self.la() == COMMA:
+            self.match(listCtx, COMMA)
+            self.parameterDeclaration(listCtx)
+        self.exit(listCtx)
+        self.match(ctx, RPAREN)
+        return self.exit(ctx)
+
+    def parameterDeclaration(self, parent):
+        ctx = self.enter(P.ParameterDeclarationContext, parent)
+        if self.la() == P.VAR:
+            self.match(ctx, P.VAR)
+        self.identifierRule(P.TypeIdentifierContext, ctx)
+        while self.la() == LBRACKET:
+            modCtx = self.enter(P.ParamTypeModContext, ctx)
+            self.match(modCtx, LBRACKET)
+            self.match(modCtx, RBRACKET)
+            self.exit(modCtx)
+        self.identifierRule(P.ParameterIdentifierContext, ctx)
+        return self.exit(ctx)
+
+    # ----- Statements -----
+
+    def statement(self, parent):
+        ctx = self.enter(P.StatementContext, parent)
+        tokenType = self.la()
+
+        if tokenType in (P.DO, LBRACE):
+            self.compoundStatement(ctx)
+        elif tokenType == P.IDENTIFIER:
+            nextType = self.la(2)
+            if nextType == LPAREN:
+                self.functionCallStatement(ctx)
+            elif self.startsDeclaration():
+                self.declareAndAssignStatement(ctx)
+            else:
+                self.assignmentStatement(ctx)
+            self.match(ctx, SEMICOLON)
+        elif tokenType in (LPAREN, P.BLUEPRINT):
+            self.declareAndAssignStatement(ctx)
+            self.match(ctx, SEMICOLON)
+        elif tokenType == P.IF:
+            self.ifOrCaseStatement(ctx)
+        elif tokenType == P.WHILE:
+            self.whileStatement(ctx)
+        elif tokenType == P.FOR:
+            self.forStatement(ctx)
+        elif tokenType == SEMICOLON:
+            self.exit(self.enter(P.EmptyStatementContext, ctx))
+            self.match(ctx, SEMICOLON)
+        elif tokenType in SEMICOLON_STATEMENTS:
+            getattr(self, SEMICOLON_STATEMENTS[tokenType])(ctx)
+            self.match(ctx, SEMICOLON)
+        else:
+            self.fail()
+        return self.exit(ctx)
+
+    # Decide whether a statement that starts with an identifier declares
+    # a variable: the type is followed by the variable's identifier.
+    def startsDeclaration(self):
+        index = self.pos + 1
+        while self.tokenTypeAt(index) == LBRACKET:
+            index = self.skipGroup(index, LBRACKET, RBRACKET)
+        return self.tokenTypeAt(index) == P.IDENTIFIER
+
+    def compoundStatement(self, parent):
+        ctx = self.enter(P.CompoundStatementContext, parent)
+        if self.la() == P.DO:
+            self.match(ctx, P.DO)
+        self.match(ctx, LBRACE)
+        self.statementList(ctx)
+        self.match(ctx, RBRACE)
+        return self.exit(ctx)
+
+    def statementList(self, parent):
+        ctx = self.enter(P.StatementListContext, parent)
+        while self.la() in STATEMENT_START:
+            self.statement(ctx)
+        return self.exit(ctx)
+
+    def declareAndAssignStatement(self, parent):
+        ctx = self.enter(P.DeclareAndAssignStatementContext, parent)
+        self.typeSpecification(ctx)
+        self.identifierRule(P.VariableIdentifierContext, ctx)
+        self.match(ctx, EQUALS)
+        self.rhs(ctx)
+        return self.exit(ctx)
+
+    def assignmentStatement(self, parent):
+        ctx = self.enter(P.AssignmentStatementContext, parent)
+        lhsCtx = self.enter(P.LhsContext, ctx)
+        self.variable(lhsCtx)
+        self.exit(lhsCtx)
+        self.match(ctx, EQUALS)
+        self.rhs(ctx)
+        return self.exit(ctx)
+
+    def rhs(self, parent):
+        ctx = self.enter(P.RhsContext, parent)
+        self.expression(ctx)
+        return self.exit(ctx)
+
+    def returnStatement(self, parent):
+        ctx = self.enter(P.ReturnStatementContext, parent)
+        self.match(ctx, P.RETURN)
+        self.expression(ctx)
+        return self.exit(ctx)
+
+    # An IF statement is a caseStatement unless IS 'TRUE' follows the
+    # expression, so the expression is parsed before its statement's
+    # context is created and then attached to it.
+    def ifOrCaseStatement(self, parent):
+        ifToken = self.tokens[self.pos]
+        self.pos += 1
+        condition = self.expression(None)
+
+        if self.la() == P.IS and self.la(2) == TRUE:
+            ctx = self.enterAt(P.IfStatementContext, parent, ifToken, condition)
+            self.match(ctx, P.IS)
+            self.match(ctx, TRUE)
+            self.match(ctx, P.DO)
+            trueCtx = self.enter(P.TrueStatementContext, ctx)
+            self.statement(trueCtx)
+            self.exit(trueCtx)
+            if self.la() == P.ELSE:
+                self.match(ctx, P.ELSE)
+                falseCtx = self.enter(P.FalseStatementContext, ctx)
+                self.statement(falseCtx)
+                self.exit(falseCtx)
+        else:
+            ctx = self.enterAt(P.CaseStatementContext, parent, ifToken, condition)
+            listCtx = self.enter(P.CaseBranchListContext, ctx)
+            while self.la() == P.IS:
+                self.caseBranch(listCtx)
+            self.exit(listCtx)
+            if self.la() == P.DEFAULT:
+                self.match(ctx, P.DEFAULT)
+                self.match(ctx, P.DO)
+                self.statement(ctx)
+        return self.exit(ctx)
+
+    # Create a statement context around a keyword and an expression that
+    # were parsed before it.
+    def enterAt(self, contextClass, parent, keyword, expression):
+        ctx = self.enter(contextClass, parent)
+        ctx.start = keyword
+        ctx.addTokenNode(keyword)
+        ctx.addChild(expression)
+        expression.parentCtx = ctx
+        return ctx
+
+    def caseBranch(self, parent):
+        ctx = self.enter(P.CaseBranchContext, parent)
+        self.match(ctx, P.IS)
+        listCtx = self.enter(P.CaseConstantListContext, ctx)
+        self.caseConstant(listCtx)
+        while self.la() == COMMA:
+            self.match(listCtx, COMMA)
+            self.caseConstant(listCtx)
+        self.exit(listCtx)
+        self.match(ctx, P.DO)
+        self.statement(ctx)
+        return self.exit(ctx)
+
+    def caseConstant(self, parent):
+        ctx = self.enter(P.CaseConstantContext, parent)
+        self.constant(ctx)
+        return self.exit(ctx)
+
+    def whileStatement(self, parent):
+        ctx = self.enter(P.WhileStatementContext, parent)
+        self.match(ctx, P.WHILE)
+        self.expression(ctx)
+        self.match(ctx, P.IS)
+        self.match(ctx, TRUE)
+        self.match(ctx, P.KEEP)
+        self.match(ctx, P.DOING)
+        self.statement(ctx)
+        return self.exit(ctx)
+
+    def forStatement(self, parent):
+        ctx = self.enter(P.ForStatementContext, parent)
+        self.match(ctx, P.FOR)
+        self.match(ctx, P.INDEX)
+        self.variable(ctx)
+        self.match(ctx, P.START)
+        self.match(ctx, P.AT)
+        self.expression(ctx)
+        self.match(ctx, P.AND)
+        self.match(ctx, P.WHILE)
+        self.expression(ctx)
+        self.match(ctx, P.KEEP)
+        self.match(ctx, P.DOING)
+        self.statement(ctx)
+        self.match(ctx, P.UPDATE)
+        self.assignmentStatement(ctx)
+        self.match(ctx, SEMICOLON)
+        return self.exit(ctx)
+
+    def printStatement(self, parent):
+        ctx = self.enter(P.PrintStatementContext, parent)
+        self.match(ctx, P.PRINT)
+        self.writeArguments(ctx)
+        return self.exit(ctx)
+
+    def printlnStatement(self, parent):
+        ctx = self.enter(P.PrintlnStatementContext, parent)
+        self.match(ctx, P.PRINTLN)
+        if self.la() == LPAREN:
+            self.writeArguments(ctx)
+        return self.exit(ctx)
+
+    def writeArguments(self, parent):
+        ctx = self.enter(P.WriteArgumentsContext, parent)
+        self.match(ctx, LPAREN)
+        self.writeArgument(ctx)
+        while self.la() == COMMA:
+            self.match(ctx, COMMA)
+            self.writeArgument(ctx)
+        self.match(ctx, RPAREN)
+        return self.exit(ctx)
+
+    def writeArgument(self, parent):
+        ctx = self.enter(P.WriteArgumentContext, parent)
+        self.expression(ctx)
+        if self.la() == COLON:
+            self.match(ctx, COLON)
+            widthCtx = self.enter(P.FieldWidthContext, ctx)
+            if self.la() in SIGNS:
+                self.sign(widthCtx)
+            self.integerConstant(widthCtx)
+            if self.la() == COLON:
+                self.match(widthCtx, COLON)
+                placesCtx = self.enter(P.DecimalPlacesContext, widthCtx)
+                self.integerConstant(placesCtx)
+                self.exit(placesCtx)
+            self.exit(widthCtx)
+        return self.exit(ctx)
+
+    def readStatement(self, parent):
+        ctx = self.enter(P.ReadStatementContext, parent)
+        self.match(ctx, P.READ)
+        self.readArguments(ctx)
+        return self.exit(ctx)
+
+    def readlnStatement(self, parent):
+        ctx = self.enter(P.ReadlnStatementContext, parent)
+        self.match(ctx, P.READLN)
+        self.readArguments(ctx)
+        return self.exit(ctx)
+
+    def readArguments(self, parent):
+        ctx = self.enter(P.ReadArgumentsContext, parent)
+        self.match(ctx, LPAREN)
+        self.variable(ctx)
+        while self.la() == COMMA:
+            self.match(ctx, COMMA)
+            self.variable(ctx)
+        self.match(ctx, RPAREN)
+        return self.exit(ctx)
+
+    def functionCallStatement(self, parent):
+        ctx = self.enter(P.FunctionCallStatementContext, parent)
+        self.identifierRule(P.FunctionNameContext, ctx)
+        self.match(ctx, LPAREN)
+        if self.la() != RPAREN:
+            listCtx = self.enter(P.ArgumentListContext, ctx)
+            self.argument(listCtx)
+            while self.la() == COMMA:
+                self.match(listCtx, COMMA)
+                self.argument(listCtx)
+            self.exit(listCtx)
+        self.match(ctx, RPAREN)
+        return self.exit(ctx)
+
+    def argument(self, parent):
+        ctx = self.enter(P.ArgumentContext, parent)
+        self.expression(ctx)
+        return self.exit(ctx)
+
+    # ----- Expressions -----
+
+    def expression(self, parent):
+        ctx = self.enter(P.ExpressionContext, parent)
+        self.simpleExpression(ctx)
+        if self.la() in REL_OPS:
+            self.tokenRule(P.RelOpContext, ctx)
+            self.simpleExpression(ctx)
+        return self.exit(ctx)
+
+    def simpleExpression(self, parent):
+        ctx = self.enter(P.SimpleExpressionContext, parent)
+        if self.la() in SIGNS:
+            self.sign(ctx)
+        self.term(ctx)
+        while self.la() in ADD_OPS:
+            self.tokenRule(P.AddOpContext, ctx)
+            self.term(ctx)
+        return self.exit(ctx)
+
+    def term(self, parent):
+        ctx = self.enter(P.TermContext, parent)
+        self.factor(ctx)
+
+        # AND is also the keyword after a FOR statement's start expression.
+        while self.la() in MUL_OPS and self.la(2) in FACTOR_START:
+            self.tokenRule(P.MulOpContext, ctx)
+            self.factor(ctx)
+        return self.exit(ctx)
+
+    def factor(self, parent):
+        tokenType = self.la()
+
+        if tokenType == P.IDENTIFIER:
+            if self.la(2) == LPAREN:
+                ctx = self.enter(P.FunctionCallFactorContext, parent)
+                self.functionCallStatement(ctx)
+            else:
+                ctx = self.enter(P.VariableFactorContext, parent)
+                self.variable(ctx)
+        elif tokenType in (P.INTEGER, P.DECIMAL) or tokenType in SIGNS:
+            ctx = self.enter(P.NumberFactorContext, parent)
+            numberCtx = self.enter(P.NumberContext, ctx)
+            if tokenType in SIGNS:
+                self.sign(numberCtx)
+            self.unsignedNumber(numberCtx)
+            self.exit(numberCtx)
+        elif tokenType == P.CHARACTER:
+            ctx = self.enter(P.CharacterFactorContext, parent)
+            self.tokenRule(P.CharacterConstantContext, ctx)
+        elif tokenType == P.STRING:
+            ctx = self.enter(P.StringFactorContext, parent)
+            self.tokenRule(P.StringConstantContext, ctx)
+        elif tokenType == P.NOT:
+            ctx = self.enter(P.NotFactorContext, parent)
+            self.match(ctx, P.NOT)
+            self.factor(ctx)
+        elif tokenType == LPAREN:
+            ctx = self.enter(P.ParenthesizedFactorContext, parent)
+            self.match(ctx, LPAREN)
+            self.expression(ctx)
+            self.match(ctx, RPAREN)
+        else:
+            self.fail()
+        return self.exit(ctx)
+
+    def variable(self, parent):
+        ctx = self.enter(P.VariableContext, parent)
+        self.identifierRule(P.VariableIdentifierContext, ctx)
+        while True:
+            tokenType = self.la()
+            if tokenType == LBRACKET:
+                modifierCtx = self.enter(P.ModifierContext, ctx)
+                self.match(modifierCtx, LBRACKET)
+                listCtx = self.enter(P.IndexListContext, modifierCtx)
+                self.index(listCtx)
+                while self.la() == COMMA:
+                    self.match(listCtx, COMMA)
+                    self.index(listCtx)
+                self.exit(listCtx)
+                self.match(modifierCtx, RBRACKET)
+                self.exit(modifierCtx)
+            elif tokenType == DOT:
+                modifierCtx = self.enter(P.ModifierContext, ctx)
+                self.match(modifierCtx, DOT)
+                self.identifierRule(P.FieldContext, modifierCtx)
+                self.exit(modifierCtx)
+            else:
+                break
+        return self.exit(ctx)
+
+    def index(self, parent):
+        ctx = self.enter(P.IndexContext, parent)
+        self.expression(ctx)
+        return self.exit(ctx)
+
+    def unsignedNumber(self, parent):
+        ctx = self.enter(P.UnsignedNumberContext, parent)
+        tokenType = self.la()
+        if tokenType == P.INTEGER:
+            self.integerConstant(ctx)
+        elif tokenType == P.DECIMAL:
+            self.tokenRule(P.DecConstantContext, ctx)
+        else:
+            self.fail()
+        return self.exit(ctx)
+
+    def integerConstant(self, parent):
+        ctx = self.enter(P.IntegerConstantContext, parent)
+        self.match(ctx, P.INTEGER)
+        return self.exit(ctx)
+
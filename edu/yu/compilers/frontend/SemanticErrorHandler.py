@@ -1,6 +1,4 @@
 from enum import Enum
-from multipledispatch import dispatch
-from antlr4 import ParserRuleContext
 
 
 class SemanticErrorHandler:
@@ -40,8 +38,16 @@ class SemanticErrorHandler:
     def get_count(self):
         return self.count
 
-    @dispatch(Code, int, str)
-    def flag(self, code, lineNumber, text):
+    # Flag a semantic error.
+    # @param code       the error code.
+    # @param lineNumber the line number, or the AST node of the error.
+    # @param text       the text near the error, None with a node.
+    def flag(self, code, lineNumber, text=None):
+        if text is None:
+            ctx = lineNumber
+            lineNumber = ctx.start.line
+            text = ctx.getText()
+
         if self.count == 0:
             print("\n===== SEMANTIC ERRORS =====\n")
             print("{:<4} {:<40} {}".format("Line", "Message", "Found near"))
@@ -50,7 +56,3 @@ class SemanticErrorHandler:
         self.count += 1
 
         print("{:03d}  {:<40} \"{}\"".format(lineNumber, code.message, text))
-
-    @dispatch(Code, ParserRuleContext)
-    def flag(self, code, ctx):
-        self.flag(code, ctx.start.line, ctx.getText())
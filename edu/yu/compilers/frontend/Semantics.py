@@ -2,9 +2,9 @@
 #  Perform type checking and create symbol tables.
 import re
 
-from gen.GraspParser import GraspParser
-from gen.GraspVisitor import GraspVisitor
 from edu.yu.compilers.frontend.SemanticErrorHandler import SemanticErrorHandler
+from edu.yu.compilers.intermediate.ast import Ast
+from edu.yu.compilers.intermediate.ast.AstVisitor import AstVisitor
 from edu.yu.compilers.intermediate.symtable.Kind import Kind
 from edu.yu.compilers.intermediate.symtable.Predefined import Predefined
 from edu.yu.compilers.intermediate.symtable.Routine import Routine
@@ -17,12 +17,13 @@ from edu.yu.compilers.intermediate.util.BackendMode import BackendMode
 from edu.yu.compilers.intermediate.util.CrossReferencer import CrossReferencer
 
 
-class Semantics(GraspVisitor):
+class Semantics(AstVisitor):
 
     def __init__(self, mode):
         # Create and initialize the symbol table stack.
         self.symTableStack = SymTableStack()
         Predefined.initialize(self.symTableStack)
+        TypeChecker.initialize()
 
         self.mode = mode
         self.error = SemanticErrorHandler()
@@ -60,15 +61,15 @@ class Semantics(GraspVisitor):
     #     crossReferencer.printCrossRefTable(self.symTableStack)
 
     def visitProgram(self, ctx):
-        self.visit(ctx.programHeader())
-        self.visit(ctx.block().declarations())
-        self.visit(ctx.block().compoundStatement())
+        self.visit(ctx.programHeader)
+        self.visit(ctx.block.declarations)
+        self.visit(ctx.block.compoundStatement)
 
         return None
 
     def visitProgramHeader(self, ctx):
-        idCtx = ctx.programIdentifier()
-        programName = idCtx.IDENTIFIER().getText()  # don't shift case
+        idCtx = ctx.programIdentifier
+        programName = idCtx.name  # don't shift case
 
         self.programId = self.symTableStack.enterLocal(programName, Kind.PROGRAM)
         self.programId.setRoutineSymTable(self.symTableStack.push())
@@ -80,12 +81,12 @@ class Semantics(GraspVisitor):
         return None
 
     def visitConstantDefinition(self, ctx):
-        idCtx = ctx.constantIdentifier()
-        constantName = idCtx.IDENTIFIER().getText().lower()
+        idCtx = ctx.constantIdentifier
+        constantName = idCtx.key
         constantId = self.symTableStack.lookupLocal(constantName)
 
         if constantId is None:
-            constCtx = ctx.constant()
+            constCtx = ctx.constant
             constValue = self.visit(constCtx)
 
             constantId = self.symTableStack.enterLocal(constantName, Kind.CONSTANT)
@@ -104,8 +105,8 @@ class Semantics(GraspVisitor):
         return None
 
     def visitConstant(self, ctx):
-        if ctx.IDENTIFIER() is not None:
-            constantName = ctx.IDENTIFIER().getText().lower()
+        if ctx.name is not None:
+            constantName = ctx.key
             constantId = self.symTableStack.lookup(constantName)
 
             if constantId is not None:
@@ -123,11 +124,11 @@ class Semantics(GraspVisitor):
                 ctx.type_ = Predefined.integerType
                 ctx.value = 0
 
-        elif ctx.characterConstant() is not None:
+        elif ctx.characterConstant is not None:
             ctx.type_ = Predefined.charType
             ctx.value = ctx.getText().charAt(1)
-        elif ctx.stringConstant() is not None:
-            graspString = ctx.stringConstant().STRING().getText()
+        elif ctx.stringConstant is not None:
+            graspString = ctx.stringConstant.getText()
             unquoted = graspString[1, graspString.length() - 1]
             ctx.type_ = Predefined.stringType
             ctx.value = unquoted.replace("''", "'").replace("\"", "\\\"")
@@ -141,15 +142,15 @@ class Semantics(GraspVisitor):
 
         return ctx.value
 
-    def visitTypeDefinition(self, ctx: GraspParser.TypeDefinitionContext):
-        idCtx = ctx.typeIdentifier()
-        typeName = idCtx.IDENTIFIER().getText().lower()
+    def visitTypeDefinition(self, ctx: Ast.TypeDefinition):
+        idCtx = ctx.typeIdentifier
+        typeName = idCtx.key
         typeId = self.symTableStack.lookupLocal(typeName)
 
-        typespecCtx = ctx.typeSpecification()
+        typespecCtx = ctx.typeSpecification
 
         # If it's a record type, create a named record type.
-        if isinstance(typespecCtx, GraspParser.RecordTypespecContext):
+        if isinstance(typespecCtx, Ast.RecordTypespec):
             if self.symTableStack.lookupLocal(typeName) is None:
                 typeId = self.createRecordType(typespecCtx, typeName)  # TODO ??? highilighted portion?
             else:
@@ -160,8 +161,15 @@ class Semantics(GraspVisitor):
             self.visit(typespecCtx)
 
             typeId = self.symTableStack.enterLocal(typeName, Kind.TYPE)
+
+            # Name only a new type. An alias such as myint = integer must
+            # not rename the (shared) predefined type, and a shared array
+            # or subrange type is named as a copy.
+            if typespecCtx.type_.getName() is None:
+                if typespecCtx.type_.isShared():
+                    typespecCtx.type_ = typespecCtx.type_.copy()
+                typespecCtx.type_.setIdentifier(typeId.getName(), typeId.getSymTable())  # setIdentifier(typeId)
             typeId.setType(typespecCtx.type_)
-            typespecCtx.type_.setIdentifier(typeId.getName(), typeId.getSymTable())  # setIdentifier(typeId)
         # Redeclared identifier.
         else:
             self.error.flag(SemanticErrorHandler.Code.REDECLARED_IDENTIFIER, ctx)
@@ -172,7 +180,7 @@ class Semantics(GraspVisitor):
         typeId.appendLineNumber(ctx.start.line)
         return None
 
-    def visitRecordTypespec(self, ctx: GraspParser.RecordTypespecContext):
+    def visitRecordTypespec(self, ctx: Ast.RecordTypespec):
         # Create an unnamed record type.
         recordTypeName = SymTable.generateUnnamedName()
         self.createRecordType(ctx, recordTypeName)  # FIXME ?
@@ -186,7 +194,7 @@ class Semantics(GraspVisitor):
     # @return the symbol table entry of the record type identifier.
 
     def createRecordType(self, recordTypeSpecCtx, recordTypeName):
-        recordTypeCtx = recordTypeSpecCtx.recordType()
+        recordTypeCtx = recordTypeSpecCtx.recordType
         recordType = Typespec(Form.RECORD)
 
         recordTypeId = self.symTableStack.enterLocal(recordTypeName, Kind.TYPE)
@@ -197,7 +205,7 @@ class Semantics(GraspVisitor):
         recordType.setRecordTypePath(recordTypePath)
 
         # Enter the record fields into the record type's symbol table.
-        recordSymTable = self.createRecordSymTable(recordTypeCtx.recordFields(), recordTypeId)
+        recordSymTable = self.createRecordSymTable(recordTypeCtx.recordFields, recordTypeId)
         recordType.setRecordSymTable(recordSymTable)
 
         recordTypeCtx.entry = recordTypeId
@@ -231,32 +239,32 @@ class Semantics(GraspVisitor):
         recordSymTable = self.symTableStack.push()
 
         recordSymTable.setOwner(ownerId)
-        self.visit(ctx.variableDeclarationsList())
+        self.visit(ctx.variableDeclarationsList)
         recordSymTable.resetVariables(Kind.RECORD_FIELD)
         self.symTableStack._pop()
 
         return recordSymTable
 
     def visitSimpleTypespec(self, ctx):
-        self.visit(ctx.simpleType())
-        ctx.type_ = ctx.simpleType().type_
+        self.visit(ctx.simpleType)
+        ctx.type_ = ctx.simpleType.type_
 
         return None
 
-    def visitArrayElemType(self, ctx:GraspParser.ArrayElemTypeContext):
-        self.visit(ctx.simpleType())
-        ctx.type_ = ctx.simpleType().type_
+    def visitArrayElemType(self, ctx:Ast.ArrayElemType):
+        self.visit(ctx.simpleType)
+        ctx.type_ = ctx.simpleType.type_
 
         return None
 
     def visitTypeIdentifierTypespec(self, ctx):
-        self.visit(ctx.typeIdentifier())
-        ctx.type_ = ctx.typeIdentifier().type_
+        self.visit(ctx.typeIdentifier)
+        ctx.type_ = ctx.typeIdentifier.type_
 
         return None
 
     def visitTypeIdentifier(self, ctx):
-        typeName = ctx.IDENTIFIER().getText().lower()
+        typeName = ctx.key
         typeId = self.symTableStack.lookup(typeName)
 
         if typeId is not None:
@@ -280,9 +288,9 @@ class Semantics(GraspVisitor):
         value = -1
 
         # Loop over the enumeration constants.
-        for constCtx in ctx.enumerationType().enumerationConstant():
-            constIdCtx = constCtx.constantIdentifier()
-            constantName = constIdCtx.IDENTIFIER().getText().lower()
+        for constCtx in ctx.enumerationType.enumerationConstant:
+            constIdCtx = constCtx.constantIdentifier
+            constantName = constIdCtx.key
             constantId = self.symTableStack.lookupLocal(constantName)
 
             if constantId is None:
@@ -305,10 +313,9 @@ class Semantics(GraspVisitor):
         return None
 
     def visitSubrangeTypespec(self, ctx):
-        type = Typespec(Form.SUBRANGE)
-        subCtx = ctx.subrangeType()
-        minCtx = subCtx.constant()[0]
-        maxCtx = subCtx.constant()[1]
+        subCtx = ctx.subrangeType
+        minCtx = subCtx.constant[0]
+        maxCtx = subCtx.constant[1]
 
         minObj = self.visit(minCtx)
         maxObj = self.visit(maxCtx)
@@ -339,39 +346,30 @@ class Semantics(GraspVisitor):
             self.error.flag(SemanticErrorHandler.Code.INVALID_CONSTANT, maxCtx)
             maxValue = minValue
 
-        type.setSubrangeBaseType(minType)
-        type.setSubrangeMinValue(minValue)
-        type.setSubrangeMaxValue(maxValue)
-
-        ctx.type_ = type
+        ctx.type_ = Typespec.subrangeOf(minType, minValue, maxValue)
         return None
 
     def visitArrayTypespec(self, ctx):
-        arrayType = Typespec(Form.ARRAY)
-        arrayCtx = ctx.arrayType()
-        listCtx = arrayCtx.arrayDimensionList()
-
-        ctx.type_ = arrayType # arrayTypespec.type_
+        arrayCtx = ctx.arrayType
+        listCtx = arrayCtx.arrayDimensionList
 
         # FIXME THIS CODE PORTION IS UNNECCESARY FOR OUR LANGUAGE - NO VARYING INDEX TYPES OR RANGES OF INDEX TYPE.
         # Loop over the array dimensions.
-        count = len(listCtx.expression())  # simpleType().size()
+        count = len(listCtx.expression)  # simpleType().size()
         for i in range(0, count):
-            exprCtx = listCtx.expression()[i]
+            exprCtx = listCtx.expression[i]
             self.visit(exprCtx)
-            arrayType.setArrayIndexType(Predefined.integerType)
-            arrayType.setArrayElementCount(5) # TODO UNNACEPTABLE
-
-            if i < count - 1:
-                elementType = Typespec(Form.ARRAY)
-                arrayType.setArrayElementType(elementType)
-                arrayType = elementType
         #  ---------------------------------------------------------------------------------
 
-        self.visit(arrayCtx.arrayElemType())
-        elementType = arrayCtx.arrayElemType().type_  # arrayTypeSpec -> arrayType -> arrayElemType.type_
-        arrayType.setArrayElementType(elementType)
+        self.visit(arrayCtx.arrayElemType)
+        arrayType = arrayCtx.arrayElemType.type_  # arrayTypeSpec -> arrayType -> arrayElemType.type_
 
+        # Wrap the element type in the dimensions from the innermost out,
+        # so that equal array types are one shared Typespec.
+        for i in range(max(count, 1)):
+            arrayType = Typespec.arrayOf(Predefined.integerType, 5, arrayType)  # TODO UNNACEPTABLE count
+
+        ctx.type_ = arrayType # arrayTypespec.type_
         return None
 
     # Return the number of values in a datatype.
@@ -393,15 +391,15 @@ class Semantics(GraspVisitor):
         return count
 
     def visitVariableDeclarations(self, ctx):
-        typeCtx = ctx.typeSpecification()
+        typeCtx = ctx.typeSpecification
         self.visit(typeCtx)
 
-        listCtx = ctx.variableIdentifierList()
+        listCtx = ctx.variableIdentifierList
 
         # Loop over the variables being declared.
-        for idCtx in listCtx.variableIdentifier():
+        for idCtx in listCtx.variableIdentifier:
             lineNumber = idCtx.start.line
-            variableName = idCtx.IDENTIFIER().getText().lower()
+            variableName = idCtx.key
             pat = re.compile("[a-zA-Z][a-zA-Z0-9]*")
             if not pat.match(variableName):
                 self.error.flag(SemanticErrorHandler.Code.INVALID_VARIABLE, ctx)
@@ -411,10 +409,9 @@ class Semantics(GraspVisitor):
                 variableId = self.symTableStack.enterLocal(variableName, Kind.VARIABLE)
                 variableId.setType(typeCtx.type_)
 
-                # Assign slot numbers to local variables.
-                symTable = variableId.getSymTable()
-                if symTable.getNestingLevel() > 1:
-                    variableId.setSlotNumber(symTable.nextSlotNumber())
+                # Assign slot numbers to variables. The program's variables
+                # have slots in the global frame of the COMPILER backend's VM.
+                variableId.setSlotNumber(variableId.getSymTable().nextSlotNumber())
 
                 idCtx.entry = variableId
             else:
@@ -425,7 +422,7 @@ class Semantics(GraspVisitor):
         return None
 
     def visitRoutineDefinition(self, ctx):
-        funcCtx = ctx.functionHead()
+        funcCtx = ctx.functionHead
         # procCtx = ctx.procedureHead() # we do not have procedures
         idCtx = None
         parameters = None
@@ -433,13 +430,13 @@ class Semantics(GraspVisitor):
         returnType = None
 
         if functionDefinition:
-            idCtx = funcCtx.routineIdentifier()
-            parameters = funcCtx.parameters()
+            idCtx = funcCtx.routineIdentifier
+            parameters = funcCtx.parameters
         # else :
-        #     idCtx = procCtx.routineIdentifier()
-        #     parameters = procCtx.parameters()
+        #     idCtx = procCtx.routineIdentifier
+        #     parameters = procCtx.parameters
 
-        routineName = idCtx.IDENTIFIER().getText().lower()
+        routineName = idCtx.key
         routineId = self.symTableStack.lookupLocal(routineName)
 
         if routineId is not None:
@@ -449,7 +446,7 @@ class Semantics(GraspVisitor):
         # this is an in line conditional in python - cool
         routineId = self.symTableStack.enterLocal(routineName, Kind.FUNCTION if functionDefinition else Kind.PROCEDURE)
         routineId.setRoutineCode(Routine.DECLARED)
-        if funcCtx.FINAL() is not None:
+        if funcCtx.final is not None:
             routineId.setImmutable(True)
         if self.symTableStack.getCurrentNestingLevel() > 1:
             routineId.setNested(True)
@@ -466,14 +463,14 @@ class Semantics(GraspVisitor):
         symTable.setOwner(routineId)
 
         if parameters is not None:
-            parameterIds = self.visit(parameters.parameterDeclarationsList())
+            parameterIds = self.visit(parameters.parameterDeclarationsList)
             routineId.setRoutineParameters(parameterIds)
 
             for paramId in parameterIds:
                 paramId.setSlotNumber(symTable.nextSlotNumber())
 
         if functionDefinition:
-            typeIdCtx = funcCtx.typeIdentifier()
+            typeIdCtx = funcCtx.typeIdentifier
             self.visit(typeIdCtx)
             returnType = typeIdCtx.type_
 
@@ -485,24 +482,24 @@ class Semantics(GraspVisitor):
         else:
             idCtx.type_ = None
 
-        self.visit(ctx.block().declarations())
+        self.visit(ctx.block.declarations)
 
         # Enter the function's associated variable into its symbol table.
         if functionDefinition:
             assocVarId = self.symTableStack.enterLocal(routineName, Kind.VARIABLE)
             assocVarId.setSlotNumber(symTable.nextSlotNumber())
             assocVarId.setType(returnType)
-        functionStatements = ctx.block().compoundStatement().statementList().statement()
+        functionStatements = ctx.block.compoundStatement.statementList.statement
         if len(functionStatements) < 3:
             routineId.setInline(True)
 
         for stmt in functionStatements:
-            if stmt.returnStatement() is not None:
-                self.visit(stmt.returnStatement().expression())
-                if stmt.returnStatement().expression().type_ != returnType:
-                    self.error.flag(SemanticErrorHandler.Code.INVALID_RETURN_TYPE, funcCtx.typeIdentifier())
-        self.visit(ctx.block().compoundStatement())
-        routineId.setExecutable(ctx.block().compoundStatement())
+            if stmt.returnStatement is not None:
+                self.visit(stmt.returnStatement.expression)
+                if stmt.returnStatement.expression.type_ != returnType:
+                    self.error.flag(SemanticErrorHandler.Code.INVALID_RETURN_TYPE, funcCtx.typeIdentifier)
+        self.visit(ctx.block.compoundStatement)
+        routineId.setExecutable(ctx.block.compoundStatement)
         self.symTableStack._pop()
         return None
 
@@ -510,7 +507,7 @@ class Semantics(GraspVisitor):
         parameterList = []
 
         # Loop over the parameter declarations.
-        for dclCtx in ctx.parameterDeclaration():
+        for dclCtx in ctx.parameterDeclaration:
             # parameterSublist = self.visit(dclCtx)
             # parameterList.extend(parameterSublist)
             parameter = self.visit(dclCtx)
@@ -519,23 +516,23 @@ class Semantics(GraspVisitor):
         return parameterList
 
     def visitParameterDeclaration(self, ctx):
-        kind = Kind.REFERENCE_PARAMETER if (ctx.VAR() is not None) else Kind.VALUE_PARAMETER  # kind #already see a prob here
-        typeCtx = ctx.typeIdentifier()
+        kind = Kind.REFERENCE_PARAMETER if (ctx.var is not None) else Kind.VALUE_PARAMETER  # kind #already see a prob here
+        typeCtx = ctx.typeIdentifier
 
         self.visit(typeCtx)
         paramType = typeCtx.type_
         # we have type now we just need the id
         # parameterSublist = []
-        param = ctx.parameterIdentifier()
+        param = ctx.parameterIdentifier
         lineNumber = param.start.line
-        paramName = param.IDENTIFIER().getText().lower()
+        paramName = param.key
         paramId = self.symTableStack.lookupLocal(paramName)
 
         if paramId is None:
             paramId = self.symTableStack.enterLocal(paramName, kind)
             paramId.setType(paramType)
 
-            if (kind == Kind.REFERENCE_PARAMETER) and (self.mode != BackendMode.EXECUTOR) and (
+            if (kind == Kind.REFERENCE_PARAMETER) and (self.mode == BackendMode.CONVERTER) and (
                     paramType.getForm() == Form.SCALAR):
                 self.error.flag(SemanticErrorHandler.Code.INVALID_REFERENCE_PARAMETER, param)
 
@@ -550,15 +547,15 @@ class Semantics(GraspVisitor):
         return paramId
 
     # ? type checker converted?
-    def visitAssignmentStatement(self, ctx: GraspParser.AssignmentStatementContext):
-        lhsCtx = ctx.lhs()
-        rhsCtx = ctx.rhs()
+    def visitAssignmentStatement(self, ctx: Ast.AssignmentStatement):
+        lhsCtx = ctx.lhs
+        rhsCtx = ctx.rhs
 
         self.visit(lhsCtx)  # TODO why not self.visitChildren()?
         self.visit(rhsCtx)
 
         lhsType = lhsCtx.type_
-        rhsType = rhsCtx.expression().type_
+        rhsType = rhsCtx.expression.type_
 
         if not TypeChecker.areAssignmentCompatible(lhsType, rhsType):
             self.error.flag(SemanticErrorHandler.Code.INCOMPATIBLE_ASSIGNMENT, rhsCtx)
@@ -569,8 +566,8 @@ class Semantics(GraspVisitor):
     def visitLhs(self, ctx):
 
         # if symTable.getNestingLevel() > 1:
-        varCtx = ctx.variable()
-        varST = self.symTableStack.lookup(varCtx.variableIdentifier().IDENTIFIER().getText().lower()).getSymTable()
+        varCtx = ctx.variable
+        varST = self.symTableStack.lookup(varCtx.variableIdentifier.key).getSymTable()
         currentScope = self.symTableStack.getLocalSymTable().getOwner()
         if varST.getNestingLevel() <= 1 and currentScope.getKind() == Kind.FUNCTION and currentScope.isImmutable():
             self.error.flag(SemanticErrorHandler.Code.IMMUTABLE_FUNCTION, ctx)
@@ -580,9 +577,9 @@ class Semantics(GraspVisitor):
         return None
 
     def visitIfStatement(self, ctx):
-        exprCtx = ctx.expression()
-        trueCtx = ctx.trueStatement()
-        falseCtx = ctx.falseStatement()
+        exprCtx = ctx.expression
+        trueCtx = ctx.trueStatement
+        falseCtx = ctx.falseStatement
 
         self.visit(exprCtx)
         exprType = exprCtx.type_
@@ -597,7 +594,7 @@ class Semantics(GraspVisitor):
         return None
 
     def visitCaseStatement(self, ctx):
-        exprCtx = ctx.expression()
+        exprCtx = ctx.expression
         self.visit(exprCtx)
         exprType = exprCtx.type_
         exprTypeForm = exprType.getForm()
@@ -608,17 +605,17 @@ class Semantics(GraspVisitor):
             exprType = Predefined.integerType
 
         constants = set()
-        branchListCtx = ctx.caseBranchList()
+        branchListCtx = ctx.caseBranchList
 
         # Loop over the CASE branches.
-        for branchCtx in branchListCtx.caseBranch():
-            constListCtx = branchCtx.caseConstantList()
-            stmtCtx = branchCtx.statement()
+        for branchCtx in branchListCtx.caseBranch:
+            constListCtx = branchCtx.caseConstantList
+            stmtCtx = branchCtx.statement
 
             if constListCtx is not None:
                 # Loop over the CASE constants in each branch.
-                for caseConstCtx in constListCtx.caseConstant():
-                    constCtx = caseConstCtx.constant()
+                for caseConstCtx in constListCtx.caseConstant:
+                    constCtx = caseConstCtx.constant
                     constValue = self.visit(constCtx)
 
                     caseConstCtx.type_ = constCtx.type_
@@ -646,46 +643,46 @@ class Semantics(GraspVisitor):
         return None
 
     def visitRepeatStatement(self, ctx):
-        exprCtx = ctx.expression()
+        exprCtx = ctx.expression
         self.visit(exprCtx)
         exprType = exprCtx.type_
 
         if not TypeChecker.isBoolean(exprType):
             self.error.flag(SemanticErrorHandler.Code.TYPE_MUST_BE_BOOLEAN, exprCtx)
 
-        self.visit(ctx.statementList())
+        self.visit(ctx.statementList)
         return None
 
     def visitWhileStatement(self, ctx):
-        exprCtx = ctx.expression()
+        exprCtx = ctx.expression
         self.visit(exprCtx)
         exprType = exprCtx.type_
 
         if not TypeChecker.isBoolean(exprType):
             self.error.flag(SemanticErrorHandler.Code.TYPE_MUST_BE_BOOLEAN, exprCtx)
 
-        self.visit(ctx.statement())
+        self.visit(ctx.statement)
         return None
 
     def visitForStatement(self, ctx):
-        varCtx = ctx.variable()
+        varCtx = ctx.variable
         self.visit(varCtx)
 
-        controlName = varCtx.variableIdentifier().getText().lower()
+        controlName = varCtx.variableIdentifier.key
         controlType = Predefined.integerType
 
         if varCtx.entry is not None:
             controlType = varCtx.type_
 
             if (controlType.getForm() != Form.SCALAR) or (controlType == Predefined.realType) or (
-                    controlType == Predefined.stringType) or (len(varCtx.modifier()) != 0):
+                    controlType == Predefined.stringType) or (len(varCtx.modifier) != 0):
                 self.error.flag(SemanticErrorHandler.Code.INVALID_CONTROL_VARIABLE, varCtx)
         else:
             self.error.flag(SemanticErrorHandler.Code.UNDECLARED_IDENTIFIER, ctx.start.line,
                             controlName)  # TODO getStart() or just start?
 
-        startCtx = ctx.expression()[0]
-        endCtx = ctx.expression()[1]
+        startCtx = ctx.expression[0]
+        endCtx = ctx.expression[1]
 
         self.visit(startCtx)
         self.visit(endCtx)
@@ -696,13 +693,14 @@ class Semantics(GraspVisitor):
             pass
             # self.error.flag(SemanticErrorHandler.Code.TYPE_MISMATCH, endCtx)
 
-        self.visit(ctx.statement())
+        self.visit(ctx.statement)
+        self.visit(ctx.assignmentStatement)
         return None
 
     def visitProcedureCallStatement(self, ctx):
-        nameCtx = ctx.procedureName()
-        listCtx = ctx.argumentList()
-        name = ctx.procedureName().getText().lower()
+        nameCtx = ctx.procedureName
+        listCtx = ctx.argumentList
+        name = ctx.procedureName.getText().lower()
         procedureId = self.symTableStack.lookup(name)
         badName = False
         if procedureId is None:
@@ -716,7 +714,7 @@ class Semantics(GraspVisitor):
         # Bad procedure name. Do a simple arguments check and then leave.
 
         if badName:
-            for exprCtx in listCtx.argument():
+            for exprCtx in listCtx.argument:
                 self.visit(exprCtx)
 
         # Good procedure name.
@@ -729,13 +727,20 @@ class Semantics(GraspVisitor):
         return None
 
     def visitFunctionCallFactor(self, ctx):
-        callCtx = ctx.functionCallStatement()
-        nameCtx = callCtx.functionName()
-        listCtx = callCtx.argumentList()
-        name = callCtx.functionName().getText().lower()
+        callCtx = ctx.functionCallStatement
+        self.visit(callCtx)
+        ctx.type_ = callCtx.functionName.type_
+
+        return None
+
+    # A call as a statement, or the call of a function call factor.
+    def visitFunctionCallStatement(self, ctx):
+        nameCtx = ctx.functionName
+        listCtx = ctx.argumentList
+        name = nameCtx.key
         functionId = self.symTableStack.lookup(name)
         badName = False
-        ctx.type_ = Predefined.integerType
+        callType = Predefined.integerType
         if functionId is None:
             self.error.flag(SemanticErrorHandler.Code.UNDECLARED_IDENTIFIER, nameCtx)
             badName = True
@@ -746,7 +751,7 @@ class Semantics(GraspVisitor):
         # Bad function name. Do a simple arguments check and then leave.
 
         if badName:
-            for exprCtx in listCtx.argument():
+            for exprCtx in listCtx.argument:
                 self.visit(exprCtx)
 
         # Good function name.
@@ -755,16 +760,16 @@ class Semantics(GraspVisitor):
             parameters = functionId.getRoutineParameters()
             self.checkCallArguments(listCtx, parameters)
 
-            ctx.type_ = functionId.getType()
+            callType = functionId.getType()
 
         nameCtx.entry = functionId
-        nameCtx.type_ = ctx.type_
+        nameCtx.type_ = callType
 
         return None
 
     def checkCallArguments(self, listCtx, parameters):
         paramsCount = len(parameters)
-        argsCount = len(listCtx.argument()) if listCtx is not None else 0
+        argsCount = len(listCtx.argument) if listCtx is not None else 0
 
         if paramsCount != argsCount:
             self.error.flag(SemanticErrorHandler.Code.ARGUMENT_COUNT_MISMATCH, listCtx)
@@ -772,9 +777,9 @@ class Semantics(GraspVisitor):
         # Check each argument against the corresponding parameter.
 
         for i in range(paramsCount):
-            argCtx = listCtx.argument()[i]
+            argCtx = listCtx.argument[i]
 
-            exprCtx = argCtx.expression()
+            exprCtx = argCtx.expression
             self.visit(exprCtx)
 
             paramId = parameters[i]
@@ -809,20 +814,20 @@ class Semantics(GraspVisitor):
 
     def expression_is_variable(self, expr_ctx):
         # Only a single simple expression?
-        if len(expr_ctx.simpleExpression()) == 1:
-            simple_ctx = expr_ctx.simpleExpression(0)
+        if len(expr_ctx.simpleExpression) == 1:
+            simple_ctx = expr_ctx.simpleExpression[0]
             # Only a single term?
-            if len(simple_ctx.term()) == 1:
-                term_ctx = simple_ctx.term(0)
+            if len(simple_ctx.term) == 1:
+                term_ctx = simple_ctx.term[0]
 
                 # Only a single factor?
-                if len(term_ctx.factor()) == 1:
-                    return isinstance(term_ctx.factor(0), GraspParser.VariableFactorContext)
+                if len(term_ctx.factor) == 1:
+                    return isinstance(term_ctx.factor[0], Ast.VariableFactor)
 
         return False
 
     def visitExpression(self, ctx):
-        simpleCtx1 = ctx.simpleExpression()[0]
+        simpleCtx1 = ctx.simpleExpression[0]
 
         # First simple expression.
         self.visit(simpleCtx1)
@@ -830,12 +835,12 @@ class Semantics(GraspVisitor):
         simpleType1 = simpleCtx1.type_
         ctx.type_ = simpleType1
 
-        relOpCtx = ctx.relOp()
+        relOpCtx = ctx.relOp
 
         # Second simple expression?
 
         if relOpCtx is not None:
-            simpleCtx2 = ctx.simpleExpression()[1]
+            simpleCtx2 = ctx.simpleExpression[1]
 
             self.visit(simpleCtx2)
             simpleType2 = simpleCtx2.type_
@@ -868,10 +873,10 @@ class Semantics(GraspVisitor):
         return None
 
     def visitSimpleExpression(self, ctx):
-        count = len(ctx.term())
-        signCtx = ctx.sign()
+        count = len(ctx.term)
+        signCtx = ctx.sign
         hasSign = signCtx is not None
-        termCtx1 = ctx.term()[0]  # TODO Is this correct? is it not [0]
+        termCtx1 = ctx.term[0]  # TODO Is this correct? is it not [0]
 
         if hasSign:
             sign = signCtx.getText()
@@ -884,8 +889,8 @@ class Semantics(GraspVisitor):
 
         # Loop over any subsequent terms.
         for i in range(1, count):
-            op = ctx.addOp()[i - 1].getText().lower()  # TODO get?
-            termCtx2 = ctx.term()[i]  # TODO get?
+            op = ctx.addOp[i - 1].getText().lower()  # TODO get?
+            termCtx2 = ctx.term[i]  # TODO get?
             self.visit(termCtx2)
             termType2 = termCtx2.type_
 
@@ -903,22 +908,14 @@ class Semantics(GraspVisitor):
                 termType2 = Predefined.booleanType
             elif op == "+":
                 # Both operands integer ==> integer result
-                if TypeChecker.areBothInteger(termType1, termType2):
-                    termType2 = Predefined.integerType
-
-
                 # Both real operands ==> real result
                 # One real and one integer operand ==> real result
-                elif TypeChecker.isAtLeastOneReal(termType1, termType2):
-                    termType2 = Predefined.realType
-
-
                 # Both operands string ==> string result
-                elif TypeChecker.areBothString(termType1, termType2):
-                    if hasSign:
+                resultType = TypeChecker.sumType(termType1, termType2)
+                if resultType is not None:
+                    if hasSign and (resultType is Predefined.stringType):
                         self.error.flag(SemanticErrorHandler.Code.INVALID_SIGN, signCtx)
-                    termType2 = Predefined.stringType
-
+                    termType2 = resultType
 
                 # Type mismatch.
                 else:
@@ -932,12 +929,11 @@ class Semantics(GraspVisitor):
 
             else:
                 # Both operands integer ==> integer result
-                if TypeChecker.areBothInteger(termType1, termType2):
-                    termType2 = Predefined.integerType
                 # Both real operands ==> real result
                 # One real and one integer operand ==> real result
-                elif TypeChecker.isAtLeastOneReal(termType1, termType2):
-                    termType2 = Predefined.realType
+                resultType = TypeChecker.arithmeticType(termType1, termType2)
+                if resultType is not None:
+                    termType2 = resultType
                 # Type mismatch.
                 else:
                     if not TypeChecker.isIntegerOrReal(termType1):
@@ -952,8 +948,8 @@ class Semantics(GraspVisitor):
         return None
 
     def visitTerm(self, ctx):
-        count = len(ctx.factor())
-        factorCtx1 = ctx.factor()[0]
+        count = len(ctx.factor)
+        factorCtx1 = ctx.factor[0]
 
         # First factor.
         self.visit(factorCtx1)
@@ -961,19 +957,18 @@ class Semantics(GraspVisitor):
 
         # Loop over any subsequent factors.
         for i in range(1, count):
-            op = ctx.mulOp()[i - 1].getText().lower()
-            factorCtx2 = ctx.factor()[i]
+            op = ctx.mulOp[i - 1].getText().lower()
+            factorCtx2 = ctx.factor[i]
             self.visit(factorCtx2)
             factorType2 = factorCtx2.type_
 
             if op == "*":
                 # Both operands integer  ==> integer result
-                if TypeChecker.areBothInteger(factorType1, factorType2):
-                    factorType2 = Predefined.integerType
-                    # Both real operands ==> real result
+                # Both real operands ==> real result
                 # One real and one integer operand ==> real result
-                elif TypeChecker.isAtLeastOneReal(factorType1, factorType2):
-                    factorType2 = Predefined.realType
+                resultType = TypeChecker.arithmeticType(factorType1, factorType2)
+                if resultType is not None:
+                    factorType2 = resultType
                     # Type mismatch.
                 else:
                     if not TypeChecker.isIntegerOrReal(factorType1):
@@ -985,9 +980,9 @@ class Semantics(GraspVisitor):
                         factorType2 = Predefined.integerType
             elif op == "/":
                 # All integer and real operand combinations ==> real result
-                if TypeChecker.areBothInteger(factorType1, factorType2) or TypeChecker.isAtLeastOneReal(factorType1,
-                                                                                                        factorType2):
-                    factorType2 = Predefined.realType
+                resultType = TypeChecker.quotientType(factorType1, factorType2)
+                if resultType is not None:
+                    factorType2 = resultType
                     # Type mismatch.
                 else:
                     if not TypeChecker.isIntegerOrReal(factorType1):
@@ -1022,7 +1017,7 @@ class Semantics(GraspVisitor):
         return None
 
     def visitVariableFactor(self, ctx):
-        varCtx = ctx.variable()
+        varCtx = ctx.variable
 
         self.visit(varCtx)
         ctx.type_ = varCtx.type_
@@ -1031,7 +1026,7 @@ class Semantics(GraspVisitor):
 
     def visitVariable(self, ctx):
 
-        varIdCtx = ctx.variableIdentifier()
+        varIdCtx = ctx.variableIdentifier
 
         self.visit(varIdCtx)
         ctx.entry = varIdCtx.entry
@@ -1040,7 +1035,7 @@ class Semantics(GraspVisitor):
         return None
 
     def visitVariableIdentifier(self, ctx):
-        variableName = ctx.IDENTIFIER().getText().lower()
+        variableName = ctx.key
         variableId = self.symTableStack.lookup(variableName)
 
         if variableId is not None:
@@ -1063,16 +1058,16 @@ class Semantics(GraspVisitor):
         dataType = varType
 
         # Loop over the modifiers.
-        for modCtx in varCtx.modifier():
+        for modCtx in varCtx.modifier:
             # Subscripts.
-            if modCtx.indexList() is not None:
-                indexListCtx = modCtx.indexList()
+            if modCtx.indexList is not None:
+                indexListCtx = modCtx.indexList
 
                 # Loop over the subscripts.
-                for indexCtx in indexListCtx.index():
+                for indexCtx in indexListCtx.index:
                     if dataType.getForm() == Form.ARRAY:
                         indexType = dataType.getArrayIndexType()
-                        exprCtx = indexCtx.expression()
+                        exprCtx = indexCtx.expression
                         self.visit(exprCtx)
 
                         if indexType.baseType() != exprCtx.type_.baseType():
@@ -1085,8 +1080,8 @@ class Semantics(GraspVisitor):
             else:  # Record field.
                 if dataType.getForm() == Form.RECORD:
                     symTable = dataType.getRecordSymTable()
-                    fieldCtx = modCtx.field()
-                    fieldName = fieldCtx.IDENTIFIER().getText().lower()
+                    fieldCtx = modCtx.field
+                    fieldName = fieldCtx.key
                     fieldId = symTable.lookup(fieldName)
 
                     # Field of the record type?
@@ -1108,9 +1103,9 @@ class Semantics(GraspVisitor):
 
     def visitNumberFactor(self, ctx):
 
-        numberCtx = ctx.number()
-        unsignedCtx = numberCtx.unsignedNumber()
-        integerCtx = unsignedCtx.integerConstant()
+        numberCtx = ctx.number
+        unsignedCtx = numberCtx.unsignedNumber
+        integerCtx = unsignedCtx.integerConstant
 
         ctx.type_ = Predefined.integerType if integerCtx is not None else Predefined.realType
 
@@ -1127,7 +1122,7 @@ class Semantics(GraspVisitor):
         return None
 
     def visitNotFactor(self, ctx):
-        factorCtx = ctx.factor()
+        factorCtx = ctx.factor
         self.visit(factorCtx)
 
         if factorCtx.type_ != Predefined.booleanType:
@@ -1137,7 +1132,7 @@ class Semantics(GraspVisitor):
         return None
 
     def visitParenthesizedFactor(self, ctx):
-        exprCtx = ctx.expression()
+        exprCtx = ctx.expression
         self.visit(exprCtx)
         ctx.type_ = exprCtx.type_
 
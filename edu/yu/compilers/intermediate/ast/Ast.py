@@ -0,0 +1,556 @@
+# <h1>Ast</h1>
+# <p>The abstract syntax tree that Semantics decorates and the Converter
+# translates. There is one node class per grammar rule and one per labeled
+# alternative, named like the GraspParser context class without the
+# "Context". Each node keeps its children in fields named after the
+# context's child accessors, so ctx.block().declarations() becomes
+# node.block.declarations and ctx.term()[i] becomes node.term[i]. A field
+# for a repeated child holds a list, a field for an optional child holds
+# None when the child is absent.</p>
+# <p>The nodes are slotted: besides the children, a node has only the
+# type_, entry, value and jumpTable locals its rule declares, the inBounds
+# the BoundsCheckEliminator sets, the token texts Semantics reads (such
+# as an identifier's name, with its key from
+# IdentifierTokenFactory), and its first and last tokens. getText() is the text of the tokens the node spans.</p>
+# <p>AstBuilder lowers a parse tree to this tree, AstVisitor walks it.</p>
+from edu.yu.compilers.frontend.IdentifierTokenFactory import IdentifierTokenFactory
+from gen.GraspLexer import GraspLexer
+
+
+class Node:
+    __slots__ = ("tokens", "start", "stop")
+
+    # The locals declared by the rules. They are not children.
+    ANNOTATIONS = frozenset(("type_", "entry", "value", "jumpTable", "inBounds"))
+
+    RULE = None  # the rule name, which is also the parent's field name
+    VISIT = None  # the name of the AstVisitor method for the node
+    LISTS = ()  # the fields that hold lists of children
+    TOKENS = {}  # token type -> the field that holds the token's text
+    FIELDS = ()  # all the fields, set for each subclass
+    CHILDREN = ()  # the fields that hold children, in grammar order
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+
+        # A labeled alternative goes into the field of its rule.
+        if Node in cls.__bases__:
+            cls.RULE = cls.__name__[0].lower() + cls.__name__[1:]
+        cls.VISIT = "visit" + cls.__name__
+
+        cls.FIELDS = tuple(field for nodeClass in reversed(cls.__mro__[:-2])
+                           for field in nodeClass.__dict__.get("__slots__", ()))
+        cls.CHILDREN = tuple(field for field in cls.FIELDS
+                             if field not in Node.ANNOTATIONS and field not in cls.TOKENS.values()
+                             and field != "key")
+
+    # Constructor. Every field starts out None or an empty list.
+    # @param tokens the token list of the source.
+    # @param start  the first token of the node.
+    # @param stop   the last token of the node.
+    def __init__(self, tokens, start, stop):
+        self.tokens = tokens
+        self.start = start
+        self.stop = stop
+
+        for field in self.FIELDS:
+            setattr(self, field, None)
+        for field in self.LISTS:
+            setattr(self, field, [])
+
+    def accept(self, visitor):
+        return getattr(visitor, self.VISIT)(self)
+
+    # Add a child node to the field of its rule. An optional child that
+    # is already there is kept, as the first one is what the parser's
+    # accessor returns.
+    # @param child the child node.
+    def add(self, child):
+        field = child.RULE
+        if field in self.LISTS:
+            getattr(self, field).append(child)
+        elif getattr(self, field) is None:
+            setattr(self, field, child)
+
+    # Keep the text of a token the node has a field for.
+    # @param token the token.
+    def addToken(self, token):
+        field = self.TOKENS.get(token.type)
+        if (field is not None) and (getattr(self, field) is None):
+            setattr(self, field, token.text)
+            if field == "name":
+                self.key = IdentifierTokenFactory.keyOf(token)
+
+    # Get the children in grammar order.
+    # @return a generator of the child nodes.
+    def getChildren(self):
+        for field in self.CHILDREN:
+            value = getattr(self, field)
+            if field in self.LISTS:
+                yield from value
+            elif value is not None:
+                yield value
+
+    # Get the source text of the node without whitespace and comments,
+    # like ParserRuleContext.getText().
+    # @return the text.
+    def getText(self):
+        if self.stop is None:
+            return ""
+        return "".join(token.text for token in self.tokens[self.start.tokenIndex:self.stop.tokenIndex + 1])
+
+
+IDENTIFIER = {GraspLexer.IDENTIFIER: "name"}
+
+
+class Program(Node):
+    __slots__ = ("programHeader", "block")
+
+
+class ProgramHeader(Node):
+    __slots__ = ("programIdentifier", "programParameters")
+
+
+class ProgramParameters(Node):
+    __slots__ = ()
+
+
+class ProgramIdentifier(Node):
+    __slots__ = ("name", "key", "entry")
+    TOKENS = IDENTIFIER
+
+
+class Block(Node):
+    __slots__ = ("declarations", "compoundStatement")
+
+
+class Declarations(Node):
+    __slots__ = ("constantsPart", "typesPart", "variablesPart", "routinesPart")
+
+
+class ConstantsPart(Node):
+    __slots__ = ("constantDefinitionsList",)
+
+
+class ConstantDefinitionsList(Node):
+    __slots__ = ("constantDefinition",)
+    LISTS = __slots__
+
+
+class ConstantDefinition(Node):
+    __slots__ = ("typeSpecification", "constantIdentifier", "constant")
+
+
+class ConstantIdentifier(Node):
+    __slots__ = ("name", "key", "type_", "entry")
+    TOKENS = IDENTIFIER
+
+
+class Constant(Node):
+    __slots__ = ("sign", "name", "key", "unsignedNumber", "characterConstant", "stringConstant", "type_", "value")
+    TOKENS = IDENTIFIER
+
+
+class Sign(Node):
+    __slots__ = ()
+
+
+class TypesPart(Node):
+    __slots__ = ("typeDefinitionsList",)
+
+
+class TypeDefinitionsList(Node):
+    __slots__ = ("typeDefinition",)
+    LISTS = __slots__
+
+
+class TypeDefinition(Node):
+    __slots__ = ("typeIdentifier", "typeSpecification")
+
+
+class TypeIdentifier(Node):
+    __slots__ = ("name", "key", "type_", "entry")
+    TOKENS = IDENTIFIER
+
+
+class TypeSpecification(Node):
+    __slots__ = ("type_",)
+
+
+class SimpleTypespec(TypeSpecification):
+    __slots__ = ("simpleType",)
+
+
+class ArrayTypespec(TypeSpecification):
+    __slots__ = ("arrayType",)
+
+
+class RecordTypespec(TypeSpecification):
+    __slots__ = ("recordType",)
+
+
+class SimpleType(Node):
+    __slots__ = ("type_",)
+
+
+class TypeIdentifierTypespec(SimpleType):
+    __slots__ = ("typeIdentifier",)
+
+
+class EnumerationTypespec(SimpleType):
+    __slots__ = ("enumerationType",)
+
+
+class EnumerationType(Node):
+    __slots__ = ("enumerationConstant",)
+    LISTS = __slots__
+
+
+class EnumerationConstant(Node):
+    __slots__ = ("constantIdentifier",)
+
+
+class ArrayType(Node):
+    __slots__ = ("arrayElemType", "arrayDimensionList")
+
+
+class ArrayElemType(Node):
+    __slots__ = ("simpleType", "recordType", "type_")
+
+
+class ArrayDimensionList(Node):
+    __slots__ = ("expression",)
+    LISTS = __slots__
+
+
+class RecordType(Node):
+    __slots__ = ("recordFields", "entry")
+
+
+class RecordFields(Node):
+    __slots__ = ("variableDeclarationsList",)
+
+
+class VariablesPart(Node):
+    __slots__ = ("variableDeclarationsList",)
+
+
+class VariableDeclarationsList(Node):
+    __slots__ = ("variableDeclarations",)
+    LISTS = __slots__
+
+
+class VariableDeclarations(Node):
+    __slots__ = ("typeSpecification", "variableIdentifierList")
+
+
+class VariableIdentifierList(Node):
+    __slots__ = ("variableIdentifier",)
+    LISTS = __slots__
+
+
+class VariableIdentifier(Node):
+    __slots__ = ("name", "key", "type_", "entry")
+    TOKENS = IDENTIFIER
+
+
+class RoutinesPart(Node):
+    __slots__ = ("routineDefinition",)
+    LISTS = __slots__
+
+
+class RoutineDefinition(Node):
+    __slots__ = ("functionHead", "block")
+
+
+class FunctionHead(Node):
+    __slots__ = ("final", "routineIdentifier", "parameters", "typeIdentifier")
+    TOKENS = {GraspLexer.FINAL: "final"}
+
+
+class RoutineIdentifier(Node):
+    __slots__ = ("name", "key", "type_", "entry")
+    TOKENS = IDENTIFIER
+
+
+class Parameters(Node):
+    __slots__ = ("parameterDeclarationsList",)
+
+
+class ParameterDeclarationsList(Node):
+    __slots__ = ("parameterDeclaration",)
+    LISTS = __slots__
+
+
+class ParameterDeclaration(Node):
+    __slots__ = ("var", "typeIdentifier", "paramTypeMod", "parameterIdentifier")
+    LISTS = ("paramTypeMod",)
+    TOKENS = {GraspLexer.VAR: "var"}
+
+
+class ParamTypeMod(Node):
+    __slots__ = ()
+
+
+class ParameterIdentifier(Node):
+    __slots__ = ("name", "key", "type_", "entry")
+    TOKENS = IDENTIFIER
+
+
+class Statement(Node):
+    __slots__ = ("compoundStatement", "assignmentStatement", "declareAndAssignStatement", "ifStatement",
+                 "caseStatement", "whileStatement", "forStatement", "printStatement", "printlnStatement",
+                 "readStatement", "readlnStatement", "functionCallStatement", "emptyStatement",
+                 "returnStatement")
+
+
+class CompoundStatement(Node):
+    __slots__ = ("statementList",)
+
+
+class EmptyStatement(Node):
+    __slots__ = ()
+
+
+class StatementList(Node):
+    __slots__ = ("statement",)
+    LISTS = __slots__
+
+
+class DeclareAndAssignStatement(Node):
+    __slots__ = ("typeSpecification", "variableIdentifier", "rhs")
+
+
+class AssignmentStatement(Node):
+    __slots__ = ("lhs", "rhs")
+
+
+class ReturnStatement(Node):
+    __slots__ = ("expression",)
+
+
+class Lhs(Node):
+    __slots__ = ("variable", "type_")
+
+
+class Rhs(Node):
+    __slots__ = ("expression",)
+
+
+class IfStatement(Node):
+    __slots__ = ("expression", "trueStatement", "falseStatement")
+
+
+class TrueStatement(Node):
+    __slots__ = ("statement",)
+
+
+class FalseStatement(Node):
+    __slots__ = ("statement",)
+
+
+class CaseStatement(Node):
+    __slots__ = ("expression", "caseBranchList", "statement", "jumpTable")
+
+
+class CaseBranchList(Node):
+    __slots__ = ("caseBranch",)
+    LISTS = __slots__
+
+
+class CaseBranch(Node):
+    __slots__ = ("caseConstantList", "statement")
+
+
+class CaseConstantList(Node):
+    __slots__ = ("caseConstant",)
+    LISTS = __slots__
+
+
+class CaseConstant(Node):
+    __slots__ = ("constant", "type_", "value")
+
+
+class WhileStatement(Node):
+    __slots__ = ("expression", "statement")
+
+
+class ForStatement(Node):
+    __slots__ = ("variable", "expression", "statement", "assignmentStatement")
+    LISTS = ("expression",)
+
+
+class DoStatement(Node):
+    __slots__ = ("expression", "statement")
+
+
+class ArgumentList(Node):
+    __slots__ = ("argument",)
+    LISTS = __slots__
+
+
+class Argument(Node):
+    __slots__ = ("expression",)
+
+
+class PrintStatement(Node):
+    __slots__ = ("writeArguments",)
+
+
+class PrintlnStatement(Node):
+    __slots__ = ("writeArguments",)
+
+
+class WriteArguments(Node):
+    __slots__ = ("writeArgument",)
+    LISTS = __slots__
+
+
+class WriteArgument(Node):
+    __slots__ = ("expression", "fieldWidth")
+
+
+class FieldWidth(Node):
+    __slots__ = ("sign", "integerConstant", "decimalPlaces")
+
+
+class DecimalPlaces(Node):
+    __slots__ = ("integerConstant",)
+
+
+class ReadStatement(Node):
+    __slots__ = ("readArguments",)
+
+
+class ReadlnStatement(Node):
+    __slots__ = ("readArguments",)
+
+
+class ReadArguments(Node):
+    __slots__ = ("variable",)
+    LISTS = __slots__
+
+
+class Expression(Node):
+    __slots__ = ("simpleExpression", "relOp", "type_")
+    LISTS = ("simpleExpression",)
+
+
+class SimpleExpression(Node):
+    __slots__ = ("sign", "term", "addOp", "type_")
+    LISTS = ("term", "addOp")
+
+
+class Term(Node):
+    __slots__ = ("factor", "mulOp", "type_")
+    LISTS = ("factor", "mulOp")
+
+
+class Factor(Node):
+    __slots__ = ("type_",)
+
+
+class VariableFactor(Factor):
+    __slots__ = ("variable",)
+
+
+class NumberFactor(Factor):
+    __slots__ = ("number",)
+
+
+class CharacterFactor(Factor):
+    __slots__ = ("characterConstant",)
+
+
+class StringFactor(Factor):
+    __slots__ = ("stringConstant",)
+
+
+class FunctionCallFactor(Factor):
+    __slots__ = ("functionCallStatement",)
+
+
+class NotFactor(Factor):
+    __slots__ = ("factor",)
+
+
+class ParenthesizedFactor(Factor):
+    __slots__ = ("expression",)
+
+
+class Variable(Node):
+    __slots__ = ("variableIdentifier", "modifier", "type_", "entry")
+    LISTS = ("modifier",)
+
+
+class Modifier(Node):
+    __slots__ = ("indexList", "field")
+
+
+class IndexList(Node):
+    __slots__ = ("index",)
+    LISTS = __slots__
+
+
+class Index(Node):
+    __slots__ = ("expression", "inBounds")
+
+
+class Field(Node):
+    __slots__ = ("name", "key", "type_", "entry")
+    TOKENS = IDENTIFIER
+
+
+class FunctionCallStatement(Node):
+    __slots__ = ("functionName", "argumentList")
+
+
+class FunctionName(Node):
+    __slots__ = ("name", "key", "type_", "entry")
+    TOKENS = IDENTIFIER
+
+
+class Number(Node):
+    __slots__ = ("sign", "unsignedNumber")
+
+
+class UnsignedNumber(Node):
+    __slots__ = ("integerConstant", "decConstant")
+
+
+class IntegerConstant(Node):
+    __slots__ = ()
+
+
+class DecConstant(Node):
+    __slots__ = ()
+
+
+class CharacterConstant(Node):
+    __slots__ = ()
+
+
+class StringConstant(Node):
+    __slots__ = ()
+
+
+class RelOp(Node):
+    __slots__ = ()
+
+
+class AddOp(Node):
+    __slots__ = ()
+
+
+class MulOp(Node):
+    __slots__ = ()
+
+
+# Every node class, rules and labeled alternatives.
+def allNodeClasses(nodeClass=Node):
+    for subclass in nodeClass.__subclasses__():
+        yield subclass
+        yield from allNodeClasses(subclass)
+
+
+NODE_CLASSES = tuple(allNodeClasses())
@@ -0,0 +1,50 @@
+# <h1>AstBuilder</h1>
+# <p>Lower a parse tree from GraspParser or the RecursiveDescentParser to
+# the abstract syntax tree. Each context becomes the node of the same
+# name, each child context goes into the field of its rule, and the
+# tokens the nodes keep the text of go into their fields. The other
+# terminals, and the error nodes of a recovered parse, are only covered
+# by the token spans.</p>
+import gc
+
+from antlr4 import ParserRuleContext
+
+from edu.yu.compilers.intermediate.ast import Ast
+
+
+class AstBuilder:
+
+    def __init__(self):
+        self.nodeClasses = {}  # context class -> node class
+
+    # Build the abstract syntax tree of a parse tree.
+    # @param tree   the ProgramContext.
+    # @param tokens the token list of the parsed source.
+    # @return the Program node.
+    def build(self, tree, tokens):
+        # Like the parse itself, the lowering creates many objects and
+        # frees none, so cyclic garbage collection would only slow it down.
+        gcWasEnabled = gc.isenabled()
+        gc.disable()
+        try:
+            return self.lower(tree, tokens)
+        finally:
+            if gcWasEnabled:
+                gc.enable()
+
+    def lower(self, ctx, tokens):
+        contextClass = type(ctx)
+        nodeClass = self.nodeClasses.get(contextClass)
+        if nodeClass is None:
+            nodeClass = getattr(Ast, contextClass.__name__[:-len("Context")])
+            self.nodeClasses[contextClass] = nodeClass
+
+        node = nodeClass(tokens, ctx.start, ctx.stop)
+        if ctx.children is not None:
+            for child in ctx.children:
+                if isinstance(child, ParserRuleContext):
+                    node.add(self.lower(child, tokens))
+                else:
+                    node.addToken(child.symbol)
+
+        return node
@@ -0,0 +1,21 @@
+# <h1>AstVisitor</h1>
+# <p>The base class of the passes over the abstract syntax tree. It has a
+# visit method for every node class, named as in GraspVisitor (visitProgram,
+# visitVariableFactor, ...), which by default visits the node's children
+# in grammar order.</p>
+from edu.yu.compilers.intermediate.ast import Ast
+
+
+class AstVisitor:
+
+    def visit(self, node):
+        return node.accept(self)
+
+    def visitChildren(self, node):
+        for child in node.getChildren():
+            child.accept(self)
+        return None
+
+
+for nodeClass in Ast.NODE_CLASSES:
+    setattr(AstVisitor, nodeClass.VISIT, AstVisitor.visitChildren)
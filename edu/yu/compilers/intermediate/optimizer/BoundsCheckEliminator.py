@@ -0,0 +1,288 @@
+# <h1>BoundsCheckEliminator</h1>
+# <p>The optimization pass that proves the array subscripts of FOR INDEX
+# loops are in bounds, so the backends don't check them. In a loop like
+# FOR INDEX i START AT 0 AND WHILE i < 5 ... UPDATE i = i + 1, the index
+# is from 0 to 4 in the body, and a subscript i, i + c or i - c of an
+# array whose type has enough elements is in bounds. The array sizes are
+# static: every array is allocated with the element count of its type.</p>
+# <p>The range holds if the loop starts at an integer literal, its
+# condition compares the index with an integer literal, its update adds a
+# literal that isn't negative, and the body assigns the index only
+# literals in the range: the index then never goes below the start, and
+# the condition keeps it below the limit when the body starts. A routine
+# called from the body must not assign the index or take it as a VAR
+# argument, nor may the routines it calls.</p>
+# <p>An Index node whose subscript is proven gets inBounds. The executor,
+# the VM and the Python generator then don't check it for being negative.
+# Java checks every subscript itself.</p>
+from edu.yu.compilers.intermediate.ast import Ast
+from edu.yu.compilers.intermediate.ast.AstVisitor import AstVisitor
+from edu.yu.compilers.intermediate.optimizer.ConstantFolder import ConstantFolder
+from edu.yu.compilers.intermediate.optimizer.Inliner import loneFactor
+from edu.yu.compilers.intermediate.optimizer.LoopInvariantMover import walk
+from edu.yu.compilers.intermediate.symtable.Kind import Kind
+from edu.yu.compilers.intermediate.symtable.Predefined import Predefined
+from edu.yu.compilers.intermediate.type.Form import Form
+
+
+class BoundsCheckEliminator(AstVisitor):
+
+    def __init__(self):
+        self.definitions = {}  # routine entry -> RoutineDefinition
+        self.assignments = {}  # routine entry -> the entries it and its callees may assign
+        self.folder = ConstantFolder()
+
+    def visitProgram(self, ctx):
+        self.define(ctx.block.declarations)
+        self.visitChildren(ctx)
+
+    # Record the definitions of the routines declared in a block and in
+    # the routines it declares.
+    # @param ctx the DeclarationsContext.
+    def define(self, ctx):
+        if ctx.routinesPart is not None:
+            for definitionCtx in ctx.routinesPart.routineDefinition:
+                self.definitions[definitionCtx.functionHead.routineIdentifier.entry] = definitionCtx
+                self.define(definitionCtx.block.declarations)
+
+    def visitForStatement(self, ctx):
+        self.eliminate(ctx)
+        self.visitChildren(ctx)
+
+    # Mark the subscripts of a FOR loop's body that are in bounds.
+    # @param ctx the ForStatementContext.
+    def eliminate(self, ctx):
+        bounds = self.indexRange(ctx)
+        if bounds is None:
+            return
+
+        indexId = ctx.variable.entry
+        for node in walk(ctx.statement):
+            if isinstance(node, Ast.Variable) and node.modifier:
+                self.markVariable(node, indexId, bounds)
+
+    # Get the range of the index of a FOR loop in its body.
+    # @param ctx the ForStatementContext.
+    # @return the (lowest, highest) index, or None if it's unknown.
+    def indexRange(self, ctx):
+        variableCtx = ctx.variable
+        indexId = variableCtx.entry
+        if variableCtx.modifier or (variableCtx.type_ is not Predefined.integerType) or (
+                indexId.getKind() not in (Kind.VARIABLE, Kind.VALUE_PARAMETER)):
+            return None
+
+        lowest = self.integerValue(ctx.expression[0])
+        highest = self.limit(ctx.expression[1], indexId)
+        if (lowest is None) or (highest is None) or (lowest > highest):
+            return None
+
+        # The update may only increase the index.
+        assignCtx = ctx.assignmentStatement
+        if (assignCtx.lhs.variable.entry is not indexId) or assignCtx.lhs.variable.modifier:
+            return None
+        step = self.increment(assignCtx.rhs.expression, indexId)
+        if (step is None) or (step < 0):
+            return None
+
+        # The body may only assign literals in the range.
+        for node in walk(ctx.statement):
+            if isinstance(node, Ast.AssignmentStatement) and (node.lhs.variable.entry is indexId):
+                value = self.integerValue(node.rhs.expression)
+                if (value is None) or not (lowest <= value <= highest):
+                    return None
+            elif isinstance(node, Ast.ForStatement) and (node.variable.entry is indexId):
+                return None
+            elif isinstance(node, Ast.DeclareAndAssignStatement) and (node.variableIdentifier.entry is indexId):
+                return None
+            elif isinstance(node, Ast.ReadArguments) and any(varCtx.entry is indexId for varCtx in node.variable):
+                return None
+            elif isinstance(node, Ast.FunctionCallStatement) and not self.keeps(node, indexId):
+                return None
+
+        return lowest, highest
+
+    # Get the highest index for which a loop condition is true.
+    # @param ctx     the ExpressionContext of the condition.
+    # @param indexId the entry of the index.
+    # @return the index, or None if the condition isn't index < literal,
+    #         index <= literal, literal > index or literal >= index.
+    def limit(self, ctx, indexId):
+        if ctx.relOp is None:
+            return None
+
+        op = ctx.relOp.getText()
+        left, right = [self.simpleFactor(simpleCtx) for simpleCtx in ctx.simpleExpression]
+        if self.isIndex(right, indexId):
+            left, right = right, left
+            op = {">": "<", ">=": "<="}.get(op)
+        if not self.isIndex(left, indexId) or (op not in ("<", "<=")):
+            return None
+
+        value = self.factorValue(right)
+        if value is None:
+            return None
+        return value - 1 if op == "<" else value
+
+    # Get what an update adds to the index.
+    # @param ctx     the ExpressionContext of the new value.
+    # @param indexId the entry of the index.
+    # @return the literal added, or None if the value isn't
+    #         index + literal or literal + index.
+    def increment(self, ctx, indexId):
+        if (ctx.relOp is not None) or (len(ctx.simpleExpression[0].term) != 2):
+            return None
+        simpleCtx = ctx.simpleExpression[0]
+        if (simpleCtx.sign is not None) or (simpleCtx.addOp[0].getText() != "+"):
+            return None
+
+        first, second = [self.termFactor(termCtx) for termCtx in simpleCtx.term]
+        if self.isIndex(second, indexId):
+            first, second = second, first
+        if not self.isIndex(first, indexId):
+            return None
+        return self.factorValue(second)
+
+    # Find out if a call keeps the value of the index: the routine it calls
+    # doesn't assign it and it isn't a VAR argument.
+    # @param ctx     the FunctionCallStatementContext.
+    # @param indexId the entry of the index.
+    # @return true if it does.
+    def keeps(self, ctx, indexId):
+        routineId = ctx.functionName.entry
+        if (routineId not in self.definitions) or (indexId in self.referenceArguments(ctx)):
+            return False
+        return indexId not in self.assigned(routineId)
+
+    # Get the entries that a call of a routine may assign, other than the
+    # routine's own.
+    # @param routineId the routine's entry.
+    # @return the set of entries.
+    def assigned(self, routineId):
+        assignments = self.assignments.get(routineId)
+        if assignments is not None:
+            return assignments
+
+        # The routines the call may reach.
+        reached = {routineId}
+        pending = [routineId]
+        while pending:
+            for node in walk(self.definitions[pending.pop()].block.compoundStatement):
+                if isinstance(node, Ast.FunctionCallStatement):
+                    calleeId = node.functionName.entry
+                    if (calleeId in self.definitions) and (calleeId not in reached):
+                        reached.add(calleeId)
+                        pending.append(calleeId)
+
+        assignments = set()
+        for reachedId in reached:
+            symTable = reachedId.getRoutineSymTable()
+            for node in walk(self.definitions[reachedId].block.compoundStatement):
+                if isinstance(node, Ast.Lhs):
+                    entries = [node.variable.entry]
+                elif isinstance(node, Ast.ReadArguments):
+                    entries = [varCtx.entry for varCtx in node.variable]
+                elif isinstance(node, Ast.FunctionCallStatement):
+                    entries = self.referenceArguments(node)
+                else:
+                    continue
+                assignments.update(entry for entry in entries if entry.getSymTable() is not symTable)
+
+        self.assignments[routineId] = assignments
+        return assignments
+
+    # Get the variables a call passes as VAR arguments.
+    # @param ctx the FunctionCallStatementContext.
+    # @return the list of their entries.
+    def referenceArguments(self, ctx):
+        parameters = ctx.functionName.entry.getRoutineParameters() or []
+        arguments = ctx.argumentList.argument if ctx.argumentList is not None else []
+
+        entries = []
+        for paramId, argCtx in zip(parameters, arguments):
+            factorCtx = loneFactor(argCtx.expression)
+            if (paramId.getKind() == Kind.REFERENCE_PARAMETER) and isinstance(factorCtx, Ast.VariableFactor):
+                entries.append(factorCtx.variable.entry)
+        return entries
+
+    # Mark the subscripts of a variable that are in bounds.
+    # @param ctx     the VariableContext.
+    # @param indexId the entry of the loop's index.
+    # @param bounds  the (lowest, highest) index.
+    def markVariable(self, ctx, indexId, bounds):
+        type_ = ctx.entry.getType()
+
+        for modCtx in ctx.modifier:
+            if modCtx.indexList is None:
+                type_ = modCtx.field.entry.getType()
+                continue
+
+            for indexCtx in modCtx.indexList.index:
+                if type_.getForm() != Form.ARRAY:
+                    return
+
+                offset = self.offset(indexCtx.expression, indexId)
+                count = type_.getArrayElementCount()
+                if (offset is not None) and (bounds[0] + offset >= 0) and (bounds[1] + offset < count):
+                    indexCtx.inBounds = True
+
+                type_ = type_.getArrayElementType()
+
+    # Get the offset of a subscript from the index.
+    # @param ctx     the ExpressionContext of the subscript.
+    # @param indexId the entry of the index.
+    # @return c for the subscript index, index + c, c + index or
+    #         index - c, where c is an integer literal, or None.
+    def offset(self, ctx, indexId):
+        if (ctx.relOp is not None) or (ctx.simpleExpression[0].sign is not None):
+            return None
+        simpleCtx = ctx.simpleExpression[0]
+        factors = [self.termFactor(termCtx) for termCtx in simpleCtx.term]
+
+        if len(factors) == 1:
+            return 0 if self.isIndex(factors[0], indexId) else None
+        elif len(factors) != 2:
+            return None
+
+        op = simpleCtx.addOp[0].getText()
+        if self.isIndex(factors[0], indexId):
+            value = self.factorValue(factors[1])
+            if value is not None:
+                return value if op == "+" else -value if op == "-" else None
+        elif self.isIndex(factors[1], indexId) and (op == "+"):
+            return self.factorValue(factors[0])
+        return None
+
+    # Find out if a factor is the loop's index.
+    # @param ctx     the factor node, or None.
+    # @param indexId the entry of the index.
+    # @return true if it is.
+    def isIndex(self, ctx, indexId):
+        return isinstance(ctx, Ast.VariableFactor) and (ctx.variable.entry is indexId) and not ctx.variable.modifier
+
+    # Get the value of an expression that is an integer literal.
+    # @param ctx the ExpressionContext.
+    # @return the int value, or None.
+    def integerValue(self, ctx):
+        return self.factorValue(loneFactor(ctx))
+
+    # Get the value of a factor that is an integer literal.
+    # @param ctx the factor node, or None.
+    # @return the int value, or None.
+    def factorValue(self, ctx):
+        if isinstance(ctx, Ast.NumberFactor) and (ctx.type_ is Predefined.integerType):
+            return self.folder.visitNumberFactor(ctx)
+        return None
+
+    # Get the lone factor of a term, if it is one.
+    # @param ctx the TermContext.
+    # @return the factor node, or None.
+    def termFactor(self, ctx):
+        return ctx.factor[0] if len(ctx.factor) == 1 else None
+
+    # Get the lone factor of a simple expression, if it is one.
+    # @param ctx the SimpleExpressionContext.
+    # @return the factor node, or None.
+    def simpleFactor(self, ctx):
+        if (ctx.sign is not None) or (len(ctx.term) != 1):
+            return None
+        return self.termFactor(ctx.term[0])
@@ -0,0 +1,381 @@
+# <h1>ConstantFolder</h1>
+# <p>The optimization pass that folds the constant subexpressions of an
+# analyzed AST in place, before a backend translates it. The FINAL
+# constants are propagated into the expressions that use them, operations
+# on constants are computed, and boolean operations with a constant
+# operand are simplified: x and true is x, false and x is false. A
+# folded expression becomes a literal factor with tokens of its own, so
+# every backend, including the Converter where it copies token text, sees
+# the folded tree.</p>
+# <p>An operation is folded only if every backend computes the same
+# value at runtime: integer results must fit a Java int, decimal results
+# must be finite, a division by zero is left for runtime, and so is the
+# / of two integers, which the converted Java computes as an integer
+# division. Java doesn't allow a loop whose condition is a constant false
+# or code after a loop whose condition is a constant true, so in loop
+# conditions a boolean operation isn't folded unless both operands are
+# constants, as Java folds it itself.</p>
+import math
+
+from antlr4.Token import CommonToken
+
+from edu.yu.compilers.backend.executor.Executor import divide, remainder
+from edu.yu.compilers.intermediate.ast import Ast
+from edu.yu.compilers.intermediate.ast.AstVisitor import AstVisitor
+from edu.yu.compilers.intermediate.symtable.Kind import Kind
+from edu.yu.compilers.intermediate.symtable.Predefined import Predefined
+from gen.GraspLexer import GraspLexer
+
+# The range of a Java int.
+MIN_INTEGER = -2 ** 31
+MAX_INTEGER = 2 ** 31 - 1
+
+MINUS = GraspLexer.literalNames.index("'-'")
+
+
+# Create a token that isn't in the source.
+# @param tokenType the token type.
+# @param text      the token text.
+# @param like      the token whose position to give it.
+# @param index     its index in the token list of its node.
+# @return the token.
+def newToken(tokenType, text, like, index):
+    token = CommonToken(type=tokenType)
+    token.line = like.line
+    token.column = like.column
+    token.tokenIndex = index
+    token.text = text
+    return token
+
+
+# Create the factor of a literal value.
+# @param value the int, float or bool.
+# @param like  the node the factor replaces, for its position.
+# @return the NumberFactor, or the VariableFactor of true or false.
+def literalFactor(value, like):
+    if isinstance(value, bool):
+        entry = Predefined.trueId if value else Predefined.falseId
+        tokens = [newToken(GraspLexer.IDENTIFIER, entry.getName(), like.start, 0)]
+        factor = Ast.VariableFactor(tokens, tokens[0], tokens[0])
+        variable = factor.variable = Ast.Variable(tokens, tokens[0], tokens[0])
+        identifier = variable.variableIdentifier = Ast.VariableIdentifier(tokens, tokens[0], tokens[0])
+        identifier.name = identifier.key = entry.getName()
+        identifier.entry = variable.entry = entry
+        identifier.type_ = variable.type_ = factor.type_ = Predefined.booleanType
+        return factor
+
+    tokens = []
+    if (value < 0) or (math.copysign(1, value) < 0):
+        tokens.append(newToken(MINUS, "-", like.start, 0))
+    integer = not isinstance(value, float)
+    text = str(abs(value)) if integer else repr(abs(value))
+    tokens.append(newToken(GraspLexer.INTEGER if integer else GraspLexer.DECIMAL, text, like.start, len(tokens)))
+    digits = tokens[-1]
+
+    factor = Ast.NumberFactor(tokens, tokens[0], digits)
+    number = factor.number = Ast.Number(tokens, tokens[0], digits)
+    if len(tokens) > 1:
+        number.sign = Ast.Sign(tokens, tokens[0], tokens[0])
+    unsigned = number.unsignedNumber = Ast.UnsignedNumber(tokens, digits, digits)
+    if integer:
+        unsigned.integerConstant = Ast.IntegerConstant(tokens, digits, digits)
+    else:
+        unsigned.decConstant = Ast.DecConstant(tokens, digits, digits)
+    factor.type_ = Predefined.integerType if integer else Predefined.realType
+    return factor
+
+
+class ConstantFolder(AstVisitor):
+
+    def __init__(self):
+        self.loopCondition = False  # true while folding the condition of a loop
+
+    # Statements.
+
+    def visitWhileStatement(self, ctx):
+        self.condition(ctx.expression)
+        self.visit(ctx.statement)
+
+    def visitForStatement(self, ctx):
+        self.visit(ctx.variable)
+        self.visit(ctx.expression[0])
+        self.condition(ctx.expression[1])
+        self.visit(ctx.statement)
+        self.visit(ctx.assignmentStatement)
+
+    # Fold the condition of a loop.
+    # @param ctx the ExpressionContext.
+    def condition(self, ctx):
+        self.loopCondition = True
+        self.visit(ctx)
+        self.loopCondition = False
+
+    # Expressions. Visiting an expression node folds its subexpressions
+    # and returns its value if it's constant, else None. A constant
+    # Expression is replaced by its literal itself, a constant part of
+    # an expression by the node that contains it.
+
+    def visitExpression(self, ctx):
+        values = [self.visit(simpleCtx) for simpleCtx in ctx.simpleExpression]
+        value = values[0]
+
+        if ctx.relOp is not None:
+            value = self.relation(ctx.relOp.getText(), values[0], values[1])
+            if value is None:
+                for simpleCtx, simpleValue in zip(ctx.simpleExpression, values):
+                    if simpleValue is not None:
+                        self.setSimpleExpression(simpleCtx, simpleValue)
+
+        if value is not None:
+            ctx.relOp = None
+            del ctx.simpleExpression[1:]
+            self.setSimpleExpression(ctx.simpleExpression[0], value)
+        return value
+
+    def visitSimpleExpression(self, ctx):
+        values = [self.visit(termCtx) for termCtx in ctx.term]
+        changed = [False] * len(values)
+
+        # A minus sign goes into a constant first term, or into the
+        # literal its first factor is, since -(a * b) is (-a) * b.
+        if (ctx.sign is not None) and (ctx.sign.getText() == "-"):
+            first = ctx.term[0]
+            if self.isNumber(values[0]) and self.inRange(-values[0]):
+                values[0] = -values[0]
+                changed[0] = True
+                ctx.sign = None
+            elif values[0] is None and isinstance(first.factor[0], Ast.NumberFactor):
+                value = -self.visit(first.factor[0])
+                if self.inRange(value):
+                    first.factor[0] = literalFactor(value, first.factor[0])
+                    ctx.sign = None
+
+        terms, ops, values, changed = self.reduce(ctx.term, ctx.addOp, values, changed)
+        for termCtx, value, termChanged in zip(terms, values, changed):
+            if (value is not None) and (termChanged or not self.isLiteralTerm(termCtx)):
+                self.setTerm(termCtx, value)
+
+        ctx.term[:] = terms
+        ctx.addOp[:] = ops
+        return values[0] if (len(values) == 1) and (ctx.sign is None) else None
+
+    def visitTerm(self, ctx):
+        values = [self.visit(factorCtx) for factorCtx in ctx.factor]
+
+        factors, ops, values, changed = self.reduce(ctx.factor, ctx.mulOp, values, [False] * len(values))
+        for i, (factorCtx, value, factorChanged) in enumerate(zip(factors, values, changed)):
+            if (value is not None) and (factorChanged or not self.isLiteralFactor(factorCtx)):
+                factors[i] = literalFactor(value, factorCtx)
+
+        ctx.factor[:] = factors
+        ctx.mulOp[:] = ops
+        return values[0] if len(values) == 1 else None
+
+    # Fold the operations of a simple expression or a term, which are
+    # left-associative: the constant operands that start the list are
+    # folded into one, and boolean operations with a constant operand are
+    # simplified.
+    # @param nodes   the operand nodes.
+    # @param ops     the operator nodes.
+    # @param values  the constant values of the operands, or None.
+    # @param changed for each operand, true if its value isn't its literal.
+    # @return the lists of the operands, operators, values and changed
+    #         flags that remain.
+    def reduce(self, nodes, ops, values, changed):
+        keptNodes = [nodes[0]]
+        keptOps = []
+        keptValues = [values[0]]
+        keptChanged = [changed[0]]
+
+        for opCtx, node, value, nodeChanged in zip(ops, nodes[1:], values[1:], changed[1:]):
+            op = opCtx.getText().lower()
+            prefix = keptValues[0] if len(keptValues) == 1 else None
+
+            if op in ("and", "or"):
+                identity = op == "and"  # x and true is x, x or false is x
+                if value is identity:
+                    continue
+                elif prefix is identity:
+                    keptNodes[0], keptValues[0], keptChanged[0] = node, value, nodeChanged
+                    continue
+                elif (prefix is (not identity)) and (value is not None or not self.loopCondition):
+                    continue  # false and x is false, true or x is true
+            elif (prefix is not None) and (value is not None):
+                result = self.arithmetic(op, prefix, value)
+                if result is not None:
+                    keptValues[0] = result
+                    keptChanged[0] = True
+                    continue
+
+            keptNodes.append(node)
+            keptOps.append(opCtx)
+            keptValues.append(value)
+            keptChanged.append(nodeChanged)
+
+        return keptNodes, keptOps, keptValues, keptChanged
+
+    # Compute an arithmetic operation as every backend would.
+    # @param op    the operator.
+    # @param left  the left operand.
+    # @param right the right operand.
+    # @return the value, or None if it's left for runtime.
+    def arithmetic(self, op, left, right):
+        if not (self.isNumber(left) and self.isNumber(right)):
+            return None
+
+        integers = isinstance(left, int) and isinstance(right, int)
+        if op == "+":
+            value = left + right
+        elif op == "-":
+            value = left - right
+        elif op == "*":
+            value = left * right
+        elif (op == "/") and not integers and (right != 0):
+            value = left / right
+        elif (op == "div") and integers and (right != 0):
+            value = divide(left, right)
+        elif (op == "mod") and integers and (right != 0):
+            value = remainder(left, right)
+        else:
+            return None
+
+        return value if self.inRange(value) else None
+
+    # Compute a relation of constants.
+    # @param op    the relational operator.
+    # @param left  the left operand, or None.
+    # @param right the right operand, or None.
+    # @return the bool value, or None if it's left for runtime.
+    def relation(self, op, left, right):
+        if (left is None) or (right is None):
+            return None
+
+        if self.isNumber(left) and self.isNumber(right):
+            if op == "<":
+                return left < right
+            elif op == "<=":
+                return left <= right
+            elif op == ">":
+                return left > right
+            elif op == ">=":
+                return left >= right
+        elif not (isinstance(left, bool) and isinstance(right, bool)):
+            return None
+
+        if op in ("=", "=="):
+            return left == right
+        elif op in ("<>", "!="):
+            return left != right
+        return None
+
+    # Find out if a value is an integer or decimal constant.
+    # @param value the value, or None.
+    # @return true if it is.
+    def isNumber(self, value):
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+    # Find out if a value can be written as a literal in every backend.
+    # @param value the value.
+    # @return true if it can.
+    def inRange(self, value):
+        if isinstance(value, float):
+            return math.isfinite(value)
+        return MIN_INTEGER <= value <= MAX_INTEGER
+
+    def visitVariableFactor(self, ctx):
+        self.visit(ctx.variable)
+
+        entry = ctx.variable.entry
+        if (entry is None) or ctx.variable.modifier:
+            return None
+
+        kind = entry.getKind()
+        type_ = entry.getType()
+        if (kind == Kind.ENUMERATION_CONSTANT) and (type_ is Predefined.booleanType):
+            return bool(entry.getValue())
+        elif kind != Kind.CONSTANT:
+            return None
+
+        # Propagate a FINAL constant.
+        value = entry.getValue()
+        if type_ is Predefined.booleanType:
+            return bool(value)
+        elif (type_ is Predefined.integerType) and isinstance(value, int) and self.inRange(value):
+            return value
+        elif (type_ is Predefined.realType) and self.isNumber(value) and self.inRange(float(value)):
+            return float(value)
+        return None
+
+    def visitNumberFactor(self, ctx):
+        numberCtx = ctx.number
+        text = numberCtx.unsignedNumber.getText()
+        value = int(text) if numberCtx.unsignedNumber.integerConstant is not None else float(text)
+
+        if numberCtx.sign is not None and numberCtx.sign.getText() == "-":
+            value = -value
+
+        return value if self.inRange(value) else None
+
+    def visitCharacterFactor(self, ctx):
+        return None
+
+    def visitStringFactor(self, ctx):
+        return None
+
+    def visitFunctionCallFactor(self, ctx):
+        self.visitChildren(ctx)
+        return None
+
+    def visitNotFactor(self, ctx):
+        value = self.visit(ctx.factor)
+        if isinstance(value, bool):
+            return not value
+        elif value is not None:
+            ctx.factor = literalFactor(value, ctx.factor)
+        return None
+
+    def visitParenthesizedFactor(self, ctx):
+        return self.visit(ctx.expression)
+
+    # Literals.
+
+    # Find out if a factor is a literal number, true or false.
+    # @param ctx the factor node.
+    # @return true if it is.
+    def isLiteralFactor(self, ctx):
+        if isinstance(ctx, Ast.NumberFactor):
+            return True
+        elif isinstance(ctx, Ast.VariableFactor):
+            entry = ctx.variable.entry
+            return (entry is not None) and (entry.getKind() == Kind.ENUMERATION_CONSTANT) and (
+                entry.getType() is Predefined.booleanType) and not ctx.variable.modifier
+        return False
+
+    # Find out if a term is a lone literal.
+    # @param ctx the TermContext.
+    # @return true if it is.
+    def isLiteralTerm(self, ctx):
+        return (len(ctx.factor) == 1) and self.isLiteralFactor(ctx.factor[0])
+
+    # Make a term a lone literal.
+    # @param ctx   the TermContext.
+    # @param value the value.
+    def setTerm(self, ctx, value):
+        ctx.factor[:] = [literalFactor(value, ctx)]
+        ctx.mulOp.clear()
+        ctx.type_ = ctx.factor[0].type_
+
+    # Make a simple expression a lone literal, unless it is one.
+    # @param ctx   the SimpleExpressionContext.
+    # @param value the value.
+    def setSimpleExpression(self, ctx, value):
+        termCtx = ctx.term[0]
+        if (ctx.sign is None) and (len(ctx.term) == 1) and self.isLiteralTerm(termCtx) and (
+                self.visit(termCtx.factor[0]) == value) and (type(self.visit(termCtx.factor[0])) is type(value)):
+            return
+
+        ctx.sign = None
+        ctx.term[:] = [termCtx]
+        ctx.addOp.clear()
+        self.setTerm(termCtx, value)
+        ctx.type_ = termCtx.type_
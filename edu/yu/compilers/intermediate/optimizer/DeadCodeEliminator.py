@@ -0,0 +1,132 @@
+# <h1>DeadCodeEliminator</h1>
+# <p>The optimization pass that removes the code a program can't execute,
+# after the constants have been folded. An if statement whose condition
+# is a constant becomes the branch it takes, or goes away if it has no
+# branch to take. A statement that follows, in the same statement list, a
+# statement that always returns is removed: a return, a compound
+# statement that ends with one, or an if statement both of whose branches
+# return. Java rejects such unreachable statements, so the converted
+# program now compiles. Then the routines that the main compound
+# statement can't reach in the call graph are removed, with their
+# subroutines, from the tree and from the subroutine list of the routine
+# they are declared in, so no backend translates them.</p>
+# <p>An if statement that isn't in a statement list, such as the branch of
+# another if statement, is left alone if it has no branch to take.</p>
+from edu.yu.compilers.intermediate.ast import Ast
+from edu.yu.compilers.intermediate.ast.AstVisitor import AstVisitor
+from edu.yu.compilers.intermediate.optimizer.Inliner import loneFactor
+from edu.yu.compilers.intermediate.symtable.Kind import Kind
+from edu.yu.compilers.intermediate.symtable.Predefined import Predefined
+
+
+# Get the routines a subtree calls, except in the routines it declares.
+# @param node the root node.
+# @return a generator of the routine entries.
+def callees(node):
+    if isinstance(node, Ast.FunctionCallStatement):
+        yield node.functionName.entry
+    for child in node.getChildren():
+        if not isinstance(child, Ast.Declarations):
+            yield from callees(child)
+
+
+class DeadCodeEliminator(AstVisitor):
+
+    def __init__(self):
+        self.owners = []  # the entries of the routines being walked, outermost first
+        self.definitions = {}  # routine entry -> RoutineDefinition
+        self.routineParts = []  # (owner entry, Declarations) of each routines part
+
+    def visitProgram(self, ctx):
+        self.owners.append(ctx.programHeader.programIdentifier.entry)
+        self.visit(ctx.block)
+        self.owners.pop()
+
+        # The routines reachable from the main compound statement.
+        reached = set()
+        pending = list(callees(ctx.block.compoundStatement))
+        while pending:
+            routineId = pending.pop()
+            if (routineId not in reached) and (routineId in self.definitions):
+                reached.add(routineId)
+                pending.extend(callees(self.definitions[routineId].block.compoundStatement))
+
+        for ownerId, declarationsCtx in self.routineParts:
+            definitions = [definitionCtx for definitionCtx in declarationsCtx.routinesPart.routineDefinition
+                           if definitionCtx.functionHead.routineIdentifier.entry in reached]
+            if definitions:
+                declarationsCtx.routinesPart.routineDefinition[:] = definitions
+            else:
+                declarationsCtx.routinesPart = None
+            ownerId.getSubroutines()[:] = [subroutineId for subroutineId in ownerId.getSubroutines()
+                                           if subroutineId in reached]
+
+    def visitDeclarations(self, ctx):
+        if ctx.routinesPart is not None:
+            self.routineParts.append((self.owners[-1], ctx))
+        self.visitChildren(ctx)
+
+    def visitRoutineDefinition(self, ctx):
+        routineId = ctx.functionHead.routineIdentifier.entry
+        self.definitions[routineId] = ctx
+
+        self.owners.append(routineId)
+        self.visit(ctx.block)
+        self.owners.pop()
+
+    def visitStatementList(self, ctx):
+        statements = []
+        for stmtCtx in ctx.statement:
+            if self.visit(stmtCtx):
+                statements.append(stmtCtx)
+                if self.returns(stmtCtx):
+                    break
+
+        ctx.statement[:] = statements
+
+    # Simplify a statement whose if statements have constant conditions.
+    # @param ctx the StatementContext.
+    # @return false if the statement does nothing and can be removed.
+    def visitStatement(self, ctx):
+        self.visitChildren(ctx)
+
+        while ctx.ifStatement is not None:
+            ifCtx = ctx.ifStatement
+            value = self.constantCondition(ifCtx.expression)
+            if value is None:
+                break
+
+            branchCtx = ifCtx.trueStatement if value else ifCtx.falseStatement
+            if branchCtx is None:
+                return False
+
+            # The statement becomes the branch.
+            for field in ctx.FIELDS:
+                setattr(ctx, field, getattr(branchCtx.statement, field))
+
+        return True
+
+    # Get the value of a condition that is true or false.
+    # @param ctx the ExpressionContext.
+    # @return the bool value, or None if it isn't constant.
+    def constantCondition(self, ctx):
+        factorCtx = loneFactor(ctx)
+        if isinstance(factorCtx, Ast.VariableFactor) and not factorCtx.variable.modifier:
+            entry = factorCtx.variable.entry
+            if (entry.getKind() == Kind.ENUMERATION_CONSTANT) and (entry.getType() is Predefined.booleanType):
+                return bool(entry.getValue())
+        return None
+
+    # Find out if a statement always returns.
+    # @param ctx the StatementContext.
+    # @return true if it does.
+    def returns(self, ctx):
+        if ctx.returnStatement is not None:
+            return True
+        elif ctx.compoundStatement is not None:
+            statements = ctx.compoundStatement.statementList.statement
+            return bool(statements) and self.returns(statements[-1])
+        elif (ctx.ifStatement is not None) and (ctx.ifStatement.falseStatement is not None):
+            return (self.returns(ctx.ifStatement.trueStatement.statement)
+                    and self.returns(ctx.ifStatement.falseStatement.statement))
+        return False
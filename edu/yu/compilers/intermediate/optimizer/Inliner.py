@@ -0,0 +1,343 @@
+# <h1>Inliner</h1>
+# <p>The optimization pass that replaces calls of small functions by their
+# bodies. Semantics marks a routine with fewer than three statements as
+# inline; a call of such a function is inlined if the body is a sequence
+# of assignments to its locals and value parameters followed by a return,
+# and the expression it returns is small enough once the assignments
+# are substituted into it. The call factor becomes that expression, with
+# each parameter replaced by its argument, so the function's locals and
+# parameters don't appear in the caller at all.</p>
+# <p>A call is inlined only if doing so can't change what the program
+# does. Neither the arguments nor the body may call a function, so the
+# order in which the inlined expression reads variables doesn't matter.
+# An argument that isn't a literal or a plain variable must be used
+# exactly once, and not in an operand of and or or that may be skipped,
+# so it's evaluated once whenever the call would be. For the same
+# reason, an assigned value that isn't a literal or a plain variable
+# must be used at least once outside such an operand. Every
+# argument and every assigned value must have the type of its parameter
+# or local, since an integer passed as a decimal would otherwise change
+# the meaning of operations like /. And every other name the body uses
+# must mean the same variable or constant at the call, where a local of
+# the caller may hide it.</p>
+# <p>Routines are inlined in the order they are defined, so a function
+# that calls a smaller one defined before it can be inlined in turn. A
+# call of a routine from its own body, or of one not yet defined, is
+# never inlined.</p>
+from collections import Counter
+
+from edu.yu.compilers.intermediate.ast import Ast
+from edu.yu.compilers.intermediate.ast.AstVisitor import AstVisitor
+from edu.yu.compilers.intermediate.symtable.Kind import Kind
+from edu.yu.compilers.intermediate.type.Form import Form
+
+# The largest inlined expression, in nodes.
+INLINE_BUDGET = 40
+
+
+# Copy a node. The copy shares the tokens, entries and types, and the
+# children until they are replaced.
+# @param node the node.
+# @return the copy.
+def copyNode(node):
+    copy = type(node).__new__(type(node))
+    copy.tokens, copy.start, copy.stop = node.tokens, node.start, node.stop
+
+    for field in node.FIELDS:
+        value = getattr(node, field)
+        setattr(copy, field, list(value) if field in node.LISTS else value)
+    return copy
+
+
+# Count the nodes of a subtree.
+# @param node the root node.
+# @return the count.
+def treeSize(node):
+    return 1 + sum(treeSize(child) for child in node.getChildren())
+
+
+# Get the lone factor of an expression, if it is one.
+# @param ctx the ExpressionContext.
+# @return the factor node, or None.
+def loneFactor(ctx):
+    if (ctx.relOp is not None) or (len(ctx.simpleExpression) != 1):
+        return None
+    simpleCtx = ctx.simpleExpression[0]
+    if (simpleCtx.sign is not None) or (len(simpleCtx.term) != 1) or (len(simpleCtx.term[0].factor) != 1):
+        return None
+    return simpleCtx.term[0].factor[0]
+
+
+class Binding:
+
+    # Constructor.
+    # @param expression  the ExpressionContext that replaces the name.
+    # @param trivial     true if it can be evaluated more than once or not
+    #                    at all.
+    # @param uses        a Counter of the bindings the expression contains.
+    # @param certainUses a Counter of those it evaluates whenever it is
+    #                    evaluated.
+    def __init__(self, expression, trivial, uses=(), certainUses=()):
+        self.expression = expression
+        self.trivial = trivial
+        self.uses = Counter(uses)
+        self.uses[self] += 1
+        self.certainUses = Counter(certainUses)
+        self.certainUses[self] += 1
+
+
+class Inliner(AstVisitor):
+
+    def __init__(self):
+        self.scopes = []  # the symbol tables of the routines being walked, outermost first
+        self.definitions = {}  # routine entry -> the RoutineDefinition, once its body is walked
+        self.loopCondition = False  # true while walking the condition of a loop
+
+    def visitProgram(self, ctx):
+        self.scopes.append(ctx.programHeader.programIdentifier.entry.getRoutineSymTable())
+        self.visit(ctx.block)
+        self.scopes.pop()
+
+    def visitRoutineDefinition(self, ctx):
+        routineId = ctx.functionHead.routineIdentifier.entry
+
+        self.scopes.append(routineId.getRoutineSymTable())
+        self.visit(ctx.block)
+        self.scopes.pop()
+
+        self.definitions[routineId] = ctx
+
+    def visitWhileStatement(self, ctx):
+        self.condition(ctx.expression)
+        self.visit(ctx.statement)
+
+    def visitForStatement(self, ctx):
+        self.visit(ctx.variable)
+        self.visit(ctx.expression[0])
+        self.condition(ctx.expression[1])
+        self.visit(ctx.statement)
+        self.visit(ctx.assignmentStatement)
+
+    # Walk the condition of a loop. Java doesn't allow a loop whose
+    # condition is a constant false or code after a loop whose condition
+    # is a constant true, so a call in a loop condition isn't inlined if
+    # that would make the condition constant.
+    # @param ctx the ExpressionContext.
+    def condition(self, ctx):
+        self.loopCondition = True
+        self.visit(ctx)
+        self.loopCondition = False
+
+    # Call factors are replaced in the nodes that contain them.
+
+    def visitTerm(self, ctx):
+        for i, factorCtx in enumerate(ctx.factor):
+            ctx.factor[i] = self.inlineFactor(factorCtx)
+
+    def visitNotFactor(self, ctx):
+        ctx.factor = self.inlineFactor(ctx.factor)
+
+    # Walk a factor, and inline it if it is a call that can be inlined.
+    # @param ctx the factor node.
+    # @return the node to replace it with.
+    def inlineFactor(self, ctx):
+        self.visit(ctx)
+        if isinstance(ctx, Ast.FunctionCallFactor):
+            inlined = self.inline(ctx.functionCallStatement)
+            if inlined is not None:
+                return inlined
+        return ctx
+
+    # Inline a call.
+    # @param ctx the FunctionCallStatementContext.
+    # @return the factor that replaces the call, or None if it can't be
+    #         inlined.
+    def inline(self, ctx):
+        functionId = ctx.functionName.entry
+        routineCtx = self.definitions.get(functionId)
+        if (routineCtx is None) or not functionId.isInline():
+            return None
+
+        symTable = functionId.getRoutineSymTable()
+        parameters = routineCtx.functionHead.parameters
+        declarations = parameters.parameterDeclarationsList.parameterDeclaration if parameters is not None else []
+        arguments = ctx.argumentList.argument if ctx.argumentList is not None else []
+        if len(arguments) != len(declarations):
+            return None
+
+        # Bind the parameters to the arguments.
+        bindings = {}
+        for dclCtx, argCtx in zip(declarations, arguments):
+            paramId = dclCtx.parameterIdentifier.entry
+            exprCtx = argCtx.expression
+            if (paramId.getType() is not exprCtx.type_) or not self.isScalar(paramId.getType()) or (
+                    not self.isPure(exprCtx, None)):
+                return None
+            bindings[paramId] = Binding(exprCtx, self.isTrivial(exprCtx))
+        argumentBindings = list(bindings.values())
+        valueBindings = []
+
+        statements = [stmtCtx for stmtCtx in routineCtx.block.compoundStatement.statementList.statement
+                      if stmtCtx.emptyStatement is None]
+        if not statements or (statements[-1].returnStatement is None):
+            return None
+
+        # Substitute each assignment into the statements after it.
+        for stmtCtx in statements[:-1]:
+            assignCtx = stmtCtx.assignmentStatement
+            if assignCtx is None:
+                return None
+
+            variableCtx = assignCtx.lhs.variable
+            targetId = variableCtx.entry
+            exprCtx = assignCtx.rhs.expression
+            if variableCtx.modifier or (targetId.getSymTable() is not symTable) or (
+                    targetId.getKind() not in (Kind.VARIABLE, Kind.VALUE_PARAMETER)) or (
+                    targetId.getName() == functionId.getName()) or (targetId.getType() is not exprCtx.type_) or (
+                    not self.isPure(exprCtx, symTable, bindings)):
+                return None
+
+            uses, certainUses = Counter(), Counter()
+            expression = self.substitute(exprCtx, bindings, uses, certainUses)
+            bindings[targetId] = Binding(expression, self.isTrivial(expression), uses, certainUses)
+            valueBindings.append(bindings[targetId])
+
+        exprCtx = statements[-1].returnStatement.expression
+        if not self.isPure(exprCtx, symTable, bindings):
+            return None
+
+        uses, certainUses = Counter(), Counter()
+        expression = self.substitute(exprCtx, bindings, uses, certainUses)
+        if treeSize(expression) > INLINE_BUDGET:
+            return None
+        if self.loopCondition and not self.readsVariable(expression):
+            return None
+
+        # Every argument that isn't trivial must be evaluated just once,
+        # and every value that isn't trivial at least once, whenever the
+        # call would be.
+        for binding in argumentBindings:
+            if (not binding.trivial) and ((uses[binding] != 1) or (certainUses[binding] != 1)):
+                return None
+        for binding in valueBindings:
+            if (not binding.trivial) and (certainUses[binding] == 0):
+                return None
+
+        return self.asFactor(expression)
+
+    # Find out if an expression calls no function and, when it's from a
+    # function body, uses only what is visible at the call.
+    # @param ctx      the ExpressionContext.
+    # @param symTable the symbol table of the function, or None for an
+    #                 argument.
+    # @param bindings the entries bound so far.
+    # @return true if it does.
+    def isPure(self, ctx, symTable, bindings=None):
+        if isinstance(ctx, Ast.FunctionCallFactor):
+            return False
+
+        if (symTable is not None) and isinstance(ctx, Ast.Variable):
+            entry = ctx.entry
+            if entry.getSymTable() is symTable:
+                # A parameter or a local that has been assigned.
+                if (entry not in bindings) or ctx.modifier:
+                    return False
+            elif not self.isVisible(entry, ctx.variableIdentifier.key):
+                return False
+
+        return all(self.isPure(child, symTable, bindings) for child in ctx.getChildren())
+
+    # Find out if an expression reads a variable or a parameter.
+    # @param ctx the ExpressionContext.
+    # @return true if it does.
+    def readsVariable(self, ctx):
+        if isinstance(ctx, Ast.Variable) and (ctx.entry.getKind() not in (Kind.CONSTANT, Kind.ENUMERATION_CONSTANT)):
+            return True
+        return any(self.readsVariable(child) for child in ctx.getChildren())
+
+    # Find out if a name means an entry at the call being inlined.
+    # @param entry the entry.
+    # @param key   the name's key.
+    # @return true if it does.
+    def isVisible(self, entry, key):
+        table = entry.getSymTable()
+        for scope in reversed(self.scopes):
+            if scope is table:
+                return True
+            elif scope.lookup(key) is not None:
+                return False
+        return table.getNestingLevel() == 0
+
+    # Find out if a type is a scalar or an enumeration, which are passed
+    # and assigned by value.
+    # @param type_ the type.
+    # @return true if it is.
+    def isScalar(self, type_):
+        return type_.getForm() in (Form.SCALAR, Form.ENUMERATION)
+
+    # Find out if an expression is a literal or a plain variable, which
+    # can be evaluated any number of times.
+    # @param ctx the ExpressionContext.
+    # @return true if it is.
+    def isTrivial(self, ctx):
+        factorCtx = loneFactor(ctx)
+        if isinstance(factorCtx, Ast.VariableFactor):
+            return not factorCtx.variable.modifier
+        return isinstance(factorCtx, (Ast.NumberFactor, Ast.CharacterFactor, Ast.StringFactor))
+
+    # Copy a subtree of the function body with the bound names replaced.
+    # @param node        the root node.
+    # @param bindings    the entry -> Binding map.
+    # @param uses        the Counter of the bindings used, which it updates.
+    # @param certainUses the Counter of the bindings used whenever the
+    #                    subtree is evaluated, which it updates.
+    # @param conditional true if the subtree may not be evaluated when
+    #                    the expression it's in is.
+    # @return the copy.
+    def substitute(self, node, bindings, uses, certainUses, conditional=False):
+        if isinstance(node, Ast.VariableFactor):
+            binding = bindings.get(node.variable.entry)
+            if binding is not None:
+                uses.update(binding.uses)
+                if not conditional:
+                    certainUses.update(binding.certainUses)
+                return self.asFactor(self.substitute(binding.expression, {}, Counter(), Counter()))
+
+        copy = copyNode(node)
+        for field in node.CHILDREN:
+            if field in node.LISTS:
+                setattr(copy, field, [self.substitute(child, bindings, uses, certainUses,
+                                                      conditional or self.isShortCircuited(node, field, i))
+                                      for i, child in enumerate(getattr(node, field))])
+            elif getattr(node, field) is not None:
+                setattr(copy, field, self.substitute(getattr(node, field), bindings, uses, certainUses, conditional))
+        return copy
+
+    # Find out if an operand of an operator chain may be skipped: it
+    # follows an and or an or.
+    # @param node  the chain node.
+    # @param field the name of the list the operand is in.
+    # @param i     the operand's index in the list.
+    # @return true if it may be.
+    def isShortCircuited(self, node, field, i):
+        if isinstance(node, Ast.Term) and (field == "factor"):
+            ops = node.mulOp
+        elif isinstance(node, Ast.SimpleExpression) and (field == "term"):
+            ops = node.addOp
+        else:
+            return False
+        return any(opCtx.getText().lower() in ("and", "or") for opCtx in ops[:i])
+
+    # Make an expression a factor: its lone factor, or the expression in
+    # parentheses.
+    # @param ctx the ExpressionContext.
+    # @return the factor node.
+    def asFactor(self, ctx):
+        factorCtx = loneFactor(ctx)
+        if factorCtx is not None:
+            return factorCtx
+
+        factorCtx = Ast.ParenthesizedFactor(ctx.tokens, ctx.start, ctx.stop)
+        factorCtx.expression = ctx
+        factorCtx.type_ = ctx.type_
+        return factorCtx
@@ -0,0 +1,621 @@
+# <h1>LoopInvariantMover</h1>
+# <p>The optimization pass that moves the loop-invariant expressions of
+# WHILE and FOR loops out of the loops. An expression is invariant if
+# the loop assigns no variable it reads, whether by an assignment, a
+# read, the FOR loop's index updates or a call of a routine that isn't
+# pure. Each invariant expression is computed once, into a temporary
+# variable before the loop, and the loop reads the temporary instead:
+# limit computations, record field chains and calls of pure functions.
+# The invariant operands at the start of an operator chain, such as the
+# a * b of a * b * i, are moved as one expression, and equal invariant
+# expressions in a loop share a temporary.</p>
+# <p>A temporary is a new variable of the routine the loop is in. It gets
+# an entry and a slot in the routine's symbol table, from which the
+# executor, the VM and the Python generator allocate variables, and a
+# declaration in the routine's variables part, from which the Converter
+# declares Java variables. Its name starts with an underscore, so it
+# can't clash with a Grasp identifier.</p>
+# <p>A FUNCTION FINAL is pure if it and the functions it calls have no VAR
+# parameters, don't print or read, and assign only their own locals and
+# value parameters. An array or record is passed by reference, so a pure
+# function assigns no element or field of an array or record parameter,
+# and no whole array or record, which could make a local share one. A
+# call of a pure function is invariant if its arguments are and the loop
+# doesn't assign the variables it reads that aren't its own.</p>
+# <p>An array or record parameter, VAR or not, is passed by reference, so
+# it may name a variable of the caller, or an array or record in one. So
+# a variable isn't invariant if the loop assigns a parameter that may
+# share its storage, because the variable is or holds an array or record
+# of the parameter's kind, and a parameter isn't invariant if the loop
+# assigns any variable that may share its storage. A local of the
+# routine the loop is in can't be a parameter's variable.</p>
+# <p>A moved expression is evaluated even if the loop body never runs, so
+# an expression in the body is moved only if it can't fail: it calls no
+# function, has no subscripts, divides only by nonzero literals and
+# reads no strings, which start out unset. The condition is evaluated at
+# least once, so any invariant expression in it can be moved, except in
+# an operand of and or or that may not be evaluated.</p>
+from edu.yu.compilers.intermediate.ast import Ast
+from edu.yu.compilers.intermediate.ast.AstVisitor import AstVisitor
+from edu.yu.compilers.intermediate.optimizer.ConstantFolder import newToken
+from edu.yu.compilers.intermediate.optimizer.Inliner import copyNode, loneFactor
+from edu.yu.compilers.intermediate.symtable.Kind import Kind
+from edu.yu.compilers.intermediate.symtable.Predefined import Predefined
+from edu.yu.compilers.intermediate.type.Form import Form
+from gen.GraspLexer import GraspLexer
+
+# The prefix of the names of the temporaries.
+TEMPORARY_PREFIX = "_invariant"
+
+
+# Get the nodes of a subtree in preorder, except in the routines it
+# declares.
+# @param node the root node.
+# @return a generator of the nodes.
+def walk(node):
+    yield node
+    for child in node.getChildren():
+        if not isinstance(child, Ast.Declarations):
+            yield from walk(child)
+
+
+# Get a key that is equal for subtrees that compute the same value. An
+# inlined subtree keeps the text of the function it came from, so the
+# key is made of the entries and the leaf texts.
+# @param node the root node.
+# @return the key.
+def structureKey(node):
+    entry = node.entry if "entry" in node.FIELDS else None
+    text = node.getText() if not node.CHILDREN else None
+    return type(node).__name__, text, entry, tuple(structureKey(child) for child in node.getChildren())
+
+
+# Get a key that is equal for the types of two variables that may share
+# storage. An array is compared by its element type, since the type that
+# names an array type is another Typespec, and a record by its form.
+# @param type_ the type.
+# @return the key.
+def storageKey(type_):
+    type_ = type_.baseType()
+    if type_.getForm() == Form.ARRAY:
+        return Form.ARRAY, storageKey(type_.getArrayElementType())
+    elif type_.getForm() == Form.RECORD:
+        return Form.RECORD
+    return type_
+
+
+class LoopInvariantMover(AstVisitor):
+
+    def __init__(self):
+        self.definitions = {}  # routine entry -> RoutineDefinition
+        self.pureReads = {}  # function entry -> what it reads that isn't its own, or None if it isn't pure
+        self.symTables = []  # the symbol tables of the routines being walked, outermost first
+        self.declarations = []  # the Declarations of the routines being walked
+        self.temporaryCount = 0
+        self.containedKeys = {}  # type -> the storage keys of it and of its elements and fields
+
+        # The loop being optimized.
+        self.assigned = None  # the entries it assigns
+        self.changed = None  # the storage keys of what it assigns
+        self.sharedChanged = None  # those of what it assigns through a parameter
+        self.impure = False  # true if it calls a routine that isn't pure
+        self.temporaries = None  # structure key -> the entry of its temporary
+        self.hoisted = None  # the assignments of the temporaries
+
+    def visitProgram(self, ctx):
+        self.define(ctx.block.declarations)
+        self.routine(ctx.programHeader.programIdentifier.entry, ctx.block)
+
+    def visitRoutineDefinition(self, ctx):
+        self.routine(ctx.functionHead.routineIdentifier.entry, ctx.block)
+
+    # Walk the block of the program or of a routine.
+    # @param routineId the entry of the program or routine.
+    # @param blockCtx  the BlockContext.
+    def routine(self, routineId, blockCtx):
+        self.symTables.append(routineId.getRoutineSymTable())
+        self.declarations.append(blockCtx.declarations)
+        self.visit(blockCtx)
+        self.declarations.pop()
+        self.symTables.pop()
+
+    # Record the definitions of the routines declared in a block and in
+    # the routines it declares.
+    # @param ctx the DeclarationsContext.
+    def define(self, ctx):
+        if ctx.routinesPart is not None:
+            for definitionCtx in ctx.routinesPart.routineDefinition:
+                self.definitions[definitionCtx.functionHead.routineIdentifier.entry] = definitionCtx
+                self.define(definitionCtx.block.declarations)
+
+    def visitStatementList(self, ctx):
+        statements = []
+        for stmtCtx in ctx.statement:
+            statements.extend(self.optimize(stmtCtx))
+            statements.append(stmtCtx)
+
+        ctx.statement[:] = statements
+
+    # A loop that isn't in a statement list, such as the branch of an if
+    # statement, becomes a compound statement with its temporaries.
+    def visitStatement(self, ctx):
+        hoisted = self.optimize(ctx)
+        if hoisted:
+            loopCtx = copyNode(ctx)
+            for field in ctx.FIELDS:
+                setattr(ctx, field, None)
+
+            ctx.compoundStatement = Ast.CompoundStatement(ctx.tokens, ctx.start, ctx.stop)
+            listCtx = ctx.compoundStatement.statementList = Ast.StatementList(ctx.tokens, ctx.start, ctx.stop)
+            listCtx.statement = hoisted + [loopCtx]
+
+    # Move the invariant expressions out of a statement if it is a loop,
+    # and then out of the loops in it.
+    # @param ctx the StatementContext.
+    # @return the assignments of the temporaries, which go before the
+    #         statement.
+    def optimize(self, ctx):
+        hoisted = []
+
+        loopCtx = ctx.whileStatement or ctx.forStatement
+        if loopCtx is not None:
+            self.assigned = set()
+            self.changed = set()
+            self.sharedChanged = set()
+            self.impure = False
+            self.temporaries = {}
+            self.hoisted = hoisted
+            self.effects(loopCtx)
+
+            if ctx.whileStatement is not None:
+                loopCtx.expression = self.collect(loopCtx.expression, True)
+                self.collectStatement(loopCtx.statement)
+            else:
+                loopCtx.expression[1] = self.collect(loopCtx.expression[1], True)
+                self.collectStatement(loopCtx.statement)
+                self.collectStatement(loopCtx.assignmentStatement)
+
+        self.visitChildren(ctx)
+        return hoisted
+
+    # Record what a loop assigns and whether it calls a routine that
+    # isn't pure.
+    # @param loopCtx the WhileStatementContext or ForStatementContext.
+    def effects(self, loopCtx):
+        for node in walk(loopCtx):
+            if isinstance(node, (Ast.Lhs, Ast.ForStatement)):
+                self.assign(node.variable)
+            elif isinstance(node, Ast.ReadArguments):
+                for variableCtx in node.variable:
+                    self.assign(variableCtx)
+            elif isinstance(node, Ast.FunctionCallStatement):
+                self.assigned.update(self.sharedArguments(node))
+                if self.reads(node.functionName.entry) is None:
+                    self.impure = True
+
+    # Record an assignment of the loop.
+    # @param ctx the VariableContext of the target.
+    def assign(self, ctx):
+        self.assigned.add(ctx.entry)
+
+        # The variable, or the arrays and records the modifiers select from.
+        types = [ctx.entry.getType()]
+        for modCtx in ctx.modifier:
+            if modCtx.indexList is None:
+                types.append(modCtx.field.entry.getType())
+            else:
+                for _ in modCtx.indexList.index:
+                    types.append(types[-1].baseType().getArrayElementType())
+        keys = {storageKey(type_) for type_ in (types[:-1] if ctx.modifier else types)}
+
+        self.changed.update(keys)
+        if self.isShared(ctx.entry):
+            self.sharedChanged.update(keys)
+
+    # Find out if an entry is a parameter that may name a variable of the
+    # caller.
+    # @param entry the entry.
+    # @return true if it is.
+    def isShared(self, entry):
+        kind = entry.getKind()
+        return (kind == Kind.REFERENCE_PARAMETER) or ((kind == Kind.VALUE_PARAMETER) and entry.getType().isStructured())
+
+    # Get the storage keys of a type and of the types of its elements and
+    # fields.
+    # @param type_ the type.
+    # @return the set of keys.
+    def storageKeys(self, type_):
+        keys = self.containedKeys.get(type_)
+        if keys is None:
+            keys = {storageKey(type_)}
+            baseType = type_.baseType()
+            if baseType.getForm() == Form.ARRAY:
+                keys |= self.storageKeys(baseType.getArrayElementType())
+            elif baseType.getForm() == Form.RECORD:
+                for fieldId in baseType.getRecordSymTable().sortedEntries():
+                    keys |= self.storageKeys(fieldId.getType())
+            self.containedKeys[type_] = keys
+        return keys
+
+    # Get the variables a call passes by reference: as VAR arguments, or
+    # as arrays or records, whose elements and fields the routine may
+    # assign.
+    # @param ctx the FunctionCallStatementContext.
+    # @return the list of their entries.
+    def sharedArguments(self, ctx):
+        parameters = ctx.functionName.entry.getRoutineParameters() or []
+        arguments = ctx.argumentList.argument if ctx.argumentList is not None else []
+
+        entries = []
+        for paramId, argCtx in zip(parameters, arguments):
+            factorCtx = loneFactor(argCtx.expression)
+            if isinstance(factorCtx, Ast.VariableFactor) and (
+                    (paramId.getKind() == Kind.REFERENCE_PARAMETER) or paramId.getType().isStructured()):
+                entries.append(factorCtx.variable.entry)
+        return entries
+
+    # Get what a function reads, if it is pure.
+    # @param functionId the function's entry.
+    # @return the set of the entries it reads that aren't its own, or
+    #         None if it isn't pure.
+    def reads(self, functionId):
+        if functionId in self.pureReads:
+            return self.pureReads[functionId]
+
+        # A function that calls back a function being checked isn't pure.
+        self.pureReads[functionId] = None
+        definitionCtx = self.definitions.get(functionId)
+        if (definitionCtx is None) or not functionId.isImmutable():
+            return None
+        if any(paramId.getKind() != Kind.VALUE_PARAMETER for paramId in functionId.getRoutineParameters() or []):
+            return None
+
+        symTable = functionId.getRoutineSymTable()
+        reads = set()
+        for node in walk(definitionCtx.block.compoundStatement):
+            if isinstance(node, (Ast.PrintStatement, Ast.PrintlnStatement, Ast.ReadStatement, Ast.ReadlnStatement)):
+                return None
+            elif isinstance(node, Ast.Lhs) and not self.isOwnTarget(node.variable, symTable):
+                return None
+            elif isinstance(node, Ast.Variable) and (node.entry.getSymTable() is not symTable):
+                reads.add(node.entry)
+            elif isinstance(node, Ast.FunctionCallStatement) and (node.functionName.entry is not functionId):
+                calleeReads = self.reads(node.functionName.entry)
+                if calleeReads is None:
+                    return None
+                reads.update(calleeReads)
+
+        self.pureReads[functionId] = reads
+        return reads
+
+    # Find out if an assignment in a function changes only what is the
+    # function's own: a local, a scalar value parameter, or an element or
+    # field of a local.
+    # @param ctx      the VariableContext of the target.
+    # @param symTable the function's symbol table.
+    # @return true if it does.
+    def isOwnTarget(self, ctx, symTable):
+        entry = ctx.entry
+        if entry.getSymTable() is not symTable:
+            return False
+        elif ctx.modifier:
+            return entry.getKind() == Kind.VARIABLE
+        return not entry.getType().isStructured()
+
+    # Find out if the value of an entry is the same in every iteration.
+    # @param entry the entry of a variable or a constant.
+    # @return true if it is.
+    def isInvariantEntry(self, entry):
+        if entry.getKind() in (Kind.CONSTANT, Kind.ENUMERATION_CONSTANT):
+            return True
+        elif self.impure or (entry in self.assigned):
+            return False
+        elif (entry.getKind() == Kind.VARIABLE) and (entry.getSymTable() is self.symTables[-1]):
+            return True
+
+        changed = self.changed if self.isShared(entry) else self.sharedChanged
+        return self.storageKeys(entry.getType()).isdisjoint(changed)
+
+    # Find out if the value of an expression is the same in every
+    # iteration.
+    # @param ctx the root node.
+    # @return true if it is.
+    def isInvariant(self, ctx):
+        for node in walk(ctx):
+            if isinstance(node, Ast.Variable) and not self.isInvariantEntry(node.entry):
+                return False
+            elif isinstance(node, Ast.FunctionCallStatement):
+                reads = self.reads(node.functionName.entry)
+                if (reads is None) or not all(self.isInvariantEntry(entry) for entry in reads):
+                    return False
+        return True
+
+    # Find out if an expression can't fail.
+    # @param ctx the root node.
+    # @return true if it can't.
+    def isTotal(self, ctx):
+        for node in walk(ctx):
+            if isinstance(node, (Ast.FunctionCallStatement, Ast.IndexList)):
+                return False
+            elif isinstance(node, Ast.Variable) and (node.type_ is Predefined.stringType):
+                return False
+            elif isinstance(node, Ast.Term):
+                for opCtx, factorCtx in zip(node.mulOp, node.factor[1:]):
+                    if (opCtx.getText().lower() in ("/", "div", "mod")) and not (
+                            isinstance(factorCtx, Ast.NumberFactor) and (float(factorCtx.getText()) != 0)):
+                        return False
+        return True
+
+    # Find out if a temporary can hold a value of a type.
+    # @param type_ the type.
+    # @return true if it can.
+    def isTemporaryType(self, type_):
+        return type_ in (Predefined.integerType, Predefined.realType, Predefined.booleanType)
+
+    # Find out if moving an expression out of the loop saves work and
+    # keeps what the program does.
+    # @param ctx           the expression node.
+    # @param unconditional true if it's evaluated whenever the condition is.
+    # @return true if it does.
+    def isHoistable(self, ctx, unconditional):
+        if isinstance(ctx, Ast.Expression):
+            worth = ctx.relOp is not None
+        elif isinstance(ctx, Ast.SimpleExpression):
+            worth = (ctx.sign is not None) or (len(ctx.term) > 1)
+        elif isinstance(ctx, Ast.Term):
+            worth = len(ctx.factor) > 1
+        elif isinstance(ctx, Ast.VariableFactor):
+            worth = bool(ctx.variable.modifier)
+        else:
+            worth = isinstance(ctx, Ast.FunctionCallFactor)
+
+        # The body may reuse a temporary of the condition.
+        return (worth and self.isTemporaryType(ctx.type_) and self.isInvariant(ctx)
+                and (unconditional or self.isTotal(ctx) or (structureKey(ctx) in self.temporaries)))
+
+    # Move the expressions out of a statement of the loop body, which may
+    # not be executed.
+    # @param ctx the statement node.
+    def collectStatement(self, ctx):
+        for field in ctx.CHILDREN:
+            if field in ctx.LISTS:
+                children = getattr(ctx, field)
+                for i, child in enumerate(children):
+                    if isinstance(child, Ast.Expression):
+                        children[i] = self.collect(child, False)
+                    else:
+                        self.collectStatement(child)
+            else:
+                child = getattr(ctx, field)
+                if isinstance(child, Ast.Expression):
+                    setattr(ctx, field, self.collect(child, False))
+                elif child is not None:
+                    self.collectStatement(child)
+
+    # Move the invariant parts of an expression out of the loop.
+    # @param ctx           the expression node.
+    # @param unconditional true if it's evaluated whenever the condition is.
+    # @return the node to replace it with.
+    def collect(self, ctx, unconditional):
+        if self.isHoistable(ctx, unconditional):
+            return self.hoist(ctx)
+
+        if isinstance(ctx, (Ast.SimpleExpression, Ast.Term)):
+            self.collectChain(ctx, unconditional)
+            return ctx
+
+        for field in ctx.CHILDREN:
+            if field in ctx.LISTS:
+                children = getattr(ctx, field)
+                children[:] = [self.collect(child, unconditional) for child in children]
+            elif getattr(ctx, field) is not None:
+                setattr(ctx, field, self.collect(getattr(ctx, field), unconditional))
+        return ctx
+
+    # Move the invariant parts of an operator chain out of the loop.
+    # @param ctx           the SimpleExpressionContext or TermContext.
+    # @param unconditional true if it's evaluated whenever the condition is.
+    def collectChain(self, ctx, unconditional):
+        if isinstance(ctx, Ast.SimpleExpression):
+            operands, ops = ctx.term, ctx.addOp
+        else:
+            operands, ops = ctx.factor, ctx.mulOp
+
+        first = 0
+        count = self.invariantPrefix(ctx, operands, ops, unconditional)
+        if count > 1:
+            self.hoistPrefix(ctx, count)
+            first = 1
+
+        for i in range(first, len(operands)):
+            if (i > 0) and (ops[i - 1].getText().lower() in ("and", "or")):
+                unconditional = False
+            operands[i] = self.collect(operands[i], unconditional)
+
+    # Count the invariant operands at the start of an operator chain that
+    # can be computed as one expression of their type.
+    # @param ctx           the SimpleExpressionContext or TermContext.
+    # @param operands      the operand nodes.
+    # @param ops           the operator nodes.
+    # @param unconditional true if it's evaluated whenever the condition is.
+    # @return the number of operands.
+    def invariantPrefix(self, ctx, operands, ops, unconditional):
+        type_ = ctx.type_
+        if (not self.isTemporaryType(type_)) or (getattr(ctx, "sign", None) is not None):
+            return 0
+
+        count = 0
+        for i, operandCtx in enumerate(operands[:-1]):
+            if (operandCtx.type_ is not type_) or ((i > 0) and (ops[i - 1].getText() == "/")):
+                break
+            if not self.isInvariant(operandCtx):
+                break
+            count = i + 1
+
+        # Dividing by an operand isn't total unless the divisor is a
+        # nonzero literal.
+        while (count > 1) and not (unconditional or self.isTotal(self.prefix(ctx, count))):
+            count -= 1
+        return count
+
+    # Make a chain of the first operands of an operator chain.
+    # @param ctx   the SimpleExpressionContext or TermContext.
+    # @param count the number of operands.
+    # @return the new chain node.
+    def prefix(self, ctx, count):
+        if isinstance(ctx, Ast.SimpleExpression):
+            prefixCtx = Ast.SimpleExpression(ctx.tokens, ctx.term[0].start, ctx.term[count - 1].stop)
+            prefixCtx.term = ctx.term[:count]
+            prefixCtx.addOp = ctx.addOp[:count - 1]
+        else:
+            prefixCtx = Ast.Term(ctx.tokens, ctx.factor[0].start, ctx.factor[count - 1].stop)
+            prefixCtx.factor = ctx.factor[:count]
+            prefixCtx.mulOp = ctx.mulOp[:count - 1]
+        prefixCtx.type_ = ctx.type_
+        return prefixCtx
+
+    # Replace the first operands of an operator chain by a temporary.
+    # @param ctx   the SimpleExpressionContext or TermContext.
+    # @param count the number of operands.
+    def hoistPrefix(self, ctx, count):
+        factorCtx = self.temporaryFactor(self.temporary(self.prefix(ctx, count)), ctx)
+
+        if isinstance(ctx, Ast.SimpleExpression):
+            ctx.term[:count] = [self.asTerm(factorCtx)]
+            del ctx.addOp[:count - 1]
+        else:
+            ctx.factor[:count] = [factorCtx]
+            del ctx.mulOp[:count - 1]
+
+    # Replace an expression by a temporary. An expression, simple
+    # expression or term node stays in place and becomes a lone read of
+    # the temporary.
+    # @param ctx the expression node.
+    # @return the node to replace it with.
+    def hoist(self, ctx):
+        factorCtx = self.temporaryFactor(self.temporary(copyNode(ctx)), ctx)
+
+        if isinstance(ctx, Ast.Factor):
+            return factorCtx
+        elif isinstance(ctx, Ast.Term):
+            ctx.factor[:] = [factorCtx]
+            ctx.mulOp.clear()
+        elif isinstance(ctx, Ast.SimpleExpression):
+            ctx.sign = None
+            ctx.term[:] = [self.asTerm(factorCtx)]
+            ctx.addOp.clear()
+        else:
+            ctx.relOp = None
+            ctx.simpleExpression[:] = [self.asSimpleExpression(self.asTerm(factorCtx))]
+        return ctx
+
+    # Get the temporary that holds the value of an expression, creating it
+    # and its assignment if the loop doesn't have one yet.
+    # @param ctx the expression node, which the assignment takes over.
+    # @return the temporary's entry.
+    def temporary(self, ctx):
+        key = structureKey(ctx)
+        entry = self.temporaries.get(key)
+        if entry is not None:
+            return entry
+
+        symTable = self.symTables[-1]
+        self.temporaryCount += 1
+        entry = symTable.enter(f"{TEMPORARY_PREFIX}{self.temporaryCount}", Kind.VARIABLE)
+        entry.setType(ctx.type_)
+        entry.setSlotNumber(symTable.nextSlotNumber())
+        self.temporaries[key] = entry
+        self.declare(entry, ctx)
+
+        exprCtx = ctx
+        if isinstance(exprCtx, Ast.Factor):
+            exprCtx = self.asTerm(exprCtx)
+        if isinstance(exprCtx, Ast.Term):
+            exprCtx = self.asSimpleExpression(exprCtx)
+        if isinstance(exprCtx, Ast.SimpleExpression):
+            simpleCtx = exprCtx
+            exprCtx = Ast.Expression(ctx.tokens, ctx.start, ctx.stop)
+            exprCtx.simpleExpression = [simpleCtx]
+            exprCtx.type_ = ctx.type_
+
+        assignCtx = Ast.AssignmentStatement(ctx.tokens, ctx.start, ctx.stop)
+        assignCtx.lhs = Ast.Lhs(ctx.tokens, ctx.start, ctx.stop)
+        assignCtx.lhs.variable = self.temporaryFactor(entry, ctx).variable
+        assignCtx.lhs.type_ = ctx.type_
+        assignCtx.rhs = Ast.Rhs(ctx.tokens, ctx.start, ctx.stop)
+        assignCtx.rhs.expression = exprCtx
+
+        stmtCtx = Ast.Statement(ctx.tokens, ctx.start, ctx.stop)
+        stmtCtx.assignmentStatement = assignCtx
+        self.hoisted.append(stmtCtx)
+        return entry
+
+    # Declare a temporary in the variables part of the routine.
+    # @param entry the temporary's entry.
+    # @param like  the node whose position to give the declaration.
+    def declare(self, entry, like):
+        token = newToken(GraspLexer.IDENTIFIER, entry.getName(), like.start, 0)
+        tokens = [token]
+        type_ = entry.getType()
+
+        declarationsCtx = self.declarations[-1]
+        if declarationsCtx.variablesPart is None:
+            declarationsCtx.variablesPart = Ast.VariablesPart(tokens, token, token)
+            declarationsCtx.variablesPart.variableDeclarationsList = Ast.VariableDeclarationsList(tokens, token, token)
+
+        typeIdCtx = Ast.TypeIdentifier(tokens, token, token)
+        typeIdCtx.name = typeIdCtx.key = type_.getName()
+        typeIdCtx.type_ = type_
+        simpleTypeCtx = Ast.TypeIdentifierTypespec(tokens, token, token)
+        simpleTypeCtx.typeIdentifier = typeIdCtx
+        simpleTypeCtx.type_ = type_
+        typeCtx = Ast.SimpleTypespec(tokens, token, token)
+        typeCtx.simpleType = simpleTypeCtx
+        typeCtx.type_ = type_
+
+        idCtx = Ast.VariableIdentifier(tokens, token, token)
+        idCtx.name = idCtx.key = entry.getName()
+        idCtx.entry = entry
+        idCtx.type_ = type_
+        listCtx = Ast.VariableIdentifierList(tokens, token, token)
+        listCtx.variableIdentifier = [idCtx]
+
+        dclCtx = Ast.VariableDeclarations(tokens, token, token)
+        dclCtx.typeSpecification = typeCtx
+        dclCtx.variableIdentifierList = listCtx
+        declarationsCtx.variablesPart.variableDeclarationsList.variableDeclarations.append(dclCtx)
+
+    # Create a factor that reads a temporary.
+    # @param entry the temporary's entry.
+    # @param like  the node whose position to give it.
+    # @return the VariableFactor.
+    def temporaryFactor(self, entry, like):
+        token = newToken(GraspLexer.IDENTIFIER, entry.getName(), like.start, 0)
+        tokens = [token]
+        type_ = entry.getType()
+
+        factorCtx = Ast.VariableFactor(tokens, token, token)
+        variableCtx = factorCtx.variable = Ast.Variable(tokens, token, token)
+        idCtx = variableCtx.variableIdentifier = Ast.VariableIdentifier(tokens, token, token)
+        idCtx.name = idCtx.key = entry.getName()
+        idCtx.entry = variableCtx.entry = entry
+        idCtx.type_ = variableCtx.type_ = factorCtx.type_ = type_
+        return factorCtx
+
+    # Make a factor a term.
+    # @param ctx the factor node.
+    # @return the TermContext.
+    def asTerm(self, ctx):
+        termCtx = Ast.Term(ctx.tokens, ctx.start, ctx.stop)
+        termCtx.factor = [ctx]
+        termCtx.type_ = ctx.type_
+        return termCtx
+
+    # Make a term a simple expression.
+    # @param ctx the TermContext.
+    # @return the SimpleExpressionContext.
+    def asSimpleExpression(self, ctx):
+        simpleCtx = Ast.SimpleExpression(ctx.tokens, ctx.start, ctx.stop)
+        simpleCtx.term = [ctx]
+        simpleCtx.type_ = ctx.type_
+        return simpleCtx
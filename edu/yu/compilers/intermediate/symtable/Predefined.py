@@ -1,5 +1,8 @@
+import copy
+
 from edu.yu.compilers.intermediate.symtable.Kind import Kind
 from edu.yu.compilers.intermediate.symtable.Routine import Routine
+from edu.yu.compilers.intermediate.symtable.SymTableStack import SymTableStack
 from edu.yu.compilers.intermediate.type.Form import Form
 from edu.yu.compilers.intermediate.type.Typespec import Typespec
 from edu.yu.compilers.intermediate.symtable.SymTableEntry import SymTableEntry
@@ -50,14 +53,40 @@ class Predefined:
     succId = None
     truncId = None
 
+    # The symbol table the predefined identifiers were created in.
+    prelude = None
+
     # Initialize a symbol table stack with predefined identifiers.
+    # The predefined types and identifiers are created only once per
+    # process; every later stack gets its own copies of the entries,
+    # which share the predefined types.
     #
     # @param symTableStack the symbol table stack to initialize.
     @staticmethod
     def initialize(symTableStack):
-        Predefined.initializeTypes(symTableStack)
-        Predefined.initializeConstants(symTableStack)
-        Predefined.initializeStandardRoutines(symTableStack)
+        if Predefined.prelude is None:
+            preludeStack = SymTableStack()
+            Predefined.initializeTypes(preludeStack)
+            Predefined.initializeConstants(preludeStack)
+            Predefined.initializeStandardRoutines(preludeStack)
+            Predefined.prelude = preludeStack.getLocalSymTable()
+
+        Predefined.enterPrelude(symTableStack)
+
+    # Enter copies of the prelude entries into the local symbol table.
+    # Each copy has its own line numbers so that nothing from one
+    # compilation leaks into the next.
+    #
+    # @param symTableStack the symbol table stack to initialize.
+    @staticmethod
+    def enterPrelude(symTableStack):
+        symTable = symTableStack.getLocalSymTable()
+
+        for preludeId in Predefined.prelude.sortedEntries():
+            entry = copy.copy(preludeId)
+            entry.symTable = symTable
+            entry.lineNumbers = []
+            symTable[entry.getName()] = entry
 
     # Initialize the predefined types.
     #
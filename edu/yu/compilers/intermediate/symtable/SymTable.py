@@ -1,12 +1,13 @@
 # <h1>SymTable</h1>
 # <p>The symbol table.</p>
+# <p>Entries are kept in a plain dictionary. The entries sorted by name are
+# built when first asked for and cached until the table changes.</p>
 # <p>Adapted from</p>
 # <p>Copyright (c) 2020 by Ronald Mak</p>
 from collections import OrderedDict
 
 from edu.yu.compilers.intermediate.symtable.Kind import Kind
 from edu.yu.compilers.intermediate.symtable.SymTableEntry import SymTableEntry
-from sortedcontainers import SortedDict
 
 
 # import edu.yu.compilers.intermediate.symtable.SymTableEntry.Kind;
@@ -16,7 +17,7 @@ from sortedcontainers import SortedDict
 # import java.util.TreeMap;
 # import static edu.yu.compilers.intermediate.symtable.SymTableEntry.Kind.VARIABLE;
 
-class SymTable(SortedDict):
+class SymTable(dict):
     UNNAMED_PREFIX = "_unnamed_"
     serialVersionUID = 0  # will convert to long automatically when needed via python
     unnamedIndex = 0
@@ -29,6 +30,7 @@ class SymTable(SortedDict):
         self.slotNumber = -1
         self.maxSlotNumber = None
         self.ownerId = None
+        self.sortedView = None  # entries sorted by name, None until needed
 
     # Generate a name for an unnamed type.
     # @return the name;
@@ -50,7 +52,8 @@ class SymTable(SortedDict):
     # Compute and return the next local variables array slot number
     # @return the slot number.
     def nextSlotNumber(self):
-        self.maxSlotNumber = self.slotNumber + 1
+        self.slotNumber += 1
+        self.maxSlotNumber = self.slotNumber
         return self.slotNumber
 
     # Getter.
@@ -71,6 +74,7 @@ class SymTable(SortedDict):
         entry = SymTableEntry(name, kind, self)
         # self[name] = entry  # these put and get methods should work
         super().__setitem__(name, entry)
+        self.sortedView = None
         return entry
 
     # Look up an existing symbol table entry.
@@ -79,17 +83,47 @@ class SymTable(SortedDict):
     def lookup(self, name):
         return super().get(name)  # these put and get methods should work
 
-    # Return an arraylist of entries sorted by name.
-    # @return the sorted arraylist.
+    # Return the entries sorted by name.
+    # @return the sorted tuple, shared until the table changes.
     def sortedEntries(self):
-        entries = super().values()
-        list = []
+        if self.sortedView is None:
+            self.sortedView = tuple(self[name] for name in sorted(self))
 
-        # Iterate over the entries and append them to the list.
-        for entry in entries:
-            list.append(entry)
+        return self.sortedView
+
+    # The dictionary methods that change the table drop the sorted view.
+
+    def __setitem__(self, name, entry):
+        super().__setitem__(name, entry)
+        self.sortedView = None
+
+    def __delitem__(self, name):
+        super().__delitem__(name)
+        self.sortedView = None
+
+    def pop(self, *args):
+        self.sortedView = None
+        return super().pop(*args)
+
+    def popitem(self):
+        self.sortedView = None
+        return super().popitem()
+
+    def setdefault(self, name, entry=None):
+        self.sortedView = None
+        return super().setdefault(name, entry)
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self.sortedView = None
+
+    def __ior__(self, other):
+        self.sortedView = None
+        return super().__ior__(other)
 
-        return list
+    def clear(self):
+        super().clear()
+        self.sortedView = None
 
     # Reset all the variable entries to a kind.
     # @param kind the kind to set.
@@ -1,4 +1,13 @@
-from multipledispatch import dispatch
+# <h1>SymTableStack</h1>
+# <p>The stack of the symbol tables of the open scopes.</p>
+# <p>Besides the tables, the stack keeps a display of bindings: for each
+# name, the entries of that name in the open scopes, innermost last. A
+# lookup reads the innermost binding instead of searching every scope,
+# so it takes the same time at any nesting depth. The bindings of a scope
+# are made as its entries are entered with enterLocal() (or when the
+# table is pushed) and are undone when it is popped. The level 0 table
+# may also be filled directly, as Predefined does: a name without a
+# binding is looked up there.</p>
 from edu.yu.compilers.intermediate.symtable.SymTable import SymTable
 from edu.yu.compilers.intermediate.symtable.SymTableEntry import SymTableEntry
 
@@ -12,6 +21,7 @@ class SymTableStack(list):
         # change all below super() to self if doesnt work
         self.append(SymTable(self.currentNestingLevel))  # ChatGPT used self instead of super()
         self.programId = None
+        self.bindings = {}  # name -> entries in the open scopes, innermost last
 
     def getCurrentNestingLevel(self) -> int:  # chatGPT used - > <ret type> :
         return self.currentNestingLevel
@@ -27,16 +37,16 @@ class SymTableStack(list):
 
     # ChatGPT Did not seem to properly override the methods in Python
 
-    @dispatch()  # Not sure if this will work
-    def push(self):
-        self.currentNestingLevel += 1
-        symTable = SymTable(self.currentNestingLevel)
-        self.append(symTable)
-        return symTable
-
-    @dispatch(SymTable)  # FIXME
-    def push(self, symTable):
+    # Push a symbol table onto the stack.
+    # @param symTable the symbol table, or None to push a new empty one.
+    # @return the pushed symbol table.
+    def push(self, symTable=None):
         self.currentNestingLevel += 1
+        if symTable is None:
+            symTable = SymTable(self.currentNestingLevel)
+        else:
+            for name, entry in symTable.items():
+                self.bind(name, entry, None)
         self.append(symTable)
 
         return symTable
@@ -45,31 +55,47 @@ class SymTableStack(list):
         symTable = self[self.currentNestingLevel]
         self.pop(self.currentNestingLevel)
         self.currentNestingLevel -= 1
+
+        # Undo the bindings of the scope.
+        bindings = self.bindings
+        for name, entry in symTable.items():
+            entries = bindings.get(name)
+            if entries and (entries[-1] is entry):
+                entries.pop()
+                if not entries:
+                    del bindings[name]
         # We differ slightly but may be functionally identical - I remove by index
         # ChatGPT simply pops - but I think same effect is achieved.
 
         return symTable
 
     def enterLocal(self, name, kind):
-        return self[self.currentNestingLevel].enter(name, kind)  # This is correct
+        symTable = self[self.currentNestingLevel]
+        replaced = symTable.lookup(name)
+        entry = symTable.enter(name, kind)  # This is correct
+        self.bind(name, entry, replaced)
+
+        return entry
+
+    # Make an entry the innermost binding of its name.
+    # @param name     the name.
+    # @param entry    the entry.
+    # @param replaced the entry it replaces in the same table, or None.
+    def bind(self, name, entry, replaced):
+        entries = self.bindings.get(name)
+        if entries is None:
+            self.bindings[name] = [entry]
+        elif (replaced is not None) and (entries[-1] is replaced):
+            entries[-1] = entry
+        else:
+            entries.append(entry)
 
     def lookupLocal(self, name):
         return self[self.currentNestingLevel].lookup(name)  # This is correct
 
     def lookup(self, name):
-        foundEntry = None
-
-        # Search the current and enclosing scopes.
-        # i = self.currentNestingLevel
-        # while (i >= 0) and (foundEntry is None):
-        #     foundEntry = self[i].lookup(name)
-        #     i -= 1 # i made decrememnt mistake i think
-        #     # it also added a break statement
-        # NO WAAY CRAZY
-        # ChatGPT's loop - very nice
-        for i in range(self.currentNestingLevel, -1, -1):
-            foundEntry = self[i].lookup(name)
-            if foundEntry:
-                break
-
-        return foundEntry
+        entries = self.bindings.get(name)
+        if entries:
+            return entries[-1]
+
+        return self[0].lookup(name)
@@ -5,10 +5,107 @@ from edu.yu.compilers.intermediate.type.Form import Form
 # FIXME This class was converted with ChatGPT so it was not checked so be aware
 
 class TypeChecker:
+    """Type checks by table.
+
+    Each predefined type a check can single out has a type ID, and every
+    other type (or no type at all) has OTHER. The capability flags of a
+    type and the compatibility and result types of a pair of types are
+    looked up by type ID in tables that initialize() builds once, after
+    the predefined types exist.
+    """
+
+    INTEGER, REAL, BOOLEAN, CHAR, STRING, OTHER = range(6)
+
+    ids = {}  # predefined Typespec -> type ID
+    types = ()  # type ID -> predefined Typespec, None for OTHER
+
+    # Capability flags by type ID. SCALAR is the scalar form, which boolean,
+    # an enumeration, doesn't have. OTHER has no capability of its own.
+    NUMERIC = (True, True, False, False, False, False)
+    LOGICAL = (False, False, True, False, False, False)
+    TEXTUAL = (False, False, False, False, True, False)
+    SCALAR = (True, True, False, True, True, False)
+
+    # Tables by [type ID][type ID].
+    realPairs = ()  # at least one real, and the other integer or real
+    assignable = ()  # assignment compatible, None if both are OTHER
+    comparable = ()  # comparison compatible, None if the first is OTHER
+    sumTypes = ()  # result of +
+    arithmeticTypes = ()  # result of - and *
+    quotientTypes = ()  # result of /
+
+    @staticmethod
+    def initialize():
+        """Build the tables for the predefined types. Repeated calls do nothing."""
+        if TypeChecker.ids:
+            return
+
+        TypeChecker.types = (Predefined.integerType, Predefined.realType, Predefined.booleanType,
+                             Predefined.charType, Predefined.stringType, None)
+        TypeChecker.ids = {type: typeId for typeId, type in enumerate(TypeChecker.types[:TypeChecker.OTHER])}
+
+        INTEGER, REAL, OTHER = TypeChecker.INTEGER, TypeChecker.REAL, TypeChecker.OTHER
+        NUMERIC, LOGICAL, TEXTUAL, SCALAR = TypeChecker.NUMERIC, TypeChecker.LOGICAL, TypeChecker.TEXTUAL, \
+            TypeChecker.SCALAR
+        typeIds = range(TypeChecker.OTHER + 1)
+
+        def table(result):
+            return tuple(tuple(result(id1, id2) for id2 in typeIds) for id1 in typeIds)
+
+        TypeChecker.realPairs = table(lambda id1, id2: NUMERIC[id1] and NUMERIC[id2] and REAL in (id1, id2))
+
+        # Identical types, or real := integer. Two types without an ID
+        # may be the same type.
+        def assignable(id1, id2):
+            if (id1 == OTHER) and (id2 == OTHER):
+                return None
+            return ((id1 == id2) and (id1 != OTHER)) or ((id1 == REAL) and (id2 == INTEGER))
+
+        # The same scalar type, the first an enumeration (boolean), or a
+        # real and a number. Whether a first type without an ID is scalar
+        # or an enumeration depends on its form.
+        def comparable(id1, id2):
+            if id1 == OTHER:
+                return None
+            return ((id1 == id2) and SCALAR[id1]) or LOGICAL[id1] or TypeChecker.realPairs[id1][id2]
+
+        TypeChecker.assignable = table(assignable)
+        TypeChecker.comparable = table(comparable)
+
+        def arithmeticType(id1, id2):
+            if (id1 == INTEGER) and (id2 == INTEGER):
+                return Predefined.integerType
+            elif TypeChecker.realPairs[id1][id2]:
+                return Predefined.realType
+            return None
+
+        def sumType(id1, id2):
+            if TEXTUAL[id1] and TEXTUAL[id2]:
+                return Predefined.stringType
+            return arithmeticType(id1, id2)
+
+        def quotientType(id1, id2):
+            return Predefined.realType if arithmeticType(id1, id2) is not None else None
+
+        TypeChecker.arithmeticTypes = table(arithmeticType)
+        TypeChecker.sumTypes = table(sumType)
+        TypeChecker.quotientTypes = table(quotientType)
+
+    @staticmethod
+    def typeId(type):
+        """Get the type ID of a type specification (of its base type)."""
+        if type is None:
+            return TypeChecker.OTHER
+
+        typeId = TypeChecker.ids.get(type)
+        if typeId is None:
+            typeId = TypeChecker.ids.get(type.baseType(), TypeChecker.OTHER)
+        return typeId
+
     @staticmethod
     def isInteger(type):
         """Check if a type specification is integer."""
-        return (type is not None) and (type.baseType() == Predefined.integerType)
+        return TypeChecker.typeId(type) == TypeChecker.INTEGER
 
     @staticmethod
     def areBothInteger(type1, type2):
@@ -18,24 +115,22 @@ class TypeChecker:
     @staticmethod
     def isReal(type):
         """Check if a type specification is real."""
-        return (type is not None) and (type.baseType() == Predefined.realType)
+        return TypeChecker.typeId(type) == TypeChecker.REAL
 
     @staticmethod
     def isIntegerOrReal(type):
         """Check if a type specification is integer or real."""
-        return TypeChecker.isInteger(type) or TypeChecker.isReal(type)
+        return TypeChecker.NUMERIC[TypeChecker.typeId(type)]
 
     @staticmethod
     def isAtLeastOneReal(type1, type2):
         """Check if at least one of two type specifications is real."""
-        return (TypeChecker.isReal(type1) and TypeChecker.isReal(type2)) or (
-                    TypeChecker.isReal(type1) and TypeChecker.isInteger(type2)) or (
-                    TypeChecker.isInteger(type1) and TypeChecker.isReal(type2))
+        return TypeChecker.realPairs[TypeChecker.typeId(type1)][TypeChecker.typeId(type2)]
 
     @staticmethod
     def isBoolean(type):
         """Check if a type specification is boolean."""
-        return (type is not None) and (type.baseType() == Predefined.booleanType)
+        return TypeChecker.LOGICAL[TypeChecker.typeId(type)]
 
     @staticmethod
     def areBothBoolean(type1, type2):
@@ -45,37 +140,42 @@ class TypeChecker:
     @staticmethod
     def isChar(type):
         """Check if a type specification is char."""
-        return (type is not None) and (type.baseType() == Predefined.charType)
+        return TypeChecker.typeId(type) == TypeChecker.CHAR
 
     @staticmethod
     def isString(type):
         """Check if a type specification is string."""
-        return (type is not None) and (type.baseType() == Predefined.stringType)
+        return TypeChecker.TEXTUAL[TypeChecker.typeId(type)]
 
     @staticmethod
     def areBothString(type1, type2):
         """Check if both type specifications are string."""
         return TypeChecker.isString(type1) and TypeChecker.isString(type2)
 
+    @staticmethod
+    def sumType(type1, type2):
+        """Get the result type of type1 + type2, None if they can't be added."""
+        return TypeChecker.sumTypes[TypeChecker.typeId(type1)][TypeChecker.typeId(type2)]
+
+    @staticmethod
+    def arithmeticType(type1, type2):
+        """Get the result type of type1 - type2 or type1 * type2, None if not numeric."""
+        return TypeChecker.arithmeticTypes[TypeChecker.typeId(type1)][TypeChecker.typeId(type2)]
+
+    @staticmethod
+    def quotientType(type1, type2):
+        """Get the result type of type1 / type2, None if not numeric."""
+        return TypeChecker.quotientTypes[TypeChecker.typeId(type1)][TypeChecker.typeId(type2)]
+
     @staticmethod
     def areAssignmentCompatible(targetType, valueType):
         """Check if two type specifications are assignment compatible."""
         if (targetType is None) or (valueType is None):
             return False
 
-        targetType = targetType.baseType()
-        valueType = valueType.baseType()
-
-        compatible = False
-
-        # Identical types.
-        if targetType == valueType:
-            compatible = True
-
-        # real := integer
-        elif TypeChecker.isReal(targetType) and TypeChecker.isInteger(valueType):
-            compatible = True
-
+        compatible = TypeChecker.assignable[TypeChecker.typeId(targetType)][TypeChecker.typeId(valueType)]
+        if compatible is None:
+            compatible = targetType.baseType() is valueType.baseType()
         return compatible
 
     @staticmethod
@@ -84,16 +184,9 @@ class TypeChecker:
         if (type1 is None) or (type2 is None):
             return False
 
-        type1 = type1.baseType()
-        type2 = type2.baseType()
-
-        form = type1.getForm()
-
-        compatible = False
-
-        if (type1 == type2 and form == Form.SCALAR) or form == Form.ENUMERATION:
-            compatible = True
-        elif TypeChecker.isAtLeastOneReal(type1, type2):
-            compatible = True
-
+        compatible = TypeChecker.comparable[TypeChecker.typeId(type1)][TypeChecker.typeId(type2)]
+        if compatible is None:
+            type1 = type1.baseType()
+            form = type1.getForm()
+            compatible = ((type1 is type2.baseType()) and (form == Form.SCALAR)) or (form == Form.ENUMERATION)
         return compatible
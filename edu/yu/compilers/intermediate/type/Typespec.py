@@ -1,8 +1,21 @@
+# <h1>Typespec</h1>
+# <p>A type specification.</p>
+# <p>Unnamed array and subrange types are hash-consed: arrayOf() and
+# subrangeOf() return the one Typespec of each structure, so equal types
+# are the same object and compare by identity. A shared type must not be
+# changed; a type definition names a copy of it.</p>
+import weakref
+
 # from edu.yu.compilers.intermediate.symtable.SymTable import SymTable
 from edu.yu.compilers.intermediate.type.Form import Form
 
 
 class Typespec:
+    __slots__ = ("name", "symTab", "form", "identifier", "info", "__weakref__")
+
+    # The shared types by structure. A type is dropped when it is no
+    # longer used, so no compilation keeps another's types alive.
+    interned = weakref.WeakValueDictionary()
 
     def __init__(self, form: Form):
         self.name = None
@@ -31,6 +44,64 @@ class Typespec:
         else:
             self.info = None
 
+    # Get the shared array type of a structure.
+    # @param indexType    the index type.
+    # @param elementCount the element count.
+    # @param elementType  the element type.
+    # @return the array type.
+    @staticmethod
+    def arrayOf(indexType, elementCount, elementType):
+        key = (Form.ARRAY, indexType, elementCount, elementType)
+        arrayType = Typespec.interned.get(key)
+        if arrayType is None:
+            arrayType = Typespec(Form.ARRAY)
+            arrayType.info.indexType = indexType
+            arrayType.info.elementCount = elementCount
+            arrayType.info.elementType = elementType
+            Typespec.interned[key] = arrayType
+        return arrayType
+
+    # Get the shared subrange type of a structure.
+    # @param baseType the base type.
+    # @param minValue the minimum value.
+    # @param maxValue the maximum value.
+    # @return the subrange type.
+    @staticmethod
+    def subrangeOf(baseType, minValue, maxValue):
+        key = (Form.SUBRANGE, baseType, minValue, maxValue)
+        subrangeType = Typespec.interned.get(key)
+        if subrangeType is None:
+            subrangeType = Typespec(Form.SUBRANGE)
+            subrangeType.info.baseType = baseType
+            subrangeType.info.minValue = minValue
+            subrangeType.info.maxValue = maxValue
+            Typespec.interned[key] = subrangeType
+        return subrangeType
+
+    # Determine whether the type is shared by all the uses of its structure.
+    # @return true if shared, false if not.
+    def isShared(self):
+        if self.form == Form.ARRAY:
+            key = (Form.ARRAY, self.info.indexType, self.info.elementCount, self.info.elementType)
+        elif self.form == Form.SUBRANGE:
+            key = (Form.SUBRANGE, self.info.baseType, self.info.minValue, self.info.maxValue)
+        else:
+            return False
+
+        return Typespec.interned.get(key) is self
+
+    # Create an unshared copy of the type, such as one to name.
+    # @return the copy.
+    def copy(self):
+        typespec = Typespec(self.form)
+        typespec.name = self.name
+        typespec.symTab = self.symTab
+        typespec.identifier = self.identifier
+        if self.info is not None:
+            for slot in type(self.info).__slots__:
+                setattr(typespec.info, slot, getattr(self.info, slot))
+        return typespec
+
     # Determine whether the type is structured (array or record).
     # @return true if structured, false if not.
 
@@ -199,25 +270,33 @@ class Typespec:
 
 
 class TypeInfo:
-    pass
+    __slots__ = ()
 
 class EnumerationInfo(TypeInfo):
+    __slots__ = ("constants",)
+
     def __init__(self):
         self.constants = []
 
 class SubrangeInfo(TypeInfo):
+    __slots__ = ("baseType", "minValue", "maxValue")
+
     def __init__(self):
         self.baseType = None
         self.minValue = 0
         self.maxValue = 0
 
 class ArrayInfo(TypeInfo):
+    __slots__ = ("indexType", "elementType", "elementCount")
+
     def __init__(self):
         self.indexType = None
         self.elementType = None
         self.elementCount = 0
 
 class RecordInfo(TypeInfo):
+    __slots__ = ("typePath", "symTable")
+
     def __init__(self):
         self.typePath = ""
         self.symTable = None
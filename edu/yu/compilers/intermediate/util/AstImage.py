@@ -0,0 +1,569 @@
+# <h1>AstImage</h1>
+# <p>A compact binary image of an abstract syntax tree after semantic
+# analysis: the tokens of the source, the node kinds, token spans, names
+# and children, and everything Semantics hung on the tree (type_, entry
+# and value locals), together with the symbol tables and type
+# specifications they refer to.</p>
+# <p>The image is made of fixed-size records in offset-indexed sections,
+# so a tool can mmap it and read single nodes with struct.unpack_from()
+# without loading the rest. rebuild() turns it back into the decorated
+# tree that the Converter accepts as if Semantics had just analyzed it.</p>
+import mmap
+import struct
+
+from antlr4.Token import CommonToken
+
+from edu.yu.compilers.frontend.IdentifierTokenFactory import IdentifierTokenFactory
+from edu.yu.compilers.intermediate.ast import Ast
+from edu.yu.compilers.intermediate.symtable.Kind import Kind
+from edu.yu.compilers.intermediate.symtable.Predefined import Predefined
+from edu.yu.compilers.intermediate.symtable.Routine import Routine
+from edu.yu.compilers.intermediate.symtable.SymTable import SymTable
+from edu.yu.compilers.intermediate.symtable.SymTableEntry import SymTableEntry
+from edu.yu.compilers.intermediate.symtable.SymTableStack import SymTableStack
+from edu.yu.compilers.intermediate.type.Form import Form
+from edu.yu.compilers.intermediate.type.Typespec import Typespec
+
+
+class AstImage:
+    MAGIC = b"GRASPAST"
+    VERSION = 3
+
+    NONE = -0x80000000  # a missing reference or optional integer
+
+    # Sections, in file order. Lists (a node's children, an entry's line
+    # numbers, ...) are (offset, count) slices of the INTS section. The
+    # TOKENS section holds every token of the source in order, so a token's
+    # record number is its token index.
+    STRING_INDEX, STRING_DATA, KINDS, TOKENS, NODES, \
+        TYPES, ENTRIES, SYMTABLES, VALUES, INTS = range(10)
+    SECTION_COUNT = 10
+
+    HEADER = struct.Struct("<8sHHii")  # magic, version, sections, root node, program entry
+    SECTION = struct.Struct("<II")  # offset, record count
+    STRING = struct.Struct("<II")  # offset into STRING_DATA, length in bytes
+    INT = struct.Struct("<i")
+    TOKEN = struct.Struct("<iiiii")  # type, line, column, token index, text
+    NODE = struct.Struct("<iiIIiiiiii")  # kind, parent, first child, child count, start token,
+                                        # stop token, name, type, entry, value
+    TYPE = struct.Struct("<iiiiii")  # form (0 = predefined), name, symtab, a, b, c
+    ENTRY = struct.Struct("<16i")  # see Writer.fillEntry()
+    SYMTABLE = struct.Struct("<6i")  # nesting level, slot, max slot, owner, entries, count
+    VALUE = struct.Struct("<iq")  # tag, payload
+
+    # Value tags.
+    NO_VALUE, BOOLEAN, INTEGER, REAL, STRING_VALUE = range(5)
+
+    # Entry flags.
+    HAS_TYPE, HAS_IMMUTABLE, IMMUTABLE, INLINE, NESTED, ROUTINE = (1 << i for i in range(6))
+
+    # Write the image of a decorated abstract syntax tree.
+    # @param path      the image file path.
+    # @param tree      the Program node after Semantics.
+    # @param programId the program identifier's symbol table entry.
+    @staticmethod
+    def write(path, tree, programId):
+        writer = AstImage.Writer()
+        data = writer.encode(tree, programId)
+
+        with open(path, 'wb') as file:
+            file.write(data)
+
+    # Open an image. The file is memory-mapped, not read.
+    # @param path the image file path.
+    def __init__(self, path):
+        with open(path, 'rb') as file:
+            self.mm = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, sectionCount, self.rootNode, self.programEntry = AstImage.HEADER.unpack_from(self.mm, 0)
+        if magic != AstImage.MAGIC or version != AstImage.VERSION or sectionCount != AstImage.SECTION_COUNT:
+            self.mm.close()
+            raise ValueError(f"{path} is not a version {AstImage.VERSION} Grasp AST image")
+
+        self.sections = [AstImage.SECTION.unpack_from(self.mm, AstImage.HEADER.size + i * AstImage.SECTION.size)
+                         for i in range(sectionCount)]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.close()
+
+    def close(self):
+        self.mm.close()
+
+    # ----- Record access. Nothing below reads more than it returns. -----
+
+    def record(self, section, layout, index):
+        offset, count = self.sections[section]
+        if not 0 <= index < count:
+            raise IndexError(f"record {index} of section {section}")
+        return layout.unpack_from(self.mm, offset + index * layout.size)
+
+    def count(self, section):
+        return self.sections[section][1]
+
+    def string(self, sid):
+        if sid == AstImage.NONE:
+            return None
+        offset, length = self.record(AstImage.STRING_INDEX, AstImage.STRING, sid)
+        base = self.sections[AstImage.STRING_DATA][0]
+        return self.mm[base + offset:base + offset + length].decode("utf-8")
+
+    def ints(self, offset, count):
+        base = self.sections[AstImage.INTS][0]
+        return struct.unpack_from(f"<{count}i", self.mm, base + offset * AstImage.INT.size)
+
+    def nodeCount(self):
+        return self.count(AstImage.NODES)
+
+    # Get the node class name of a node, e.g. "VariableFactor".
+    def kind(self, node):
+        kind = self.record(AstImage.NODES, AstImage.NODE, node)[0]
+        return self.string(self.record(AstImage.KINDS, AstImage.INT, kind)[0])
+
+    def parent(self, node):
+        parent = self.record(AstImage.NODES, AstImage.NODE, node)[1]
+        return None if parent == AstImage.NONE else parent
+
+    # Get the children of a node in grammar order.
+    # @return a list of node indexes.
+    def children(self, node):
+        first, count = self.record(AstImage.NODES, AstImage.NODE, node)[2:4]
+        return list(self.ints(first, count))
+
+    def token(self, token):
+        tokenType, line, column, tokenIndex, text = self.record(AstImage.TOKENS, AstImage.TOKEN, token)
+        return tokenType, line, column, tokenIndex, self.string(text)
+
+    # Get the source line of the first token of a node.
+    def line(self, node):
+        start = self.record(AstImage.NODES, AstImage.NODE, node)[4]
+        return None if start == AstImage.NONE else self.token(start)[1]
+
+    # Get the text of a node, like Node.getText().
+    def text(self, node):
+        start, stop = self.record(AstImage.NODES, AstImage.NODE, node)[4:6]
+        if stop == AstImage.NONE:
+            return ""
+        return "".join(self.token(token)[4] for token in range(start, stop + 1))
+
+    # Get the text of a node's token field, such as an identifier's name.
+    def name(self, node):
+        return self.string(self.record(AstImage.NODES, AstImage.NODE, node)[6])
+
+    # Get the name and form of a node's type, if Semantics gave it one.
+    def typeOf(self, node):
+        typeRef = self.record(AstImage.NODES, AstImage.NODE, node)[7]
+        if typeRef == AstImage.NONE:
+            return None
+        form, name = self.record(AstImage.TYPES, AstImage.TYPE, typeRef)[:2]
+        return self.string(name), ("predefined" if form == 0 else str(Form(form)))
+
+    # Get the name and kind of a node's symbol table entry, if any.
+    def entryOf(self, node):
+        entryRef = self.record(AstImage.NODES, AstImage.NODE, node)[8]
+        if entryRef == AstImage.NONE:
+            return None
+        name, kind = self.record(AstImage.ENTRIES, AstImage.ENTRY, entryRef)[:2]
+        return self.string(name), Kind(kind)
+
+    # ----- Rebuilding the decorated tree. -----
+
+    # Rebuild the decorated tree with its symbol tables and types.
+    # @return (the Program node, the program identifier's entry).
+    def rebuild(self):
+        # The predefined types are shared with the live compiler.
+        if Predefined.prelude is None:
+            Predefined.initialize(SymTableStack())
+        predefined = {
+            "integer": Predefined.integerType,
+            "decimal": Predefined.realType,
+            "boolean": Predefined.booleanType,
+            "char": Predefined.charType,
+            "string": Predefined.stringType,
+        }
+
+        kinds = [getattr(Ast, self.string(self.record(AstImage.KINDS, AstImage.INT, i)[0]))
+                 for i in range(self.count(AstImage.KINDS))]
+
+        tokens = []
+        for i in range(self.count(AstImage.TOKENS)):
+            tokenType, line, column, tokenIndex, text = self.token(i)
+            token = CommonToken(type=tokenType)
+            token.line = line
+            token.column = column
+            token.tokenIndex = tokenIndex
+            token.text = text
+            tokens.append(token)
+
+        # Create every object first, then link them: the references are cyclic.
+        nodes = []
+        for i in range(self.nodeCount()):
+            kind, parent, first, count, start, stop = self.record(AstImage.NODES, AstImage.NODE, i)[:6]
+            nodes.append(kinds[kind](tokens, tokens[start], None if stop == AstImage.NONE else tokens[stop]))
+        symTables = [SymTable(self.record(AstImage.SYMTABLES, AstImage.SYMTABLE, i)[0])
+                     for i in range(self.count(AstImage.SYMTABLES))]
+        types = []
+        for i in range(self.count(AstImage.TYPES)):
+            form, name = self.record(AstImage.TYPES, AstImage.TYPE, i)[:2]
+            types.append(predefined[self.string(name)] if form == 0 else Typespec(Form(form)))
+        entries = []
+        for i in range(self.count(AstImage.ENTRIES)):
+            name, kind, symTable = self.record(AstImage.ENTRIES, AstImage.ENTRY, i)[:3]
+            entries.append(SymTableEntry(self.string(name), Kind(kind), symTables[symTable]))
+
+        def ref(objects, index):
+            return None if index == AstImage.NONE else objects[index]
+
+        for i, node in enumerate(nodes):
+            kind, parent, first, count, start, stop, name, typeRef, entryRef, valueRef = \
+                self.record(AstImage.NODES, AstImage.NODE, i)
+            for field in node.TOKENS.values():
+                setattr(node, field, self.string(name))
+                if field == "name" and node.name is not None:
+                    node.name, node.key = IdentifierTokenFactory.intern(node.name)
+            if typeRef != AstImage.NONE:
+                node.type_ = types[typeRef]
+            if entryRef != AstImage.NONE:
+                node.entry = entries[entryRef]
+            if valueRef != AstImage.NONE:
+                node.value = self.value(valueRef)
+
+            for childRef in self.ints(first, count):
+                node.add(nodes[childRef])
+
+        for i, typespec in enumerate(types):
+            form, name, symTab, a, b, c = self.record(AstImage.TYPES, AstImage.TYPE, i)
+            if form == 0:
+                continue
+
+            typespec.setIdentifier(self.string(name), ref(symTables, symTab))
+            if typespec.form == Form.ENUMERATION:
+                typespec.setEnumerationConstants([entries[e] for e in self.ints(a, b)])
+            elif typespec.form == Form.SUBRANGE:
+                typespec.setSubrangeBaseType(ref(types, a))
+                typespec.setSubrangeMinValue(self.value(b))
+                typespec.setSubrangeMaxValue(self.value(c))
+            elif typespec.form == Form.ARRAY:
+                typespec.setArrayIndexType(ref(types, a))
+                typespec.setArrayElementType(ref(types, b))
+                typespec.setArrayElementCount(c)
+            elif typespec.form == Form.RECORD:
+                typespec.setRecordTypePath(self.string(a))
+                typespec.setRecordSymTable(ref(symTables, b))
+
+        for i, entry in enumerate(entries):
+            (name, kind, symTable, typeRef, slot, valueRef, linesAt, lineCount, flags, code,
+             routineSymTable, paramsAt, paramCount, subroutinesAt, subroutineCount, executable) = \
+                self.record(AstImage.ENTRIES, AstImage.ENTRY, i)
+
+            if flags & AstImage.HAS_TYPE:
+                entry.setType(ref(types, typeRef))
+            entry.setSlotNumber(None if slot == AstImage.NONE else slot)
+            if valueRef != AstImage.NONE:
+                if not hasattr(entry, "info"):
+                    entry.info = SymTableEntry.ValueInfo()
+                entry.setValue(self.value(valueRef))
+            entry.lineNumbers = list(self.ints(linesAt, lineCount))
+            if flags & AstImage.HAS_IMMUTABLE:
+                entry.setImmutable(bool(flags & AstImage.IMMUTABLE))
+
+            if flags & AstImage.ROUTINE:
+                if not isinstance(getattr(entry, "info", None), SymTableEntry.RoutineInfo):
+                    entry.info = SymTableEntry.RoutineInfo()
+                    entry.info.parameters = []
+                    entry.info.subroutines = []
+                entry.setRoutineCode(None if code == AstImage.NONE else Routine(code))
+                entry.setRoutineSymTable(ref(symTables, routineSymTable))
+                entry.setRoutineParameters([entries[e] for e in self.ints(paramsAt, paramCount)])
+                entry.info.subroutines = [entries[e] for e in self.ints(subroutinesAt, subroutineCount)]
+                entry.setExecutable(ref(nodes, executable))
+                entry.setInline(bool(flags & AstImage.INLINE))
+                entry.setNested(bool(flags & AstImage.NESTED))
+
+        for i, symTable in enumerate(symTables):
+            nestingLevel, slot, maxSlot, owner, entriesAt, entryCount = \
+                self.record(AstImage.SYMTABLES, AstImage.SYMTABLE, i)
+            symTable.slotNumber = slot
+            symTable.maxSlotNumber = None if maxSlot == AstImage.NONE else maxSlot
+            symTable.setOwner(ref(entries, owner))
+            for e in self.ints(entriesAt, entryCount):
+                symTable[entries[e].getName()] = entries[e]
+
+        return nodes[self.rootNode], ref(entries, self.programEntry)
+
+    def value(self, valueRef):
+        tag, payload = self.record(AstImage.VALUES, AstImage.VALUE, valueRef)
+
+        if tag == AstImage.BOOLEAN:
+            return bool(payload)
+        elif tag == AstImage.INTEGER:
+            return payload
+        elif tag == AstImage.REAL:
+            return struct.unpack("<d", struct.pack("<q", payload))[0]
+        elif tag == AstImage.STRING_VALUE:
+            return self.string(payload)
+        else:
+            return None
+
+    # Encodes a decorated tree. Objects get their record number when first
+    # seen and their record filled in when taken off the work list, so
+    # cyclic references (entry -> symbol table -> entry) are no problem.
+    class Writer:
+
+        def __init__(self):
+            self.stringIds = {}
+            self.strings = []
+            self.kindIds = {}
+            self.kinds = []
+            self.tokens = []
+            self.nodeIds = {}
+            self.nodes = []
+            self.children = []
+            self.typeIds = {}
+            self.types = []
+            self.entryIds = {}
+            self.entries = []
+            self.symTableIds = {}
+            self.symTables = []
+            self.values = []
+            self.ints = []
+            self.pending = []
+
+            self.predefinedNames = {
+                id(Predefined.integerType): "integer",
+                id(Predefined.realType): "decimal",
+                id(Predefined.booleanType): "boolean",
+                id(Predefined.charType): "char",
+                id(Predefined.stringType): "string",
+            }
+
+        def encode(self, tree, programId):
+            self.tokens = [(token.type, token.line, token.column, token.tokenIndex, self.string(token.text))
+                           for token in tree.tokens]
+
+            # Number the nodes breadth first so each node's children are
+            # contiguous in the CHILDREN section.
+            self.nodeRef(tree, AstImage.NONE)
+            position = 0
+            while position < len(self.nodes):
+                self.fillNode(position)
+                position += 1
+
+            programRef = self.entryRef(programId)
+            while self.pending:
+                fill, obj, index = self.pending.pop()
+                fill(obj, index)
+
+            return self.pack(programRef)
+
+        def string(self, text):
+            if text is None:
+                return AstImage.NONE
+            sid = self.stringIds.get(text)
+            if sid is None:
+                sid = len(self.strings)
+                self.stringIds[text] = sid
+                self.strings.append(text)
+            return sid
+
+        def intList(self, values):
+            offset = len(self.ints)
+            self.ints.extend(values)
+            return offset, len(values)
+
+        def value(self, value):
+            if value is None:
+                return AstImage.NONE
+            elif isinstance(value, bool):
+                record = (AstImage.BOOLEAN, int(value))
+            elif isinstance(value, int) and -2 ** 63 <= value < 2 ** 63:
+                record = (AstImage.INTEGER, value)
+            elif isinstance(value, float):
+                record = (AstImage.REAL, struct.unpack("<q", struct.pack("<d", value))[0])
+            else:
+                record = (AstImage.STRING_VALUE, self.string(str(value)))
+            self.values.append(record)
+            return len(self.values) - 1
+
+        @staticmethod
+        def tokenRef(token):
+            return AstImage.NONE if token is None else token.tokenIndex
+
+        def nodeRef(self, node, parentRef):
+            index = len(self.nodes)
+            self.nodeIds[id(node)] = index
+            self.nodes.append((node, parentRef))
+            return index
+
+        def fillNode(self, index):
+            node, parentRef = self.nodes[index]
+
+            first, count = self.intList([self.nodeRef(child, index) for child in node.getChildren()])
+
+            # A node has at most one token field.
+            name = AstImage.NONE
+            for field in node.TOKENS.values():
+                name = self.string(getattr(node, field))
+
+            kindName = type(node).__name__
+            kind = self.kindIds.get(kindName)
+            if kind is None:
+                kind = len(self.kinds)
+                self.kindIds[kindName] = kind
+                self.kinds.append((self.string(kindName),))
+
+            self.nodes[index] = (kind, parentRef, first, count,
+                                 self.tokenRef(node.start), self.tokenRef(node.stop), name,
+                                 self.typeRef(getattr(node, "type_", None)),
+                                 self.entryRef(getattr(node, "entry", None)),
+                                 self.value(getattr(node, "value", None)))
+
+        def typeRef(self, typespec):
+            if typespec is None:
+                return AstImage.NONE
+            index = self.typeIds.get(id(typespec))
+            if index is None:
+                index = len(self.types)
+                self.typeIds[id(typespec)] = index
+                self.types.append(None)
+                self.pending.append((self.fillType, typespec, index))
+            return index
+
+        def fillType(self, typespec, index):
+            predefinedName = self.predefinedNames.get(id(typespec))
+            if predefinedName is not None:
+                self.types[index] = (0, self.string(predefinedName), AstImage.NONE, 0, 0, 0)
+                return
+
+            form = typespec.getForm()
+            a = b = c = 0
+            if form == Form.ENUMERATION:
+                a, b = self.intList([self.entryRef(e) for e in typespec.getEnumerationConstants()])
+            elif form == Form.SUBRANGE:
+                a = self.typeRef(typespec.getSubrangeBaseType())
+                b = self.value(typespec.getSubrangeMinValue())
+                c = self.value(typespec.getSubrangeMaxValue())
+            elif form == Form.ARRAY:
+                a = self.typeRef(typespec.getArrayIndexType())
+                b = self.typeRef(typespec.getArrayElementType())
+                c = typespec.getArrayElementCount()
+            elif form == Form.RECORD:
+                a = self.string(typespec.getRecordTypePath())
+                b = self.symTableRef(typespec.getRecordSymTable())
+
+            self.types[index] = (form.value, self.string(typespec.getName()),
+                                 self.symTableRef(typespec.getSymTab()), a, b, c)
+
+        def entryRef(self, entry):
+            if entry is None:
+                return AstImage.NONE
+            index = self.entryIds.get(id(entry))
+            if index is None:
+                index = len(self.entries)
+                self.entryIds[id(entry)] = index
+                self.entries.append(None)
+                self.pending.append((self.fillEntry, entry, index))
+            return index
+
+        # An entry record is: name, kind, symbol table, type, slot number,
+        # value, line numbers (offset, count), flags, routine code, routine
+        # symbol table, parameters (offset, count), subroutines (offset,
+        # count), executable node.
+        def fillEntry(self, entry, index):
+            flags = 0
+            typeRef = AstImage.NONE
+            if hasattr(entry, "typespec"):
+                flags |= AstImage.HAS_TYPE
+                typeRef = self.typeRef(entry.getType())
+            if hasattr(entry, "immutable"):
+                flags |= AstImage.HAS_IMMUTABLE
+                if entry.isImmutable():
+                    flags |= AstImage.IMMUTABLE
+
+            info = getattr(entry, "info", None)
+            valueRef = AstImage.NONE
+            code = routineSymTable = executable = AstImage.NONE
+            paramsAt = paramCount = subroutinesAt = subroutineCount = 0
+
+            if isinstance(info, SymTableEntry.RoutineInfo):
+                flags |= AstImage.ROUTINE
+                if info.inline:
+                    flags |= AstImage.INLINE
+                if info.nestedSubroutine:
+                    flags |= AstImage.NESTED
+                code = info.code.value if info.code is not None else AstImage.NONE
+                routineSymTable = self.symTableRef(getattr(info, "symTable", None))
+                paramsAt, paramCount = self.intList([self.entryRef(p) for p in info.parameters or []])
+                subroutinesAt, subroutineCount = self.intList([self.entryRef(s) for s in info.subroutines or []])
+                executable = self.nodeIds.get(id(info.executable), AstImage.NONE)
+            elif isinstance(info, SymTableEntry.ValueInfo):
+                valueRef = self.value(info.value)
+
+            slot = entry.getSlotNumber()
+            linesAt, lineCount = self.intList(entry.getLineNumbers())
+
+            self.entries[index] = (self.string(entry.getName()), entry.getKind().value,
+                                   self.symTableRef(entry.getSymTable()), typeRef,
+                                   AstImage.NONE if slot is None else slot, valueRef,
+                                   linesAt, lineCount, flags, code, routineSymTable,
+                                   paramsAt, paramCount, subroutinesAt, subroutineCount, executable)
+
+        def symTableRef(self, symTable):
+            if symTable is None:
+                return AstImage.NONE
+            index = self.symTableIds.get(id(symTable))
+            if index is None:
+                index = len(self.symTables)
+                self.symTableIds[id(symTable)] = index
+                self.symTables.append(None)
+                self.pending.append((self.fillSymTable, symTable, index))
+            return index
+
+        def fillSymTable(self, symTable, index):
+            entriesAt, entryCount = self.intList([self.entryRef(e) for e in symTable.sortedEntries()])
+            maxSlot = symTable.getMaxSlotNumber()
+
+            self.symTables[index] = (symTable.getNestingLevel(), symTable.slotNumber,
+                                     AstImage.NONE if maxSlot is None else maxSlot,
+                                     self.entryRef(symTable.getOwner()), entriesAt, entryCount)
+
+        def pack(self, programRef):
+            stringData = bytearray()
+            stringIndex = []
+            for text in self.strings:
+                encoded = text.encode("utf-8")
+                stringIndex.append((len(stringData), len(encoded)))
+                stringData += encoded
+
+            sections = [
+                (AstImage.STRING, stringIndex),
+                (None, bytes(stringData)),
+                (AstImage.INT, self.kinds),
+                (AstImage.TOKEN, self.tokens),
+                (AstImage.NODE, self.nodes),
+                (AstImage.TYPE, self.types),
+                (AstImage.ENTRY, self.entries),
+                (AstImage.SYMTABLE, self.symTables),
+                (AstImage.VALUE, self.values),
+                (AstImage.INT, [(i,) for i in self.ints]),
+            ]
+
+            body = bytearray()
+            table = []
+            start = AstImage.HEADER.size + AstImage.SECTION_COUNT * AstImage.SECTION.size
+            for layout, records in sections:
+                offset = start + len(body)
+                if layout is None:
+                    table.append((offset, len(records)))
+                    body += records
+                else:
+                    table.append((offset, len(records)))
+                    for record in records:
+                        body += layout.pack(*record)
+
+            header = AstImage.HEADER.pack(AstImage.MAGIC, AstImage.VERSION, AstImage.SECTION_COUNT,
+                                          0, programRef)
+            header += b"".join(AstImage.SECTION.pack(*entry) for entry in table)
+            return bytes(header + body)
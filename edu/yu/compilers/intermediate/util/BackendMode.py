@@ -5,3 +5,4 @@ class BackendMode(Enum):
     CONVERTER = 1
     EXECUTOR = 2
     COMPILER = 3
+    PYTHON = 4
@@ -0,0 +1,102 @@
+# <h1>ParserConformance</h1>
+# <p>The differential check of RecursiveDescentParser against the
+# generated GraspParser. Both parse the same tokens of every .grasp and
+# .pgm source, and their trees are compared node for node: the same
+# context classes, tokens, start and stop tokens, and parent links. A
+# source with syntax errors must be rejected. The sources default to the
+# programs in this directory. Run from the repository root:</p>
+# <pre>python -m programs.ParserConformance [path ...]</pre>
+# <p>The exit status is 1 if any source parsed differently.</p>
+import sys
+import time
+
+from antlr4 import CommonTokenStream, FileStream
+from antlr4.error.Errors import ParseCancellationException
+from antlr4.tree.Tree import TerminalNode
+
+from edu.yu.compilers.frontend.RecursiveDescentParser import RecursiveDescentParser
+from gen.GraspLexer import GraspLexer
+from gen.GraspParser import GraspParser
+from programs.ScannerConformance import PROGRAMS_DIR, sourceFiles
+
+
+# Compare two parse trees node for node: the same context classes, the
+# same tokens, and the same start and stop tokens.
+# @return a description of the first difference, or None.
+def treeDifference(expected, actual):
+    if isinstance(expected, TerminalNode) or isinstance(actual, TerminalNode):
+        if type(expected) is not type(actual) or expected.symbol is not actual.symbol:
+            return f"token {expected.getText()!r} against {actual.getText()!r}"
+        return None
+
+    if type(expected) is not type(actual):
+        return f"{type(expected).__name__} against {type(actual).__name__} at line {expected.start.line}"
+    if (expected.start is not actual.start) or (expected.stop is not actual.stop):
+        return f"{type(expected).__name__} spans differ at line {expected.start.line}"
+
+    expectedChildren = expected.children or []
+    actualChildren = actual.children or []
+    if len(expectedChildren) != len(actualChildren):
+        return f"{type(expected).__name__} has {len(actualChildren)} children, not {len(expectedChildren)}, " \
+               f"at line {expected.start.line}"
+    for expectedChild, actualChild in zip(expectedChildren, actualChildren):
+        if actualChild.parentCtx is not actual:
+            return f"{type(actualChild).__name__} has the wrong parent at line {expected.start.line}"
+        difference = treeDifference(expectedChild, actualChild)
+        if difference is not None:
+            return difference
+    return None
+
+
+# Compare the parser with GraspParser over source files. Both parse the
+# same tokens. Sources with syntax errors must be rejected.
+# @param paths files and directories of .grasp and .pgm sources.
+# @return the number of files that parsed differently.
+def compareWithGraspParser(paths):
+    sourceNames = sourceFiles(paths)
+
+    differences = 0
+    antlrTime = 0.0
+    descentTime = 0.0
+    for sourceName in sourceNames:
+        lexer = GraspLexer(FileStream(sourceName))
+        lexer.removeErrorListeners()
+        tokens = CommonTokenStream(lexer)
+        tokens.fill()
+
+        parser = GraspParser(tokens)
+        parser.removeErrorListeners()
+        start = time.perf_counter()
+        expected = parser.program()
+        antlrTime += time.perf_counter() - start
+        errorCount = parser.getNumberOfSyntaxErrors()
+
+        start = time.perf_counter()
+        try:
+            actual = RecursiveDescentParser().parse(tokens)
+            failure = None
+        except ParseCancellationException as ex:
+            actual = None
+            failure = str(ex)
+        descentTime += time.perf_counter() - start
+
+        if errorCount > 0:
+            difference = None if actual is None else f"accepted a source with {errorCount} syntax errors"
+        elif actual is None:
+            difference = f"rejected a valid source: {failure}"
+        else:
+            difference = treeDifference(expected, actual)
+
+        if difference is None:
+            print(f"{sourceName}: same" + (" (rejected)" if actual is None else ""))
+        else:
+            differences += 1
+            print(f"{sourceName}: {difference}")
+
+    print(f"{len(sourceNames)} files, {differences} different. "
+          f"GraspParser {antlrTime * 1000:.1f} ms, RecursiveDescentParser {descentTime * 1000:.1f} ms.")
+    return differences
+
+
+if __name__ == "__main__":
+    sys.exit(1 if compareWithGraspParser(sys.argv[1:] or [PROGRAMS_DIR]) > 0 else 0)
@@ -0,0 +1,97 @@
+# <h1>ScannerConformance</h1>
+# <p>The differential check of GraspScanner against the generated
+# GraspLexer. It lexes every .grasp and .pgm source with both and
+# compares the token streams (types, text, positions, channel) and the
+# token recognition errors. The sources default to the programs in this
+# directory. Run from the repository root:</p>
+# <pre>python -m programs.ScannerConformance [path ...]</pre>
+# <p>The exit status is 1 if any source lexed differently.</p>
+import os
+import sys
+
+from antlr4 import FileStream
+from antlr4.Token import Token
+from antlr4.error.ErrorListener import ErrorListener
+
+from edu.yu.compilers.frontend.GraspScanner import GraspScanner
+from gen.GraspLexer import GraspLexer
+
+# The sample programs.
+PROGRAMS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+# Records the errors a lexer reports.
+class ErrorRecorder(ErrorListener):
+
+    def __init__(self):
+        self.errors = []
+
+    def syntaxError(self, recognizer, offendingSymbol, line, charPositionInLine, msg, ex):
+        self.errors.append((line, charPositionInLine, msg))
+
+
+# Get the source files among files and directories.
+# @param paths the files and directories.
+# @return the file names, the .grasp and .pgm files of a directory in
+#         sorted order.
+def sourceFiles(paths):
+    sourceNames = []
+    for path in paths:
+        if os.path.isdir(path):
+            for directory, subdirectories, fileNames in os.walk(path):
+                subdirectories.sort()
+                sourceNames += [os.path.join(directory, fileName) for fileName in sorted(fileNames)
+                                if fileName.endswith((".grasp", ".pgm"))]
+        else:
+            sourceNames.append(path)
+    return sourceNames
+
+
+# Lex a source with a lexer class.
+# @param lexerClass GraspLexer or GraspScanner.
+# @param source the InputStream.
+# @return the list of token descriptions and the list of errors.
+def lexAll(lexerClass, source):
+    lexer = lexerClass(source)
+    lexer.removeErrorListeners()
+    recorder = ErrorRecorder()
+    lexer.addErrorListener(recorder)
+
+    tokens = []
+    while True:
+        token = lexer.nextToken()
+        tokens.append((token.type, token.text, token.line, token.column,
+                       token.start, token.stop, token.channel))
+        if token.type == Token.EOF:
+            return tokens, recorder.errors
+
+
+# Compare the scanner with GraspLexer over source files.
+# @param paths files and directories of .grasp and .pgm sources.
+# @return the number of files that lexed differently.
+def compareWithGraspLexer(paths):
+    sourceNames = sourceFiles(paths)
+
+    differences = 0
+    for sourceName in sourceNames:
+        expected = lexAll(GraspLexer, FileStream(sourceName))
+        actual = lexAll(GraspScanner, FileStream(sourceName))
+
+        if actual == expected:
+            print(f"{sourceName}: same {len(expected[0])} tokens")
+        else:
+            differences += 1
+            for which, expectedList, actualList in (("token", expected[0], actual[0]),
+                                                    ("error", expected[1], actual[1])):
+                for index, (want, got) in enumerate(zip(expectedList + [None] * len(actualList),
+                                                        actualList + [None] * len(expectedList))):
+                    if want != got:
+                        print(f"{sourceName}: {which} {index} differs: GraspLexer {want}, GraspScanner {got}")
+                        break
+
+    print(f"{len(sourceNames)} files, {differences} different.")
+    return differences
+
+
+if __name__ == "__main__":
+    sys.exit(1 if compareWithGraspLexer(sys.argv[1:] or [PROGRAMS_DIR]) > 0 else 0)